@@ -10,6 +10,8 @@ Task 0-ARCH.4: Thought Prompts Templates ✅ COMPLETE
 from .react_agent_service import ReActAgent, ReActAgentState
 from .tool_registry import ToolRegistry, create_tool_registry
 from .thought_prompts import ThoughtPrompts, ReasoningExample
+from .tool_result_cache import ToolResultCache, get_tool_result_cache
+from .llm_client import LLMClient, LLMResponse, get_llm_client
 
 __all__ = [
     'ReActAgent',
@@ -17,5 +19,10 @@ __all__ = [
     'ToolRegistry',
     'create_tool_registry',
     'ThoughtPrompts',
-    'ReasoningExample'
+    'ReasoningExample',
+    'ToolResultCache',
+    'get_tool_result_cache',
+    'LLMClient',
+    'LLMResponse',
+    'get_llm_client'
 ]
@@ -10,6 +10,7 @@ Features:
 2. Max 3 retries per tool with exponential backoff
 3. Alternative tool suggestion when retries exhausted
 4. Retry history tracking per tool
+5. Per-analysis, deadline-aware retry scheduling (RetryScheduler)
 
 Usage:
     corrector = SelfCorrectionStrategy()
@@ -23,6 +24,11 @@ Usage:
         alt_tool = corrector.suggest_alternative_tool(tool_name, error_category)
         # Try alternative tool
 
+    # Non-blocking: keep retry counts in the analysis state
+    scheduler = RetryScheduler(corrector, state['retry_history'], deadline)
+    if scheduler.schedule_retry(tool_name, error):
+        # ... run other planned tools until scheduler.is_due(tool_name)
+
 File: implementation/agents/correction_strategy.py
 Created: 2025-11-02
 Task: 0-ARCH.5
@@ -55,7 +61,8 @@ class SelfCorrectionStrategy:
         self.retry_history: Dict[str, int] = {}  # tool_name -> retry_count
         self.last_retry_time: Dict[str, datetime] = {}  # tool_name -> last_retry_timestamp
 
-    def should_retry(self, tool_name: str, error: Exception) -> bool:
+    def should_retry(self, tool_name: str, error: Exception,
+                     retry_history: Optional[Dict[str, int]] = None) -> bool:
         """
         Decide if we should retry a failed tool execution.
 
@@ -67,12 +74,17 @@ class SelfCorrectionStrategy:
         Args:
             tool_name: Name of the tool that failed
             error: The exception that was raised
+            retry_history: Per-analysis retry counts to update
+                (default: this instance's shared history)
 
         Returns:
             True if we should retry, False otherwise
         """
+        if retry_history is None:
+            retry_history = self.retry_history
+
         # Check current retry count
-        retries = self.retry_history.get(tool_name, 0)
+        retries = retry_history.get(tool_name, 0)
 
         # Max retries reached?
         if retries >= self.MAX_RETRIES:
@@ -99,7 +111,7 @@ class SelfCorrectionStrategy:
         is_transient = any(err in error_str for err in transient_errors)
 
         if is_transient:
-            self.retry_history[tool_name] = retries + 1
+            retry_history[tool_name] = retries + 1
             self.last_retry_time[tool_name] = datetime.now()
             logger.info(f"🔄 Retry {retries + 1}/{self.MAX_RETRIES} for {tool_name} (transient error: {type(error).__name__})")
             return True
@@ -108,7 +120,8 @@ class SelfCorrectionStrategy:
         logger.info(f"❌ Not retrying {tool_name} - permanent error: {type(error).__name__}")
         return False
 
-    def get_backoff_time(self, tool_name: str) -> float:
+    def get_backoff_time(self, tool_name: str,
+                         retry_history: Optional[Dict[str, int]] = None) -> float:
         """
         Calculate exponential backoff wait time for retry.
 
@@ -119,11 +132,14 @@ class SelfCorrectionStrategy:
 
         Args:
             tool_name: Name of the tool to get backoff time for
+            retry_history: Per-analysis retry counts (default: shared history)
 
         Returns:
             Number of seconds to wait before retry
         """
-        retries = self.retry_history.get(tool_name, 1)
+        if retry_history is None:
+            retry_history = self.retry_history
+        retries = retry_history.get(tool_name, 1)
         backoff = self.BASE_BACKOFF_SECONDS * (2 ** (retries - 1))
         logger.debug(f"⏱️ Backoff time for {tool_name}: {backoff}s")
         return backoff
@@ -215,6 +231,107 @@ class SelfCorrectionStrategy:
         """
         return self.retry_history.get(tool_name, 0) >= self.MAX_RETRIES
 
+    def has_exhausted_retries_in(self, tool_name: str, retry_history: Dict[str, int]) -> bool:
+        """
+        Check if a tool has exhausted all retries in a per-analysis history.
+
+        Args:
+            tool_name: Name of tool to check
+            retry_history: Per-analysis retry counts
+
+        Returns:
+            True if tool has reached MAX_RETRIES, False otherwise
+        """
+        return retry_history.get(tool_name, 0) >= self.MAX_RETRIES
+
+
+class RetryScheduler:
+    """
+    Per-analysis retry scheduler.
+
+    Unlike calling time.sleep() between attempts, the scheduler only records
+    when a failed tool becomes eligible again, so the caller can run other
+    planned tools during the backoff window. Retry counts live in a dict
+    owned by the analysis state, so concurrent analyses sharing one
+    SelfCorrectionStrategy do not corrupt each other's counts.
+
+    Retries are abandoned when the backoff would end after the analysis
+    deadline.
+    """
+
+    def __init__(self, strategy: SelfCorrectionStrategy,
+                 retry_history: Dict[str, int],
+                 deadline: Optional[float] = None):
+        """
+        Args:
+            strategy: Shared retry policy (transient detection, backoff)
+            retry_history: Per-analysis tool_name -> retry_count dict
+            deadline: Absolute time.time() deadline for the analysis (None = no deadline)
+        """
+        self.strategy = strategy
+        self.retry_history = retry_history
+        self.deadline = deadline
+        self.pending: Dict[str, float] = {}  # tool_name -> ready_at
+        self.abandoned: Dict[str, str] = {}  # tool_name -> reason
+
+    def schedule_retry(self, tool_name: str, error: Exception) -> bool:
+        """
+        Schedule a retry for a failed tool.
+
+        Returns:
+            True if a retry was scheduled, False if the tool should not be
+            retried (permanent error, max retries, or deadline exceeded)
+        """
+        if not self.strategy.should_retry(tool_name, error, self.retry_history):
+            reason = "max_retries" if self.strategy.has_exhausted_retries_in(tool_name, self.retry_history) else "permanent_error"
+            self.abandoned[tool_name] = reason
+            return False
+
+        backoff = self.strategy.get_backoff_time(tool_name, self.retry_history)
+        ready_at = time.time() + backoff
+
+        if self.deadline is not None and ready_at >= self.deadline:
+            logger.warning(f"⏰ Abandoning retry for {tool_name}: backoff {backoff}s exceeds analysis deadline")
+            self.abandoned[tool_name] = "deadline"
+            return False
+
+        self.pending[tool_name] = ready_at
+        logger.info(f"🔄 Retry {self.retry_history[tool_name]}/{self.strategy.MAX_RETRIES} "
+                    f"for {tool_name} scheduled in {backoff}s")
+        return True
+
+    def is_pending(self, tool_name: str) -> bool:
+        """Check if a retry is scheduled for a tool"""
+        return tool_name in self.pending
+
+    def time_until_due(self, tool_name: str) -> float:
+        """Seconds until a scheduled retry may run (0 if due or not pending)"""
+        ready_at = self.pending.get(tool_name)
+        if ready_at is None:
+            return 0.0
+        return max(0.0, ready_at - time.time())
+
+    def time_remaining(self) -> Optional[float]:
+        """Seconds left before the analysis deadline (None = no deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    def wait_until_due(self, tool_name: str):
+        """Block until a scheduled retry is due (only when nothing else can run)"""
+        wait = self.time_until_due(tool_name)
+        if wait > 0:
+            time.sleep(wait)
+
+    def mark_attempted(self, tool_name: str):
+        """Clear the pending entry once the retry is executed"""
+        self.pending.pop(tool_name, None)
+
+    def mark_success(self, tool_name: str):
+        """Reset retry state for a tool after a successful execution"""
+        self.pending.pop(tool_name, None)
+        self.retry_history.pop(tool_name, None)
+
 
 # Singleton instance for easy access
 _correction_strategy_instance = None
@@ -0,0 +1,503 @@
+"""
+Local Fast-Path Error Classifier for ReAct Agent
+================================================
+
+Lightweight classifier that lets the ReAct agent skip the LLM classification
+call for obvious failures (TimeoutError, ModuleNotFoundError, AssertionError).
+
+Model:
+- Hashed word unigram/bigram features (no vocabulary to maintain)
+- Multinomial logistic regression trained with SGD (pure Python)
+- Temperature-scaled probabilities calibrated on a held-out split
+- Confidence threshold chosen to reach a target precision on held-out data;
+  below the threshold the agent falls back to the LLM
+
+Training data: `failure_analysis.classification` rows joined with the
+failure text stored in MongoDB (`test_failures`), or a JSONL file of
+{"text": ..., "label": ...} records.
+
+Usage:
+    # Offline training and reporting
+    python agents/fast_classifier.py train --output fast_classifier_model.json
+    python agents/fast_classifier.py report --model fast_classifier_model.json
+
+    # Runtime
+    classifier = get_fast_classifier()
+    prediction = classifier.classify(error_message, error_log) if classifier else None
+    if prediction:
+        category, confidence = prediction
+
+File: implementation/agents/fast_classifier.py
+Created: 2026-10-19
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import logging
+import argparse
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Categories the ReAct agent routes on (see classify_error_node prompt)
+KNOWN_CATEGORIES = ['CODE_ERROR', 'INFRA_ERROR', 'CONFIG_ERROR', 'DEPENDENCY_ERROR', 'TEST_FAILURE']
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'fast_classifier_model.json'
+)
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def extract_features(text: str, n_features: int = 2 ** 18) -> Dict[int, float]:
+    """
+    Hash word unigrams and bigrams of a failure text into a sparse vector.
+
+    Numbers, hex values and punctuation are dropped by tokenization, so
+    volatile tokens (ports, ids, durations) do not affect the features.
+
+    Args:
+        text: Error message / log text
+        n_features: Hash space size
+
+    Returns:
+        L2-normalized sparse feature dict {index: value}
+    """
+    tokens = [t.lower() for t in _TOKEN_PATTERN.findall(text)]
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    features: Dict[int, float] = defaultdict(float)
+    for gram in grams:
+        features[zlib.crc32(gram.encode('utf-8')) % n_features] += 1.0
+
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    if norm == 0:
+        return {}
+    return {index: value / norm for index, value in features.items()}
+
+
+def _softmax(scores: List[float], temperature: float = 1.0) -> List[float]:
+    scaled = [s / temperature for s in scores]
+    top = max(scaled)
+    exps = [math.exp(s - top) for s in scaled]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+def split_samples(samples: List[Tuple[str, str]], holdout_fraction: float = 0.2,
+                  rng: Optional[random.Random] = None) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """
+    Shuffle and split samples the way train() does
+
+    Returns:
+        (holdout, training)
+    """
+    samples = list(samples)
+    (rng or random.Random(42)).shuffle(samples)
+    holdout_size = int(len(samples) * holdout_fraction)
+    return samples[:holdout_size], samples[holdout_size:]
+
+
+class FastPathClassifier:
+    """
+    Hashed n-gram logistic regression with calibrated confidence.
+    """
+
+    def __init__(self, labels: List[str], n_features: int = 2 ** 18):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.weights: List[Dict[int, float]] = [defaultdict(float) for _ in self.labels]
+        self.bias: List[float] = [0.0 for _ in self.labels]
+        self.temperature = 1.0
+        self.threshold = 1.01  # Never fast-path until calibrated
+        self.metadata: Dict = {}
+
+        self._lock = threading.Lock()
+        self._stats = {"fast_path": 0, "fallback": 0, "total_latency_ms": 0.0}
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Predict the category of a failure text.
+
+        Returns:
+            (label, calibrated confidence)
+        """
+        features = extract_features(text, self.n_features)
+        probabilities = self._probabilities(features, self.temperature)
+        best = max(range(len(self.labels)), key=probabilities.__getitem__)
+        return self.labels[best], probabilities[best]
+
+    def classify(self, error_message: str, error_log: str = "") -> Optional[Tuple[str, float]]:
+        """
+        Fast-path classification.
+
+        Returns:
+            (label, confidence) when confidence reaches the calibrated
+            threshold, otherwise None (caller should use the LLM)
+        """
+        start = time.perf_counter()
+        label, confidence = self.predict(self._failure_text(error_message, error_log))
+        accepted = confidence >= self.threshold
+
+        with self._lock:
+            self._stats["fast_path" if accepted else "fallback"] += 1
+            self._stats["total_latency_ms"] += (time.perf_counter() - start) * 1000
+
+        return (label, confidence) if accepted else None
+
+    def get_stats(self) -> Dict:
+        """Fast-path hit rate and latency"""
+        with self._lock:
+            total = self._stats["fast_path"] + self._stats["fallback"]
+            return {
+                "fast_path": self._stats["fast_path"],
+                "fallback": self._stats["fallback"],
+                "fast_path_rate": self._stats["fast_path"] / total if total else 0.0,
+                "avg_latency_ms": self._stats["total_latency_ms"] / total if total else 0.0,
+                "threshold": self.threshold
+            }
+
+    @staticmethod
+    def _failure_text(error_message: str, error_log: str = "") -> str:
+        """Text the model sees (same truncation as the LLM prompt)"""
+        return f"{(error_message or '')[:500]}\n{(error_log or '')[:1000]}"
+
+    def _scores(self, features: Dict[int, float]) -> List[float]:
+        return [
+            self.bias[k] + sum(self.weights[k].get(i, 0.0) * v for i, v in features.items())
+            for k in range(len(self.labels))
+        ]
+
+    def _probabilities(self, features: Dict[int, float], temperature: float) -> List[float]:
+        return _softmax(self._scores(features), temperature)
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def train(
+        cls,
+        samples: List[Tuple[str, str]],
+        epochs: int = 15,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        holdout_fraction: float = 0.2,
+        target_precision: float = 0.95,
+        min_support: int = 5,
+        seed: int = 42
+    ) -> "FastPathClassifier":
+        """
+        Train and calibrate a classifier.
+
+        Args:
+            samples: (failure text, label) pairs
+            epochs: SGD passes over the training split
+            learning_rate: Initial SGD step size (decays per epoch)
+            l2: L2 regularization strength
+            holdout_fraction: Fraction held out for calibration
+            target_precision: Required fast-path precision on held-out data
+            min_support: Minimum held-out predictions above the threshold
+            seed: Shuffle seed
+
+        Returns:
+            Trained FastPathClassifier
+        """
+        if not samples:
+            raise ValueError("No training samples")
+
+        rng = random.Random(seed)
+        holdout, training = split_samples(samples, holdout_fraction, rng)
+        if len(holdout) < min_support:
+            # Too little data for a separate split - calibrate on training data
+            holdout = training
+
+        model = cls(sorted({label for _, label in samples}))
+        label_index = {label: k for k, label in enumerate(model.labels)}
+        vectors = [(extract_features(text, model.n_features), label_index[label]) for text, label in training]
+
+        for epoch in range(epochs):
+            rng.shuffle(vectors)
+            rate = learning_rate / (1 + epoch)
+            for features, target in vectors:
+                probabilities = model._probabilities(features, 1.0)
+                for k, probability in enumerate(probabilities):
+                    gradient = probability - (1.0 if k == target else 0.0)
+                    weights = model.weights[k]
+                    for i, v in features.items():
+                        weights[i] -= rate * (gradient * v + l2 * weights[i])
+                    model.bias[k] -= rate * gradient
+
+        holdout_vectors = [(extract_features(text, model.n_features), label_index[label]) for text, label in holdout]
+        model.temperature = model._fit_temperature(holdout_vectors)
+        model.threshold = model._fit_threshold(holdout_vectors, target_precision, min_support)
+        model.metadata = {
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "training_samples": len(training),
+            "holdout_samples": len(holdout),
+            "target_precision": target_precision
+        }
+
+        logger.info(f"✅ Fast-path classifier trained on {len(training)} samples "
+                    f"(temperature={model.temperature:.2f}, threshold={model.threshold:.3f})")
+        return model
+
+    def _fit_temperature(self, vectors: List[Tuple[Dict[int, float], int]]) -> float:
+        """Temperature minimizing held-out negative log-likelihood"""
+        scores = [(self._scores(features), target) for features, target in vectors]
+
+        def nll(temperature: float) -> float:
+            return -sum(math.log(max(_softmax(s, temperature)[t], 1e-12)) for s, t in scores)
+
+        candidates = [0.05 * step for step in range(2, 101)]  # 0.1 .. 5.0
+        return min(candidates, key=nll)
+
+    def _fit_threshold(
+        self,
+        vectors: List[Tuple[Dict[int, float], int]],
+        target_precision: float,
+        min_support: int
+    ) -> float:
+        """Lowest confidence at which held-out precision stays at target"""
+        predictions = []
+        for features, target in vectors:
+            probabilities = self._probabilities(features, self.temperature)
+            best = max(range(len(self.labels)), key=probabilities.__getitem__)
+            predictions.append((probabilities[best], best == target))
+        predictions.sort(key=lambda p: p[0], reverse=True)
+
+        threshold = 1.01
+        correct = 0
+        for count, (confidence, is_correct) in enumerate(predictions, start=1):
+            correct += is_correct
+            if count >= min_support and correct / count >= target_precision:
+                threshold = confidence
+        return threshold
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def evaluate(self, samples: List[Tuple[str, str]]) -> Dict:
+        """
+        Accuracy, fast-path coverage/precision and latency on labeled samples.
+        """
+        correct = fast_path = fast_path_correct = 0
+        latencies = []
+
+        for text, label in samples:
+            start = time.perf_counter()
+            predicted, confidence = self.predict(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            correct += predicted == label
+            if confidence >= self.threshold:
+                fast_path += 1
+                fast_path_correct += predicted == label
+
+        latencies.sort()
+        total = len(samples)
+        return {
+            "samples": total,
+            "accuracy": correct / total if total else 0.0,
+            "fast_path_coverage": fast_path / total if total else 0.0,
+            "fast_path_precision": fast_path_correct / fast_path if fast_path else 0.0,
+            "threshold": self.threshold,
+            "avg_latency_ms": sum(latencies) / total if total else 0.0,
+            "p95_latency_ms": latencies[int(0.95 * (total - 1))] if total else 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Write model as JSON (non-zero weights only)"""
+        data = {
+            "labels": self.labels,
+            "n_features": self.n_features,
+            "weights": [{str(i): w for i, w in weights.items() if abs(w) > 1e-6} for weights in self.weights],
+            "bias": self.bias,
+            "temperature": self.temperature,
+            "threshold": self.threshold,
+            "metadata": self.metadata
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> "FastPathClassifier":
+        """Load model written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        model = cls(data["labels"], data["n_features"])
+        model.weights = [{int(i): w for i, w in weights.items()} for weights in data["weights"]]
+        model.bias = data["bias"]
+        model.temperature = data["temperature"]
+        model.threshold = data["threshold"]
+        model.metadata = data.get("metadata", {})
+        return model
+
+
+# ============================================================================
+# Training data
+# ============================================================================
+
+def load_samples_from_jsonl(path: str) -> List[Tuple[str, str]]:
+    """Read {"text": ..., "label": ...} records"""
+    samples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record["text"], record["label"]))
+    return samples
+
+
+def load_samples_from_history(limit: int = 50000) -> List[Tuple[str, str]]:
+    """
+    Build training samples from analyzed failures.
+
+    Labels come from `failure_analysis.classification`; the failure text is
+    read from the MongoDB `test_failures` document the analysis refers to.
+    """
+    from bson import ObjectId
+    from connection_pool import postgres_connection, get_mongo_client
+
+    with postgres_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT mongodb_failure_id, classification
+            FROM failure_analysis
+            WHERE classification = ANY(%s)
+            ORDER BY id DESC
+            LIMIT %s
+            """,
+            (KNOWN_CATEGORIES, limit)
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+
+    labels = {}
+    for failure_id, classification in rows:
+        if ObjectId.is_valid(failure_id):
+            labels[ObjectId(failure_id)] = classification
+
+    collection = get_mongo_client()[os.getenv("MONGODB_DATABASE", "ddn_tests")]['test_failures']
+    samples = []
+    ids = list(labels)
+    for offset in range(0, len(ids), 1000):
+        batch = ids[offset:offset + 1000]
+        for doc in collection.find({'_id': {'$in': batch}}, {'error_message': 1, 'error_log': 1, 'stack_trace': 1}):
+            text = FastPathClassifier._failure_text(
+                doc.get('error_message', ''),
+                doc.get('error_log') or doc.get('stack_trace', '')
+            )
+            samples.append((text, labels[doc['_id']]))
+
+    logger.info(f"Loaded {len(samples)} labeled failures from history")
+    return samples
+
+
+# ============================================================================
+# Shared instance
+# ============================================================================
+
+_fast_classifier: Optional[FastPathClassifier] = None
+_fast_classifier_loaded = False
+_fast_classifier_lock = threading.Lock()
+
+
+def get_fast_classifier() -> Optional[FastPathClassifier]:
+    """
+    Get the shared fast-path classifier.
+
+    Loaded from FAST_CLASSIFIER_MODEL_PATH (default:
+    implementation/fast_classifier_model.json). Disabled with
+    FAST_CLASSIFIER_ENABLED=false.
+
+    Returns:
+        FastPathClassifier, or None if disabled or no trained model exists
+    """
+    global _fast_classifier, _fast_classifier_loaded
+
+    if not _fast_classifier_loaded:
+        with _fast_classifier_lock:
+            if not _fast_classifier_loaded:
+                _fast_classifier_loaded = True
+                path = os.getenv("FAST_CLASSIFIER_MODEL_PATH", DEFAULT_MODEL_PATH)
+                if os.getenv("FAST_CLASSIFIER_ENABLED", "true").lower() != "true":
+                    logger.info("Fast-path classifier disabled")
+                elif os.path.exists(path):
+                    try:
+                        _fast_classifier = FastPathClassifier.load(path)
+                        logger.info(f"✅ Fast-path classifier loaded (threshold={_fast_classifier.threshold:.3f})")
+                    except Exception as e:
+                        logger.warning(f"Fast-path classifier load failed: {e}")
+                else:
+                    logger.info(f"No fast-path classifier model at {path} - using LLM classification")
+
+    return _fast_classifier
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    """Offline training and accuracy/latency reporting"""
+    parser = argparse.ArgumentParser(description="Train or evaluate the fast-path error classifier")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train from analysis history or a JSONL file")
+    train_parser.add_argument("--output", default=DEFAULT_MODEL_PATH, help="Model output path")
+    train_parser.add_argument("--data", help="JSONL file of {text, label} records (default: PostgreSQL + MongoDB)")
+    train_parser.add_argument("--target-precision", type=float, default=0.95)
+    train_parser.add_argument("--epochs", type=int, default=15)
+
+    report_parser = subparsers.add_parser("report", help="Report accuracy, coverage and latency")
+    report_parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="Model path")
+    report_parser.add_argument("--data", help="JSONL file of {text, label} records (default: PostgreSQL + MongoDB)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    samples = load_samples_from_jsonl(args.data) if args.data else load_samples_from_history()
+
+    if args.command == "train":
+        model = FastPathClassifier.train(samples, epochs=args.epochs, target_precision=args.target_precision)
+        model.save(args.output)
+        print(f"Model written to {args.output}")
+        # Samples the model was not trained on (the threshold is calibrated on them)
+        holdout, training = split_samples(samples)
+        report = {
+            "holdout": model.evaluate(holdout) if holdout else None,
+            "training": model.evaluate(training)
+        }
+    else:
+        report = FastPathClassifier.load(args.model).evaluate(samples)
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    implementation_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, implementation_dir)
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Speculative GitHub File Prefetch for ReAct Agent
+================================================
+
+For CODE_ERROR failures the agent classifies, reasons, selects
+`github_get_file` and only then calls the GitHub MCP server, so the code
+fetch is serial with two LLM round trips. The files the tool will ask for
+are already visible in the stack trace at analysis start, so they are
+fetched in the background while classification and reasoning run.
+
+Features:
+1. Candidate files fetched concurrently at analysis start (bounded count)
+2. Per-analysis byte budget; oversized results are discarded
+3. Session cancelled as soon as routing decides the category needs no code
+4. `github_get_file` consumes prefetched results (waits only for in-flight
+   fetches, never refetches)
+5. Stats: used, wasted, cancelled, oversize, errors
+
+Usage:
+    prefetcher = GitHubPrefetcher(github_client)
+    with prefetcher.session(["src/app/client.py"], branch="main"):
+        ...
+        session = current_prefetch_session()
+        result = session.take("src/app/client.py", timeout=10)
+
+File: implementation/agents/github_prefetch.py
+Created: 2026-10-19
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prefetch session of the analysis running in the current context.
+# LangGraph copies the context into worker threads, so all nodes of one
+# analysis see the same session while concurrent analyses stay isolated.
+_prefetch_session: ContextVar[Optional["PrefetchSession"]] = ContextVar("github_prefetch_session", default=None)
+
+
+def current_prefetch_session() -> Optional["PrefetchSession"]:
+    """Prefetch session of the current analysis (None outside a session)"""
+    return _prefetch_session.get()
+
+
+class PrefetchSession:
+    """
+    Background fetches for one analysis.
+    """
+
+    def __init__(self, prefetcher: "GitHubPrefetcher", file_paths: List[str], branch: str):
+        self.prefetcher = prefetcher
+        self.branch = branch
+        self.cancelled_reason: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._futures: Dict[str, Future] = {}
+        self._summary = {"files": list(file_paths), "used": 0, "cancelled": 0, "oversize": 0, "errors": 0}
+
+        for path in file_paths:
+            self._futures[path] = prefetcher.executor.submit(self._fetch, path)
+
+    def _fetch(self, file_path: str):
+        """Fetch one file (runs in the prefetch pool)"""
+        if self.cancelled_reason is not None:
+            return None
+
+        try:
+            result = self.prefetcher.github_client.get_file(file_path=file_path, branch=self.branch)
+        except Exception as e:
+            logger.warning(f"   GitHub prefetch failed for {file_path}: {e}")
+            self._count("errors")
+            return None
+
+        if not result.success:
+            self._count("errors")
+            return None
+
+        size = result.size_bytes or len(result.content or "")
+        with self._lock:
+            if self._bytes + size > self.prefetcher.max_bytes:
+                self._summary["oversize"] += 1
+                return None
+            self._bytes += size
+        return result
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._summary[key] += amount
+
+    def take(self, file_path: str, timeout: float):
+        """
+        Consume the prefetched result for a file.
+
+        Waits up to `timeout` for an in-flight fetch.
+
+        Returns:
+            GitHubFileResult, or None if the file was not prefetched, failed,
+            exceeded the budget or did not arrive in time
+        """
+        with self._lock:
+            future = self._futures.pop(file_path, None)
+        if future is None or future.cancelled():
+            return None
+
+        try:
+            result = future.result(timeout=max(timeout, 0))
+        except FutureTimeoutError:
+            logger.info(f"   GitHub prefetch of {file_path} still running - fetching directly")
+            return None
+
+        if result is not None:
+            self._count("used")
+        return result
+
+    def take_completed(self) -> List[Tuple[str, object]]:
+        """Consume prefetched results that are already available (no waiting)"""
+        completed = []
+        with self._lock:
+            for path, future in list(self._futures.items()):
+                if future.done() and not future.cancelled():
+                    del self._futures[path]
+                    if future.result() is not None:
+                        completed.append((path, future.result()))
+        self._count("used", len(completed))
+        return completed
+
+    def cancel(self, reason: str):
+        """Stop fetches that have not started; discard everything not yet used"""
+        if self.cancelled_reason is not None:
+            return
+        self.cancelled_reason = reason
+
+        with self._lock:
+            cancelled = sum(1 for future in self._futures.values() if future.cancel())
+            self._futures.clear()
+            self._summary["cancelled"] += cancelled
+
+        if cancelled:
+            logger.info(f"   GitHub prefetch cancelled ({reason}): {cancelled} fetches skipped")
+
+    def close(self):
+        """End of analysis: count unused results as wasted"""
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+
+        wasted = 0
+        for future in futures:
+            if not future.cancel() and future.done() and future.result() is not None:
+                wasted += 1
+        self.prefetcher._record_session(self.get_summary(), wasted)
+
+    def get_summary(self) -> Dict:
+        """Per-analysis prefetch summary"""
+        with self._lock:
+            return {**self._summary, "bytes": self._bytes, "cancelled_reason": self.cancelled_reason}
+
+
+class GitHubPrefetcher:
+    """
+    Shared prefetch pool for all analyses of an agent.
+    """
+
+    def __init__(
+        self,
+        github_client,
+        max_files: int = 3,
+        max_bytes: int = 512 * 1024,
+        max_workers: int = 4
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            github_client: GitHubClient (MCP wrapper)
+            max_files: Files prefetched per analysis
+            max_bytes: Content bytes kept per analysis
+            max_workers: Concurrent fetches across all analyses
+        """
+        self.github_client = github_client
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="github-prefetch")
+
+        self._lock = threading.Lock()
+        self._stats = {"sessions": 0, "prefetched": 0, "used": 0, "wasted": 0,
+                       "cancelled": 0, "oversize": 0, "errors": 0}
+
+    @contextmanager
+    def session(self, file_paths: List[str], branch: str):
+        """
+        Prefetch files for the analysis running inside the block.
+
+        Yields:
+            PrefetchSession (also available via current_prefetch_session())
+        """
+        session = PrefetchSession(self, file_paths[:self.max_files], branch)
+        token = _prefetch_session.set(session)
+        try:
+            yield session
+        finally:
+            _prefetch_session.reset(token)
+            session.close()
+
+    def _record_session(self, summary: Dict, wasted: int):
+        with self._lock:
+            self._stats["sessions"] += 1
+            self._stats["prefetched"] += len(summary["files"])
+            self._stats["wasted"] += wasted
+            for key in ("used", "cancelled", "oversize", "errors"):
+                self._stats[key] += summary[key]
+
+    def get_stats(self) -> Dict:
+        """Aggregate prefetch statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["use_rate"] = stats["used"] / stats["prefetched"] if stats["prefetched"] else 0.0
+        return stats
@@ -0,0 +1,328 @@
+"""
+Pooled LLM Gateway Client for ReAct Agent
+=========================================
+
+Shared client for the OpenAI-compatible chat completions endpoint used by
+classification, reasoning and answer generation.
+
+Features:
+1. Keep-alive connection pooling (one requests.Session per client)
+2. Transport-level retries for 429/5xx with backoff (urllib3 Retry)
+3. Deterministic-prompt response cache: temperature-0 calls keyed by
+   model + prompt hash (LRU with TTL)
+4. Single-flight coalescing: identical in-flight requests share one HTTP call
+5. Token and latency accounting per call (LLMResponse) and per client
+
+Usage:
+    client = get_llm_client(base_url, api_key)
+    response = client.chat(prompt, model="gpt-4o-mini", temperature=0.0)
+    data = json.loads(response.content)
+    print(response.usage, response.latency_ms, response.cached)
+
+File: implementation/agents/llm_client.py
+Created: 2026-10-19
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMResponse:
+    """Result of a chat completion call"""
+    content: str
+    model: str
+    usage: Dict[str, int] = field(default_factory=dict)  # prompt/completion/total tokens billed (0 if reused)
+    latency_ms: float = 0.0
+    cached: bool = False      # Served from the deterministic-prompt cache
+    coalesced: bool = False   # Shared the result of an identical in-flight call
+
+
+class _InFlight:
+    """Pending HTTP call that identical requests can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[LLMResponse] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMClient:
+    """
+    Thread-safe chat completions client with pooling, caching and coalescing.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        pool_size: int = 10,
+        max_retries: int = 2,
+        cache_max_entries: int = 500,
+        cache_ttl_seconds: int = 3600
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: API base URL (e.g. https://api.openai.com/v1)
+            api_key: Bearer token
+            pool_size: Keep-alive connections kept per host
+            max_retries: Transport retries for 429/5xx responses
+            cache_max_entries: Max cached deterministic responses
+            cache_ttl_seconds: TTL of cached responses
+        """
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.cache_max_entries = cache_max_entries
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"],
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, LLMResponse)
+        self._in_flight: Dict[str, _InFlight] = {}
+
+        self._stats = {
+            "requests": 0,
+            "http_calls": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_latency_ms": 0.0
+        }
+        self._model_stats: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def chat(
+        self,
+        prompt: Union[str, List[Dict[str, str]]],
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.0,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout: float = 30
+    ) -> LLMResponse:
+        """
+        Run a chat completion.
+
+        Args:
+            prompt: User prompt, or a full list of chat messages
+            model: Model name
+            temperature: Sampling temperature (0.0 responses are cached)
+            response_format: Response format (default: JSON object)
+            timeout: Request timeout in seconds
+
+        Returns:
+            LLMResponse with content, token usage and latency
+
+        Raises:
+            requests.RequestException: On HTTP/transport failure
+        """
+        messages = [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+        if response_format is None:
+            response_format = {"type": "json_object"}
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format
+        }
+        key = self._request_key(payload)
+        cacheable = temperature == 0
+
+        with self._lock:
+            self._stats["requests"] += 1
+
+            if cacheable:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    self._stats["cache_hits"] += 1
+                    return cached
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = _InFlight()
+                self._in_flight[key] = pending
+                leader = True
+            else:
+                self._stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            pending.done.wait(timeout)
+            if pending.error is not None:
+                raise pending.error
+            if pending.response is None:
+                raise requests.Timeout(f"Coalesced LLM request timed out after {timeout}s")
+            return self._reused(pending.response, coalesced=True)
+
+        try:
+            response = self._post(payload, timeout)
+            pending.response = response
+            if cacheable:
+                with self._lock:
+                    self._cache_put(key, response)
+            return response
+        except BaseException as e:
+            pending.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            pending.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get token/latency accounting.
+
+        Returns:
+            Dict with request counts, cache/coalescing savings, token totals
+            and per-model breakdown
+        """
+        with self._lock:
+            http_calls = self._stats["http_calls"]
+            return {
+                **self._stats,
+                "avg_latency_ms": round(self._stats["total_latency_ms"] / http_calls, 1) if http_calls else 0.0,
+                "cache_size": len(self._cache),
+                "per_model": {model: dict(counts) for model, counts in self._model_stats.items()}
+            }
+
+    def clear_cache(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _request_key(payload: Dict[str, Any]) -> str:
+        """Model + prompt hash identifying identical requests"""
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _post(self, payload: Dict[str, Any], timeout: float) -> LLMResponse:
+        """Perform the HTTP call and record accounting"""
+        start = time.time()
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json=payload,
+            timeout=timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+        latency_ms = (time.time() - start) * 1000
+
+        usage = body.get('usage') or {}
+        result = LLMResponse(
+            content=body['choices'][0]['message']['content'],
+            model=payload["model"],
+            usage={
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0)
+            },
+            latency_ms=latency_ms
+        )
+
+        with self._lock:
+            self._stats["http_calls"] += 1
+            self._stats["prompt_tokens"] += result.usage["prompt_tokens"]
+            self._stats["completion_tokens"] += result.usage["completion_tokens"]
+            self._stats["total_latency_ms"] += latency_ms
+            model_counts = self._model_stats.setdefault(
+                payload["model"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_ms": 0.0}
+            )
+            model_counts["calls"] += 1
+            model_counts["prompt_tokens"] += result.usage["prompt_tokens"]
+            model_counts["completion_tokens"] += result.usage["completion_tokens"]
+            model_counts["latency_ms"] += latency_ms
+
+        return result
+
+    def _cache_get(self, key: str) -> Optional[LLMResponse]:
+        """Return cached response marked as cached (lock held)"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.time():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return self._reused(response, cached=True)
+
+    @staticmethod
+    def _reused(response: LLMResponse, **flags) -> LLMResponse:
+        """Copy of a response served without an HTTP call (no tokens billed)"""
+        return LLMResponse(**{**response.__dict__, **flags, "latency_ms": 0.0,
+                              "usage": {name: 0 for name in response.usage}})
+
+    def _cache_put(self, key: str, response: LLMResponse):
+        """Insert into LRU (lock held)"""
+        self._cache[key] = (time.time() + self.cache_ttl_seconds, response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+
+# Shared clients, one per endpoint + credential
+_llm_clients: Dict[tuple, LLMClient] = {}
+_llm_clients_lock = threading.Lock()
+
+
+def get_llm_client(base_url: str, api_key: Optional[str]) -> LLMClient:
+    """
+    Get the shared LLMClient for an endpoint.
+
+    Returns:
+        LLMClient shared by all agents using the same base URL and key
+    """
+    key = (base_url, api_key)
+    client = _llm_clients.get(key)
+    if client is None:
+        with _llm_clients_lock:
+            client = _llm_clients.get(key)
+            if client is None:
+                client = LLMClient(base_url, api_key)
+                _llm_clients[key] = client
+    return client
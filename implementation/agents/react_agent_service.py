@@ -24,15 +24,15 @@ from langchain_pinecone import PineconeVectorStore
 from langchain_openai import OpenAIEmbeddings
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Literal
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+import copy
 import os
 import json
 import time
 import logging
 from dotenv import load_dotenv
-from pymongo import MongoClient
-import psycopg2
 from psycopg2.extras import RealDictCursor
-import requests
 
 # Import ToolRegistry (Task 0-ARCH.3)
 from tool_registry import ToolRegistry, create_tool_registry
@@ -41,7 +41,22 @@ from tool_registry import ToolRegistry, create_tool_registry
 from thought_prompts import ThoughtPrompts
 
 # Import SelfCorrectionStrategy (Task 0-ARCH.5)
-from correction_strategy import SelfCorrectionStrategy
+from correction_strategy import SelfCorrectionStrategy, RetryScheduler
+
+# Shared cross-request tool result cache
+from tool_result_cache import get_tool_result_cache
+
+# Pooled LLM gateway client (keep-alive, prompt cache, request coalescing)
+from llm_client import get_llm_client
+
+# Local fast-path classifier (skips the LLM call for obvious failures)
+from fast_classifier import get_fast_classifier
+
+# Speculative GitHub file prefetch (overlaps code fetch with LLM calls)
+from github_prefetch import GitHubPrefetcher, current_prefetch_session
+
+# Per-category iteration/token budgets and evidence-based early termination
+from reasoning_budget import get_reasoning_budget, EARLY_STOP_REASONS, DEFAULT_MAX_ITERATIONS
 
 # Task 0E.4: Import GitHub Client (wrapper for MCP server)
 import sys
@@ -49,12 +64,21 @@ implementation_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, implementation_dir)
 from github_client import GitHubClient, get_github_client
 
+# Shared, thread-safe PostgreSQL/MongoDB pools
+from connection_pool import get_postgres_pool, postgres_connection, get_mongo_client
+
 # Task 0D.6: Import RAGRouter (OPTION C routing)
 from rag_router import create_rag_router
 
 # Task 0-ARCH.29: Import Fusion RAG (replaces single Pinecone queries)
 from retrieval import FusionRAG, get_fusion_rag
 
+# Failure-signature fingerprints (batch analysis groups identical failures)
+from failure_fingerprint import compute_fingerprint
+
+# Ingestion-time enrichment (precomputed referenced files and signature)
+from failure_enrichment import detect_referenced_files
+
 # Load environment
 load_dotenv()
 
@@ -76,10 +100,14 @@ class ReActAgentState(BaseModel):
     stack_trace: Optional[str] = None
     job_name: Optional[str] = None
     test_name: Optional[str] = None
+    commit_sha: Optional[str] = None
 
     # Classification
     error_category: Optional[str] = None
     classification_confidence: float = 0.0
+    classification_source: Optional[str] = None  # fast_path, batch_llm, llm or keyword
+    preclassified: Optional[Dict] = None  # Classification supplied by analyze_many()
+    enrichment: Optional[Dict] = None  # Ingestion-time enrichment (failure_enrichment)
 
     # Task 0D.6: Routing Decision (OPTION C)
     routing_decision: Optional[Dict] = None
@@ -89,7 +117,7 @@ class ReActAgentState(BaseModel):
 
     # ReAct Loop State
     iteration: int = 0
-    max_iterations: int = 5
+    max_iterations: int = DEFAULT_MAX_ITERATIONS  # Replaced by the category budget after classification
     reasoning_history: List[Dict] = Field(default_factory=list)
     actions_taken: List[Dict] = Field(default_factory=list)
     observations: List[Dict] = Field(default_factory=list)
@@ -109,12 +137,23 @@ class ReActAgentState(BaseModel):
     # Tool Execution Results
     tool_results: Dict[str, any] = Field(default_factory=dict)
 
+    # Task 0-ARCH.5: Per-analysis retry state
+    retry_history: Dict[str, int] = Field(default_factory=dict)
+    analysis_deadline: Optional[float] = None  # time.time() deadline
+
+    # LLM token/latency accounting for this analysis
+    llm_usage: Dict[str, float] = Field(default_factory=dict)
+
     # Task 0-ARCH.8: Multi-Step Reasoning
     multi_file_detected: bool = False
     referenced_files: List[str] = Field(default_factory=list)
     retrieval_plan: List[Dict] = Field(default_factory=list)
     retrieved_cache: Dict[str, any] = Field(default_factory=dict)
 
+    # Evidence sufficiency (reasoning_budget.estimate_evidence_sufficiency)
+    evidence_score: float = 0.0
+    evidence: Optional[Dict] = None
+
     # Final Output
     solution_confidence: float = 0.0
     root_cause: Optional[str] = None
@@ -127,7 +166,7 @@ class ReActAgentState(BaseModel):
 
     # Decision State
     should_continue: bool = True
-    termination_reason: Optional[str] = None
+    termination_reason: Optional[str] = None  # evidence_sufficient, token_budget, agent_done, high_confidence, max_iterations
 
     class Config:
         arbitrary_types_allowed = True
@@ -175,6 +214,20 @@ ERROR_CATEGORIES = {
     }
 }
 
+# Category list shared by the single and batched classification prompts
+CLASSIFICATION_CATEGORIES = """- CODE_ERROR: Syntax errors, null pointers, type errors, undefined variables
+- INFRA_ERROR: Memory errors, disk space, network, timeouts
+- CONFIG_ERROR: Configuration issues, permissions, environment variables
+- DEPENDENCY_ERROR: Missing modules, import errors, version conflicts
+- TEST_FAILURE: Assertion failures, expected vs actual mismatches"""
+
+# Distinct failures classified per batched LLM call (analyze_many)
+BATCH_CLASSIFICATION_SIZE = 20
+
+# analyze() arguments read from analyze_many() failure dicts
+ANALYZE_FIELDS = ("build_id", "error_log", "error_message", "stack_trace", "job_name", "test_name", "commit_sha",
+                  "enrichment")
+
 
 # ============================================================================
 # REACT AGENT CLASS
@@ -197,6 +250,10 @@ class ReActAgent:
         # OpenAI for classification and reasoning
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.openai_base_url = "https://api.openai.com/v1"
+        self.llm_client = get_llm_client(self.openai_base_url, self.openai_api_key)
+
+        # Trained local classifier (None until a model has been trained)
+        self.fast_classifier = get_fast_classifier()
 
         # Pinecone for dual-index RAG
         self.pinecone_api_key = os.getenv("PINECONE_API_KEY")
@@ -209,27 +266,15 @@ class ReActAgent:
         self.knowledge_index = os.getenv("PINECONE_KNOWLEDGE_INDEX", "ddn-knowledge-docs")
         self.error_library_index = os.getenv("PINECONE_FAILURES_INDEX", "ddn-error-library")
 
-        # MongoDB for logs
-        mongo_uri = os.getenv("MONGODB_URI")
-        if mongo_uri:
-            self.mongo_client = MongoClient(mongo_uri)
+        # MongoDB for logs (shared client, pooled internally)
+        self.mongo_client = get_mongo_client(os.getenv("MONGODB_URI"))
+        if self.mongo_client is not None:
             self.mongo_db = self.mongo_client[os.getenv("MONGODB_DATABASE", "ddn_tests")]
         else:
-            self.mongo_client = None
             self.mongo_db = None
 
-        # PostgreSQL for metadata
-        self.postgres_conn = None
-        try:
-            self.postgres_conn = psycopg2.connect(
-                host=os.getenv("POSTGRES_HOST", "localhost"),
-                port=os.getenv("POSTGRES_PORT", "5432"),
-                database=os.getenv("POSTGRES_DATABASE", "ddn_ai"),
-                user=os.getenv("POSTGRES_USER", "postgres"),
-                password=os.getenv("POSTGRES_PASSWORD")
-            )
-        except Exception as e:
-            logger.warning(f"PostgreSQL connection failed: {e}")
+        # PostgreSQL for metadata (shared pool - one connection per concurrent query)
+        self.postgres_pool = get_postgres_pool()
 
         # Task 0E.4: GitHub Client (wrapper for MCP server)
         try:
@@ -239,6 +284,16 @@ class ReActAgent:
             logger.warning(f"GitHub Client initialization failed: {e}")
             self.github_client = None
 
+        # Prefetch stack-trace files while classification/reasoning run
+        if self.github_client is not None and os.getenv("GITHUB_PREFETCH_ENABLED", "true").lower() == "true":
+            self.github_prefetcher = GitHubPrefetcher(
+                self.github_client,
+                max_files=int(os.getenv("GITHUB_PREFETCH_MAX_FILES", 3)),
+                max_bytes=int(os.getenv("GITHUB_PREFETCH_MAX_BYTES", 512 * 1024))
+            )
+        else:
+            self.github_prefetcher = None
+
         # Task 0-ARCH.3: Initialize ToolRegistry for intelligent tool selection
         self.tool_registry = create_tool_registry()
         logger.info("✅ ToolRegistry initialized with dynamic category discovery")
@@ -247,6 +302,12 @@ class ReActAgent:
         self.correction_strategy = SelfCorrectionStrategy()
         logger.info("✅ SelfCorrectionStrategy initialized with retry logic")
 
+        # Shared tool result cache (survives across analyze() calls)
+        self.tool_cache = get_tool_result_cache()
+
+        # Per-category reasoning budgets and early termination (shared stats)
+        self.reasoning_budget = get_reasoning_budget()
+
         # Task 0D.6: Initialize RAGRouter for intelligent routing (OPTION C)
         try:
             self.rag_router = create_rag_router()
@@ -275,6 +336,10 @@ class ReActAgent:
             logger.warning("   - Falling back to legacy Pinecone-only queries")
             self.fusion_rag = None
 
+        # Compile the LangGraph workflow once; the compiled graph is reused
+        # by every analyze() call (state is passed per invocation)
+        self.workflow = self.create_workflow()
+
         logger.info("✅ ReAct Agent initialized")
 
 
@@ -291,35 +356,16 @@ class ReActAgent:
         - Error messages mentioning multiple files
         - Import/dependency chains
 
+        Uses the files found at ingestion when the failure is enriched.
+
         Returns:
             (is_multi_file, list_of_files)
         """
-        import re
-
-        files = []
-        error_text = f"{state['error_message']}\n{state.get('stack_trace', '')}\n{state['error_log'][:1000]}"
-
-        # Pattern 1: Python file paths
-        python_files = re.findall(r'File "([^"]+\.py)"', error_text)
-        files.extend(python_files)
-
-        # Pattern 2: Java/C++ file paths with line numbers
-        java_files = re.findall(r'at ([A-Za-z0-9_/.]+\.java):\d+', error_text)
-        files.extend(java_files)
-
-        cpp_files = re.findall(r'([A-Za-z0-9_/.]+\.(cpp|h|hpp)):\d+', error_text)
-        files.extend([f[0] for f in cpp_files])
-
-        # Pattern 3: Generic file paths
-        generic_files = re.findall(r'([A-Za-z0-9_/.-]+\.(js|ts|go|rb|php|cs))[:(\s]', error_text)
-        files.extend([f[0] for f in generic_files])
-
-        # Pattern 4: Import statements
-        imports = re.findall(r'(?:import|from)\s+([A-Za-z0-9_.]+)', error_text)
-        files.extend([imp.replace('.', '/') + '.py' for imp in imports if '.' in imp])
-
-        # Deduplicate and filter
-        files = list(set([f for f in files if f and len(f) > 2]))
+        enrichment = state.get('enrichment')
+        if enrichment and 'referenced_files' in enrichment:
+            files = list(enrichment['referenced_files'])
+        else:
+            files = detect_referenced_files(state['error_message'], state.get('stack_trace'), state['error_log'])
 
         # Multi-file if we found 2+ distinct files
         is_multi_file = len(files) >= 2
@@ -410,70 +456,87 @@ class ReActAgent:
         state['retrieved_cache'][cache_key] = result
         logger.info(f"💾 CACHED: {cache_key}")
 
+    def _shared_cache_key(self, tool_name: str, state: dict) -> Optional[str]:
+        """
+        Build the cross-request cache key for a tool call.
 
-    # ========================================================================
-    # NODE 1: CLASSIFICATION
-    # ========================================================================
-
-    def classify_error_node(self, state: dict) -> dict:
+        GitHub files are keyed by file path + commit SHA, everything else by
+        a normalized error signature (see ToolResultCache.build_key).
         """
-        Classify error into category using OpenAI
+        target = None
+        if tool_name == "github_get_file":
+            target = self._extract_file_path(state.get('stack_trace', '') or state.get('error_log', ''))
+        return self.tool_cache.build_key(tool_name, state, target=target)
+
+    def _github_prefetch_scope(self, state: dict):
         """
-        logger.info(f"🔍 NODE 1: Classifying error (build: {state['build_id']})")
+        Start prefetching the files github_get_file is likely to request.
 
-        classification_prompt = f"""Classify this test failure into ONE category.
+        Candidates are the primary stack-trace file (what the tool fetches)
+        followed by other referenced files; files already in the shared
+        cache are skipped.
+        """
+        if getattr(self, 'github_prefetcher', None) is None:
+            return nullcontext()
 
-ERROR MESSAGE:
-{state['error_message'][:500]}
+        files = []
+        primary = self._extract_file_path(state.get('stack_trace') or state.get('error_log', ''))
+        if primary and not self.tool_cache.contains(self._shared_cache_key("github_get_file", state)):
+            files.append(primary)
+        _, referenced_files = self._detect_multi_file_references(state)
+        files.extend(f for f in referenced_files if f not in files)
 
-ERROR LOG:
-{state['error_log'][:1000]}
+        if not files:
+            return nullcontext()
 
-CATEGORIES:
-- CODE_ERROR: Syntax errors, null pointers, type errors, undefined variables
-- INFRA_ERROR: Memory errors, disk space, network, timeouts
-- CONFIG_ERROR: Configuration issues, permissions, environment variables
-- DEPENDENCY_ERROR: Missing modules, import errors, version conflicts
-- TEST_FAILURE: Assertion failures, expected vs actual mismatches
+        logger.info(f"🐙 Prefetching {min(len(files), self.github_prefetcher.max_files)} GitHub files")
+        return self.github_prefetcher.session(files, branch=state.get('commit_sha') or "main")
 
-Respond with JSON:
-{{
-    "category": "...",
-    "confidence": 0.0-1.0,
-    "reasoning": "..."
-}}"""
+    def _apply_cached_tool_result(self, tool_name: str, result: any, state: dict):
+        """
+        Replay the state updates a tool makes when its result comes from the
+        shared cache instead of a live call.
+        """
+        if tool_name in ("pinecone_knowledge", "pinecone_error_library"):
+            state['rag_results'].extend(result)
+        elif tool_name == "github_get_file":
+            state['github_files'].extend(result)
+        elif tool_name == "mongodb_logs":
+            state['mongodb_logs'] = result
+        elif tool_name == "postgres_history":
+            state['postgres_history'] = result
 
-        try:
-            response = requests.post(
-                f"{self.openai_base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": classification_prompt}],
-                    "temperature": 0.0,
-                    "response_format": {"type": "json_object"}
-                },
-                timeout=30
-            )
-            response.raise_for_status()
 
-            result = response.json()['choices'][0]['message']['content']
-            classification = json.loads(result)
+    # ========================================================================
+    # NODE 1: CLASSIFICATION
+    # ========================================================================
 
-            state['error_category'] = classification['category']
-            state['classification_confidence'] = classification['confidence']
+    def classify_error_node(self, state: dict) -> dict:
+        """
+        Classify error into category (local fast path, otherwise OpenAI)
+        """
+        logger.info(f"🔍 NODE 1: Classifying error (build: {state['build_id']})")
 
-            logger.info(f"✅ Classified as {state['error_category']} "
+        # Fast path: local classifier for obvious failures (no LLM call)
+        preclassified = state.get('preclassified')
+        fast_prediction = None
+        if preclassified is None and self.fast_classifier is not None:
+            fast_prediction = self.fast_classifier.classify(state['error_message'], state['error_log'])
+
+        if preclassified is not None:
+            # Batch analysis already classified this failure
+            state['error_category'] = preclassified['category']
+            state['classification_confidence'] = preclassified['confidence']
+            state['classification_source'] = preclassified['source']
+            logger.info(f"📦 Batch-classified as {state['error_category']} "
                        f"(confidence: {state['classification_confidence']:.2f})")
-
-        except Exception as e:
-            logger.error(f"❌ Classification failed: {e}")
-            # Fallback: keyword matching
-            state['error_category'] = self._fallback_classification(state['error_message'])
-            state['classification_confidence'] = 0.5
+        elif fast_prediction is not None:
+            state['error_category'], state['classification_confidence'] = fast_prediction
+            state['classification_source'] = "fast_path"
+            logger.info(f"⚡ Fast-path classified as {state['error_category']} "
+                       f"(confidence: {state['classification_confidence']:.2f})")
+        else:
+            self._classify_with_llm(state)
 
         # Task 0-ARCH.8: Detect multi-file references
         is_multi_file, referenced_files = self._detect_multi_file_references(state)
@@ -514,8 +577,70 @@ Respond with JSON:
             state['should_use_github'] = True
             state['should_use_rag'] = True
 
+        # Category decided: drop speculative code fetches if code is not needed
+        prefetch = current_prefetch_session()
+        if prefetch is not None and not state.get('should_use_github', True):
+            prefetch.cancel(f"{state['error_category']} does not need code")
+
+        # Category decided: apply its reasoning iteration budget
+        budget = self.reasoning_budget.budget_for(state['error_category'])
+        state['max_iterations'] = budget.max_iterations
+        logger.info(f"⏱️  Reasoning budget: {budget.max_iterations} iterations, {budget.max_tokens} tokens")
+
         return state
 
+    def _classify_with_llm(self, state: dict) -> None:
+        """Classify error with the LLM (keyword matching if the call fails)"""
+
+        classification_prompt = f"""Classify this test failure into ONE category.
+
+ERROR MESSAGE:
+{state['error_message'][:500]}
+
+ERROR LOG:
+{state['error_log'][:1000]}
+
+CATEGORIES:
+{CLASSIFICATION_CATEGORIES}
+
+Respond with JSON:
+{{
+    "category": "...",
+    "confidence": 0.0-1.0,
+    "reasoning": "..."
+}}"""
+
+        try:
+            response = self.llm_client.chat(classification_prompt, model="gpt-4o-mini", temperature=0.0, timeout=30)
+            self._record_llm_usage(state, response)
+
+            result = response.content
+            classification = json.loads(result)
+
+            state['error_category'] = classification['category']
+            state['classification_confidence'] = classification['confidence']
+            state['classification_source'] = "llm"
+
+            logger.info(f"✅ Classified as {state['error_category']} "
+                       f"(confidence: {state['classification_confidence']:.2f})")
+
+        except Exception as e:
+            logger.error(f"❌ Classification failed: {e}")
+            # Fallback: keyword matching
+            state['error_category'] = self._fallback_classification(state['error_message'])
+            state['classification_confidence'] = 0.5
+            state['classification_source'] = "keyword"
+
+    def _record_llm_usage(self, state: dict, response) -> None:
+        """Accumulate LLM token/latency accounting for this analysis"""
+        usage = state.setdefault('llm_usage', {})
+        usage['calls'] = usage.get('calls', 0) + 1
+        usage['cached'] = usage.get('cached', 0) + int(response.cached)
+        usage['coalesced'] = usage.get('coalesced', 0) + int(response.coalesced)
+        usage['prompt_tokens'] = usage.get('prompt_tokens', 0) + response.usage.get('prompt_tokens', 0)
+        usage['completion_tokens'] = usage.get('completion_tokens', 0) + response.usage.get('completion_tokens', 0)
+        usage['latency_ms'] = round(usage.get('latency_ms', 0.0) + response.latency_ms, 1)
+
     def _fallback_classification(self, error_message: str) -> str:
         """Fallback classification using keyword matching"""
         error_lower = error_message.lower()
@@ -602,23 +727,10 @@ Error Message: {state['error_message'][:300]}"""
         )
 
         try:
-            response = requests.post(
-                f"{self.openai_base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": reasoning_prompt}],
-                    "temperature": 0.2,
-                    "response_format": {"type": "json_object"}
-                },
-                timeout=30
-            )
-            response.raise_for_status()
+            response = self.llm_client.chat(reasoning_prompt, model="gpt-4o-mini", temperature=0.2, timeout=30)
+            self._record_llm_usage(state, response)
 
-            result = response.json()['choices'][0]['message']['content']
+            result = response.content
             reasoning = json.loads(result)
 
             # Task 0-ARCH.4: Parse response matching ThoughtPrompts JSON format
@@ -647,6 +759,12 @@ Error Message: {state['error_message'][:300]}"""
             state['next_action'] = self._fallback_tool_selection(state)
             state['needs_more_info'] = state['iteration'] < 3
 
+        # Token budget: no further tool round trips once it is spent
+        budget = self.reasoning_budget.budget_for(state.get('error_category'))
+        usage = state.get('llm_usage') or {}
+        if usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0) >= budget.max_tokens:
+            state['termination_reason'] = "token_budget"
+
         return state
 
     def _build_reasoning_context(self, state: dict) -> str:
@@ -783,7 +901,10 @@ Error Message: {state['error_message'][:300]}"""
 
         Implements:
         - Retry logic for transient errors (max 3 retries)
-        - Exponential backoff (1s, 2s, 4s)
+        - Exponential backoff (1s, 2s, 4s) scheduled per analysis: while the
+          selected tool is backing off, other planned tools run instead of
+          the worker thread sleeping
+        - Retries abandoned once the backoff would pass the analysis deadline
         - Alternative tool suggestion when retries exhausted
         """
         tool_name = state.get('next_action')
@@ -793,97 +914,59 @@ Error Message: {state['error_message'][:300]}"""
 
         logger.info(f"⚙️  NODE 4: Executing tool '{tool_name}'")
 
-        # Task 0-ARCH.8: Check cache first
-        cache_key = f"{tool_name}:{state.get('error_message', '')[:100]}"
-        cached_result = self._get_cached_result(cache_key, state)
-        if cached_result is not None:
-            logger.info(f"💾 Using cached result for '{tool_name}'")
-            state['tool_results'][tool_name] = cached_result
-            state['actions_taken'].append({
-                "iteration": state['iteration'],
-                "tool": tool_name,
-                "success": True,
-                "execution_time_ms": 0,
-                "cached": True
-            })
+        # Task 0-ARCH.8: Check cache first (per-analysis, then shared)
+        if self._use_cached_tool_result(tool_name, state):
             return state
 
+        # Retry counts live in the analysis state, not on the shared agent
+        if 'retry_history' not in state:
+            state['retry_history'] = {}
+        scheduler = RetryScheduler(
+            self.correction_strategy,
+            state['retry_history'],
+            state.get('analysis_deadline')
+        )
+
         start_time = time.time()
-        success = False
-        result = None
-        error_msg = None
-        last_exception = None
 
         # Task 0-ARCH.5: Try executing tool with retry logic
-        while True:
-            try:
-                # Route to appropriate tool
-                if tool_name == "pinecone_knowledge":
-                    result = self._tool_pinecone_knowledge(state)
-                    success = True
-                elif tool_name == "pinecone_error_library":
-                    result = self._tool_pinecone_error_library(state)
-                    success = True
-                elif tool_name == "github_get_file":
-                    result = self._tool_github_get_file(state)
-                    success = True
-                elif tool_name == "mongodb_logs":
-                    result = self._tool_mongodb_logs(state)
-                    success = True
-                elif tool_name == "postgres_history":
-                    result = self._tool_postgres_history(state)
-                    success = True
-                else:
-                    logger.warning(f"Unknown tool: {tool_name}")
-                    error_msg = f"Unknown tool: {tool_name}"
-                    break
-
-                # Success - exit retry loop
-                break
+        success, result, error_msg = self._attempt_tool(tool_name, state, scheduler)
 
-            except Exception as e:
-                last_exception = e
-                logger.error(f"❌ Tool '{tool_name}' failed: {e}")
-
-                # Task 0-ARCH.5: Check if we should retry
-                if self.correction_strategy.should_retry(tool_name, e):
-                    # Calculate backoff time
-                    backoff_time = self.correction_strategy.get_backoff_time(tool_name)
-                    retry_count = self.correction_strategy.retry_history.get(tool_name, 1)
-
-                    logger.info(f"🔄 Retrying in {backoff_time}s (attempt {retry_count}/{self.correction_strategy.MAX_RETRIES})...")
-                    time.sleep(backoff_time)
-                    continue  # Retry
-                else:
-                    # No retry - check for alternative tool
-                    error_msg = str(e)
-
-                    # Task 0-ARCH.5: Suggest alternative tool
-                    alt_tool = self.correction_strategy.suggest_alternative_tool(
-                        tool_name,
-                        state.get('error_category')
-                    )
-
-                    if alt_tool:
-                        logger.info(f"💡 Switching to alternative tool: {alt_tool}")
-                        # Update state to use alternative tool in next iteration
-                        state['next_action'] = alt_tool
-
-                    break  # Exit retry loop
+        while not success and scheduler.is_pending(tool_name):
+            if scheduler.time_until_due(tool_name) > 0:
+                # Use the backoff window for another planned tool
+                filler_tool = self._select_filler_tool(state, exclude=tool_name)
+                if filler_tool:
+                    logger.info(f"⏩ Running '{filler_tool}' while '{tool_name}' backs off")
+                    self._execute_filler_tool(filler_tool, state)
+                    continue
+                scheduler.wait_until_due(tool_name)
+
+            scheduler.mark_attempted(tool_name)
+            success, result, error_msg = self._attempt_tool(tool_name, state, scheduler)
 
         execution_time = (time.time() - start_time) * 1000
+        retries = state['retry_history'].get(tool_name, 0)
 
         # Store tool result
         if success and result is not None:
-            state['tool_results'][tool_name] = result
+            self._store_tool_result(tool_name, result, state)
             logger.info(f"✅ Tool '{tool_name}' completed in {execution_time:.0f}ms")
 
-            # Task 0-ARCH.8: Cache successful result
-            cache_key = f"{tool_name}:{state.get('error_message', '')[:100]}"
-            self._cache_result(cache_key, result, state)
-
             # Reset retry history on success
-            self.correction_strategy.reset_tool_history(tool_name)
+            scheduler.mark_success(tool_name)
+
+        elif tool_name in scheduler.abandoned:
+            # Task 0-ARCH.5: Suggest alternative tool
+            alt_tool = self.correction_strategy.suggest_alternative_tool(
+                tool_name,
+                state.get('error_category')
+            )
+
+            if alt_tool:
+                logger.info(f"💡 Switching to alternative tool: {alt_tool}")
+                # Update state to use alternative tool in next iteration
+                state['next_action'] = alt_tool
 
         # Track action
         state['actions_taken'].append({
@@ -892,11 +975,144 @@ Error Message: {state['error_message'][:300]}"""
             "success": success,
             "execution_time_ms": execution_time,
             "error": error_msg,
-            "retries": self.correction_strategy.retry_history.get(tool_name, 0)
+            "retries": retries,
+            "retry_abandoned": scheduler.abandoned.get(tool_name)
         })
 
         return state
 
+    def _get_tool_function(self, tool_name: str):
+        """Map a tool name to its implementation (None if not implemented)"""
+        tool_functions = {
+            "pinecone_knowledge": self._tool_pinecone_knowledge,
+            "pinecone_error_library": self._tool_pinecone_error_library,
+            "github_get_file": self._tool_github_get_file,
+            "mongodb_logs": self._tool_mongodb_logs,
+            "postgres_history": self._tool_postgres_history
+        }
+        return tool_functions.get(tool_name)
+
+    def _attempt_tool(self, tool_name: str, state: dict, scheduler: RetryScheduler) -> tuple:
+        """
+        Run a single attempt of a tool; schedule a retry on transient failure.
+
+        Returns:
+            (success, result, error_msg)
+        """
+        tool_function = self._get_tool_function(tool_name)
+        if tool_function is None:
+            logger.warning(f"Unknown tool: {tool_name}")
+            return False, None, f"Unknown tool: {tool_name}"
+
+        try:
+            return True, tool_function(state), None
+        except Exception as e:
+            logger.error(f"❌ Tool '{tool_name}' failed: {e}")
+            scheduler.schedule_retry(tool_name, e)
+            return False, None, str(e)
+
+    def _select_filler_tool(self, state: dict, exclude: str) -> Optional[str]:
+        """
+        Pick another planned tool to run while `exclude` is backing off.
+
+        Uses the same ToolRegistry recommendation and routing filter as tool
+        selection, restricted to implemented tools not yet executed.
+        """
+        deadline = state.get('analysis_deadline')
+        if deadline is not None and time.time() >= deadline:
+            return None
+
+        tools_used = [a['tool'] for a in state['actions_taken']]
+        recommended_tools = self.tool_registry.get_tools_for_category(
+            error_category=state.get('error_category', 'UNKNOWN'),
+            solution_confidence=state.get('solution_confidence', 0.0),
+            iteration=state.get('iteration', 1),
+            tools_already_used=tools_used
+        )
+
+        for tool in recommended_tools:
+            if (tool != exclude and tool not in tools_used
+                    and self._get_tool_function(tool) is not None
+                    and self._is_tool_allowed_by_routing(tool, state)):
+                return tool
+        return None
+
+    def _execute_filler_tool(self, tool_name: str, state: dict):
+        """Execute a planned tool once (no retries) during another tool's backoff"""
+        if self._use_cached_tool_result(tool_name, state):
+            return
+
+        start_time = time.time()
+        success, result, error_msg = True, None, None
+        try:
+            result = self._get_tool_function(tool_name)(state)
+        except Exception as e:
+            logger.error(f"❌ Tool '{tool_name}' failed: {e}")
+            success, error_msg = False, str(e)
+
+        if success and result is not None:
+            self._store_tool_result(tool_name, result, state)
+
+        state['actions_taken'].append({
+            "iteration": state['iteration'],
+            "tool": tool_name,
+            "success": success,
+            "execution_time_ms": (time.time() - start_time) * 1000,
+            "error": error_msg,
+            "retries": 0,
+            "during_backoff": True
+        })
+
+    def _use_cached_tool_result(self, tool_name: str, state: dict) -> bool:
+        """
+        Serve a tool from the per-analysis cache or the shared cache.
+
+        Returns:
+            True if a cached result was applied and the action recorded
+        """
+        cache_key = f"{tool_name}:{state.get('error_message', '')[:100]}"
+        cached_result = self._get_cached_result(cache_key, state)
+        if cached_result is not None:
+            logger.info(f"💾 Using cached result for '{tool_name}'")
+            state['tool_results'][tool_name] = cached_result
+            state['actions_taken'].append({
+                "iteration": state['iteration'],
+                "tool": tool_name,
+                "success": True,
+                "execution_time_ms": 0,
+                "cached": True
+            })
+            return True
+
+        # Shared cross-request cache (same failing test analyzed before)
+        shared_key = self._shared_cache_key(tool_name, state)
+        shared_result = self.tool_cache.get(tool_name, shared_key)
+        if shared_result is not None:
+            logger.info(f"💾 Using shared cached result for '{tool_name}'")
+            self._apply_cached_tool_result(tool_name, shared_result, state)
+            state['tool_results'][tool_name] = shared_result
+            self._cache_result(cache_key, shared_result, state)
+            state['actions_taken'].append({
+                "iteration": state['iteration'],
+                "tool": tool_name,
+                "success": True,
+                "execution_time_ms": 0,
+                "cached": True,
+                "cache_source": "shared"
+            })
+            return True
+
+        return False
+
+    def _store_tool_result(self, tool_name: str, result: any, state: dict):
+        """Store a live tool result in state and both cache levels"""
+        state['tool_results'][tool_name] = result
+
+        # Task 0-ARCH.8: Cache successful result
+        cache_key = f"{tool_name}:{state.get('error_message', '')[:100]}"
+        self._cache_result(cache_key, result, state)
+        self.tool_cache.put(tool_name, self._shared_cache_key(tool_name, state), result, state)
+
 
     # ========================================================================
     # TOOL IMPLEMENTATIONS
@@ -923,17 +1139,7 @@ Error Message: {state['error_message'][:300]}"""
                     top_k=3
                 )
 
-                results = []
-                for doc in fusion_results:
-                    results.append({
-                        "source": f"fusion_rag_{doc['primary_source']}",
-                        "content": doc['text'],
-                        "metadata": doc.get('metadata', {}),
-                        "confidence": doc.get('rerank_score', doc.get('rrf_score', 0.9)),
-                        "rrf_score": doc.get('rrf_score', 0.0),
-                        "rerank_score": doc.get('rerank_score'),
-                        "sources": doc.get('sources', [])  # Source attribution
-                    })
+                results = self._fusion_tool_results(fusion_results, default_confidence=0.9)
 
                 state['rag_results'].extend(results)
                 logger.info(f"   Found {len(results)} docs via Fusion RAG")
@@ -954,14 +1160,7 @@ Error Message: {state['error_message'][:300]}"""
                     filter={"doc_type": "error_documentation"}
                 )
 
-                results = []
-                for doc in docs:
-                    results.append({
-                        "source": "knowledge_docs",
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "confidence": 0.9
-                    })
+                results = self._vector_tool_results(docs, "knowledge_docs", confidence=0.9)
 
                 state['rag_results'].extend(results)
                 logger.info(f"   Found {len(results)} knowledge docs")
@@ -997,17 +1196,7 @@ Error Message: {state['error_message'][:300]}"""
                     top_k=3
                 )
 
-                results = []
-                for doc in fusion_results:
-                    results.append({
-                        "source": f"fusion_rag_{doc['primary_source']}",
-                        "content": doc['text'],
-                        "metadata": doc.get('metadata', {}),
-                        "confidence": doc.get('rerank_score', doc.get('rrf_score', 0.7)),
-                        "rrf_score": doc.get('rrf_score', 0.0),
-                        "rerank_score": doc.get('rerank_score'),
-                        "sources": doc.get('sources', [])  # Source attribution
-                    })
+                results = self._fusion_tool_results(fusion_results, default_confidence=0.7)
 
                 state['rag_results'].extend(results)
                 logger.info(f"   Found {len(results)} similar past errors via Fusion RAG")
@@ -1029,14 +1218,7 @@ Error Message: {state['error_message'][:300]}"""
                     filter={"error_category": state['error_category']} if state.get('error_category') else None
                 )
 
-                results = []
-                for doc in docs:
-                    results.append({
-                        "source": "error_library",
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "confidence": 0.7
-                    })
+                results = self._vector_tool_results(docs, "error_library", confidence=0.7)
 
                 state['rag_results'].extend(results)
                 logger.info(f"   Found {len(results)} similar past errors")
@@ -1046,6 +1228,29 @@ Error Message: {state['error_message'][:300]}"""
             logger.error(f"   Pinecone error library search failed: {e}")
             return []
 
+    @staticmethod
+    def _fusion_tool_results(fusion_results: List[Dict], default_confidence: float) -> List[Dict]:
+        """Convert Fusion RAG documents to RAG tool results"""
+        return [{
+            "source": f"fusion_rag_{doc['primary_source']}",
+            "content": doc['text'],
+            "metadata": doc.get('metadata', {}),
+            "confidence": doc.get('rerank_score', doc.get('rrf_score', default_confidence)),
+            "rrf_score": doc.get('rrf_score', 0.0),
+            "rerank_score": doc.get('rerank_score'),
+            "sources": doc.get('sources', [])  # Source attribution
+        } for doc in fusion_results]
+
+    @staticmethod
+    def _vector_tool_results(docs, source: str, confidence: float) -> List[Dict]:
+        """Convert legacy Pinecone documents to RAG tool results"""
+        return [{
+            "source": source,
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "confidence": confidence
+        } for doc in docs]
+
     def _tool_github_get_file(self, state: dict) -> List[Dict]:
         """
         Fetch file from GitHub via GitHubClient wrapper (Task 0E.4)
@@ -1069,26 +1274,41 @@ Error Message: {state['error_message'][:300]}"""
             return []
 
         try:
-            # Task 0E.4: Use GitHubClient wrapper instead of raw HTTP
-            result = self.github_client.get_file(file_path=file_path)
+            # Use the speculative prefetch if it covered this file
+            prefetch = current_prefetch_session()
+            result = None
+            if prefetch is not None:
+                deadline = state.get('analysis_deadline')
+                timeout = min(30, deadline - time.time()) if deadline else 30
+                result = prefetch.take(file_path, timeout=timeout)
+                if result is not None:
+                    logger.info(f"   ⚡ Using prefetched file: {file_path}")
+
+            if result is None:
+                # Task 0E.4: Use GitHubClient wrapper instead of raw HTTP
+                result = self.github_client.get_file(
+                    file_path=file_path,
+                    branch=state.get('commit_sha') or "main"
+                )
 
             if result.success:
-                # Convert to dict format for state storage
-                file_data = {
-                    "file_path": result.file_path,
-                    "content": result.content,
-                    "total_lines": result.total_lines,
-                    "line_range": result.line_range,
-                    "sha": result.sha,
-                    "url": result.url,
-                    "size_bytes": result.size_bytes,
-                    "repo": result.repo,
-                    "branch": result.branch
-                }
-
+                file_data = self._github_file_data(result)
                 state['github_files'].append(file_data)
                 logger.info(f"   ✓ Retrieved: {file_path} ({result.total_lines} lines)")
-                return [file_data]
+                files = [file_data]
+
+                # Task 0-ARCH.8: Related files already prefetched complete the retrieval plan
+                if prefetch is not None and state.get('multi_file_detected'):
+                    for related_path, related in prefetch.take_completed():
+                        related_data = self._github_file_data(related)
+                        state['github_files'].append(related_data)
+                        files.append(related_data)
+                        for step in state.get('retrieval_plan', []):
+                            if step['action'] == "github_get_file" and step['target'] == related_path:
+                                step['completed'] = True
+                        logger.info(f"   ✓ Retrieved (prefetched): {related_path}")
+
+                return files
             else:
                 logger.warning(f"   GitHub fetch failed: {result.error}")
                 return []
@@ -1097,11 +1317,26 @@ Error Message: {state['error_message'][:300]}"""
             logger.error(f"   GitHub fetch failed: {e}")
             return []
 
+    @staticmethod
+    def _github_file_data(result) -> Dict:
+        """Convert a GitHubFileResult to dict format for state storage"""
+        return {
+            "file_path": result.file_path,
+            "content": result.content,
+            "total_lines": result.total_lines,
+            "line_range": result.line_range,
+            "sha": result.sha,
+            "url": result.url,
+            "size_bytes": result.size_bytes,
+            "repo": result.repo,
+            "branch": result.branch
+        }
+
     def _tool_mongodb_logs(self, state: dict) -> List[Dict]:
         """Fetch logs from MongoDB"""
         logger.info("   🍃 Fetching MongoDB logs...")
 
-        if not self.mongo_db:
+        if self.mongo_db is None:
             logger.warning("   MongoDB not connected")
             return []
 
@@ -1136,23 +1371,24 @@ Error Message: {state['error_message'][:300]}"""
         """Fetch failure history from PostgreSQL"""
         logger.info("   🐘 Fetching PostgreSQL history...")
 
-        if not self.postgres_conn:
+        if self.postgres_pool is None:
             logger.warning("   PostgreSQL not connected")
             return []
 
         try:
-            cursor = self.postgres_conn.cursor(cursor_factory=RealDictCursor)
+            with postgres_connection(self.postgres_pool) as conn:
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-            cursor.execute("""
-                SELECT build_id, test_name, analyzed_at, root_cause, recommendation
-                FROM ai_analysis
-                WHERE test_name = %s
-                ORDER BY analyzed_at DESC
-                LIMIT 5
-            """, (state.get('test_name'),))
+                cursor.execute("""
+                    SELECT build_id, test_name, analyzed_at, root_cause, recommendation
+                    FROM ai_analysis
+                    WHERE test_name = %s
+                    ORDER BY analyzed_at DESC
+                    LIMIT 5
+                """, (state.get('test_name'),))
 
-            history = cursor.fetchall()
-            cursor.close()
+                history = cursor.fetchall()
+                cursor.close()
 
             state['postgres_history'] = [dict(row) for row in history]
             logger.info(f"   Found {len(history)} historical analyses")
@@ -1218,6 +1454,13 @@ Error Message: {state['error_message'][:300]}"""
         state['observations'].append(observation)
         logger.info(f"   {observation['findings']}")
 
+        # Early termination: skip further reasoning calls once the evidence
+        # is sufficient or the token budget is spent
+        stop_reason = self.reasoning_budget.stop_reason(state, code_available=self.github_client is not None)
+        if stop_reason is not None:
+            state['termination_reason'] = stop_reason
+            logger.info(f"⏹️  Stopping early: {stop_reason} (evidence score: {state.get('evidence_score', 0.0):.2f})")
+
         return state
 
 
@@ -1278,23 +1521,10 @@ Error Message: {state['error_message'][:300]}"""
         )
 
         try:
-            response = requests.post(
-                f"{self.openai_base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": answer_prompt}],
-                    "temperature": 0.1,
-                    "response_format": {"type": "json_object"}
-                },
-                timeout=30
-            )
-            response.raise_for_status()
+            response = self.llm_client.chat(answer_prompt, model="gpt-4o-mini", temperature=0.1, timeout=30)
+            self._record_llm_usage(state, response)
 
-            result = response.json()['choices'][0]['message']['content']
+            result = response.content
             answer = json.loads(result)
 
             # Task 0-ARCH.4: Parse response matching ThoughtPrompts answer format
@@ -1366,6 +1596,11 @@ Error Message: {state['error_message'][:300]}"""
         """
         Decide if we should continue gathering info or generate answer
         """
+        # Check token budget
+        if state.get('termination_reason') == "token_budget":
+            logger.warning(f"⚠️  Token budget for {state.get('error_category')} spent")
+            return "generate"
+
         # Check iteration limit
         if state['iteration'] >= state['max_iterations']:
             logger.warning(f"⚠️  Max iterations ({state['max_iterations']}) reached")
@@ -1385,6 +1620,14 @@ Error Message: {state['error_message'][:300]}"""
         logger.info(f"🔄 Continue gathering (iteration {state['iteration']}/{state['max_iterations']})")
         return "continue"
 
+    def should_reason_again(self, state: dict) -> str:
+        """
+        Decide after an observation whether another reasoning call is needed
+        """
+        if state.get('termination_reason') in EARLY_STOP_REASONS:
+            return "generate"
+        return "reasoning"
+
 
     # ========================================================================
     # WORKFLOW BUILDER
@@ -1425,7 +1668,16 @@ Error Message: {state['error_message'][:300]}"""
         # ReAct loop: select → execute → observe → reasoning
         workflow.add_edge("select_tool", "execute_tool")
         workflow.add_edge("execute_tool", "observe")
-        workflow.add_edge("observe", "reasoning")  # Loop back!
+
+        # Conditional: Loop back, or stop early on sufficient evidence
+        workflow.add_conditional_edges(
+            "observe",
+            self.should_reason_again,
+            {
+                "reasoning": "reasoning",  # Loop back!
+                "generate": "generate_answer"
+            }
+        )
 
         # Answer → Verify → End
         workflow.add_edge("generate_answer", "verify")
@@ -1444,10 +1696,19 @@ Error Message: {state['error_message'][:300]}"""
                 error_message: str,
                 stack_trace: Optional[str] = None,
                 job_name: Optional[str] = None,
-                test_name: Optional[str] = None) -> dict:
+                test_name: Optional[str] = None,
+                commit_sha: Optional[str] = None,
+                deadline_seconds: Optional[float] = None,
+                classification: Optional[Dict] = None,
+                enrichment: Optional[Dict] = None) -> dict:
         """
         Analyze error using ReAct workflow
 
+        Safe to call concurrently from many threads: all per-analysis data
+        lives in the workflow state, routing statistics are collected in an
+        analysis-scoped context, and database access goes through the shared
+        connection pools.
+
         Args:
             build_id: Unique build identifier
             error_log: Full error log
@@ -1455,17 +1716,23 @@ Error Message: {state['error_message'][:300]}"""
             stack_trace: Stack trace (optional)
             job_name: Job name (optional)
             test_name: Test name (optional)
+            commit_sha: Commit under test (optional, pins GitHub file cache)
+            deadline_seconds: Time budget for the analysis; tool retries whose
+                backoff would exceed it are abandoned
+                (default: REACT_ANALYSIS_DEADLINE_SECONDS or 120)
+            classification: Precomputed classification
+                {"category", "confidence", "source"} (skips classification)
+            enrichment: Current ingestion-time enrichment of the failure
+                (failure_enrichment.current_enrichment); skips referenced-file
+                detection
 
         Returns:
             dict with analysis results
         """
         logger.info(f"🚀 Starting ReAct analysis for build: {build_id}")
 
-        # Task 0-ARCH.5: Reset retry history for new analysis
-        self.correction_strategy.reset_all_history()
-
-        # Task 0-ARCH.7: Reset routing statistics for new analysis
-        self.tool_registry.reset_routing_stats()
+        if deadline_seconds is None:
+            deadline_seconds = float(os.getenv("REACT_ANALYSIS_DEADLINE_SECONDS", 120))
 
         # Create initial state
         initial_state = {
@@ -1475,8 +1742,9 @@ Error Message: {state['error_message'][:300]}"""
             "stack_trace": stack_trace,
             "job_name": job_name,
             "test_name": test_name,
+            "commit_sha": commit_sha,
             "iteration": 0,
-            "max_iterations": 5,
+            "max_iterations": DEFAULT_MAX_ITERATIONS,
             "reasoning_history": [],
             "actions_taken": [],
             "observations": [],
@@ -1485,16 +1753,29 @@ Error Message: {state['error_message'][:300]}"""
             "mongodb_logs": [],
             "postgres_history": [],
             "tool_results": {},
+            "retry_history": {},
+            "analysis_deadline": time.time() + deadline_seconds,
+            "llm_usage": {},
+            "preclassified": classification,
+            "enrichment": enrichment,
             "needs_more_info": True,
             "should_continue": True
         }
 
-        # Create and run workflow
-        app = self.create_workflow()
+        # Task 0-ARCH.7: Routing statistics are collected per analysis
+        # GitHub files are prefetched while classification/reasoning run
+        with self.tool_registry.analysis_scope(), self._github_prefetch_scope(initial_state):
+            return self._run_workflow(initial_state)
+
+    def _run_workflow(self, initial_state: dict) -> dict:
+        """Invoke the compiled workflow and build the analysis result"""
+        build_id = initial_state['build_id']
+        start_time = time.time()
 
         try:
-            # Execute workflow
-            final_state = app.invoke(initial_state)
+            # Execute the compiled workflow
+            final_state = self.workflow.invoke(initial_state)
+            reasoning_budget = self._record_reasoning_budget(final_state, (time.time() - start_time) * 1000)
 
             logger.info(f"✅ ReAct analysis complete!")
             logger.info(f"   Iterations: {final_state['iteration']}")
@@ -1524,11 +1805,17 @@ Error Message: {state['error_message'][:300]}"""
                     cache_hits = sum(1 for a in final_state['actions_taken'] if a.get('cached', False))
                     logger.info(f"   Cache hits: {cache_hits}/{len(final_state['actions_taken'])} actions")
 
+            prefetch = current_prefetch_session()
+            actions = final_state['actions_taken']
+            shared_hits = sum(1 for a in actions if a.get('cache_source') == "shared")
+            local_hits = sum(1 for a in actions if a.get('cached', False)) - shared_hits
+
             return {
                 "success": True,
                 "build_id": build_id,
                 "error_category": final_state.get('error_category'),
                 "classification_confidence": final_state.get('classification_confidence'),
+                "classification_source": final_state.get('classification_source'),
                 "root_cause": final_state.get('root_cause'),
                 "fix_recommendation": final_state.get('fix_recommendation'),
                 "solution_confidence": final_state.get('solution_confidence'),
@@ -1545,7 +1832,16 @@ Error Message: {state['error_message'][:300]}"""
                     "retrieval_plan": final_state.get('retrieval_plan', []),
                     "cache_hits": sum(1 for a in final_state['actions_taken'] if a.get('cached', False)),
                     "total_actions": len(final_state['actions_taken'])
-                }
+                },
+                "tool_cache": {
+                    "shared_hits": shared_hits,
+                    "analysis_hits": local_hits,
+                    "misses": len(actions) - shared_hits - local_hits,
+                    "shared_cache": self.tool_cache.get_stats()
+                },
+                "llm_usage": final_state.get('llm_usage', {}),
+                "github_prefetch": prefetch.get_summary() if prefetch is not None else None,
+                "reasoning_budget": reasoning_budget
             }
 
         except Exception as e:
@@ -1559,6 +1855,264 @@ Error Message: {state['error_message'][:300]}"""
             }
 
 
+    def _record_reasoning_budget(self, final_state: dict, latency_ms: float) -> Dict:
+        """Record the finished loop in the per-category budget statistics"""
+        termination_reason = final_state.get('termination_reason')
+        if termination_reason is None:
+            if final_state['iteration'] >= final_state['max_iterations']:
+                termination_reason = "max_iterations"
+            elif final_state.get('solution_confidence', 0.0) >= 0.8 and final_state.get('needs_more_info') \
+                    and final_state.get('next_action') != "DONE":
+                termination_reason = "high_confidence"
+            else:
+                termination_reason = "agent_done"
+
+        usage = final_state.get('llm_usage') or {}
+        tokens = usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0)
+        category = final_state.get('error_category')
+        iterations_saved = self.reasoning_budget.record(
+            category, final_state['iteration'], tokens, latency_ms, termination_reason
+        )
+
+        return {
+            "budget": self.reasoning_budget.budget_for(category).to_dict(),
+            "iterations": final_state['iteration'],
+            "tokens": tokens,
+            "termination_reason": termination_reason,
+            "evidence_score": final_state.get('evidence_score', 0.0),
+            "evidence": final_state.get('evidence'),
+            "iterations_saved": iterations_saved
+        }
+
+    def get_reasoning_stats(self) -> Dict[str, Dict]:
+        """Per-category iterations saved, early stops and latency distribution"""
+        return self.reasoning_budget.get_stats()
+
+
+    # ========================================================================
+    # BATCH ANALYSIS
+    # ========================================================================
+
+    def analyze_many(self,
+                     failures: List[Dict],
+                     max_workers: Optional[int] = None,
+                     deadline_seconds: Optional[float] = None) -> List[dict]:
+        """
+        Analyze a batch of failures (e.g. every failure of one build)
+
+        Failures are grouped by failure-signature fingerprint and only one
+        failure per group is analyzed. Distinct failures are classified in
+        batched LLM calls, their RAG retrieval is batched into the shared tool
+        cache, and the per-group ReAct loops run concurrently.
+
+        Args:
+            failures: Dicts with analyze() arguments (build_id, error_log,
+                error_message, stack_trace, job_name, test_name, commit_sha,
+                enrichment)
+            max_workers: Concurrent analyses (default: REACT_BATCH_MAX_WORKERS or 4)
+            deadline_seconds: Time budget per analysis (see analyze())
+
+        Returns:
+            One result per failure, in input order. Each result has a "batch"
+            entry with the fingerprint, group size and whether it reuses the
+            analysis of another failure.
+        """
+        if not failures:
+            return []
+
+        start_time = time.time()
+
+        # Group identical failures (differing only in volatile tokens)
+        groups: Dict[str, List[int]] = {}
+        for index, failure in enumerate(failures):
+            enrichment = failure.get('enrichment')
+            if enrichment:
+                fingerprint = enrichment['signature']['fingerprint']
+            else:
+                fingerprint = compute_fingerprint(
+                    failure.get('error_message') or '',
+                    failure.get('error_log') or '',
+                    failure.get('stack_trace') or ''
+                ).fingerprint
+            groups.setdefault(fingerprint, []).append(index)
+
+        fingerprints = list(groups)
+        representatives = [self._analyze_arguments(failures[groups[fp][0]]) for fp in fingerprints]
+        logger.info(f"📦 Batch analysis: {len(failures)} failures → {len(fingerprints)} distinct signatures")
+
+        classifications = self._classify_many(representatives)
+        self._prefetch_retrieval_many(representatives, classifications)
+
+        def run(position: int) -> dict:
+            try:
+                return self.analyze(**representatives[position], deadline_seconds=deadline_seconds,
+                                    classification=classifications[position])
+            except Exception as e:
+                logger.error(f"❌ Batch analysis of {representatives[position]['build_id']} failed: {e}")
+                return {"success": False, "build_id": representatives[position]['build_id'], "error": str(e)}
+
+        workers = max_workers or int(os.getenv("REACT_BATCH_MAX_WORKERS", 4))
+        with ThreadPoolExecutor(max_workers=min(workers, len(representatives)),
+                                thread_name_prefix="react-batch") as executor:
+            group_results = list(executor.map(run, range(len(representatives))))
+
+        # Fan results back out to every failure of the group
+        results: List[Optional[dict]] = [None] * len(failures)
+        for fingerprint, representative, group_result in zip(fingerprints, representatives, group_results):
+            members = groups[fingerprint]
+            for position, index in enumerate(members):
+                result = group_result if position == 0 else copy.deepcopy(group_result)
+                result['build_id'] = self._analyze_arguments(failures[index])['build_id']
+                result['batch'] = {
+                    "fingerprint": fingerprint,
+                    "group_size": len(members),
+                    "representative_build_id": representative['build_id'],
+                    "deduplicated": position > 0
+                }
+                results[index] = result
+
+        logger.info(f"📦 Batch analysis complete: {len(failures)} failures, {len(fingerprints)} analyses "
+                    f"in {time.time() - start_time:.1f}s")
+        return results
+
+    @staticmethod
+    def _analyze_arguments(failure: Dict) -> Dict:
+        """analyze() keyword arguments for a failure dict"""
+        arguments = {field: failure.get(field) for field in ANALYZE_FIELDS}
+        arguments['build_id'] = str(arguments['build_id'] or 'unknown')
+        arguments['error_message'] = arguments['error_message'] or ''
+        arguments['error_log'] = arguments['error_log'] or arguments['error_message']
+        return arguments
+
+    def _classify_many(self, failures: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Classify distinct failures: local fast path first, then batched LLM
+        calls (BATCH_CLASSIFICATION_SIZE failures per prompt).
+
+        Returns:
+            Classification per failure; None where the batch call failed
+            (analyze() then classifies that failure itself)
+        """
+        classifications: List[Optional[Dict]] = [None] * len(failures)
+        remaining = []
+
+        for position, failure in enumerate(failures):
+            prediction = None
+            if self.fast_classifier is not None:
+                prediction = self.fast_classifier.classify(failure['error_message'], failure['error_log'])
+            if prediction is not None:
+                classifications[position] = {"category": prediction[0], "confidence": prediction[1],
+                                             "source": "fast_path"}
+            else:
+                remaining.append(position)
+
+        for offset in range(0, len(remaining), BATCH_CLASSIFICATION_SIZE):
+            chunk = remaining[offset:offset + BATCH_CLASSIFICATION_SIZE]
+            if len(chunk) == 1:
+                continue  # Single failure: the regular (cacheable) classification prompt
+
+            for position, classification in zip(chunk, self._classify_batch_with_llm([failures[p] for p in chunk])):
+                classifications[position] = classification
+
+        return classifications
+
+    def _classify_batch_with_llm(self, failures: List[Dict]) -> List[Optional[Dict]]:
+        """Classify several failures in one LLM call"""
+        entries = "\n\n".join(
+            f"[{number}]\nERROR MESSAGE:\n{failure['error_message'][:300]}\nERROR LOG:\n{failure['error_log'][:500]}"
+            for number, failure in enumerate(failures)
+        )
+
+        batch_prompt = f"""Classify each of these {len(failures)} test failures into ONE category.
+
+{entries}
+
+CATEGORIES:
+{CLASSIFICATION_CATEGORIES}
+
+Respond with JSON:
+{{
+    "classifications": [
+        {{"id": 0, "category": "...", "confidence": 0.0-1.0}}
+    ]
+}}"""
+
+        classifications: List[Optional[Dict]] = [None] * len(failures)
+        try:
+            response = self.llm_client.chat(batch_prompt, model="gpt-4o-mini", temperature=0.0, timeout=60)
+            for item in json.loads(response.content).get('classifications', []):
+                number = int(item.get('id', -1))
+                if 0 <= number < len(failures) and item.get('category'):
+                    classifications[number] = {"category": item['category'],
+                                               "confidence": float(item.get('confidence', 0.5)),
+                                               "source": "batch_llm"}
+            logger.info(f"✅ Batch-classified {sum(c is not None for c in classifications)}/{len(failures)} failures")
+        except Exception as e:
+            logger.warning(f"⚠️  Batch classification failed: {e} - classifying individually")
+
+        return classifications
+
+    def _prefetch_retrieval_many(self, failures: List[Dict], classifications: List[Optional[Dict]]) -> None:
+        """
+        Run the RAG retrieval of all classified failures as one batch and
+        store the results in the shared tool cache, where the per-failure
+        pinecone_knowledge/pinecone_error_library tool calls find them.
+        """
+        states = []
+        for failure, classification in zip(failures, classifications):
+            if classification is None:
+                continue
+            state = {**failure, 'error_category': classification['category']}
+            if not all(self.tool_cache.contains(self._shared_cache_key(tool, state))
+                       for tool in ("pinecone_knowledge", "pinecone_error_library")):
+                states.append(state)
+
+        if not states:
+            return
+
+        try:
+            if self.fusion_rag is not None:
+                # Both RAG tools issue the same Fusion RAG query
+                requests = [{"query": state['error_message'], "filters": {'category': state['error_category']}}
+                            for state in states]
+                batches = self.fusion_rag.retrieve_many(requests, expand_query=True, top_k=3)
+                for state, fusion_results in zip(states, batches):
+                    self.tool_cache.put("pinecone_knowledge", self._shared_cache_key("pinecone_knowledge", state),
+                                        self._fusion_tool_results(fusion_results, default_confidence=0.9), state)
+                    self.tool_cache.put("pinecone_error_library",
+                                        self._shared_cache_key("pinecone_error_library", state),
+                                        self._fusion_tool_results(fusion_results, default_confidence=0.7), state)
+            else:
+                self._prefetch_vector_search_many(states)
+
+            logger.info(f"📦 Batch retrieval cached for {len(states)} distinct failures")
+        except Exception as e:
+            logger.warning(f"⚠️  Batch retrieval failed: {e} - tools will query individually")
+
+    def _prefetch_vector_search_many(self, states: List[Dict]) -> None:
+        """Legacy Pinecone-only batch retrieval: one embedding call for all queries"""
+        embeddings = self.embeddings.embed_documents([state['error_message'] for state in states])
+        knowledge = PineconeVectorStore(index_name=self.knowledge_index, embedding=self.embeddings,
+                                        pinecone_api_key=self.pinecone_api_key)
+        error_library = PineconeVectorStore(index_name=self.error_library_index, embedding=self.embeddings,
+                                            pinecone_api_key=self.pinecone_api_key)
+
+        def search(item):
+            state, embedding = item
+            knowledge_docs = knowledge.similarity_search_by_vector(
+                embedding, k=3, filter={"doc_type": "error_documentation"}
+            )
+            library_docs = error_library.similarity_search_by_vector(
+                embedding, k=3, filter={"error_category": state['error_category']}
+            )
+            self.tool_cache.put("pinecone_knowledge", self._shared_cache_key("pinecone_knowledge", state),
+                                self._vector_tool_results(knowledge_docs, "knowledge_docs", confidence=0.9), state)
+            self.tool_cache.put("pinecone_error_library", self._shared_cache_key("pinecone_error_library", state),
+                                self._vector_tool_results(library_docs, "error_library", confidence=0.7), state)
+
+        with ThreadPoolExecutor(max_workers=min(4, len(states)), thread_name_prefix="react-batch-rag") as executor:
+            list(executor.map(search, zip(states, embeddings)))
+
     def refresh_categories(self) -> Dict[str, str]:
         """
         Refresh error categories from Pinecone knowledge docs.
@@ -1588,14 +2142,6 @@ Error Message: {state['error_message'][:300]}"""
         return self.tool_registry.get_available_categories()
 
 
-    def __del__(self):
-        """Cleanup connections"""
-        if self.mongo_client:
-            self.mongo_client.close()
-        if self.postgres_conn:
-            self.postgres_conn.close()
-
-
 # ============================================================================
 # CONVENIENCE FUNCTION
 # ============================================================================
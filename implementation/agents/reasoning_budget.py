@@ -0,0 +1,338 @@
+"""
+Adaptive Reasoning Budget for ReAct Agent
+=========================================
+
+Per-category iteration/token budgets and evidence-based early termination
+for the ReAct reasoning loop. Without it the loop runs until the LLM says
+DONE or 5 iterations pass, so simple INFRA/CONFIG failures whose answer is
+already in the retrieved documents still pay for extra reasoning calls.
+
+Features:
+1. Per-category budget: max reasoning iterations, max LLM tokens and the
+   evidence-sufficiency threshold (override with REACT_REASONING_BUDGETS)
+2. Evidence-sufficiency estimate from retrieval scores (CrossEncoder rerank
+   score or RRF source agreement), the rerank margin between the best two
+   documents, routing coverage (code fetched when RAGRouter requires it)
+   and classification confidence
+3. Per-category statistics: early stops by reason, iterations saved versus
+   the unbudgeted loop, tokens, latency distribution (p50/p95/p99)
+
+Usage:
+    budget_policy = get_reasoning_budget()
+
+    budget = budget_policy.budget_for("INFRA_ERROR")
+    state['max_iterations'] = budget.max_iterations
+
+    reason = budget_policy.stop_reason(state)   # None = keep reasoning
+    budget_policy.record(category, iterations, tokens, latency_ms, reason)
+
+File: implementation/agents/reasoning_budget.py
+Created: 2026-10-19
+"""
+
+import json
+import math
+import os
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, asdict, replace
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Iterations of the loop before per-category budgets existed
+DEFAULT_MAX_ITERATIONS = 5
+
+# RRF constant used by FusionRAG (score of a rank-1 hit is 1 / (k + 1))
+RRF_K = 60
+
+# Rank-1 agreement of this many retrieval sources counts as full relevance
+RRF_FULL_AGREEMENT_SOURCES = 2
+
+# Relevance cap for results without a retrieval score (legacy Pinecone path)
+UNSCORED_RELEVANCE = 0.6
+
+# Top-1 vs top-2 relevance gap that counts as an unambiguous best match
+CLEAR_MARGIN = 0.3
+
+# Latency samples kept per category for percentiles
+LATENCY_SAMPLES = 1000
+
+# Termination reasons set by the budget policy (the rest come from the loop)
+EARLY_STOP_REASONS = ("evidence_sufficient", "token_budget")
+
+
+@dataclass(frozen=True)
+class CategoryBudget:
+    """Reasoning budget for one error category"""
+    max_iterations: int = DEFAULT_MAX_ITERATIONS
+    max_tokens: int = 20000
+    sufficiency_threshold: float = 0.8
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+# RAG-only categories are usually answered by the first retrieval; code and
+# test failures need the source file and keep a larger budget
+DEFAULT_CATEGORY_BUDGETS: Dict[str, CategoryBudget] = {
+    "CODE_ERROR": CategoryBudget(max_iterations=5, max_tokens=20000, sufficiency_threshold=0.85),
+    "TEST_FAILURE": CategoryBudget(max_iterations=4, max_tokens=16000, sufficiency_threshold=0.8),
+    "INFRA_ERROR": CategoryBudget(max_iterations=3, max_tokens=10000, sufficiency_threshold=0.7),
+    "CONFIG_ERROR": CategoryBudget(max_iterations=3, max_tokens=10000, sufficiency_threshold=0.7),
+    "DEPENDENCY_ERROR": CategoryBudget(max_iterations=3, max_tokens=10000, sufficiency_threshold=0.7),
+}
+
+DEFAULT_BUDGET = CategoryBudget()
+
+
+def _sigmoid(value: float) -> float:
+    return 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, value))))
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(1.0, value))
+
+
+def document_relevance(doc: Dict) -> float:
+    """
+    Relevance of one RAG tool result in [0, 1].
+
+    CrossEncoder rerank scores are logits (sigmoid). Without a rerank score
+    the RRF score measures how many sources ranked the document near the
+    top. Results without any retrieval score are capped at
+    UNSCORED_RELEVANCE: their confidence is a per-index prior, not a match.
+    """
+    rerank_score = doc.get('rerank_score')
+    if rerank_score is not None:
+        return _sigmoid(float(rerank_score))
+
+    rrf_score = doc.get('rrf_score')
+    if rrf_score:
+        return _clamp(float(rrf_score) * (RRF_K + 1) / RRF_FULL_AGREEMENT_SOURCES)
+
+    return min(_clamp(float(doc.get('confidence') or 0.0)), UNSCORED_RELEVANCE)
+
+
+def estimate_evidence_sufficiency(state: dict, code_available: bool = True) -> Tuple[float, Dict]:
+    """
+    Estimate whether the evidence gathered so far answers the failure.
+
+    score = coverage * (0.75 * retrieval + 0.25 * classification_confidence)
+
+    retrieval = best relevance, scaled down when the best two documents are
+    close (an ambiguous match); coverage = fraction of the evidence the
+    routing decision requires (RAG always, GitHub code when routed and a
+    GitHub client is available).
+
+    Returns:
+        (score in [0, 1], breakdown dict)
+    """
+    relevances = sorted((document_relevance(doc) for doc in state.get('rag_results') or []), reverse=True)
+    top = relevances[0] if relevances else 0.0
+    margin = top - relevances[1] if len(relevances) > 1 else top
+    retrieval = top * (0.6 + 0.4 * _clamp(margin / CLEAR_MARGIN))
+
+    required = {"rag": bool(relevances)}
+    if state.get('should_use_github', True) and code_available:
+        required["github"] = bool(state.get('github_files'))
+    coverage = sum(required.values()) / len(required)
+
+    classification_confidence = _clamp(float(state.get('classification_confidence') or 0.0))
+    score = coverage * (0.75 * retrieval + 0.25 * classification_confidence)
+
+    return round(score, 4), {
+        "top_relevance": round(top, 4),
+        "margin": round(margin, 4),
+        "retrieval": round(retrieval, 4),
+        "coverage": round(coverage, 4),
+        "missing": [name for name, present in required.items() if not present],
+        "classification_confidence": classification_confidence
+    }
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ReasoningBudget:
+    """
+    Per-category reasoning budgets, early-termination policy and statistics.
+
+    Thread-safe: one instance is shared by all concurrent analyses.
+    """
+
+    def __init__(self,
+                 budgets: Optional[Dict[str, CategoryBudget]] = None,
+                 default_budget: CategoryBudget = DEFAULT_BUDGET,
+                 early_termination: bool = True):
+        """
+        Initialize the policy.
+
+        Args:
+            budgets: Per-category budgets (merged over DEFAULT_CATEGORY_BUDGETS)
+            default_budget: Budget for categories without an entry
+            early_termination: Stop on sufficient evidence (budgets always apply)
+        """
+        self.budgets = dict(DEFAULT_CATEGORY_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        self.default_budget = default_budget
+        self.early_termination = early_termination
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    def budget_for(self, category: Optional[str]) -> CategoryBudget:
+        """Budget for an error category"""
+        return self.budgets.get(category or "", self.default_budget)
+
+    def stop_reason(self, state: dict, code_available: bool = True) -> Optional[str]:
+        """
+        Check whether the loop should stop before another reasoning call.
+
+        Sets state['evidence_score'] / state['evidence'] as a side effect.
+
+        Returns:
+            "token_budget", "evidence_sufficient" or None (keep reasoning)
+        """
+        budget = self.budget_for(state.get('error_category'))
+
+        usage = state.get('llm_usage') or {}
+        tokens = usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0)
+        if tokens >= budget.max_tokens:
+            return "token_budget"
+
+        score, breakdown = estimate_evidence_sufficiency(state, code_available)
+        state['evidence_score'] = score
+        state['evidence'] = breakdown
+
+        if self.early_termination and score >= budget.sufficiency_threshold:
+            return "evidence_sufficient"
+        return None
+
+    def record(self,
+               category: Optional[str],
+               iterations: int,
+               tokens: int,
+               latency_ms: float,
+               termination_reason: Optional[str]) -> int:
+        """
+        Record a finished analysis.
+
+        Returns:
+            Iterations saved versus the unbudgeted loop (DEFAULT_MAX_ITERATIONS)
+        """
+        category = category or "UNKNOWN"
+        budget = self.budget_for(category)
+        budget_stop = termination_reason in EARLY_STOP_REASONS or (
+            termination_reason == "max_iterations" and budget.max_iterations < DEFAULT_MAX_ITERATIONS
+        )
+        saved = max(0, DEFAULT_MAX_ITERATIONS - iterations) if budget_stop else 0
+
+        with self._lock:
+            stats = self._stats.setdefault(category, {
+                "analyses": 0,
+                "iterations": 0,
+                "iterations_saved": 0,
+                "tokens": 0,
+                "termination": {},
+                "latencies_ms": deque(maxlen=LATENCY_SAMPLES)
+            })
+            stats["analyses"] += 1
+            stats["iterations"] += iterations
+            stats["iterations_saved"] += saved
+            stats["tokens"] += tokens
+            reason = termination_reason or "unknown"
+            stats["termination"][reason] = stats["termination"].get(reason, 0) + 1
+            stats["latencies_ms"].append(latency_ms)
+
+        return saved
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Get per-category statistics.
+
+        Returns:
+            {category: {analyses, avg_iterations, iterations_saved,
+            early_stops, termination, avg_tokens, latency_ms{...}, budget}}
+        """
+        with self._lock:
+            snapshot = {category: {**stats, "termination": dict(stats["termination"]),
+                                   "latencies_ms": sorted(stats["latencies_ms"])}
+                        for category, stats in self._stats.items()}
+
+        report = {}
+        for category, stats in snapshot.items():
+            latencies = stats["latencies_ms"]
+            analyses = stats["analyses"]
+            report[category] = {
+                "analyses": analyses,
+                "avg_iterations": round(stats["iterations"] / analyses, 2),
+                "iterations_saved": stats["iterations_saved"],
+                "early_stops": sum(stats["termination"].get(r, 0) for r in EARLY_STOP_REASONS),
+                "termination": stats["termination"],
+                "avg_tokens": round(stats["tokens"] / analyses, 1),
+                "latency_ms": {
+                    "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+                    "p50": round(_percentile(latencies, 50), 1),
+                    "p95": round(_percentile(latencies, 95), 1),
+                    "p99": round(_percentile(latencies, 99), 1),
+                    "max": round(latencies[-1], 1) if latencies else 0.0
+                },
+                "budget": self.budget_for(category).to_dict()
+            }
+        return report
+
+    def reset_stats(self):
+        """Clear all statistics"""
+        with self._lock:
+            self._stats.clear()
+
+
+def load_budget_overrides(raw: Optional[str]) -> Dict[str, CategoryBudget]:
+    """
+    Parse REACT_REASONING_BUDGETS, e.g.
+    '{"INFRA_ERROR": {"max_iterations": 2}, "CODE_ERROR": {"max_tokens": 30000}}'
+
+    Unspecified fields keep the category's default budget.
+    """
+    if not raw:
+        return {}
+    try:
+        overrides = json.loads(raw)
+        return {
+            category: replace(DEFAULT_CATEGORY_BUDGETS.get(category, DEFAULT_BUDGET), **fields)
+            for category, fields in overrides.items()
+        }
+    except (ValueError, TypeError) as e:
+        logger.warning(f"⚠️  Invalid REACT_REASONING_BUDGETS ({e}) - using default budgets")
+        return {}
+
+
+# Singleton instance shared by all ReActAgent instances in the process
+_reasoning_budget_instance = None
+_reasoning_budget_lock = threading.Lock()
+
+
+def get_reasoning_budget() -> ReasoningBudget:
+    """
+    Get singleton instance of ReasoningBudget.
+
+    Returns:
+        Global ReasoningBudget instance
+    """
+    global _reasoning_budget_instance
+    if _reasoning_budget_instance is None:
+        with _reasoning_budget_lock:
+            if _reasoning_budget_instance is None:
+                _reasoning_budget_instance = ReasoningBudget(
+                    budgets=load_budget_overrides(os.getenv("REACT_REASONING_BUDGETS")),
+                    early_termination=os.getenv("REACT_EARLY_TERMINATION", "true").lower() == "true"
+                )
+    return _reasoning_budget_instance
@@ -23,11 +23,28 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
 from langchain_pinecone import PineconeVectorStore
 from langchain_openai import OpenAIEmbeddings
 
 logger = logging.getLogger(__name__)
 
+# Routing stats for the analysis running in the current context (Task 0-ARCH.7).
+# LangGraph copies the context into worker threads, so nodes of one analysis
+# share the scope while concurrent analyses stay isolated.
+_routing_scope: ContextVar[Optional[Dict]] = ContextVar("routing_scope", default=None)
+
+
+def _empty_routing_stats() -> Dict[str, int]:
+    return {
+        "github_skipped_80_percent": 0,
+        "github_used_20_percent": 0,
+        "infra_skipped_github": 0,
+        "config_skipped_github": 0,
+        "total_routing_decisions": 0
+    }
+
 
 @dataclass
 class ToolMetadata:
@@ -93,15 +110,9 @@ class ToolRegistry:
         self.tools: Dict[str, ToolMetadata] = {}
         self._register_all_tools()
 
-        # Task 0-ARCH.7: Routing decision tracking
-        self.routing_decisions: List[Dict] = []
-        self.routing_stats = {
-            "github_skipped_80_percent": 0,
-            "github_used_20_percent": 0,
-            "infra_skipped_github": 0,
-            "config_skipped_github": 0,
-            "total_routing_decisions": 0
-        }
+        # Task 0-ARCH.7: Routing decision tracking (used outside analysis_scope)
+        self._routing_decisions: List[Dict] = []
+        self._routing_stats = _empty_routing_stats()
 
         # Initialize categories from Pinecone at startup
         logger.info("Discovering categories from Pinecone at startup...")
@@ -685,13 +696,35 @@ class ToolRegistry:
     def reset_routing_stats(self):
         """Reset routing statistics for new analysis (Task 0-ARCH.7)"""
         self.routing_decisions.clear()
-        self.routing_stats = {
-            "github_skipped_80_percent": 0,
-            "github_used_20_percent": 0,
-            "infra_skipped_github": 0,
-            "config_skipped_github": 0,
-            "total_routing_decisions": 0
-        }
+        self.routing_stats.update(_empty_routing_stats())
+
+    @property
+    def routing_stats(self) -> Dict[str, int]:
+        """Routing counters of the current analysis scope (or registry-wide)"""
+        scope = _routing_scope.get()
+        return scope["stats"] if scope is not None else self._routing_stats
+
+    @property
+    def routing_decisions(self) -> List[Dict]:
+        """Routing decisions of the current analysis scope (or registry-wide)"""
+        scope = _routing_scope.get()
+        return scope["decisions"] if scope is not None else self._routing_decisions
+
+    @contextmanager
+    def analysis_scope(self):
+        """
+        Collect routing statistics for a single analysis.
+
+        Inside the block, routing_stats/routing_decisions refer to a fresh
+        per-analysis store, so concurrent analyze() calls sharing this
+        registry neither reset nor mix each other's statistics.
+        """
+        scope = {"stats": _empty_routing_stats(), "decisions": []}
+        token = _routing_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _routing_scope.reset(token)
 
     def record_tool_execution(
         self,
@@ -0,0 +1,363 @@
+"""
+Shared Tool Result Cache for ReAct Agent
+========================================
+
+Cross-request cache for ReAct tool results. The per-analysis
+`retrieved_cache` only helps within a single `analyze()` run; this cache is
+shared by every analysis handled by the process (and optionally by every
+process through Redis), so the next analysis of the same failing test can
+skip Pinecone/GitHub/MongoDB/PostgreSQL round trips.
+
+Features:
+1. In-process LRU (bounded entry count) with per-entry expiry
+2. Optional Redis second level (shared across workers)
+3. Per-tool TTL policy (GitHub files pinned to a commit SHA are immutable,
+   MongoDB logs are short-lived)
+4. Keys built from tool name + normalized error signature, or
+   file path + commit SHA for GitHub files
+5. Hit/miss statistics per tool
+
+Usage:
+    cache = get_tool_result_cache()
+
+    key = cache.build_key("pinecone_knowledge", state)
+    result = cache.get("pinecone_knowledge", key)
+    if result is None:
+        result = run_tool()
+        cache.put("pinecone_knowledge", key, result)
+
+File: implementation/agents/tool_result_cache.py
+Created: 2026-10-19
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Shared failure-signature normalizer (implementation/failure_fingerprint.py)
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from failure_fingerprint import normalize_failure_text
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a result stays valid, per tool. None = never cache.
+DEFAULT_TOOL_TTLS: Dict[str, Optional[int]] = {
+    # Knowledge/error library results change only when the indexes are rebuilt
+    "pinecone_knowledge": 3600,
+    "pinecone_error_library": 3600,
+    # GitHub file content keyed by commit SHA never changes
+    "github_get_file": 7 * 24 * 3600,
+    # Logs and history keep growing while builds run
+    "mongodb_logs": 60,
+    "postgres_history": 300,
+}
+
+# TTL for GitHub files fetched from a moving branch (no commit SHA known)
+GITHUB_BRANCH_TTL_SECONDS = 300
+
+REDIS_KEY_PREFIX = "ddn:toolcache:"
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+class ToolResultCache:
+    """
+    Two-level (local LRU + optional Redis) TTL cache for ReAct tool results.
+
+    Thread-safe: a single instance is shared by all concurrent analyses.
+    Values are deep-copied on the way in and out so callers can mutate the
+    returned objects freely.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_policy: Optional[Dict[str, Optional[int]]] = None,
+        redis_client=None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in the local LRU
+            ttl_policy: Per-tool TTL overrides (merged over DEFAULT_TOOL_TTLS)
+            redis_client: Optional redis.Redis client for the shared level
+        """
+        self.max_entries = max_entries
+        self.ttl_policy = dict(DEFAULT_TOOL_TTLS)
+        if ttl_policy:
+            self.ttl_policy.update(ttl_policy)
+        self.redis_client = redis_client
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+
+        self._stats = {
+            "hits": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "redis_errors": 0
+        }
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Key construction
+    # ------------------------------------------------------------------
+
+    def build_key(self, tool_name: str, state: dict, target: Optional[str] = None) -> Optional[str]:
+        """
+        Build the shared cache key for a tool call.
+
+        Args:
+            tool_name: Tool being executed
+            state: Current agent state
+            target: Explicit target (e.g. file path) when known
+
+        Returns:
+            Cache key, or None if the tool should not be cached
+        """
+        if self.get_ttl(tool_name, state) is None:
+            return None
+
+        if tool_name == "github_get_file":
+            if not target:
+                return None
+            ref = state.get('commit_sha') or "branch:main"
+            return f"{tool_name}:{_hash(f'{target}@{ref}')}"
+
+        if tool_name == "mongodb_logs":
+            scope = f"{state.get('build_id')}|{state.get('job_name')}|{state.get('test_name')}"
+            return f"{tool_name}:{_hash(scope)}"
+
+        if tool_name == "postgres_history":
+            if not state.get('test_name'):
+                return None
+            return f"{tool_name}:{_hash(state['test_name'])}"
+
+        signature = normalize_failure_text(state.get('error_message', ''))
+        category = state.get('error_category') or "UNKNOWN"
+        return f"{tool_name}:{_hash(f'{category}|{signature}')}"
+
+    def get_ttl(self, tool_name: str, state: Optional[dict] = None) -> Optional[int]:
+        """Get TTL in seconds for a tool (None = not cacheable)"""
+        if tool_name == "github_get_file" and state is not None and not state.get('commit_sha'):
+            return GITHUB_BRANCH_TTL_SECONDS
+        return self.ttl_policy.get(tool_name)
+
+    # ------------------------------------------------------------------
+    # Get / put
+    # ------------------------------------------------------------------
+
+    def get(self, tool_name: str, key: Optional[str]) -> Optional[Any]:
+        """
+        Look up a cached tool result.
+
+        Returns:
+            Deep copy of the cached value, or None on miss
+        """
+        if key is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._record(tool_name, "hits", "local_hits")
+                    return copy.deepcopy(value)
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+        value = self._redis_get(key)
+        if value is not None:
+            ttl = self._redis_ttl(key)
+            with self._lock:
+                self._store_local(key, value, now + ttl)
+                self._record(tool_name, "hits", "redis_hits")
+            return copy.deepcopy(value)
+
+        with self._lock:
+            self._record(tool_name, "misses")
+        return None
+
+    def contains(self, key: Optional[str]) -> bool:
+        """
+        Check for an unexpired local entry (no Redis round trip, no stats).
+        """
+        if key is None:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def put(self, tool_name: str, key: Optional[str], value: Any, state: Optional[dict] = None) -> bool:
+        """
+        Store a tool result.
+
+        Empty results are not cached so that a transient failure (tools return
+        [] on error) does not hide data from the next analysis.
+
+        Returns:
+            True if the value was stored
+        """
+        if key is None or not value:
+            return False
+
+        ttl = self.get_ttl(tool_name, state)
+        if ttl is None:
+            return False
+
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._store_local(key, stored, time.time() + ttl)
+            self._record(tool_name, "stores")
+
+        self._redis_set(key, value, ttl)
+        return True
+
+    def invalidate(self, key: str):
+        """Remove a single key from both levels"""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Tool cache Redis delete failed: {e}")
+
+    def clear(self):
+        """Clear the local level and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+            self._tool_stats.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with global counters, hit rate, size and per-tool counters
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "redis_enabled": self.redis_client is not None,
+                "per_tool": {tool: dict(counts) for tool, counts in self._tool_stats.items()}
+            }
+
+    # ------------------------------------------------------------------
+    # Internals (callers hold self._lock where noted)
+    # ------------------------------------------------------------------
+
+    def _store_local(self, key: str, value: Any, expires_at: float):
+        """Insert into LRU, evicting the oldest entries (lock held)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _record(self, tool_name: str, *counters: str):
+        """Increment global and per-tool counters (lock held)"""
+        tool_counts = self._tool_stats.setdefault(tool_name, {"hits": 0, "misses": 0, "stores": 0})
+        for counter in counters:
+            self._stats[counter] += 1
+            if counter in tool_counts:
+                tool_counts[counter] += 1
+
+    def _redis_get(self, key: str) -> Optional[Any]:
+        if self.redis_client is None:
+            return None
+        try:
+            data = self.redis_client.get(REDIS_KEY_PREFIX + key)
+            return json.loads(data) if data else None
+        except Exception as e:
+            with self._lock:
+                self._stats["redis_errors"] += 1
+            logger.warning(f"Tool cache Redis get failed: {e}")
+            return None
+
+    def _redis_ttl(self, key: str) -> int:
+        try:
+            ttl = self.redis_client.ttl(REDIS_KEY_PREFIX + key)
+            return ttl if ttl and ttl > 0 else 60
+        except Exception:
+            return 60
+
+    def _redis_set(self, key: str, value: Any, ttl: int):
+        if self.redis_client is None:
+            return
+        try:
+            # default=str: MongoDB/PostgreSQL rows carry datetime values
+            self.redis_client.setex(REDIS_KEY_PREFIX + key, ttl, json.dumps(value, default=str))
+        except Exception as e:
+            with self._lock:
+                self._stats["redis_errors"] += 1
+            logger.warning(f"Tool cache Redis set failed: {e}")
+
+
+# Singleton instance shared by all ReActAgent instances in the process
+_tool_result_cache_instance = None
+_tool_result_cache_lock = threading.Lock()
+
+
+def _create_redis_client():
+    """Create Redis client for the shared level if enabled via TOOL_CACHE_REDIS"""
+    if os.getenv("TOOL_CACHE_REDIS", "false").lower() != "true":
+        return None
+    try:
+        import redis
+        client = redis.Redis(
+            host=os.getenv('REDIS_HOST', 'localhost'),
+            port=int(os.getenv('REDIS_PORT', 6379)),
+            db=int(os.getenv('REDIS_DB', 0)),
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+        client.ping()
+        logger.info("✅ Tool result cache: Redis level enabled")
+        return client
+    except Exception as e:
+        logger.warning(f"⚠️  Tool result cache: Redis unavailable ({e}) - local LRU only")
+        return None
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """
+    Get singleton instance of ToolResultCache.
+
+    Returns:
+        Global ToolResultCache instance
+    """
+    global _tool_result_cache_instance
+    if _tool_result_cache_instance is None:
+        with _tool_result_cache_lock:
+            if _tool_result_cache_instance is None:
+                _tool_result_cache_instance = ToolResultCache(
+                    max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 1000)),
+                    redis_client=_create_redis_client()
+                )
+    return _tool_result_cache_instance
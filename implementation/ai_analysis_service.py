@@ -4,13 +4,14 @@ Simple, production-ready service using Gemini AI
 Integrates with MongoDB, PostgreSQL, and Pinecone
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
 import json
+import copy
 
 # AI and Database imports
 import google.generativeai as genai
@@ -18,7 +19,7 @@ from openai import OpenAI
 from pinecone import Pinecone
 from pymongo import MongoClient
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, Json
 import requests  # Phase 2: For re-ranking service API calls
 
 # Task 0-ARCH.10: Import ReAct Agent
@@ -49,6 +50,12 @@ except ImportError as e:
     PHASE_0D_AVAILABLE = False
     logging.warning(f"Phase 0D modules not available: {e}")
 
+# Failure-signature fingerprints (fuzzy analysis cache + dedup)
+from failure_fingerprint import compute_fingerprint, raw_failure_key, get_fingerprint_cache, is_cacheable_analysis
+
+# Ingestion-time enrichment (entities, referenced files, signature, token counts)
+from failure_enrichment import current_enrichment, ensure_enrichment, signature_from_enrichment
+
 # Phase 4: Import PII redaction
 security_dir = os.path.join(implementation_dir, 'security')
 sys.path.insert(0, security_dir)
@@ -106,6 +113,8 @@ if CRAG_AVAILABLE:
         logger.info("   - MEDIUM (0.65-0.85): HITL queue")
         logger.info("   - LOW (0.40-0.65): Self-correction")
         logger.info("   - VERY_LOW (<0.40): Web search fallback")
+        if crag_verifier.async_correction:
+            logger.info("   - LOW/VERY_LOW corrections run in background (provisional answer first)")
     except Exception as e:
         logger.error(f"✗ CRAG Verifier initialization failed: {str(e)[:200]}")
         logger.warning("   - Answers will not be verified (no confidence scoring)")
@@ -273,23 +282,12 @@ def analyze_with_react_agent(failure_data):
 
     try:
         # Extract failure data
-        error_message = failure_data.get('error_message', '')
-        error_log = failure_data.get('error_log', error_message)  # Use error_message if no log
-        test_name = failure_data.get('test_name', '')
-        stack_trace = failure_data.get('stack_trace', '')
-        build_id = str(failure_data.get('_id', 'unknown'))
+        react_request = react_request_from_failure(failure_data)
 
-        logger.info(f"[ReAct] Starting analysis for: {test_name} (build: {build_id})")
+        logger.info(f"[ReAct] Starting analysis for: {react_request['test_name']} (build: {react_request['build_id']})")
 
         # Call ReAct agent
-        react_result = react_agent.analyze(
-            build_id=build_id,
-            error_log=error_log,
-            error_message=error_message,
-            stack_trace=stack_trace,
-            job_name=failure_data.get('job_name'),
-            test_name=test_name
-        )
+        react_result = react_agent.analyze(**react_request)
 
         if react_result.get('success'):
             logger.info(f"[ReAct] Analysis complete: {react_result.get('error_category')}")
@@ -317,6 +315,46 @@ def analyze_with_react_agent(failure_data):
         return None
 
 
+def react_request_from_failure(failure_data):
+    """Map a stored failure document to ReActAgent.analyze() arguments"""
+    error_message = failure_data.get('error_message', '')
+    return {
+        'build_id': str(failure_data.get('_id', 'unknown')),
+        'error_log': failure_data.get('error_log', error_message),  # Use error_message if no log
+        'error_message': error_message,
+        'stack_trace': failure_data.get('stack_trace', ''),
+        'job_name': failure_data.get('job_name'),
+        'test_name': failure_data.get('test_name', ''),
+        'enrichment': current_enrichment(failure_data)
+    }
+
+
+def analyze_batch_with_react_agent(failures):
+    """
+    Analyze many failures with ReActAgent.analyze_many()
+
+    Identical failures share one analysis; distinct failures share batched
+    classification and retrieval.
+
+    Returns:
+        ReAct result per failure (None where the analysis failed)
+    """
+    global react_agent
+
+    if react_agent is None:
+        logger.error("[ReAct] Agent not available - using fallback")
+        return [None] * len(failures)
+
+    try:
+        logger.info(f"[ReAct] Starting batch analysis of {len(failures)} failures")
+        react_results = react_agent.analyze_many([react_request_from_failure(f) for f in failures])
+    except Exception as e:
+        logger.error(f"[ReAct] Error during batch analysis: {str(e)}")
+        return [None] * len(failures)
+
+    return [result if result.get('success') else None for result in react_results]
+
+
 def verify_react_result_with_crag(react_result, failure_data):
     """
     Verify ReAct agent result using CRAG (Task 0-ARCH.18)
@@ -387,11 +425,12 @@ def verify_react_result_with_crag(react_result, failure_data):
         logger.info(f"[CRAG] Verifying ReAct result (category: {react_result.get('error_category')})")
         logger.info(f"[CRAG] Retrieved docs: {len(retrieved_docs)}, Avg similarity: {sum(d.get('similarity_score', 0) for d in retrieved_docs) / len(retrieved_docs) if retrieved_docs else 0:.2f}")
 
-        # Run CRAG verification
+        # Run CRAG verification (background corrections are published when done)
         verification_result = crag_verifier.verify(
             react_result=react_result,
             retrieved_docs=retrieved_docs,
-            failure_data=failure_context
+            failure_data=failure_context,
+            on_corrected=lambda corrected: publish_corrected_verification(corrected, react_result, failure_data)
         )
 
         # Log verification results
@@ -414,17 +453,7 @@ def verify_react_result_with_crag(react_result, failure_data):
                        f"cls={components.get('classification', 0):.2f}")
 
         # Return verification result with original react_result embedded
-        return {
-            'verified': True,
-            'verification_status': status,
-            'confidence': confidence,
-            'confidence_level': confidence_level,
-            'react_result': react_result,  # Original result
-            'verified_answer': verification_result.get('answer'),  # May be corrected/enhanced
-            'verification_metadata': metadata,
-            'action_taken': verification_result.get('action_taken'),
-            'review_url': verification_result.get('review_url')  # For HITL cases
-        }
+        return crag_verification_summary(verification_result, react_result)
 
     except Exception as e:
         logger.error(f"[CRAG] Verification error: {str(e)}")
@@ -443,6 +472,129 @@ def verify_react_result_with_crag(react_result, failure_data):
         }
 
 
+def crag_verification_summary(verification_result, react_result):
+    """Wrap a CRAGVerifier.verify() result with the original ReAct result"""
+    return {
+        'verified': True,
+        'verification_status': verification_result.get('status'),
+        'confidence': verification_result.get('confidence', 0.0),
+        'confidence_level': verification_result.get('confidence_level', 'UNKNOWN'),
+        'react_result': react_result,  # Original result
+        'verified_answer': verification_result.get('answer'),  # May be corrected/enhanced
+        'verification_metadata': verification_result.get('verification_metadata', {}),
+        'action_taken': verification_result.get('action_taken'),
+        'review_url': verification_result.get('review_url')  # For HITL cases
+    }
+
+
+# Background CRAG corrections (CRAG_ASYNC_CORRECTION), shared by all
+# service and worker processes: the failure IDs whose stored analysis is
+# the provisional answer of a running correction, and the published result
+# of a finished correction (for records saved later and for polling)
+CRAG_CORRECTIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS crag_corrections (
+        correction_id VARCHAR(64) PRIMARY KEY,
+        status VARCHAR(50) NOT NULL DEFAULT 'CORRECTING',
+        tier VARCHAR(50),
+        failure_ids TEXT[] NOT NULL DEFAULT '{}',
+        analysis JSONB,
+        scheduled_at TIMESTAMP DEFAULT NOW(),
+        completed_at TIMESTAMP
+    )
+"""
+_crag_corrections_table_ready = False
+
+
+def _crag_corrections_connection():
+    """PostgreSQL connection, with the crag_corrections table created"""
+    global _crag_corrections_table_ready
+    conn = psycopg2.connect(**POSTGRES_CONFIG)
+    if not _crag_corrections_table_ready:
+        with conn.cursor() as cursor:
+            cursor.execute(CRAG_CORRECTIONS_TABLE_SQL)
+        conn.commit()
+        _crag_corrections_table_ready = True
+    return conn
+
+
+def get_published_correction(correction_id):
+    """
+    Stored state of a background CRAG correction
+
+    Returns:
+        dict with status, tier, failure_ids, analysis (None while correcting)
+        and timestamps; None if unknown
+    """
+    try:
+        conn = _crag_corrections_connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM crag_corrections WHERE correction_id = %s", (correction_id,))
+                row = cursor.fetchone()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"[CRAG] Failed to read correction {str(correction_id)[:8]}: {e}")
+        return None
+
+    if row is None:
+        return None
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def publish_corrected_verification(verification_result, react_result, failure_data):
+    """
+    Publish the final result of a background CRAG correction
+
+    Runs on the CRAG correction worker. The corrected (or HITL-queued)
+    answer is formatted like a synchronous one and replaces the provisional
+    analysis in the fingerprint cache and in every failure_analysis record
+    saved with it.
+    """
+    correction_id = verification_result.get('verification_metadata', {}).get('correction_id')
+
+    verification = crag_verification_summary(verification_result, react_result)
+    analysis = format_react_result_with_gemini(verification.get('verified_answer') or react_result)
+    apply_crag_verification(analysis, verification)
+
+    signature, raw_key = failure_signature(failure_data)
+    analysis['fingerprint'] = signature.fingerprint
+    if is_cacheable_analysis(analysis):
+        get_fingerprint_cache().put(signature, analysis, raw_key=raw_key)
+
+    # Records saved from now on get this analysis (save_analysis_to_postgres
+    # locks the row); records saved before are listed in failure_ids
+    failure_ids = []
+    try:
+        conn = _crag_corrections_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO crag_corrections (correction_id, status, tier, analysis, completed_at)
+                    VALUES (%s, %s, %s, %s, NOW())
+                    ON CONFLICT (correction_id) DO UPDATE SET
+                        status = EXCLUDED.status,
+                        analysis = EXCLUDED.analysis,
+                        completed_at = EXCLUDED.completed_at
+                    RETURNING failure_ids
+                """, (correction_id, analysis.get('crag_status'),
+                      verification_result.get('verification_metadata', {}).get('correction_tier'),
+                      Json(analysis, dumps=lambda value: json.dumps(value, default=str))))
+                failure_ids = cursor.fetchone()[0]
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"[CRAG] Failed to store correction {str(correction_id)[:8]}: {e}")
+
+    if failure_ids:
+        update_analysis_in_postgres(failure_ids, analysis)
+
+    logger.info(f"[CRAG] Published correction {str(correction_id)[:8]}: {analysis.get('crag_status')} "
+                f"(confidence {analysis.get('crag_confidence', 0.0):.3f}, {len(failure_ids)} records updated)")
+    return analysis
+
+
 def format_react_result_with_gemini(react_result):
     """
     Format ReAct analysis result using Gemini for user-friendly presentation (Task 0-ARCH.10)
@@ -780,27 +932,8 @@ def analyze_failure_with_gemini(failure_data):
         react_result = analyze_with_react_agent(failure_data)
 
         if react_result is not None:
-            # Task 0-ARCH.18: Step 2: Verify with CRAG
-            verification_result = verify_react_result_with_crag(react_result, failure_data)
-
-            # Step 3: Format with Gemini (using verified result)
-            # Use verified_answer if available, otherwise use original react_result
-            result_to_format = verification_result.get('verified_answer', react_result)
-            formatted_result = format_react_result_with_gemini(result_to_format)
-
-            # Task 0-ARCH.18: Add CRAG verification metadata to response
-            formatted_result['crag_verified'] = verification_result.get('verified', False)
-            formatted_result['crag_confidence'] = verification_result.get('confidence', 0.0)
-            formatted_result['crag_confidence_level'] = verification_result.get('confidence_level', 'UNKNOWN')
-            formatted_result['crag_status'] = verification_result.get('verification_status', 'UNKNOWN')
-            formatted_result['crag_action'] = verification_result.get('action_taken', 'none')
-            formatted_result['crag_metadata'] = verification_result.get('verification_metadata', {})
-
-            # Add review URL for HITL cases
-            if verification_result.get('review_url'):
-                formatted_result['review_url'] = verification_result['review_url']
-
-            return formatted_result
+            # Steps 2-3: Verify with CRAG, format with Gemini
+            return finalize_react_result(react_result, failure_data)
         else:
             logger.warning("[Analysis] ReAct analysis failed - falling back to Gemini")
 
@@ -865,7 +998,8 @@ def analyze_failure_with_gemini(failure_data):
                 error_log=error_log,
                 error_message=error_message,
                 error_category=error_category,
-                stack_trace=stack_trace
+                stack_trace=stack_trace,
+                enrichment=current_enrichment(failure_data)
             )
 
             logger.info(f"[Task 0D.5] Context optimized: {optimized_context.total_tokens} tokens "
@@ -988,6 +1122,139 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting, no extra text."""
                 "similar_error_docs": []
             }
 
+def finalize_react_result(react_result, failure_data):
+    """
+    Verify a ReAct result with CRAG (Task 0-ARCH.18) and format it with Gemini
+    """
+    verification_result = verify_react_result_with_crag(react_result, failure_data)
+
+    # Format with Gemini (using verified result)
+    # Use verified_answer if available, otherwise use original react_result
+    result_to_format = verification_result.get('verified_answer', react_result)
+    formatted_result = format_react_result_with_gemini(result_to_format)
+    return apply_crag_verification(formatted_result, verification_result)
+
+def apply_crag_verification(formatted_result, verification_result):
+    """Task 0-ARCH.18: Add CRAG verification metadata to response"""
+    formatted_result['crag_verified'] = verification_result.get('verified', False)
+    formatted_result['crag_confidence'] = verification_result.get('confidence', 0.0)
+    formatted_result['crag_confidence_level'] = verification_result.get('confidence_level', 'UNKNOWN')
+    formatted_result['crag_status'] = verification_result.get('verification_status', 'UNKNOWN')
+    formatted_result['crag_action'] = verification_result.get('action_taken', 'none')
+    formatted_result['crag_metadata'] = verification_result.get('verification_metadata', {})
+
+    # Add review URL for HITL cases
+    if verification_result.get('review_url'):
+        formatted_result['review_url'] = verification_result['review_url']
+
+    # Provisional answer - the final result replaces it when the background
+    # correction finishes (publish_corrected_verification)
+    correction_id = formatted_result['crag_metadata'].get('correction_id')
+    if formatted_result['crag_status'] == 'CORRECTING' and correction_id:
+        formatted_result['crag_correction_id'] = correction_id
+
+    return formatted_result
+
+def failure_signature(failure_data):
+    """
+    Failure signature and exact-text key of a failure
+
+    The signature stored by ingestion-time enrichment is used when current.
+
+    Returns:
+        (FailureSignature, raw_key)
+    """
+    error_message = failure_data.get('error_message', '')
+    error_log = failure_data.get('error_log', '')
+    stack_trace = failure_data.get('stack_trace', '')
+
+    raw_key = raw_failure_key(error_message, error_log, stack_trace)
+    enrichment = current_enrichment(failure_data, raw_key=raw_key)
+    if enrichment is not None:
+        return signature_from_enrichment(enrichment), raw_key
+    return compute_fingerprint(error_message, error_log, stack_trace), raw_key
+
+def analyze_failure_deduplicated(failure_data):
+    """
+    Analyze a failure, reusing a recent analysis of the same failure signature
+
+    Failures that differ only in timestamps, paths, ids or ports share a
+    fingerprint; the first one is analyzed and the rest reuse its result.
+    Failed AI analyses and results whose CRAG verification errored are not
+    cached (is_cacheable_analysis).
+    """
+    signature, raw_key = failure_signature(failure_data)
+    fingerprint_cache = get_fingerprint_cache()
+
+    cached = fingerprint_cache.get(signature, raw_key=raw_key)
+    if cached is not None:
+        logger.info(f"[Fingerprint] Reusing analysis for signature {signature.fingerprint[:12]} "
+                    f"({cached['fingerprint_match']['match']} match)")
+        cached['fingerprint'] = signature.fingerprint
+        return cached
+
+    analysis = analyze_failure_with_gemini(failure_data)
+    analysis['fingerprint'] = signature.fingerprint
+
+    if is_cacheable_analysis(analysis):
+        fingerprint_cache.put(signature, analysis, raw_key=raw_key)
+
+    return analysis
+
+def analyze_failures_batch(failures):
+    """
+    Analyze many failures (e.g. one build), sharing work between them
+
+    Failures with a recent analysis of their signature reuse it. The rest go
+    through ReActAgent.analyze_many(); each distinct signature is verified
+    and formatted once and fanned out, unless it is not cacheable
+    (is_cacheable_analysis). Failures the batch could not analyze
+    fall back to analyze_failure_deduplicated().
+
+    Returns:
+        Analysis per failure, in input order
+    """
+    fingerprint_cache = get_fingerprint_cache()
+    analyses = [None] * len(failures)
+    signatures = {}
+    pending = []
+
+    for index, failure in enumerate(failures):
+        signature, raw_key = failure_signature(failure)
+        signatures[index] = (signature, raw_key)
+
+        cached = fingerprint_cache.get(signature, raw_key=raw_key)
+        if cached is not None:
+            cached['fingerprint'] = signature.fingerprint
+            analyses[index] = cached
+        else:
+            pending.append(index)
+
+    logger.info(f"[Batch] {len(failures)} failures: {len(failures) - len(pending)} reused, {len(pending)} to analyze")
+
+    react_results = analyze_batch_with_react_agent([failures[i] for i in pending]) if pending else []
+
+    finalized = {}
+    for index, react_result in zip(pending, react_results):
+        signature, raw_key = signatures[index]
+
+        if react_result is None:
+            analysis = analyze_failure_deduplicated(failures[index])
+        elif signature.fingerprint in finalized:
+            analysis = copy.deepcopy(finalized[signature.fingerprint])
+        else:
+            analysis = finalize_react_result(react_result, failures[index])
+            analysis['fingerprint'] = signature.fingerprint
+            # Failed or unverified results are finalized again for each duplicate
+            if is_cacheable_analysis(analysis):
+                fingerprint_cache.put(signature, analysis, raw_key=raw_key)
+                finalized[signature.fingerprint] = analysis
+
+        analysis['fingerprint'] = signature.fingerprint
+        analyses[index] = analysis
+
+    return analyses
+
 # ============================================================================
 # VECTOR EMBEDDINGS
 # ============================================================================
@@ -1116,7 +1383,47 @@ def save_analysis_to_postgres(failure_id, analysis, similar_failures):
     """
     Save AI analysis to PostgreSQL
     Task 0E.6: Now includes GitHub source code files (for CODE_ERROR)
+
+    A provisional analysis (CRAG status CORRECTING) is saved as the
+    corrected one if its background correction already finished, otherwise
+    the record is updated when it does.
     """
+    correction_id = analysis.get('crag_correction_id')
+    if not correction_id:
+        return _insert_analysis(failure_id, analysis, similar_failures)
+
+    # The crag_corrections row stays locked until the record is saved and
+    # subscribed, so a publish in another process waits and then updates it
+    analysis_id = None
+    try:
+        conn = _crag_corrections_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO crag_corrections (correction_id, tier) VALUES (%s, %s)
+                    ON CONFLICT (correction_id) DO NOTHING
+                """, (correction_id, analysis.get('crag_metadata', {}).get('correction_tier')))
+                cursor.execute("SELECT analysis FROM crag_corrections WHERE correction_id = %s FOR UPDATE",
+                               (correction_id,))
+                corrected = cursor.fetchone()[0]
+                if corrected is not None:
+                    analysis_id = _insert_analysis(failure_id, corrected, similar_failures)
+                else:
+                    analysis_id = _insert_analysis(failure_id, analysis, similar_failures)
+                    cursor.execute("""
+                        UPDATE crag_corrections SET failure_ids = array_append(failure_ids, %s)
+                        WHERE correction_id = %s
+                    """, (str(failure_id), correction_id))
+            conn.commit()
+        finally:
+            conn.close()
+        return analysis_id
+
+    except Exception as e:
+        logger.error(f"[CRAG] Failed to subscribe {failure_id} to correction {str(correction_id)[:8]}: {e}")
+        return analysis_id if analysis_id is not None else _insert_analysis(failure_id, analysis, similar_failures)
+
+def _insert_analysis(failure_id, analysis, similar_failures):
     try:
         conn = psycopg2.connect(**POSTGRES_CONFIG)
         cursor = conn.cursor()
@@ -1176,6 +1483,49 @@ def save_analysis_to_postgres(failure_id, analysis, similar_failures):
         logger.error(f"PostgreSQL save error: {str(e)}")
         return None
 
+def update_analysis_in_postgres(failure_ids, analysis):
+    """
+    Replace the stored analysis of failures with a newer one (background
+    CRAG correction results)
+
+    Returns:
+        Number of records updated
+    """
+    try:
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+        UPDATE failure_analysis
+        SET classification = %s,
+            root_cause = %s,
+            severity = %s,
+            recommendation = %s,
+            confidence_score = %s,
+            analyzed_at = %s
+        WHERE mongodb_failure_id = ANY(%s)
+        """, (
+            analysis.get('classification', 'UNKNOWN'),
+            analysis.get('root_cause', '')[:500],  # Limit size
+            analysis.get('severity', 'MEDIUM'),
+            analysis.get('solution', '')[:1000],  # Limit size
+            float(analysis.get('confidence', 0.7)),
+            datetime.utcnow(),
+            [str(failure_id) for failure_id in failure_ids]
+        ))
+
+        updated = cursor.rowcount
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        logger.info(f"Updated {updated} analyses in PostgreSQL")
+        return updated
+
+    except Exception as e:
+        logger.error(f"PostgreSQL update error: {str(e)}")
+        return 0
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -1271,6 +1621,13 @@ def health_check():
             'error': str(e)[:200]
         }
 
+    # Fingerprint cache (fuzzy analysis reuse)
+    health_status['components']['fingerprint_cache'] = get_fingerprint_cache().get_stats()
+
+    # ReAct reasoning budgets (early stops, iterations saved, latency per category)
+    if react_agent is not None:
+        health_status['components']['reasoning_budget'] = react_agent.get_reasoning_stats()
+
     # RAG availability
     health_status['rag_enabled'] = bool(gemini_model and OPENAI_API_KEY and PINECONE_API_KEY)
     health_status['gemini_available'] = gemini_model is not None
@@ -1322,6 +1679,27 @@ def get_crag_metrics():
             'message': str(e)
         }), 500
 
+@app.route('/api/crag/metrics/prometheus', methods=['GET'])
+def get_crag_metrics_prometheus():
+    """
+    Get CRAG verification metrics in the Prometheus text exposition format
+
+    Scrape target for Prometheus: counters per confidence level, routing
+    decision and fallback outcome, plus confidence and component score
+    histograms.
+    """
+    try:
+        if not CRAG_AVAILABLE:
+            return Response('# CRAG verification not available\n', status=503,
+                            mimetype='text/plain; version=0.0.4')
+
+        from verification.crag_metrics import get_metrics
+        return Response(get_metrics().export_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    except Exception as e:
+        logger.error(f"Failed to export CRAG metrics: {e}")
+        return Response(f'# Failed to export metrics: {e}\n', status=500, mimetype='text/plain')
+
 @app.route('/api/crag/health', methods=['GET'])
 def get_crag_health():
     """
@@ -1356,13 +1734,40 @@ def get_crag_health():
             'message': str(e)
         }), 500
 
+@app.route('/api/crag/corrections/<correction_id>', methods=['GET'])
+def get_crag_correction(correction_id):
+    """
+    Get the state of a background CRAG correction (CRAG_ASYNC_CORRECTION)
+
+    Analyses returned with crag_status CORRECTING carry crag_correction_id;
+    poll this until status is no longer CORRECTING. 'analysis' is the
+    published final analysis.
+    """
+    if crag_verifier is None:
+        return jsonify({'error': 'CRAG verification not available'}), 503
+
+    # The correction runs in the process that scheduled it; its published
+    # result is stored for all processes
+    correction = crag_verifier.get_correction(correction_id)
+    published = get_published_correction(correction_id)
+    if correction is None and published is None:
+        return jsonify({'error': 'Correction not found'}), 404
+
+    if correction is None:
+        correction = {key: published[key] for key in ('correction_id', 'status', 'tier', 'scheduled_at',
+                                                      'completed_at')}
+    correction['analysis'] = published['analysis'] if published else None
+
+    return jsonify(correction)
+
 @app.route('/api/crag/metrics/reset', methods=['POST'])
 def reset_crag_metrics():
     """
     Reset CRAG metrics (Task 0-ARCH.19)
 
-    Resets all collected metrics to zero. Useful for testing or
-    starting fresh metric collection periods.
+    Resets all collected metrics to zero (in every process when a shared
+    CRAG_METRICS_BACKEND is configured). Useful for testing or starting
+    fresh metric collection periods.
 
     Requires admin access or specific authorization.
     """
@@ -1410,12 +1815,17 @@ def analyze_failure():
 
         logger.info(f"Analyzing failure: {failure_id}")
 
+        # Failures stored without enrichment (Jenkins reporter, n8n) are
+        # enriched once here; re-analyses reuse it
+        ensure_enrichment(failures_collection, failure)
+
         # Step 1: Search for similar failures
         error_message = failure.get('error_message', '')
         similar_failures = search_similar_failures(error_message)
 
-        # Step 2: AI Analysis with Gemini (NO FALLBACK)
-        analysis = analyze_failure_with_gemini(failure)
+        # Step 2: AI Analysis with Gemini (NO FALLBACK), reusing analyses of
+        # the same failure signature
+        analysis = analyze_failure_deduplicated(failure)
 
         # Step 3: Save to PostgreSQL
         analysis_id = save_analysis_to_postgres(failure_id, analysis, similar_failures)
@@ -1467,16 +1877,20 @@ def analyze_batch():
             '_id': {'$nin': [failure_id for failure_id in analyzed_ids]}
         }).limit(limit)
 
+        # Analyze the whole batch at once (shared classification/retrieval)
+        failures = list(unanalyzed)
+        for failure in failures:
+            ensure_enrichment(failures_collection, failure)
+        analyses = analyze_failures_batch(failures)
+
         results = []
-        for failure in unanalyzed:
+        for failure, analysis in zip(failures, analyses):
             failure_id = str(failure['_id'])
 
-            logger.info(f"Analyzing failure: {failure_id}")
+            logger.info(f"Storing analysis for failure: {failure_id}")
 
-            # Analyze with Gemini (NO FALLBACK)
             error_message = failure.get('error_message', '')
             similar_failures = search_similar_failures(error_message)
-            analysis = analyze_failure_with_gemini(failure)
             analysis_id = save_analysis_to_postgres(failure_id, analysis, similar_failures)
 
             # Store in Pinecone
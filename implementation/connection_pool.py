@@ -0,0 +1,194 @@
+"""
+Shared Database Connection Pools
+
+Process-wide PostgreSQL and MongoDB connection pools so that services
+handling concurrent requests (Flask threads, Celery workers) do not share a
+single psycopg2 connection or open a new MongoClient per component.
+
+- PostgreSQL: psycopg2 ThreadedConnectionPool, borrowed with the
+  `postgres_connection()` context manager (commit on success, rollback on
+  error, broken connections discarded). When all connections are in use,
+  borrowers wait up to POSTGRES_POOL_TIMEOUT seconds for one.
+- MongoDB: one MongoClient per URI (MongoClient is thread-safe and pools
+  sockets internally; pool size from MONGODB_MAX_POOL_SIZE)
+
+Usage:
+    pool = get_postgres_pool()
+    with postgres_connection(pool) as conn:
+        cursor = conn.cursor()
+        ...
+
+    client = get_mongo_client(os.getenv("MONGODB_URI"))
+
+File: implementation/connection_pool.py
+"""
+
+import os
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds postgres_connection() waits for a free connection
+POSTGRES_POOL_TIMEOUT = float(os.getenv("POSTGRES_POOL_TIMEOUT", 30))
+
+_postgres_pool = None
+_postgres_pool_lock = threading.Lock()
+
+# Free-connection semaphore per pool, sized to its maxconn
+_pool_slots = weakref.WeakKeyDictionary()
+_pool_slots_lock = threading.Lock()
+
+_mongo_clients: Dict[str, object] = {}
+_mongo_clients_lock = threading.Lock()
+
+
+def _postgres_config() -> Dict:
+    """PostgreSQL connection settings from environment"""
+    return {
+        "host": os.getenv("POSTGRES_HOST", "localhost"),
+        "port": os.getenv("POSTGRES_PORT", "5432"),
+        "database": os.getenv("POSTGRES_DATABASE", "ddn_ai"),
+        "user": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD")
+    }
+
+
+def get_postgres_pool():
+    """
+    Get (or create) the process-wide PostgreSQL connection pool.
+
+    Pool bounds come from POSTGRES_POOL_MIN (default 1) and
+    POSTGRES_POOL_MAX (default 10).
+
+    Returns:
+        psycopg2.pool.ThreadedConnectionPool, or None if PostgreSQL is unavailable
+    """
+    global _postgres_pool
+
+    if _postgres_pool is None:
+        with _postgres_pool_lock:
+            if _postgres_pool is None:
+                try:
+                    from psycopg2.pool import ThreadedConnectionPool
+
+                    _postgres_pool = ThreadedConnectionPool(
+                        int(os.getenv("POSTGRES_POOL_MIN", 1)),
+                        int(os.getenv("POSTGRES_POOL_MAX", 10)),
+                        **_postgres_config()
+                    )
+                    logger.info("✅ PostgreSQL connection pool initialized")
+                except Exception as e:
+                    logger.warning(f"PostgreSQL connection pool failed: {e}")
+                    return None
+
+    return _postgres_pool
+
+
+def _slots(pool) -> Optional[threading.BoundedSemaphore]:
+    """Semaphore counting the pool's free connections (None if it has no maxconn)"""
+    maxconn = getattr(pool, "maxconn", None)
+    if not isinstance(maxconn, int):
+        return None
+    with _pool_slots_lock:
+        slots = _pool_slots.get(pool)
+        if slots is None:
+            slots = _pool_slots[pool] = threading.BoundedSemaphore(maxconn)
+        return slots
+
+
+@contextmanager
+def postgres_connection(pool=None, timeout: Optional[float] = None):
+    """
+    Borrow a connection from the pool for the duration of a block.
+
+    Commits on normal exit and rolls back on error. Connections that were
+    closed underneath us are discarded instead of returned to the pool.
+    psycopg2 pools raise PoolError at once when all connections are in
+    use; this waits for one to be returned instead.
+
+    Args:
+        pool: Pool to borrow from (default: process-wide pool)
+        timeout: Seconds to wait for a free connection (default: POSTGRES_POOL_TIMEOUT)
+
+    Raises:
+        RuntimeError: If no pool is available
+        psycopg2.pool.PoolError: If no connection was free within the timeout
+    """
+    pool = pool or get_postgres_pool()
+    if pool is None:
+        raise RuntimeError("PostgreSQL connection pool not available")
+
+    slots = _slots(pool)
+    if slots is not None and not slots.acquire(blocking=False):
+        timeout = POSTGRES_POOL_TIMEOUT if timeout is None else timeout
+        logger.info(f"PostgreSQL connection pool exhausted ({pool.maxconn} in use) - waiting up to {timeout}s")
+        if not slots.acquire(timeout=timeout):
+            logger.warning(f"PostgreSQL connection pool exhausted: no connection free after {timeout}s")
+            from psycopg2.pool import PoolError
+            raise PoolError(f"connection pool exhausted (waited {timeout}s)")
+
+    try:
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            pool.putconn(conn, close=bool(getattr(conn, "closed", False)))
+    finally:
+        if slots is not None:
+            slots.release()
+
+
+def get_mongo_client(uri: Optional[str] = None):
+    """
+    Get (or create) the shared MongoClient for a URI.
+
+    Args:
+        uri: MongoDB connection URI (default: MONGODB_URI)
+
+    Returns:
+        pymongo.MongoClient, or None if no URI is configured
+    """
+    uri = uri or os.getenv("MONGODB_URI")
+    if not uri:
+        return None
+
+    client = _mongo_clients.get(uri)
+    if client is None:
+        with _mongo_clients_lock:
+            client = _mongo_clients.get(uri)
+            if client is None:
+                from pymongo import MongoClient
+
+                client = MongoClient(
+                    uri,
+                    maxPoolSize=int(os.getenv("MONGODB_MAX_POOL_SIZE", 50))
+                )
+                _mongo_clients[uri] = client
+
+    return client
+
+
+def close_all():
+    """Close all shared pools (process shutdown)"""
+    global _postgres_pool
+
+    with _postgres_pool_lock:
+        if _postgres_pool is not None:
+            _postgres_pool.closeall()
+            _postgres_pool = None
+
+    with _mongo_clients_lock:
+        for client in _mongo_clients.values():
+            client.close()
+        _mongo_clients.clear()
@@ -409,6 +409,21 @@ class ContextEngineer:
         tokens = self.estimate_tokens(optimized)
         return optimized, tokens
 
+    def _fit_to_budget(self, text: str, budget: int, tokens: Optional[int] = None) -> Tuple[str, bool, int]:
+        """
+        truncate_to_budget() that also returns the token count
+
+        Args:
+            tokens: Known token count of text (skips estimating it again)
+
+        Returns:
+            Tuple of (text, was_truncated, token_count)
+        """
+        if tokens is not None and tokens <= budget:
+            return (text or ""), False, tokens
+        fitted, truncated = self.truncate_to_budget(text, budget)
+        return fitted, truncated, self.estimate_tokens(fitted)
+
     # ========================================================================
     # METADATA ENRICHMENT
     # ========================================================================
@@ -494,7 +509,8 @@ class ContextEngineer:
         error_category: str,
         stack_trace: Optional[str] = None,
         similar_errors: Optional[List[Dict]] = None,
-        github_code: Optional[str] = None
+        github_code: Optional[str] = None,
+        enrichment: Optional[Dict] = None
     ) -> OptimizedContext:
         """
         Main function to optimize entire context for AI analysis
@@ -506,52 +522,74 @@ class ContextEngineer:
             stack_trace: Stack trace (optional)
             similar_errors: Similar errors from RAG (optional)
             github_code: GitHub code context (optional)
+            enrichment: Current ingestion-time enrichment of the failure
+                (failure_enrichment); its entities, optimized error log and
+                token counts are used instead of being recomputed
 
         Returns:
             OptimizedContext object with all optimizations applied
         """
         logger.info(f"Optimizing context for category: {error_category}")
 
+        if enrichment and enrichment.get('error_log_budget') != self.budget.error_log:
+            enrichment = None  # Optimized for another budget
+        token_counts = enrichment['token_counts'] if enrichment else {}
+
         context = OptimizedContext(
             error_message=error_message,
             error_category=error_category
         )
 
         # 1. Extract entities from all sources
-        all_text = f"{error_message}\n{error_log or ''}\n{stack_trace or ''}"
-        entities = self.extract_entities(all_text)
-        context.entities = self.extract_critical_entities(entities)
+        if enrichment:
+            context.entities = [
+                ExtractedEntity(entity_type=e['type'], value=e['value'],
+                                confidence=e.get('confidence', 1.0), context=e.get('context'))
+                for e in enrichment['entities']
+            ]
+        else:
+            all_text = f"{error_message}\n{error_log or ''}\n{stack_trace or ''}"
+            entities = self.extract_entities(all_text)
+            context.entities = self.extract_critical_entities(entities)
 
         # 2. Optimize each component to fit token budget
         token_breakdown = {}
 
         # Error message (always keep, but truncate if needed)
-        error_msg_optimized, truncated = self.truncate_to_budget(
+        error_msg_optimized, truncated, tokens = self._fit_to_budget(
             error_message,
-            self.budget.error_message
+            self.budget.error_message,
+            token_counts.get('error_message')
         )
         context.error_message = error_msg_optimized
-        token_breakdown['error_message'] = self.estimate_tokens(error_msg_optimized)
+        token_breakdown['error_message'] = tokens
         if truncated:
             context.truncated_sections.append('error_message')
 
         # Stack trace
         if stack_trace:
-            stack_optimized, truncated = self.truncate_to_budget(
+            stack_optimized, truncated, tokens = self._fit_to_budget(
                 stack_trace,
-                self.budget.stack_trace
+                self.budget.stack_trace,
+                token_counts.get('stack_trace')
             )
             context.stack_trace = stack_optimized
-            token_breakdown['stack_trace'] = self.estimate_tokens(stack_optimized)
+            token_breakdown['stack_trace'] = tokens
             if truncated:
                 context.truncated_sections.append('stack_trace')
 
         # Error log (most aggressive optimization)
         if error_log:
-            log_optimized, tokens = self.optimize_error_log(error_log)
+            if enrichment:
+                log_optimized = enrichment['optimized_error_log']
+                tokens = token_counts['optimized_error_log']
+                log_tokens = token_counts['error_log']
+            else:
+                log_optimized, tokens = self.optimize_error_log(error_log)
+                log_tokens = self.estimate_tokens(error_log)
             context.error_log = log_optimized
             token_breakdown['error_log'] = tokens
-            if self.estimate_tokens(error_log) != tokens:
+            if log_tokens != tokens:
                 context.truncated_sections.append('error_log')
 
         # Similar errors (if provided)
@@ -0,0 +1,285 @@
+"""
+Ingestion-Time Failure Enrichment
+
+Entity extraction, error-log optimization, referenced-file detection and
+fingerprinting run their regexes over the full failure text, and an
+analysis, a re-analysis and every refinement of the same failure used to
+repeat them. They depend only on the failure text, so they are computed
+once when the failure is stored and saved on the failure document:
+
+    enrichment: {
+        version, raw_key,            # what the values were computed from
+        entities, entity_counts,     # critical entities, count of all entities per type
+        referenced_files,            # files named in message / stack trace / log head
+        signature,                   # failure signature and fingerprint
+        optimized_error_log,         # ContextEngineer.optimize_error_log() output
+        error_log_budget,            # token budget it was optimized for
+        token_counts,                # estimated tokens per field
+        enriched_at
+    }
+
+The analysis path uses the stored values when the enrichment is current:
+same ENRICHMENT_VERSION and the raw_key still matches the document text.
+
+Enriched by:
+- mongodb_robot_listener FailureWriter, after PII redaction, before insert
+- ai_analysis_service, for failures stored without enrichment (Jenkins
+  reporter, n8n), the first time they are analyzed
+- Backfill of stored failures:
+    python failure_enrichment.py [--limit N] [--batch-size 500] [--all]
+
+File: implementation/failure_enrichment.py
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from context_engineering import ContextEngineer, ExtractedEntity
+from failure_fingerprint import FailureSignature, compute_fingerprint, raw_failure_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when an enrichment field or its computation changes; older
+# enrichments are then recomputed instead of used
+ENRICHMENT_VERSION = 1
+
+# Log prefix searched for referenced files (the start of the log names the
+# failing files; further down are mostly repeats)
+REFERENCED_FILES_LOG_CHARS = 1000
+
+_PYTHON_FILE_PATTERN = re.compile(r'File "([^"]+\.py)"')
+_JAVA_FILE_PATTERN = re.compile(r'at ([A-Za-z0-9_/.]+\.java):\d+')
+_CPP_FILE_PATTERN = re.compile(r'([A-Za-z0-9_/.]+\.(?:cpp|h|hpp)):\d+')
+_GENERIC_FILE_PATTERN = re.compile(r'([A-Za-z0-9_/.-]+\.(?:js|ts|go|rb|php|cs))[:(\s]')
+_IMPORT_PATTERN = re.compile(r'(?:import|from)\s+([A-Za-z0-9_.]+)')
+
+_engineer = None
+_engineer_lock = threading.Lock()
+
+
+def get_context_engineer() -> ContextEngineer:
+    """Shared ContextEngineer with the default token budget"""
+    global _engineer
+    if _engineer is None:
+        with _engineer_lock:
+            if _engineer is None:
+                _engineer = ContextEngineer()
+    return _engineer
+
+
+def detect_referenced_files(error_message: str, stack_trace: Optional[str], error_log: Optional[str]) -> List[str]:
+    """
+    Files referenced by a failure (stack frames, file:line mentions, imports)
+
+    Searches the error message, the stack trace and the first
+    REFERENCED_FILES_LOG_CHARS of the error log.
+
+    Returns:
+        Distinct file paths: Python frames, Java, C/C++, other sources, imports
+    """
+    text = f"{error_message or ''}\n{stack_trace or ''}\n{(error_log or '')[:REFERENCED_FILES_LOG_CHARS]}"
+
+    files = _PYTHON_FILE_PATTERN.findall(text)
+    files += _JAVA_FILE_PATTERN.findall(text)
+    files += _CPP_FILE_PATTERN.findall(text)
+    files += _GENERIC_FILE_PATTERN.findall(text)
+    files += [name.replace('.', '/') + '.py' for name in _IMPORT_PATTERN.findall(text) if '.' in name]
+
+    return list(dict.fromkeys(f for f in files if f and len(f) > 2))
+
+
+def serialize_entities(entities: List[ExtractedEntity]) -> List[Dict]:
+    """Entities in the OptimizedContext.to_dict() format"""
+    return [{'type': e.entity_type, 'value': e.value, 'confidence': e.confidence, 'context': e.context}
+            for e in entities]
+
+
+def deserialize_entities(entities: List[Dict]) -> List[ExtractedEntity]:
+    return [ExtractedEntity(entity_type=e['type'], value=e['value'], confidence=e.get('confidence', 1.0),
+                            context=e.get('context'))
+            for e in entities]
+
+
+def signature_from_enrichment(enrichment: Dict) -> FailureSignature:
+    """The stored FailureSignature"""
+    signature = enrichment['signature']
+    return FailureSignature(exception_type=signature['exception_type'], message=signature['message'],
+                            frames=list(signature['frames']))
+
+
+def _raw_key(failure: Dict) -> str:
+    return raw_failure_key(failure.get('error_message') or '', failure.get('error_log') or '',
+                           failure.get('stack_trace') or '')
+
+
+def enrich_failure(failure: Dict, engineer: Optional[ContextEngineer] = None) -> Dict:
+    """
+    Compute the enrichment of a failure document
+
+    Uses the fields the way the analysis reads them: the error log falls
+    back to the error message when the document has none.
+
+    Args:
+        failure: Failure document (error_message, error_log, stack_trace)
+        engineer: ContextEngineer (default: shared instance)
+
+    Returns:
+        Enrichment dict (store as failure['enrichment'])
+    """
+    engineer = engineer or get_context_engineer()
+    error_message = failure.get('error_message') or ''
+    stack_trace = failure.get('stack_trace') or ''
+    error_log = failure.get('error_log', error_message) or ''
+
+    entities = engineer.extract_entities(f"{error_message}\n{error_log}\n{stack_trace}")
+    entity_counts = {}
+    for entity in entities:
+        entity_counts[entity.entity_type] = entity_counts.get(entity.entity_type, 0) + 1
+
+    optimized_log, optimized_tokens = engineer.optimize_error_log(error_log)
+    signature = compute_fingerprint(error_message, failure.get('error_log') or '', stack_trace)
+
+    return {
+        'version': ENRICHMENT_VERSION,
+        'raw_key': _raw_key(failure),
+        'entities': serialize_entities(engineer.extract_critical_entities(entities)),
+        'entity_counts': entity_counts,
+        'referenced_files': detect_referenced_files(error_message, stack_trace, error_log),
+        'signature': signature.to_dict(),
+        'optimized_error_log': optimized_log,
+        'error_log_budget': engineer.budget.error_log,
+        'token_counts': {
+            'error_message': engineer.estimate_tokens(error_message),
+            'stack_trace': engineer.estimate_tokens(stack_trace),
+            'error_log': engineer.estimate_tokens(error_log),
+            'optimized_error_log': optimized_tokens
+        },
+        'enriched_at': datetime.utcnow()
+    }
+
+
+def current_enrichment(failure: Dict, raw_key: Optional[str] = None) -> Optional[Dict]:
+    """
+    The stored enrichment if it is current for the failure text
+
+    Args:
+        failure: Failure document
+        raw_key: raw_failure_key() of the failure, if already computed
+
+    Returns:
+        failure['enrichment'], or None when missing, of an older version or
+        computed from different text (e.g. before the document was edited)
+    """
+    enrichment = failure.get('enrichment')
+    if not enrichment or enrichment.get('version') != ENRICHMENT_VERSION:
+        return None
+    if enrichment.get('raw_key') != (raw_key or _raw_key(failure)):
+        return None
+    return enrichment
+
+
+def ensure_enrichment(collection, failure: Dict, engineer: Optional[ContextEngineer] = None) -> Dict:
+    """
+    Current enrichment of a stored failure, computing and saving it if needed
+
+    The enrichment is also set on the failure dict. Saving is best effort:
+    the analysis goes on when the update fails.
+
+    Args:
+        collection: test_failures collection (None = do not save)
+        failure: Failure document with _id
+        engineer: ContextEngineer (default: shared instance)
+    """
+    enrichment = current_enrichment(failure)
+    if enrichment is not None:
+        return enrichment
+
+    enrichment = enrich_failure(failure, engineer)
+    failure['enrichment'] = enrichment
+    if collection is not None and failure.get('_id') is not None:
+        try:
+            collection.update_one({'_id': failure['_id']}, {'$set': {'enrichment': enrichment}})
+        except Exception as e:
+            logger.warning(f"[Enrichment] Could not save enrichment of {failure['_id']}: {e}")
+    return enrichment
+
+
+def backfill(collection, limit: Optional[int] = None, batch_size: int = 500, everything: bool = False,
+             engineer: Optional[ContextEngineer] = None) -> int:
+    """
+    Enrich stored failures without an enrichment of the current version
+
+    Failures are read in _id order, batch_size at a time, and updated with
+    one bulk write per batch.
+
+    Args:
+        collection: test_failures collection
+        limit: Most failures to enrich (None = all)
+        batch_size: Failures per read and bulk write
+        everything: Recompute enrichments of the current version too
+
+    Returns:
+        Number of failures enriched
+    """
+    from pymongo import UpdateOne
+
+    query = {} if everything else {'enrichment.version': {'$ne': ENRICHMENT_VERSION}}
+    projection = {'error_message': 1, 'error_log': 1, 'stack_trace': 1}
+    enriched = 0
+    last_id = None
+
+    while limit is None or enriched < limit:
+        page = dict(query, _id={'$gt': last_id}) if last_id is not None else query
+        size = batch_size if limit is None else min(batch_size, limit - enriched)
+        failures = list(collection.find(page, projection).sort('_id', 1).limit(size))
+        if not failures:
+            break
+        last_id = failures[-1]['_id']
+
+        collection.bulk_write([UpdateOne({'_id': failure['_id']},
+                                         {'$set': {'enrichment': enrich_failure(failure, engineer)}})
+                               for failure in failures], ordered=False)
+        enriched += len(failures)
+        logger.info(f"[Enrichment] Enriched {enriched} failures")
+
+    return enriched
+
+
+def main(argv=None):
+    """Backfill enrichments of stored failures"""
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Enrich stored test failures")
+    parser.add_argument('--limit', type=int, help="Most failures to enrich")
+    parser.add_argument('--batch-size', type=int, default=500, help="Failures per bulk write")
+    parser.add_argument('--all', action='store_true', help="Recompute current enrichments too")
+    args = parser.parse_args(argv)
+
+    mongodb_uri = os.getenv('MONGODB_URI')
+    if not mongodb_uri:
+        print("MONGODB_URI not configured")
+        return 1
+
+    client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=int(os.getenv('MONGODB_TIMEOUT_MS', 5000)))
+    try:
+        collection = client[os.getenv('MONGODB_DB', 'ddn_tests')]['test_failures']
+        enriched = backfill(collection, limit=args.limit, batch_size=args.batch_size, everything=args.all)
+    finally:
+        client.close()
+
+    print(f"Enriched {enriched} failure(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
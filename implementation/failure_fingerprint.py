@@ -0,0 +1,478 @@
+"""
+Failure-Signature Fingerprinting and Fuzzy Analysis Cache
+
+Two failures that differ only in timestamps, temp paths, PIDs, ports or
+object addresses are the same failure for analysis purposes. This module
+reduces a failure to a stable signature and uses its fingerprint as a
+second-level cache and dedup key behind the exact-text caches.
+
+Signature:
+- Exception type (e.g. TimeoutError, java.lang.NullPointerException)
+- Normalized message: timestamps, UUIDs, hex ids/addresses, paths and
+  numbers masked, whitespace collapsed
+- Top stack frames (file basename + function), nearest the raise first
+
+Cache:
+- Redis-backed (shared across processes) or in-process LRU
+- Metrics: exact hits (same raw text), fuzzy hits (same signature, different
+  raw text), misses, collisions (fingerprint match, signature mismatch)
+- In-flight dedup: acquire()/wait_for() so concurrent workers analyze a
+  signature once
+
+Usage:
+    signature = compute_fingerprint(error_message, error_log, stack_trace)
+    cache = get_fingerprint_cache()
+    result = cache.get(signature, raw_key=exact_cache_key)
+    if result is None:
+        result = analyze(...)
+        cache.put(signature, result, raw_key=exact_cache_key)
+
+File: implementation/failure_fingerprint.py
+Created: 2026-10-19
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Order matters: broad structures first, bare numbers last
+_TIMESTAMP_PATTERNS = [
+    re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'),
+    re.compile(r'\b\d{1,2}/\d{1,2}/\d{2,4}[ ,]+\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AP]M)?', re.IGNORECASE),
+    re.compile(r'\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun),? \w{3} \d{1,2} \d{2}:\d{2}:\d{2}(?: \d{4})?'),
+    re.compile(r'\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b'),
+]
+_UUID_PATTERN = re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b')
+_HEX_ADDRESS_PATTERN = re.compile(r'\b0x[0-9a-fA-F]+\b')
+_HEX_ID_PATTERN = re.compile(r'\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b')
+_PATH_PATTERN = re.compile(r'(?:[A-Za-z]:\\|\\\\|/)(?:[^\s\\/:"\'<>|,;()]+[\\/])+([^\s\\/:"\'<>|,;()]*)')
+_NUMBER_PATTERN = re.compile(r'\d+')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+_EXCEPTION_PATTERN = re.compile(
+    r'\b((?:[a-zA-Z_][\w$]*\.)*[A-Z][\w$]*(?:Error|Exception|Failure|Fault|Timeout|Exit|Interrupt))\b'
+)
+_PYTHON_FRAME_PATTERN = re.compile(r'File "([^"]+)", line \d+, in ([\w<>.]+)')
+_JAVA_FRAME_PATTERN = re.compile(r'^\s*at ([\w$.<>]+)\(', re.MULTILINE)
+_PATH_SEPARATOR_PATTERN = re.compile(r'[\\/]')
+
+DEFAULT_TOP_FRAMES = 3
+
+
+def normalize_failure_text(text: str, max_length: int = 500) -> str:
+    """
+    Mask volatile tokens in failure text.
+
+    Timestamps, UUIDs, hex addresses/ids, paths (basename kept) and numbers
+    are replaced with placeholders; whitespace is collapsed and text lowered.
+
+    Args:
+        text: Error message or log excerpt
+        max_length: Characters of input considered
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+
+    normalized = text[:max_length]
+    for pattern in _TIMESTAMP_PATTERNS:
+        normalized = pattern.sub('<ts>', normalized)
+    normalized = _UUID_PATTERN.sub('<uuid>', normalized)
+    normalized = _HEX_ADDRESS_PATTERN.sub('<hex>', normalized)
+    normalized = _HEX_ID_PATTERN.sub('<hex>', normalized)
+    normalized = _PATH_PATTERN.sub(lambda m: '<path>/' + m.group(1), normalized)
+    normalized = _NUMBER_PATTERN.sub('<n>', normalized)
+    normalized = _WHITESPACE_PATTERN.sub(' ', normalized).strip().lower()
+    return normalized
+
+
+def extract_exception_type(*texts: str) -> str:
+    """First exception-like type name found in the given texts"""
+    for text in texts:
+        if text:
+            match = _EXCEPTION_PATTERN.search(text)
+            if match:
+                return match.group(1)
+    return ""
+
+
+def extract_top_frames(stack_trace: str, count: int = DEFAULT_TOP_FRAMES) -> List[str]:
+    """
+    Frames nearest the raise point.
+
+    Python tracebacks list the raising frame last, Java traces first.
+
+    Returns:
+        List like ["client.py:connect", ...] or ["com.ddn.Client.connect", ...]
+    """
+    if not stack_trace:
+        return []
+
+    python_frames = _PYTHON_FRAME_PATTERN.findall(stack_trace)
+    if python_frames:
+        frames = [f"{_PATH_SEPARATOR_PATTERN.split(path)[-1]}:{func}" for path, func in python_frames]
+        return list(reversed(frames))[:count]
+
+    return _JAVA_FRAME_PATTERN.findall(stack_trace)[:count]
+
+
+@dataclass
+class FailureSignature:
+    """Stable identity of a failure"""
+    exception_type: str
+    message: str
+    frames: List[str] = field(default_factory=list)
+
+    @property
+    def canonical(self) -> str:
+        return f"{self.exception_type}|{self.message}|{'>'.join(self.frames)}"
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(self.canonical.encode('utf-8')).hexdigest()[:32]
+
+    def to_dict(self) -> Dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "exception_type": self.exception_type,
+            "message": self.message,
+            "frames": self.frames
+        }
+
+
+def compute_fingerprint(
+    error_message: str,
+    error_log: str = "",
+    stack_trace: str = "",
+    top_frames: int = DEFAULT_TOP_FRAMES
+) -> FailureSignature:
+    """
+    Build the signature of a failure.
+
+    Args:
+        error_message: Error message
+        error_log: Full error log (used for exception type/frames if needed)
+        stack_trace: Stack trace (preferred source of frames)
+        top_frames: Number of frames kept
+
+    Returns:
+        FailureSignature (use .fingerprint as the key)
+    """
+    error_message = error_message or ""
+    error_log = error_log or ""
+    stack_trace = stack_trace or ""
+
+    return FailureSignature(
+        exception_type=extract_exception_type(error_message, stack_trace, error_log),
+        message=normalize_failure_text(error_message or error_log),
+        frames=extract_top_frames(stack_trace or error_log, top_frames)
+    )
+
+
+def raw_failure_key(error_message: str, error_log: str = "", stack_trace: str = "") -> str:
+    """Exact-text key of a failure (distinguishes exact from fuzzy hits)"""
+    combined = f"{error_log or ''}|{error_message or ''}|{stack_trace or ''}"
+    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+
+
+def is_cacheable_analysis(analysis: Optional[Dict]) -> bool:
+    """
+    Whether an analysis may be reused for other failures of its signature
+
+    Failed AI analyses (AI_* classifications, FAILED status) and results
+    whose CRAG verification errored are not cached.
+    """
+    if not analysis:
+        return False
+    if str(analysis.get('classification', '')).startswith('AI_') or analysis.get('ai_status') == 'FAILED':
+        return False
+    return (analysis.get('crag_metadata') or {}).get('status') != 'ERROR'
+
+
+class FingerprintCache:
+    """
+    Second-level analysis cache keyed by failure fingerprint.
+
+    Thread-safe. With a Redis client, entries and in-flight claims are shared
+    across processes (Flask workers, Celery workers).
+    """
+
+    PREFIX = "ddn:fingerprint:"
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl_seconds: int = 3600,
+        max_local_entries: int = 1000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: redis.Redis (decode_responses=True) or None for
+                an in-process cache
+            ttl_seconds: Entry TTL
+            max_local_entries: LRU bound of the in-process cache
+        """
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_local_entries = max_local_entries
+
+        self._lock = threading.Lock()
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, entry)
+        self._claims: Dict[str, float] = {}
+
+        self._stats = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "fuzzy_hits": 0,
+            "misses": 0,
+            "collisions": 0,
+            "stores": 0,
+            "dedup_waits": 0,
+            "errors": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def get(self, signature: FailureSignature, raw_key: Optional[str] = None) -> Optional[Dict]:
+        """
+        Look up a cached analysis.
+
+        Args:
+            signature: Failure signature
+            raw_key: Exact-text key of the current failure (distinguishes
+                exact from fuzzy hits)
+
+        Returns:
+            Cached result dict (with 'fingerprint_match' metadata) or None
+        """
+        entry = self._read(signature.fingerprint)
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.get("canonical") != signature.canonical:
+                self._stats["collisions"] += 1
+                self._stats["misses"] += 1
+                logger.warning(f"⚠️  Fingerprint collision: {signature.fingerprint}")
+                return None
+
+            exact = raw_key is not None and raw_key == entry.get("raw_key")
+            self._stats["exact_hits" if exact else "fuzzy_hits"] += 1
+
+        result = entry["result"]
+        result["fingerprint_match"] = {
+            "fingerprint": signature.fingerprint,
+            "match": "exact" if exact else "fuzzy",
+            "cached_at": entry.get("cached_at")
+        }
+        return result
+
+    def put(self, signature: FailureSignature, result: Dict, raw_key: Optional[str] = None) -> bool:
+        """
+        Store an analysis under the failure's fingerprint.
+
+        Returns:
+            True if stored
+        """
+        entry = {
+            "canonical": signature.canonical,
+            "raw_key": raw_key,
+            "cached_at": time.time(),
+            "result": result
+        }
+        try:
+            payload = json.dumps(entry, default=str)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️  Fingerprint cache: result not serializable: {e}")
+            return False
+
+        key = self.PREFIX + signature.fingerprint
+        if self.redis_client is not None:
+            try:
+                self.redis_client.setex(key, self.ttl_seconds, payload)
+            except Exception as e:
+                logger.warning(f"⚠️  Fingerprint cache save error: {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                return False
+        else:
+            with self._lock:
+                self._local[key] = (time.time() + self.ttl_seconds, payload)
+                self._local.move_to_end(key)
+                while len(self._local) > self.max_local_entries:
+                    self._local.popitem(last=False)
+
+        with self._lock:
+            self._stats["stores"] += 1
+        return True
+
+    def _read(self, fingerprint: str) -> Optional[Dict]:
+        key = self.PREFIX + fingerprint
+
+        if self.redis_client is not None:
+            try:
+                payload = self.redis_client.get(key)
+            except Exception as e:
+                logger.warning(f"⚠️  Fingerprint cache retrieval error: {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                return None
+        else:
+            with self._lock:
+                item = self._local.get(key)
+                if item is None:
+                    return None
+                expires_at, payload = item
+                if expires_at <= time.time():
+                    del self._local[key]
+                    return None
+                self._local.move_to_end(key)
+
+        return json.loads(payload) if payload else None
+
+    # ------------------------------------------------------------------
+    # In-flight dedup
+    # ------------------------------------------------------------------
+
+    def acquire(self, signature: FailureSignature, ttl_seconds: int = 300) -> bool:
+        """
+        Claim the analysis of a signature.
+
+        Returns:
+            True if the caller should analyze; False if another worker
+            already holds the claim
+        """
+        key = f"{self.PREFIX}lock:{signature.fingerprint}"
+
+        if self.redis_client is not None:
+            try:
+                return bool(self.redis_client.set(key, "1", nx=True, ex=ttl_seconds))
+            except Exception as e:
+                logger.warning(f"⚠️  Fingerprint claim error: {e}")
+                return True
+
+        with self._lock:
+            now = time.time()
+            if self._claims.get(key, 0) > now:
+                return False
+            self._claims[key] = now + ttl_seconds
+            return True
+
+    def release(self, signature: FailureSignature):
+        """Release a claim taken with acquire()"""
+        key = f"{self.PREFIX}lock:{signature.fingerprint}"
+
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(key)
+            except Exception as e:
+                logger.warning(f"⚠️  Fingerprint release error: {e}")
+            return
+
+        with self._lock:
+            self._claims.pop(key, None)
+
+    def wait_for(
+        self,
+        signature: FailureSignature,
+        timeout: float,
+        raw_key: Optional[str] = None,
+        poll_interval: float = 0.5
+    ) -> Optional[Dict]:
+        """
+        Wait for another worker's analysis of the same signature.
+
+        Returns:
+            Cached result, or None if nothing arrived before the timeout
+        """
+        with self._lock:
+            self._stats["dedup_waits"] += 1
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._read(signature.fingerprint) is not None:
+                return self.get(signature, raw_key=raw_key)
+            time.sleep(poll_interval)
+        return None
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        """
+        Hit-rate and collision metrics.
+
+        Returns:
+            Dict with lookups, exact/fuzzy hits, misses, collisions, stores,
+            hit_rate and fuzzy_share (fraction of hits the exact-text cache
+            would have missed)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            local_size = len(self._local)
+
+        hits = stats["exact_hits"] + stats["fuzzy_hits"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        stats["fuzzy_share"] = stats["fuzzy_hits"] / hits if hits else 0.0
+        stats["backend"] = "redis" if self.redis_client is not None else "local"
+        stats["local_size"] = local_size
+        return stats
+
+
+_fingerprint_cache: Optional[FingerprintCache] = None
+_fingerprint_cache_lock = threading.Lock()
+
+
+def get_fingerprint_cache() -> FingerprintCache:
+    """
+    Get the process-wide fingerprint cache.
+
+    Uses Redis at REDIS_URL when reachable (shared across workers), otherwise
+    an in-process cache. TTL from FINGERPRINT_CACHE_TTL (default 3600s).
+    """
+    global _fingerprint_cache
+
+    if _fingerprint_cache is None:
+        with _fingerprint_cache_lock:
+            if _fingerprint_cache is None:
+                redis_client = None
+                try:
+                    import redis
+
+                    redis_client = redis.Redis.from_url(
+                        os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                        decode_responses=True,
+                        socket_connect_timeout=2,
+                        socket_timeout=2
+                    )
+                    redis_client.ping()
+                except Exception as e:
+                    logger.warning(f"⚠️  Fingerprint cache using in-process storage (Redis unavailable: {e})")
+                    redis_client = None
+
+                _fingerprint_cache = FingerprintCache(
+                    redis_client=redis_client,
+                    ttl_seconds=int(os.getenv("FINGERPRINT_CACHE_TTL", 3600))
+                )
+
+    return _fingerprint_cache
@@ -29,6 +29,9 @@ sys.path.insert(0, agents_dir)
 # Import ReAct Agent (Task 0-ARCH.2, 0-ARCH.3, 0-ARCH.4, 0-ARCH.5)
 from react_agent_service import ReActAgent, create_react_agent
 
+# Failure-signature fingerprints (second-level fuzzy cache)
+from failure_fingerprint import compute_fingerprint, FingerprintCache
+
 # Load environment variables
 load_dotenv()
 
@@ -61,6 +64,9 @@ except Exception as e:
     logger.warning("   Caching will be disabled")
     redis_client = None
 
+# Second-level cache keyed by failure fingerprint (shares the Redis client)
+fingerprint_cache = FingerprintCache(redis_client=redis_client, ttl_seconds=3600)
+
 # Initialize ReAct Agent (Task 0-ARCH.6)
 react_agent = None
 
@@ -234,7 +240,8 @@ def cache_stats():
                 "port": int(os.getenv('REDIS_PORT', 6379)),
                 "db": int(os.getenv('REDIS_DB', 0)),
                 "ttl_seconds": 3600
-            }
+            },
+            "fingerprint_cache": fingerprint_cache.get_stats()
         }), 200
 
     except Exception as e:
@@ -312,6 +319,19 @@ def analyze_error_endpoint():
             logger.info(f"⚡ Returning cached result for build {data['build_id']}")
             return jsonify(cached_result), 200
 
+        # Second level: same failure signature (differs only in timestamps,
+        # paths, ids, ports...) analyzed recently
+        signature = compute_fingerprint(error_message, data['error_log'], data.get('stack_trace'))
+        cached_result = fingerprint_cache.get(signature, raw_key=cache_key)
+
+        if cached_result:
+            cached_result['build_id'] = data['build_id']
+            cached_result['cache_hit'] = True
+            cached_result['cache_key'] = cache_key[:20] + "..."
+            logger.info(f"⚡ Returning fingerprint-cached result for build {data['build_id']} "
+                        f"(signature {signature.fingerprint[:12]})")
+            return jsonify(cached_result), 200
+
         # Cache miss - run ReAct agent analysis
         logger.info(f"🔄 Running fresh analysis for build {data['build_id']}")
         result = react_agent.analyze(
@@ -333,8 +353,12 @@ def analyze_error_endpoint():
         result['cache_hit'] = False
         result['cache_key'] = cache_key[:20] + "..."
 
+        result['fingerprint'] = signature.fingerprint
+
         # Save to cache (TTL: 1 hour)
         save_to_cache(cache_key, result, ttl_seconds=3600)
+        if result.get('success'):
+            fingerprint_cache.put(signature, result, raw_key=cache_key)
 
         logger.info(f"📤 ReAct analysis complete: {result.get('error_category')} ({result.get('iterations')} iterations)")
 
@@ -0,0 +1,414 @@
+"""
+Per-Build Failure Collector for Parallel Robot Framework Runs (pabot)
+
+With pabot every worker process loads its own MongoDBListener, which means
+one MongoClient pool and one PII redactor (Presidio model load) per
+process. In collector mode the listeners only stream their failure records
+to a single collector process per build, which owns the MongoDB
+connection, the redactor and the batched FailureWriter, and stores a build
+summary document (test_build_summaries) when the run is over.
+
+- Transport: multiprocessing.connection on 127.0.0.1 (random port, random
+  authkey), published in a per-build state file
+- The first listener of a build starts the collector (an exclusive lock
+  file elects it); the others wait for the state file
+- The collector exits once no listener has been connected for
+  MONGODB_COLLECTOR_IDLE_SECONDS
+- If the collector goes away, listeners spool failures to the shared NDJSON
+  spool, which is replayed by the next writer
+
+Usage:
+    # Automatic in pabot workers, or with MONGODB_LISTENER_MODE=collector:
+    pabot --processes 8 --listener ../implementation/mongodb_robot_listener.py tests/
+
+    # Or started explicitly before the run:
+    python mongodb_failure_collector.py --build $BUILD_NUMBER --job $JOB_NAME
+
+Configuration:
+    MONGODB_COLLECTOR_IDLE_SECONDS=30      Exit after this long without listeners
+    MONGODB_COLLECTOR_START_TIMEOUT=15     Listener wait for the collector to start
+    MONGODB_COLLECTOR_STATE=<path>         State file (default: per build in the temp dir)
+
+File: implementation/mongodb_failure_collector.py
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+
+from bson import ObjectId
+
+from mongodb_robot_listener import FailureWriter, connect_mongodb, create_pii_redactor
+
+SUMMARY_COLLECTION = 'test_build_summaries'
+
+
+def state_path(build_number, job_name):
+    """State file (address and authkey) of the collector of a build"""
+    override = os.getenv('MONGODB_COLLECTOR_STATE')
+    if override:
+        return override
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{job_name}_{build_number}")
+    return os.path.join(tempfile.gettempdir(), f"ddn_failure_collector_{safe_name}.json")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class FailureCollector:
+    """Receives failure records from the listeners of one build"""
+
+    def __init__(self, writer, build_number, job_name, summaries=None, state_file=None, idle_seconds=None):
+        """
+        Args:
+            writer: FailureWriter storing the failures (owns MongoDB and the redactor)
+            build_number / job_name: Build the collector serves
+            summaries: Collection for the build summary document (None = not stored)
+            state_file: Published address (default: state_path())
+            idle_seconds: Exit after this long without listeners
+                (default: MONGODB_COLLECTOR_IDLE_SECONDS or 30)
+        """
+        self.writer = writer
+        self.build_number = build_number
+        self.job_name = job_name
+        self.summaries = summaries
+        self.state_file = state_file or state_path(build_number, job_name)
+        self.idle_seconds = idle_seconds if idle_seconds is not None else float(
+            os.getenv('MONGODB_COLLECTOR_IDLE_SECONDS', 30)
+        )
+
+        self._authkey = os.urandom(16)
+        self._listener = Listener(('127.0.0.1', 0), authkey=self._authkey)
+        self.address = self._listener.address
+
+        self._lock = threading.Lock()
+        self._clients = 0
+        self._last_activity = time.monotonic()
+        self._stopping = False
+
+        # Build summary
+        self.started_at = datetime.utcnow()
+        self.processes = set()
+        self.suites = {}
+        self.failures_received = 0
+
+    def write_state(self):
+        """Publish address and authkey (readable by this user only)"""
+        tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                'host': self.address[0],
+                'port': self.address[1],
+                'authkey': self._authkey.hex(),
+                'pid': os.getpid()
+            }, f)
+        os.replace(tmp_path, self.state_file)
+
+    def serve(self):
+        """
+        Accept listeners until none has been connected for idle_seconds
+
+        Returns:
+            dict: Build summary document
+        """
+        accept_thread = threading.Thread(target=self._accept_loop, name='collector-accept', daemon=True)
+        accept_thread.start()
+        print(f"[Failure Collector] Serving build {self.build_number} on {self.address[0]}:{self.address[1]}")
+
+        while True:
+            time.sleep(min(0.5, self.idle_seconds / 4 or 0.05))
+            with self._lock:
+                if not self._clients and time.monotonic() - self._last_activity >= self.idle_seconds:
+                    break
+
+        # New listeners start a new collector from here on; finish the ones
+        # that connected in between
+        self._stopping = True
+        _remove(self.state_file)
+        _remove(f"{self.state_file}.lock")
+        self._wake_accept()
+        accept_thread.join(5)
+        self._listener.close()
+        while True:
+            with self._lock:
+                if not self._clients:
+                    break
+            time.sleep(0.05)
+
+        self.writer.close()
+        return self._store_summary()
+
+    def _wake_accept(self):
+        """Unblock accept() (closing the socket does not) with a connection that fails the handshake"""
+        try:
+            socket.create_connection(self.address, timeout=1).close()
+        except OSError:
+            pass
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._stopping:
+                    return
+                continue  # Failed handshake (wrong authkey, dropped connection)
+            with self._lock:
+                self._clients += 1
+                self._last_activity = time.monotonic()
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            while True:
+                kind, payload = conn.recv()
+                if kind == 'failure':
+                    self.writer.submit(payload)
+                    with self._lock:
+                        self.failures_received += 1
+                elif kind == 'test':
+                    suite, status = payload
+                    with self._lock:
+                        counts = self.suites.setdefault(suite or 'unknown', {'PASS': 0, 'FAIL': 0, 'SKIP': 0})
+                        counts[status] = counts.get(status, 0) + 1
+                elif kind == 'hello':
+                    with self._lock:
+                        self.processes.add(payload)
+                elif kind == 'bye':
+                    break
+        except (EOFError, OSError):
+            pass  # Listener process ended without close()
+        finally:
+            conn.close()
+            with self._lock:
+                self._clients -= 1
+                self._last_activity = time.monotonic()
+
+    def build_summary(self):
+        """Summary document of the build"""
+        with self._lock:
+            suites = [
+                {'suite': suite, 'passed': counts.get('PASS', 0), 'failed': counts.get('FAIL', 0),
+                 'skipped': counts.get('SKIP', 0)}
+                for suite, counts in sorted(self.suites.items())
+            ]
+            processes = len(self.processes)
+            failures_received = self.failures_received
+
+        return {
+            '_id': f"{self.job_name}#{self.build_number}",
+            'build_number': self.build_number,
+            'job_name': self.job_name,
+            'test_type': 'robot_framework',
+            'started_at': self.started_at,
+            'finished_at': datetime.utcnow(),
+            'processes': processes,
+            'total_tests': sum(s['passed'] + s['failed'] + s['skipped'] for s in suites),
+            'passed': sum(s['passed'] for s in suites),
+            'failed': sum(s['failed'] for s in suites),
+            'skipped': sum(s['skipped'] for s in suites),
+            'suites': suites,
+            'failures_received': failures_received,
+            'failures_stored': self.writer.stats['inserted'],
+            'failures_spooled': self.writer.stats['spooled']
+        }
+
+    def _store_summary(self):
+        summary = self.build_summary()
+        if self.summaries is not None:
+            try:
+                self.summaries.replace_one({'_id': summary['_id']}, summary, upsert=True)
+            except Exception as e:
+                print(f"[Failure Collector] WARNING: could not store build summary: {e}")
+        print(f"[Failure Collector] Build {self.build_number}: {summary['total_tests']} tests, "
+              f"{summary['failed']} failed, {summary['processes']} listener process(es)")
+        return summary
+
+
+class CollectorClient:
+    """
+    Listener side of the collector connection
+
+    Has the FailureWriter interface (submit / close / stats) used by
+    MongoDBListener. If the collector goes away, failures are redacted and
+    spooled.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._fallback = None
+        self.stats = {'sent': 0, 'spooled': 0}
+        self._send('hello', os.getpid())
+
+    def submit(self, doc):
+        """Send a failure document to the collector"""
+        doc.setdefault('_id', ObjectId())  # Idempotent if replayed from the spool
+        if self._send('failure', doc):
+            self.stats['sent'] += 1
+            return
+        if self._fallback is None:
+            # Spool only; replay inserts spooled documents as they are, so
+            # they are redacted in this process before they are spooled
+            self._fallback = FailureWriter(None, redactor=create_pii_redactor())
+        self._fallback.submit(doc)
+        self.stats['spooled'] += 1
+
+    def record_test(self, suite, status):
+        """Count a finished test in the build summary"""
+        self._send('test', (suite, status))
+
+    def close(self):
+        self._send('bye', None)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        if self._fallback is not None:
+            self._fallback.close()
+
+    def _send(self, kind, payload):
+        with self._lock:
+            if self._conn is None:
+                return False
+            try:
+                self._conn.send((kind, payload))
+                return True
+            except (OSError, ValueError) as e:
+                print(f"[MongoDB Listener] WARNING: collector connection lost ({e}) - spooling failures")
+                self._conn = None
+                return False
+
+
+def _connect(path):
+    """CollectorClient for a published collector, or None"""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        return CollectorClient(Client((state['host'], state['port']), authkey=bytes.fromhex(state['authkey'])))
+    except ConnectionRefusedError:
+        # Collector is gone: let the next listener start a new one
+        _remove(path)
+        _remove(f"{path}.lock")
+        return None
+    except Exception:
+        return None
+
+
+def _claim(lock_path, stale_seconds):
+    """Exclusively create the election lock (True = this process starts the collector)"""
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < stale_seconds:
+                    return False
+            except OSError:
+                pass
+            _remove(lock_path)  # Left behind by a collector that never started
+    return False
+
+
+def _spawn(build_number, job_name, path):
+    """Start the collector as a detached process (output in <state>.log)"""
+    options = {}
+    if os.name == 'posix':
+        options['start_new_session'] = True
+    else:
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+
+    with open(f"{os.path.splitext(path)[0]}.log", 'a') as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--build', str(build_number), '--job', job_name,
+             '--state', path],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, close_fds=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), **options
+        )
+
+
+def connect_to_collector(build_number, job_name, start_timeout=None):
+    """
+    Connect to the collector of a build, starting it if no listener has yet
+
+    Returns:
+        CollectorClient, or None if no collector could be reached in time
+    """
+    start_timeout = start_timeout if start_timeout is not None else float(
+        os.getenv('MONGODB_COLLECTOR_START_TIMEOUT', 15)
+    )
+    path = state_path(build_number, job_name)
+    deadline = time.monotonic() + start_timeout
+
+    while True:
+        client = _connect(path)
+        if client is not None:
+            return client
+        if _claim(f"{path}.lock", stale_seconds=2 * start_timeout):
+            try:
+                _spawn(build_number, job_name, path)
+            except Exception as e:
+                _remove(f"{path}.lock")
+                print(f"[MongoDB Listener] WARNING: could not start collector: {e}")
+                return None
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-build failure collector for parallel Robot runs")
+    parser.add_argument('--build', default=os.getenv('BUILD_NUMBER', 'local'), help="Build number")
+    parser.add_argument('--job', default=os.getenv('JOB_NAME', 'robot-framework-tests'), help="Job name")
+    parser.add_argument('--state', help="State file (default: per build in the temp dir)")
+    parser.add_argument('--idle-seconds', type=float, help="Exit after this long without listeners")
+    args = parser.parse_args(argv)
+
+    state_file = args.state or state_path(args.build, args.job)
+    client = None
+    try:
+        mongodb_uri = os.getenv('MONGODB_URI')
+        collection = summaries = None
+        if mongodb_uri:
+            client, db = connect_mongodb(mongodb_uri, os.getenv('MONGODB_DB', 'ddn_tests'))
+            collection, summaries = db['test_failures'], db[SUMMARY_COLLECTION]
+        else:
+            print("[Failure Collector] ERROR: MONGODB_URI not configured - failures will be spooled")
+
+        writer = FailureWriter(collection, redactor=create_pii_redactor())
+        collector = FailureCollector(writer, args.build, args.job, summaries=summaries,
+                                     state_file=state_file, idle_seconds=args.idle_seconds)
+        collector.write_state()
+        collector.serve()  # Removes state and lock file once it stops accepting
+        return 0
+    except BaseException:
+        _remove(state_file)
+        _remove(f"{state_file}.lock")
+        raise
+    finally:
+        if client:
+            client.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,15 +2,50 @@
 Robot Framework Listener for MongoDB Integration
 Automatically sends test failures to MongoDB Atlas during test execution
 Phase 4: Now includes PII redaction before storage
+
+Failures are written by a background FailureWriter so a slow or remote
+MongoDB does not lengthen the test run: end_test() only queues the
+document; the writer redacts PII, adds the ingestion-time enrichment
+(failure_enrichment: entities, referenced files, signature, token counts),
+batches inserts with
+insert_many(ordered=False), spools batches to a local NDJSON file while
+MongoDB is unreachable and replays the spool once it is back. close()
+flushes everything still queued.
+
+In parallel runs (pabot) the listeners instead stream their failures to a
+single collector process per build (mongodb_failure_collector.py), which
+owns the MongoDB connection, the redactor and the writer.
+
+Configuration:
+    MONGODB_LISTENER_MODE=auto             auto (collector in pabot workers) | collector | direct
+    MONGODB_LISTENER_BATCH_SIZE=100        Documents per insert_many
+    MONGODB_LISTENER_FLUSH_SECONDS=1       Longest wait before a partial batch is written
+    MONGODB_LISTENER_QUEUE_SIZE=10000      Bounded queue (overflow goes to the spool)
+    MONGODB_LISTENER_SPOOL=<path>          NDJSON spool (default: mongodb_listener_spool.ndjson
+                                           next to this file)
+    MONGODB_LISTENER_RETRY_SECONDS=30      Spool replay interval while MongoDB is down
+    FAILURE_ENRICHMENT_ENABLED=true        Enrich failures before they are stored
 """
 
 import os
 import sys
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pymongo import MongoClient
+from pymongo.errors import BulkWriteError, PyMongoError
+from bson import ObjectId, json_util
 from dotenv import load_dotenv
 import traceback
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: spool appends are not locked across processes
+    FCNTL_AVAILABLE = False
+
 # Phase 4: Add security module to path
 security_dir = os.path.join(os.path.dirname(__file__), 'security')
 sys.path.insert(0, security_dir)
@@ -23,9 +58,299 @@ except ImportError:
     PII_REDACTION_AVAILABLE = False
     print("[MongoDB Listener] WARNING: PII redaction not available")
 
+try:
+    from failure_enrichment import enrich_failure
+    ENRICHMENT_AVAILABLE = True
+except ImportError:
+    ENRICHMENT_AVAILABLE = False
+    print("[MongoDB Listener] WARNING: Failure enrichment not available")
+
 # Load environment variables
 load_dotenv()
 
+DEFAULT_SPOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mongodb_listener_spool.ndjson')
+
+# Duplicate key: the document was already stored (replayed spool)
+DUPLICATE_KEY_ERROR = 11000
+
+
+class FailureWriter:
+    """
+    Background writer for failure documents
+
+    Documents get their _id when queued, so a batch that is replayed from
+    the spool after a partial insert is not stored twice (duplicates are
+    ignored).
+    """
+
+    def __init__(self, collection, redactor=None, spool_path=None, batch_size=None,
+                 flush_seconds=None, max_queue=None, retry_seconds=None, enrich=None):
+        """
+        Args:
+            collection: pymongo collection (None = spool only)
+            redactor: PIIRedactor applied on the writer thread
+            enrich: Add the failure enrichment after redaction, on the writer
+                thread (default: FAILURE_ENRICHMENT_ENABLED, true)
+            spool_path: NDJSON spool (default: MONGODB_LISTENER_SPOOL or DEFAULT_SPOOL_PATH)
+            batch_size: Documents per insert_many (default: MONGODB_LISTENER_BATCH_SIZE or 100)
+            flush_seconds: Partial batch wait (default: MONGODB_LISTENER_FLUSH_SECONDS or 1)
+            max_queue: Bounded queue size (default: MONGODB_LISTENER_QUEUE_SIZE or 10000)
+            retry_seconds: Spool replay interval (default: MONGODB_LISTENER_RETRY_SECONDS or 30)
+        """
+        self.collection = collection
+        self.redactor = redactor
+        if enrich is None:
+            enrich = os.getenv('FAILURE_ENRICHMENT_ENABLED', 'true').lower() == 'true'
+        self.enrich = enrich and ENRICHMENT_AVAILABLE
+        self.spool_path = spool_path or os.getenv('MONGODB_LISTENER_SPOOL', DEFAULT_SPOOL_PATH)
+        self.batch_size = batch_size or int(os.getenv('MONGODB_LISTENER_BATCH_SIZE', 100))
+        self.flush_seconds = flush_seconds if flush_seconds is not None else float(
+            os.getenv('MONGODB_LISTENER_FLUSH_SECONDS', 1)
+        )
+        self.retry_seconds = retry_seconds if retry_seconds is not None else float(
+            os.getenv('MONGODB_LISTENER_RETRY_SECONDS', 30)
+        )
+
+        self._queue = queue.Queue(maxsize=max_queue or int(os.getenv('MONGODB_LISTENER_QUEUE_SIZE', 10000)))
+        self._spool_lock = threading.Lock()
+        self._next_replay = 0.0  # Replay a spool left by an earlier run right away
+        self._closed = False
+
+        self.stats = {
+            'queued': 0,
+            'inserted': 0,
+            'duplicates': 0,
+            'spooled': 0,
+            'replayed': 0,
+            'batches': 0,
+            'redactions': 0,
+            'enriched': 0
+        }
+
+        self._thread = threading.Thread(target=self._run, name='mongodb-listener-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, doc):
+        """Queue a failure document (never blocks; overflow is spooled)"""
+        doc.setdefault('_id', ObjectId())
+        self.stats['queued'] += 1
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            self._spool([self._prepare(doc)])
+
+    def close(self, timeout=30.0):
+        """Write everything queued (or spool it if MongoDB is down) and stop"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+        leftover = []
+        while True:
+            try:
+                doc = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if doc is not None:
+                leftover.append(doc)
+        if leftover:
+            # Still blocked on MongoDB after timeout: keep them for the next run.
+            # Replay inserts spooled documents as they are, so redact them first
+            self._spool([self._prepare(doc) for doc in leftover])
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._write([self._prepare(doc) for doc in batch])
+            if self.collection is not None and time.monotonic() >= self._next_replay:
+                self._replay()
+            if stop:
+                return
+
+    def _next_batch(self):
+        """Up to batch_size documents, waiting at most flush_seconds after the first"""
+        batch = []
+        try:
+            doc = self._queue.get(timeout=self.flush_seconds)
+        except queue.Empty:
+            return batch, False
+        deadline = time.monotonic() + self.flush_seconds
+        while doc is not None:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                doc = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _prepare(self, doc):
+        """Redacted and enriched document, as it is stored"""
+        doc = self._redact(doc)
+        if self.enrich:
+            try:
+                # Computed from the redacted text that is stored
+                doc['enrichment'] = enrich_failure(doc)
+                self.stats['enriched'] += 1
+            except Exception as e:
+                # Analyses compute it themselves when missing
+                print(f"[MongoDB Listener] WARNING: Failure enrichment failed: {e}")
+        return doc
+
+    def _redact(self, doc):
+        if not self.redactor:
+            return doc
+        try:
+            redacted_doc, redaction_metadata = self.redactor.redact_failure_data(doc)
+            self.stats['redactions'] += redaction_metadata['total_redactions']
+            return redacted_doc
+        except Exception as e:
+            print(f"[MongoDB Listener] WARNING: PII redaction failed: {e}")
+            # Continue with unredacted data (better to store data than lose it)
+            return doc
+
+    def _insert(self, docs):
+        """
+        insert_many(ordered=False); duplicates of already stored documents are ignored
+
+        Returns:
+            list: Documents that could not be stored
+        """
+        if self.collection is None:
+            return docs
+        try:
+            self.collection.insert_many(docs, ordered=False)
+            self.stats['inserted'] += len(docs)
+            return []
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            failed = {error['index'] for error in errors if error.get('code') != DUPLICATE_KEY_ERROR}
+            duplicates = len(errors) - len(failed)
+            self.stats['duplicates'] += duplicates
+            self.stats['inserted'] += len(docs) - len(errors)
+            return [doc for index, doc in enumerate(docs) if index in failed]
+        except PyMongoError as e:
+            print(f"[MongoDB Listener] WARNING: MongoDB unavailable ({e}) - spooling {len(docs)} failure(s)")
+            self._next_replay = time.monotonic() + self.retry_seconds
+            return docs
+
+    def _write(self, docs):
+        self.stats['batches'] += 1
+        failed = self._insert(docs)
+        if failed:
+            self._spool(failed)
+        else:
+            print(f"[MongoDB Listener] ✓ Stored {len(docs)} failure(s)")
+
+    @contextmanager
+    def _locked_spool(self, mode):
+        """Spool file, locked against the writer threads of other listener processes"""
+        with self._spool_lock, open(self.spool_path, mode, encoding='utf-8') as f:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield f
+
+    def _spool(self, docs):
+        try:
+            with self._locked_spool('a') as f:
+                for doc in docs:
+                    f.write(json_util.dumps(doc) + '\n')
+            self.stats['spooled'] += len(docs)
+        except OSError as e:
+            print(f"[MongoDB Listener] ERROR: could not spool {len(docs)} failure(s): {e}")
+
+    def _replay(self):
+        """Insert spooled documents; the ones still failing stay in the spool"""
+        self._next_replay = time.monotonic() + self.retry_seconds
+        if not os.path.exists(self.spool_path) or not os.path.getsize(self.spool_path):
+            return
+
+        with self._locked_spool('r+') as f:
+            docs = []
+            for line in f:
+                try:
+                    docs.append(json_util.loads(line))
+                except ValueError:
+                    pass  # Torn line (process killed while spooling)
+
+            remaining = []
+            for start in range(0, len(docs), self.batch_size):
+                batch = docs[start:start + self.batch_size]
+                if remaining:
+                    remaining.extend(batch)  # MongoDB went away: keep the rest
+                    continue
+                failed = self._insert(batch)
+                self.stats['replayed'] += len(batch) - len(failed)
+                remaining.extend(failed)
+
+            f.seek(0)
+            f.truncate()
+            for doc in remaining:
+                f.write(json_util.dumps(doc) + '\n')
+
+        if len(docs) > len(remaining):
+            print(f"[MongoDB Listener] ✓ Replayed {len(docs) - len(remaining)} spooled failure(s)")
+
+
+def collector_mode_enabled():
+    """
+    Whether listeners stream failures to a per-build collector process
+
+    MONGODB_LISTENER_MODE=collector|direct; by default (auto) the collector
+    is used when the listener runs in a pabot worker (pabot passes
+    PABOTQUEUEINDEX on the robot command line).
+    """
+    mode = os.getenv('MONGODB_LISTENER_MODE', 'auto').lower()
+    if mode == 'auto':
+        return any('PABOTQUEUEINDEX' in arg for arg in sys.argv)
+    return mode == 'collector'
+
+
+def connect_mongodb(mongodb_uri, mongodb_db):
+    """
+    MongoClient and database for the listener / collector
+
+    Returns:
+        tuple: (client, database); failures are spooled while MongoDB is unreachable
+    """
+    client = MongoClient(
+        mongodb_uri,
+        serverSelectionTimeoutMS=int(os.getenv('MONGODB_TIMEOUT_MS', 5000))
+    )
+
+    # Test connection
+    try:
+        client.server_info()
+        print(f"[MongoDB Listener] Connected to MongoDB: {mongodb_db}")
+    except Exception as e:
+        print(f"[MongoDB Listener] WARNING: MongoDB unreachable ({e}) - "
+              f"failures will be spooled and replayed")
+    return client, client[mongodb_db]
+
+
+def create_pii_redactor():
+    """PII redactor if PII_REDACTION_ENABLED=true and available, else None"""
+    pii_enabled = os.getenv('PII_REDACTION_ENABLED', 'false').lower() == 'true'
+
+    if not pii_enabled:
+        print("[MongoDB Listener] ℹ️  PII redaction DISABLED (client approval pending)")
+        print("[MongoDB Listener] ℹ️  Storing actual data for dashboard navigation")
+    elif PII_REDACTION_AVAILABLE:
+        try:
+            redactor = get_pii_redactor()
+            print("[MongoDB Listener] ✓ PII redaction ENABLED")
+            return redactor
+        except Exception as e:
+            print(f"[MongoDB Listener] WARNING: PII redaction failed to initialize: {e}")
+    else:
+        print("[MongoDB Listener] WARNING: PII redaction disabled - install presidio packages")
+    return None
+
+
 class MongoDBListener:
     """
     Robot Framework listener that sends test failures to MongoDB
@@ -34,45 +359,45 @@ class MongoDBListener:
     ROBOT_LISTENER_API_VERSION = 3
 
     def __init__(self):
-        """Initialize MongoDB connection"""
+        """Initialize MongoDB connection (or the connection to the build's collector)"""
+        # Store current suite and test context
+        self.current_suite = None
+        self.current_test = None
+        self.build_number = os.getenv('BUILD_NUMBER', 'local')
+        self.job_name = os.getenv('JOB_NAME', 'robot-framework-tests')
+
+        # Time spent in end_test() per failing test (listener overhead)
+        self.end_test_seconds = []
+
+        self.client = None
+        self.writer = None
+        self.collector = None
+
         try:
+            if collector_mode_enabled():
+                # Parallel run: one collector process owns MongoDB and the redactor
+                from mongodb_failure_collector import connect_to_collector
+                self.collector = connect_to_collector(self.build_number, self.job_name)
+                if self.collector:
+                    self.writer = self.collector
+                    print(f"[MongoDB Listener] Streaming failures to collector for build {self.build_number}")
+                    return
+                print("[MongoDB Listener] WARNING: collector unavailable - writing to MongoDB directly")
+
             self.mongodb_uri = os.getenv('MONGODB_URI')
             self.mongodb_db = os.getenv('MONGODB_DB', 'ddn_tests')
 
             if not self.mongodb_uri:
                 print("[MongoDB Listener] ERROR: MONGODB_URI not configured")
-                self.client = None
                 return
 
-            self.client = MongoClient(self.mongodb_uri)
-            self.db = self.client[self.mongodb_db]
+            self.client, self.db = connect_mongodb(self.mongodb_uri, self.mongodb_db)
             self.collection = self.db['test_failures']
 
-            # Test connection
-            self.client.server_info()
-            print(f"[MongoDB Listener] Connected to MongoDB: {self.mongodb_db}")
-
-            # Store current suite and test context
-            self.current_suite = None
-            self.current_test = None
-            self.build_number = os.getenv('BUILD_NUMBER', 'local')
-            self.job_name = os.getenv('JOB_NAME', 'robot-framework-tests')
-
             # Phase 4: Initialize PII redactor
-            self.pii_redactor = None
-            pii_enabled = os.getenv('PII_REDACTION_ENABLED', 'false').lower() == 'true'
+            self.pii_redactor = create_pii_redactor()
 
-            if not pii_enabled:
-                print("[MongoDB Listener] ℹ️  PII redaction DISABLED (client approval pending)")
-                print("[MongoDB Listener] ℹ️  Storing actual data for dashboard navigation")
-            elif PII_REDACTION_AVAILABLE:
-                try:
-                    self.pii_redactor = get_pii_redactor()
-                    print("[MongoDB Listener] ✓ PII redaction ENABLED")
-                except Exception as e:
-                    print(f"[MongoDB Listener] WARNING: PII redaction failed to initialize: {e}")
-            else:
-                print("[MongoDB Listener] WARNING: PII redaction disabled - install presidio packages")
+            self.writer = FailureWriter(self.collection, redactor=self.pii_redactor)
 
         except Exception as e:
             print(f"[MongoDB Listener] Connection error: {str(e)}")
@@ -95,11 +420,15 @@ class MongoDBListener:
 
     def end_test(self, data, result):
         """Called when a test case ends"""
-        if not self.client:
+        if not self.writer:
             return
 
+        if self.collector:
+            self.collector.record_test(self.current_suite, result.status)
+
         # Only report failures
         if result.status == 'FAIL':
+            started = time.perf_counter()
             try:
                 # Calculate duration
                 end_time = datetime.utcnow()
@@ -143,24 +472,14 @@ class MongoDBListener:
                     }
                 }
 
-                # Phase 4: Redact PII before storing
-                if self.pii_redactor:
-                    try:
-                        redacted_doc, redaction_metadata = self.pii_redactor.redact_failure_data(failure_doc)
-                        failure_doc = redacted_doc
-                        if redaction_metadata['total_redactions'] > 0:
-                            print(f"[MongoDB Listener] ✓ Redacted {redaction_metadata['total_redactions']} PII entities")
-                    except Exception as e:
-                        print(f"[MongoDB Listener] WARNING: PII redaction failed: {e}")
-                        # Continue with unredacted data (better to store data than lose it)
-
-                # Store in MongoDB
-                insert_result = self.collection.insert_one(failure_doc)
-                print(f"[MongoDB Listener] ✓ Failure stored: {result.name} (ID: {insert_result.inserted_id})")
+                # Stored (after PII redaction and enrichment) by the background writer
+                self.writer.submit(failure_doc)
+                print(f"[MongoDB Listener] ✓ Failure queued: {result.name}")
 
             except Exception as e:
                 print(f"[MongoDB Listener] ERROR storing failure: {str(e)}")
                 print(traceback.format_exc())
+            self.end_test_seconds.append(time.perf_counter() - started)
         else:
             print(f"[MongoDB Listener] ✓ Test passed: {result.name}")
 
@@ -170,6 +489,20 @@ class MongoDBListener:
 
     def close(self):
         """Called when all tests are completed"""
+        if self.writer:
+            self.writer.close()
+            stats = self.writer.stats
+            if self.collector:
+                print(f"[MongoDB Listener] Collector: {stats['sent']} sent, {stats['spooled']} spooled")
+            else:
+                print(f"[MongoDB Listener] Writer: {stats['inserted']} stored, {stats['spooled']} spooled, "
+                      f"{stats['replayed']} replayed in {stats['batches']} batch(es)")
+            if self.end_test_seconds:
+                samples = sorted(self.end_test_seconds)
+                print(f"[MongoDB Listener] end_test overhead: "
+                      f"mean {sum(samples) / len(samples) * 1000:.2f} ms, "
+                      f"p95 {samples[int(0.95 * (len(samples) - 1))] * 1000:.2f} ms "
+                      f"over {len(samples)} failure(s)")
         if self.client:
             print("[MongoDB Listener] Closing MongoDB connection")
             self.client.close()
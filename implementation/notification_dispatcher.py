@@ -0,0 +1,343 @@
+"""
+Asynchronous Batched Notification Dispatcher
+
+HITL review requests and Slack failure alerts used to be sent with one
+synchronous HTTP request per item inside the request path, so a burst of
+failures from one build blocked the caller and flooded the channel.
+
+NotificationDispatcher moves delivery to a background thread:
+- submit() never blocks: a bounded queue, items are dropped (and counted)
+  when it is full
+- items with the same coalescing key (e.g. build + category) arriving
+  within the window are delivered as one digest
+- failed deliveries are retried with exponential backoff, without holding
+  up digests for other keys
+- queue depth, drops, retries and send / delivery latency are reported by
+  get_stats()
+
+Usage:
+    def send(key, items):
+        ...  # post one message for all items, raise on failure
+
+    dispatcher = NotificationDispatcher(send, name="slack")
+    dispatcher.submit(("B-123", "INFRA_ERROR"), payload)
+
+Configuration (constructor arguments override):
+    NOTIFY_QUEUE_SIZE=1000          Bounded queue size
+    NOTIFY_COALESCE_SECONDS=10      Coalescing window per key
+    NOTIFY_MAX_BATCH=50             Digest sent early once this many items
+    NOTIFY_MAX_ATTEMPTS=5           Attempts per digest before it is dropped
+    NOTIFY_BACKOFF_SECONDS=2        First retry delay (doubled per attempt)
+
+File: implementation/notification_dispatcher.py
+"""
+
+import atexit
+import os
+import queue
+import weakref
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept for percentiles
+LATENCY_SAMPLES = 1000
+
+# Longest retry delay
+MAX_BACKOFF_SECONDS = 300.0
+
+# Time given to deliver queued notifications at interpreter exit
+EXIT_FLUSH_SECONDS = 5.0
+
+_dispatchers = weakref.WeakSet()
+
+
+def _flush_at_exit():
+    for dispatcher in list(_dispatchers):
+        dispatcher.close(EXIT_FLUSH_SECONDS)
+
+
+atexit.register(_flush_at_exit)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _latency_summary(samples) -> Dict[str, float]:
+    values = sorted(samples)
+    return {
+        "mean": round(sum(values) / len(values), 1) if values else 0.0,
+        "p50": round(_percentile(values, 50), 1),
+        "p95": round(_percentile(values, 95), 1),
+        "p99": round(_percentile(values, 99), 1),
+        "max": round(values[-1], 1) if values else 0.0
+    }
+
+
+class _Digest:
+    """Items of one coalescing key waiting to be delivered"""
+
+    __slots__ = ("key", "items", "enqueued_at", "due", "attempts")
+
+    def __init__(self, key: Hashable, due: float):
+        self.key = key
+        self.items: List[Any] = []
+        self.enqueued_at: List[float] = []
+        self.due = due
+        self.attempts = 0
+
+
+class NotificationDispatcher:
+    """
+    Background dispatcher with a bounded queue, per-key coalescing and retries.
+
+    send(key, items) is called on the dispatcher thread with every item
+    coalesced under key (oldest first) and must raise on failure.
+    """
+
+    def __init__(self, send: Callable[[Hashable, List[Any]], Any], name: str = "notifications",
+                 max_queue: Optional[int] = None, window_seconds: Optional[float] = None,
+                 max_batch: Optional[int] = None, max_attempts: Optional[int] = None,
+                 backoff_seconds: Optional[float] = None):
+        """
+        Args:
+            send: Delivers one digest (key, items); raises on failure
+            name: Used in logs and the thread name
+            max_queue: Bounded queue size (default: NOTIFY_QUEUE_SIZE or 1000)
+            window_seconds: Coalescing window (default: NOTIFY_COALESCE_SECONDS or 10)
+            max_batch: Items that trigger an early send (default: NOTIFY_MAX_BATCH or 50)
+            max_attempts: Attempts per digest (default: NOTIFY_MAX_ATTEMPTS or 5)
+            backoff_seconds: First retry delay (default: NOTIFY_BACKOFF_SECONDS or 2)
+        """
+        self.send = send
+        self.name = name
+        self.max_queue = max_queue or int(os.getenv("NOTIFY_QUEUE_SIZE", 1000))
+        self.window_seconds = window_seconds if window_seconds is not None else float(
+            os.getenv("NOTIFY_COALESCE_SECONDS", 10)
+        )
+        self.max_batch = max_batch or int(os.getenv("NOTIFY_MAX_BATCH", 50))
+        self.max_attempts = max_attempts or int(os.getenv("NOTIFY_MAX_ATTEMPTS", 5))
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else float(
+            os.getenv("NOTIFY_BACKOFF_SECONDS", 2)
+        )
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._digests: Dict[Hashable, _Digest] = {}
+        self._digests_lock = threading.Lock()  # Changed by the dispatcher thread, read by flush/get_stats
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+
+        # Statistics
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "submitted": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "digests_sent": 0,
+            "items_sent": 0,
+            "retries": 0,
+            "digests_failed": 0,
+            "items_failed": 0
+        }
+        self._send_latency_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._delivery_latency_ms = deque(maxlen=LATENCY_SAMPLES)
+
+        _dispatchers.add(self)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, key: Hashable, item: Any) -> bool:
+        """
+        Queue an item for delivery (never blocks)
+
+        Returns:
+            bool: False if the dispatcher is closed or the queue is full
+        """
+        if self._closed:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((key, item, time.monotonic()))
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(f"⚠️  [{self.name}] Notification queue full ({self.max_queue}) - dropped {key}")
+            return False
+        self._count("submitted")
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Deliver everything queued now, ignoring the coalescing window
+
+        Digests in retry backoff are attempted once more. Returns False if
+        items are still undelivered after timeout.
+        """
+        if self._thread is None:
+            return self._queue.empty()
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            self._flush_requested = True
+            self._wake()
+            while self._flush_requested:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        with self._digests_lock:
+            return not self._digests
+
+    def close(self, timeout: float = 10.0):
+        """Flush and stop the dispatcher thread"""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._wake()
+            self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _wake(self):
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # The worker is busy with queued items anyway
+
+    # ------------------------------------------------------------------
+    # Dispatcher thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._closed:
+            timeout = None
+            with self._digests_lock:
+                if self._digests:
+                    timeout = max(0.0, min(d.due for d in self._digests.values()) - time.monotonic())
+
+            try:
+                entry = self._queue.get(timeout=timeout)
+                self._add(entry)
+                while True:  # Take the whole burst before sending
+                    self._add(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            with self._idle:
+                flushing = self._flush_requested
+            self._send_due(force=flushing)
+            if flushing:
+                with self._idle:
+                    self._flush_requested = False
+                    self._idle.notify_all()
+
+    def _add(self, entry):
+        if entry is None:
+            return
+        key, item, enqueued_at = entry
+        with self._digests_lock:
+            digest = self._digests.get(key)
+            coalesced = digest is not None
+            if digest is None:
+                digest = self._digests[key] = _Digest(key, enqueued_at + self.window_seconds)
+            digest.items.append(item)
+            digest.enqueued_at.append(enqueued_at)
+            if len(digest.items) >= self.max_batch and digest.attempts == 0:
+                digest.due = 0.0
+        if coalesced:
+            self._count("coalesced")
+
+    def _send_due(self, force: bool = False):
+        now = time.monotonic()
+        with self._digests_lock:
+            due = [d for d in self._digests.values() if force or d.due <= now]
+        for digest in due:
+            self._deliver(digest)
+
+    def _deliver(self, digest: _Digest):
+        started = time.monotonic()
+        try:
+            self.send(digest.key, list(digest.items))
+        except Exception as e:
+            with self._digests_lock:
+                digest.attempts += 1
+                dropped = digest.attempts >= self.max_attempts
+                if dropped:
+                    del self._digests[digest.key]
+                else:
+                    delay = min(MAX_BACKOFF_SECONDS, self.backoff_seconds * 2 ** (digest.attempts - 1))
+                    digest.due = time.monotonic() + delay
+            if dropped:
+                self._count("digests_failed")
+                self._count("items_failed", len(digest.items))
+                logger.error(f"[{self.name}] Dropping notification {digest.key} "
+                             f"({len(digest.items)} items) after {digest.attempts} attempts: {e}")
+                return
+            self._count("retries")
+            logger.warning(f"⚠️  [{self.name}] Notification {digest.key} failed ({e}) - retry in {delay:.1f}s")
+            return
+
+        finished = time.monotonic()
+        with self._digests_lock:
+            del self._digests[digest.key]
+        with self._stats_lock:
+            self._counters["digests_sent"] += 1
+            self._counters["items_sent"] += len(digest.items)
+            self._send_latency_ms.append((finished - started) * 1000)
+            self._delivery_latency_ms.extend((finished - t) * 1000 for t in digest.enqueued_at)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            self._counters[counter] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, delivery counters and latency percentiles (ms)"""
+        with self._stats_lock:
+            counters = dict(self._counters)
+            send_latency = list(self._send_latency_ms)
+            delivery_latency = list(self._delivery_latency_ms)
+        with self._digests_lock:
+            pending_digests = len(self._digests)
+            pending_items = sum(len(d.items) for d in self._digests.values())
+            retrying_digests = sum(1 for d in self._digests.values() if d.attempts)
+
+        return {
+            "name": self.name,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.max_queue,
+            "pending_digests": pending_digests,
+            "pending_items": pending_items,
+            "retrying_digests": retrying_digests,
+            **counters,
+            "send_latency_ms": _latency_summary(send_latency),
+            "delivery_latency_ms": _latency_summary(delivery_latency),
+            "config": {
+                "window_seconds": self.window_seconds,
+                "max_batch": self.max_batch,
+                "max_attempts": self.max_attempts,
+                "backoff_seconds": self.backoff_seconds
+            }
+        }
@@ -15,6 +15,8 @@ Version: 1.0.0
 import os
 import sys
 import logging
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
@@ -118,7 +120,8 @@ class FusionRAG:
         parallel_workers: int = 4,
         rrf_k: int = 60,
         enable_rerank: bool = True,
-        rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+        rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        embedding_cache_size: int = 1024
     ):
         """
         Initialize FusionRAG with all 4 retrieval sources
@@ -132,6 +135,8 @@ class FusionRAG:
             rrf_k: RRF constant (default: 60)
             enable_rerank: Enable CrossEncoder re-ranking (default: True) [Task 0-ARCH.27]
             rerank_model: CrossEncoder model name (default: ms-marco-MiniLM-L-6-v2) [Task 0-ARCH.27]
+            embedding_cache_size: Query embeddings kept in memory (batch
+                retrieval embeds all queries up front)
         """
         logger.info("[FUSION-RAG] Initializing Fusion RAG service...")
 
@@ -140,6 +145,11 @@ class FusionRAG:
         self.rrf_k = rrf_k
         self.enable_rerank = enable_rerank
 
+        # Query embedding cache (LRU), filled by single and batched embedding calls
+        self.embedding_cache_size = embedding_cache_size
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+
         # Track which sources are available
         self.sources_available = {
             'pinecone': False,
@@ -359,18 +369,7 @@ class FusionRAG:
         logger.info(f"[FUSION-RAG] Retrieving for query: {query[:100]}...")
 
         # Step 1: Query expansion (Task 0-ARCH.28)
-        queries = [query]
-        if expand_query and self.query_expander is not None:
-            # Expand query with error category context
-            error_category = filters.get('category') if filters else None
-            queries = self.query_expander.expand(
-                query,
-                error_category=error_category,
-                include_original=True
-            )
-            logger.info(f"[FUSION-RAG] Expanded to {len(queries)} query variations")
-        elif expand_query:
-            logger.warning("[FUSION-RAG] Query expansion requested but expander not available")
+        queries = self._expand_query(query, filters, expand_query)
 
         # Step 2: Parallel retrieval from all available sources
         all_results = []
@@ -406,6 +405,74 @@ class FusionRAG:
 
         return final_results
 
+    def retrieve_many(
+        self,
+        requests: List[Dict[str, Any]],
+        expand_query: bool = False,
+        top_k: int = 5,
+        retrieve_k: int = 50,
+        max_workers: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve for many queries at once (e.g. all distinct failures of a build)
+
+        All query variations are embedded in one batched OpenAI call, then the
+        per-query retrievals run concurrently.
+
+        Args:
+            requests: [{'query': str, 'filters': Optional[dict]}, ...]
+            expand_query: Whether to expand each query
+            top_k: Number of final results per query
+            retrieve_k: Number of results per source
+            max_workers: Concurrent retrievals (default: parallel_workers)
+
+        Returns:
+            One result list per request, in request order
+        """
+        if not requests:
+            return []
+
+        start_time = time.time()
+
+        if self.sources_available['pinecone']:
+            variations = []
+            for req in requests:
+                variations.extend(self._expand_query(req['query'], req.get('filters'), expand_query))
+            self._embed_batch(variations)
+
+        def run(req):
+            try:
+                return self.retrieve(req['query'], filters=req.get('filters'), expand_query=expand_query,
+                                     top_k=top_k, retrieve_k=retrieve_k)
+            except Exception as e:
+                logger.error(f"[FUSION-RAG] Batch retrieval failed for query: {e}")
+                return []
+
+        workers = min(max_workers or self.parallel_workers, len(requests))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run, requests))
+
+        elapsed = time.time() - start_time
+        logger.info(f"[FUSION-RAG] Batch retrieved {len(requests)} queries in {elapsed:.2f}s")
+
+        return results
+
+    def _expand_query(self, query: str, filters: Optional[Dict[str, Any]], expand_query: bool) -> List[str]:
+        """Query variations to retrieve for (original first)"""
+        if expand_query and self.query_expander is not None:
+            # Expand query with error category context
+            error_category = filters.get('category') if filters else None
+            queries = self.query_expander.expand(
+                query,
+                error_category=error_category,
+                include_original=True
+            )
+            logger.info(f"[FUSION-RAG] Expanded to {len(queries)} query variations")
+            return queries
+        elif expand_query:
+            logger.warning("[FUSION-RAG] Query expansion requested but expander not available")
+        return [query]
+
     def _parallel_retrieve(
         self,
         query: str,
@@ -982,6 +1049,12 @@ class FusionRAG:
         Returns:
             Embedding vector or None
         """
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(text)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(text)
+                return embedding
+
         if not OPENAI_AVAILABLE:
             logger.error("[FUSION-RAG] OpenAI not available for embeddings")
             return None
@@ -999,12 +1072,52 @@ class FusionRAG:
                 input=text
             )
 
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            self._cache_embeddings({text: embedding})
+            return embedding
 
         except Exception as e:
             logger.error(f"[FUSION-RAG] Failed to get embedding: {e}")
             return None
 
+    def _embed_batch(self, texts: List[str], batch_size: int = 256) -> int:
+        """
+        Embed texts not yet cached, batch_size texts per OpenAI request
+
+        Returns:
+            Number of texts embedded (0 on failure; callers fall back to
+            per-query embedding)
+        """
+        with self._embedding_cache_lock:
+            missing = list(dict.fromkeys(t for t in texts if t not in self._embedding_cache))
+        if not missing or not OPENAI_AVAILABLE or not os.getenv('OPENAI_API_KEY'):
+            return 0
+
+        embedded = 0
+        try:
+            openai.api_key = os.getenv('OPENAI_API_KEY')
+            for i in range(0, len(missing), batch_size):
+                chunk = missing[i:i + batch_size]
+                response = openai.embeddings.create(
+                    model="text-embedding-ada-002",
+                    input=chunk
+                )
+                self._cache_embeddings({text: item.embedding for text, item in zip(chunk, response.data)})
+                embedded += len(chunk)
+        except Exception as e:
+            logger.error(f"[FUSION-RAG] Batch embedding failed: {e}")
+
+        logger.info(f"[FUSION-RAG] Embedded {embedded} queries in {(len(missing) + batch_size - 1) // batch_size} batch(es)")
+        return embedded
+
+    def _cache_embeddings(self, embeddings: Dict[str, List[float]]):
+        with self._embedding_cache_lock:
+            for text, embedding in embeddings.items():
+                self._embedding_cache[text] = embedding
+                self._embedding_cache.move_to_end(text)
+            while len(self._embedding_cache) > self.embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about available sources and performance
@@ -13,20 +13,37 @@ Redacts:
 - Social Security Numbers
 - API keys and tokens
 
+The regex fallback runs all patterns as one precompiled alternation in a
+single re.sub pass. Texts above PII_STREAM_THRESHOLD characters (multi-MB
+console logs) are redacted in overlapping chunks (redact_stream), which
+also keeps Presidio below the spaCy document size limit.
+
+Presidio is only run on texts with candidate spans (a cheap regex gate:
+digit groups, '@', URLs, long tokens, capitalized names). Its results are
+cached per text hash, and PII_PRESIDIO_WORKERS moves the analyzer into
+worker processes so the NLP model does not run on the caller's thread.
+
 Author: DDN AI Analysis System
 Date: 2025-11-03
 Version: 1.0.0
 """
 
+import bisect
+import hashlib
+import multiprocessing
+import os
 import re
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 
 # Presidio imports
 try:
     from presidio_analyzer import AnalyzerEngine
-    from presidio_anonymizer import AnonymizerEngine
-    from presidio_anonymizer.entities import OperatorConfig
     PRESIDIO_AVAILABLE = True
 except ImportError:
     PRESIDIO_AVAILABLE = False
@@ -36,6 +53,86 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Texts longer than this are redacted in chunks
+STREAM_THRESHOLD_CHARS = int(os.getenv('PII_STREAM_THRESHOLD', 1_000_000))
+STREAM_CHUNK_CHARS = int(os.getenv('PII_STREAM_CHUNK_CHARS', 256 * 1024))
+# Lookahead kept between chunks (longest PII token that is never split)
+STREAM_OVERLAP_CHARS = int(os.getenv('PII_STREAM_OVERLAP_CHARS', 4096))
+# Presidio chunks stay well below spaCy's 1,000,000 character limit
+PRESIDIO_CHUNK_CHARS = 100_000
+
+# Entity details kept per text (counts are always complete)
+MAX_ENTITY_DETAILS = 1000
+
+# Texts without a candidate span skip Presidio
+PRESIDIO_PREFILTER = os.getenv('PII_PREFILTER', 'true').lower() == 'true'
+# Presidio results cached per text hash (0 disables the cache)
+PRESIDIO_CACHE_SIZE = int(os.getenv('PII_CACHE_SIZE', 4096))
+# Presidio worker processes (0 = analyze on the calling thread)
+PRESIDIO_WORKERS = int(os.getenv('PII_PRESIDIO_WORKERS', 0))
+
+Span = Tuple[int, int, str, float]
+
+
+@lru_cache(maxsize=None)
+def _compile_patterns(patterns: Tuple[Tuple[str, str], ...], first_chars: str = '') -> re.Pattern:
+    """
+    One alternation of all patterns; the group name identifies the entity type
+
+    A leading \\b shared by every pattern is tested once per position instead
+    of once per alternative, and `first_chars` (a character class every match
+    starts with) rejects most remaining positions before any alternative runs.
+    """
+    if all(pattern.startswith(r'\b') for _, pattern in patterns):
+        alternatives = '|'.join(f'(?P<{name}>{pattern[2:]})' for name, pattern in patterns)
+        prefix = r'\b' + (f'(?={first_chars})' if first_chars else '')
+        return re.compile(f'{prefix}(?:{alternatives})', re.IGNORECASE)
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in patterns), re.IGNORECASE)
+
+
+def _resolve_overlaps(results) -> List[Span]:
+    """Non-overlapping analyzer results sorted by start (higher score, then longer wins)"""
+    spans = []
+    for result in sorted(results, key=lambda r: (-r.score, -(r.end - r.start))):
+        index = bisect.bisect_left(spans, (result.start,))
+        if index and spans[index - 1][1] > result.start:
+            continue
+        if index < len(spans) and spans[index][0] < result.end:
+            continue
+        spans.insert(index, (result.start, result.end, result.entity_type, result.score))
+    return spans
+
+
+# Analyzer of a Presidio worker process
+_worker_analyzer = None
+
+
+def _init_presidio_worker(analyzer_factory: Callable):
+    """Load the analyzer (spaCy model) once per worker process"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer_factory()
+
+
+def _analyze_in_worker(text: str, language: str, entities: List[str]) -> List[Span]:
+    return _resolve_overlaps(_worker_analyzer.analyze(text=text, language=language, entities=entities))
+
+
+class _Findings:
+    """Redactions of one text: complete counts, capped entity details"""
+
+    def __init__(self):
+        self.by_type = Counter()
+        self.entities = []
+
+    def add(self, entity_type: str, start: int, end: int, score: float):
+        self.by_type[entity_type] += 1
+        if len(self.entities) < MAX_ENTITY_DETAILS:
+            self.entities.append({'type': entity_type, 'start': start, 'end': end, 'score': score})
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_type.values())
+
 
 class PIIRedactor:
     """
@@ -77,6 +174,9 @@ class PIIRedactor:
         'JWT': r'\beyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\b'
     }
 
+    # Characters a REGEX_PATTERNS match can start with (keep in sync)
+    REGEX_FIRST_CHARS = r'[\w.%+(-]'
+
     # Replacement tokens
     REPLACEMENT_TOKENS = {
         'EMAIL': '<EMAIL>',
@@ -94,21 +194,52 @@ class PIIRedactor:
         'US_BANK_NUMBER': '<BANK_ACCOUNT>'
     }
 
-    def __init__(self, use_presidio: bool = True):
+    # Text Presidio may report PII in (case-sensitive); texts without a match
+    # skip the analyzer. Single lowercase names or names at the start of a
+    # sentence are not candidates - set PII_PREFILTER=false to analyze all text.
+    PRESIDIO_CANDIDATE_PATTERNS = {
+        # Phone, card, SSN, bank/passport/license numbers, IPs, dates
+        'DIGITS': r'\d{4}|\d{3}[-.\s)/]\d|\d{1,3}(?:\.\d{1,3}){3}',
+        'EMAIL_URL': r'@|://|\bwww\.',
+        # IBAN, crypto wallets and other long alphanumeric identifiers
+        'TOKEN': r'\b(?=[A-Za-z]*\d)[A-Za-z0-9]{20,}\b',
+        # "John Smith", "New York", "... user Alice ..." (not Class.method or CamelCase)
+        'NAME': r'(?<![\w.$/\\])[A-Z][a-z]+[ \t]+[A-Z][a-z]+(?![\w(./\\])|(?<=[a-z] )[A-Z][a-z]+(?![\w(./\\])'
+    }
+
+    def __init__(self, use_presidio: bool = True, workers: Optional[int] = None,
+                 cache_size: Optional[int] = None, prefilter: Optional[bool] = None,
+                 analyzer_factory: Optional[Callable] = None):
         """
         Initialize PII redactor
 
         Args:
             use_presidio: Whether to use Presidio (True) or regex fallback (False)
+            workers: Presidio worker processes (default: PII_PRESIDIO_WORKERS, 0 = in-process)
+            cache_size: Cached Presidio results (default: PII_CACHE_SIZE)
+            prefilter: Skip Presidio for texts without candidates (default: PII_PREFILTER)
+            analyzer_factory: Builds the analyzer (default: presidio AnalyzerEngine)
         """
-        self.use_presidio = use_presidio and PRESIDIO_AVAILABLE
+        self.analyzer_factory = analyzer_factory or (AnalyzerEngine if PRESIDIO_AVAILABLE else None)
+        self.use_presidio = use_presidio and self.analyzer_factory is not None
+        self.workers = PRESIDIO_WORKERS if workers is None else workers
+        self.cache_size = PRESIDIO_CACHE_SIZE if cache_size is None else cache_size
+        self.prefilter = PRESIDIO_PREFILTER if prefilter is None else prefilter
         self.analyzer = None
-        self.anonymizer = None
 
-        if self.use_presidio:
+        self._regex = _compile_patterns(tuple(self.REGEX_PATTERNS.items()), self.REGEX_FIRST_CHARS)
+        self._candidates = re.compile('|'.join(f'(?:{pattern})' for pattern in
+                                               self.PRESIDIO_CANDIDATE_PATTERNS.values()))
+        self._cache = OrderedDict()
+        self._pool = None
+        self._lock = threading.Lock()
+
+        if self.use_presidio and self.workers > 0:
+            # The analyzer is loaded by the worker processes
+            logger.info(f"✓ PII Redactor initialized with Presidio ({self.workers} worker processes)")
+        elif self.use_presidio:
             try:
-                self.analyzer = AnalyzerEngine()
-                self.anonymizer = AnonymizerEngine()
+                self.analyzer = self.analyzer_factory()
                 logger.info("✓ PII Redactor initialized with Presidio")
             except Exception as e:
                 logger.warning(f"Failed to initialize Presidio, using regex fallback: {e}")
@@ -121,6 +252,11 @@ class PIIRedactor:
             'total_redactions': 0,
             'by_type': {}
         }
+        self.presidio_stats = {
+            'analyzed': 0,
+            'skipped': 0,
+            'cache_hits': 0
+        }
 
     def redact(self, text: str, language: str = 'en') -> Tuple[str, Dict]:
         """
@@ -136,87 +272,257 @@ class PIIRedactor:
         if not text or not isinstance(text, str):
             return text, {'redactions': 0, 'entities': []}
 
+        if len(text) > STREAM_THRESHOLD_CHARS:
+            metadata = {}
+            redacted = ''.join(self.redact_stream([text], metadata=metadata, language=language))
+            return redacted, metadata
+
         if self.use_presidio:
             return self._redact_with_presidio(text, language)
         else:
             return self._redact_with_regex(text)
 
-    def _redact_with_presidio(self, text: str, language: str) -> Tuple[str, Dict]:
-        """Redact PII using Presidio"""
+    def _redact_with_presidio(self, text: str, language: str,
+                              spans: Optional[List[Span]] = None) -> Tuple[str, Dict]:
+        """Redact PII using Presidio (spans: results already analyzed for text)"""
         try:
-            analyzer_results = self.analyzer.analyze(
-                text=text,
-                language=language,
-                entities=self.PII_ENTITIES
-            )
-
-            if not analyzer_results:
-                return text, {'redactions': 0, 'entities': []}
-
-            operators = {}
-            for entity_type in self.PII_ENTITIES:
-                replacement = self.REPLACEMENT_TOKENS.get(entity_type, f'<{entity_type}>')
-                operators[entity_type] = OperatorConfig("replace", {"new_value": replacement})
-
-            anonymized_result = self.anonymizer.anonymize(
-                text=text,
-                analyzer_results=analyzer_results,
-                operators=operators
-            )
-
-            entities_found = [{
-                'type': result.entity_type,
-                'start': result.start,
-                'end': result.end,
-                'score': result.score
-            } for result in analyzer_results]
-
-            self.redaction_stats['total_redactions'] += len(entities_found)
-            for entity in entities_found:
-                entity_type = entity['type']
-                self.redaction_stats['by_type'][entity_type] = \
-                    self.redaction_stats['by_type'].get(entity_type, 0) + 1
-
-            return anonymized_result.text, {
-                'redactions': len(entities_found),
-                'entities': entities_found,
-                'method': 'presidio'
-            }
-
+            if spans is None:
+                spans = self._analyze_many([text], language)[0]
         except Exception as e:
             logger.error(f"Presidio redaction failed: {e}")
             return self._redact_with_regex(text)
 
+        findings = _Findings()
+        parts = []
+        position = 0
+        for start, end, entity_type, score in spans:
+            parts.append(text[position:start])
+            parts.append(self.REPLACEMENT_TOKENS.get(entity_type, f'<{entity_type}>'))
+            findings.add(entity_type, start, end, score)
+            position = end
+        parts.append(text[position:])
+
+        return ''.join(parts), self._finish(findings, 'presidio')
+
+    # ------------------------------------------------------------------
+    # Presidio analysis (gate, cache, worker processes)
+    # ------------------------------------------------------------------
+
+    def _analyze_many(self, texts: List[str], language: str) -> List[List[Span]]:
+        """Presidio spans for each text; identical texts are analyzed once"""
+        spans = [None] * len(texts)
+        pending = OrderedDict()  # cache key -> indexes of texts to analyze
+
+        for index, text in enumerate(texts):
+            if self.prefilter and not self._candidates.search(text):
+                spans[index] = []
+                self.presidio_stats['skipped'] += 1
+                continue
+            key = self._cache_key(text, language) if self.cache_size > 0 else index
+            cached = self._cache_get(key)
+            if cached is not None:
+                spans[index] = cached
+                self.presidio_stats['cache_hits'] += 1
+            else:
+                pending.setdefault(key, []).append(index)
+
+        if pending:
+            results = self._run_analyzer([texts[indexes[0]] for indexes in pending.values()], language)
+            self.presidio_stats['analyzed'] += len(results)
+            for (key, indexes), result in zip(pending.items(), results):
+                self._cache_put(key, result)
+                for index in indexes:
+                    spans[index] = result
+        return spans
+
+    def _run_analyzer(self, texts: List[str], language: str) -> List[List[Span]]:
+        """Analyze texts in the worker processes, or on this thread"""
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                futures = [pool.submit(_analyze_in_worker, text, language, self.PII_ENTITIES) for text in texts]
+                return [future.result() for future in futures]
+            except BrokenProcessPool as e:
+                logger.error(f"Presidio worker processes failed, analyzing in-process: {e}")
+                self.close()
+                self.workers = 0
+
+        analyzer = self._get_analyzer()
+        return [_resolve_overlaps(analyzer.analyze(text=text, language=language, entities=self.PII_ENTITIES))
+                for text in texts]
+
+    def _get_analyzer(self):
+        with self._lock:
+            if self.analyzer is None:
+                try:
+                    self.analyzer = self.analyzer_factory()
+                except Exception:
+                    self.use_presidio = False
+                    raise
+            return self.analyzer
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # spawn: the caller may run other threads (e.g. the listener's writer)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_presidio_worker,
+                                                 initargs=(self.analyzer_factory,))
+            return self._pool
+
+    @staticmethod
+    def _cache_key(text: str, language: str) -> Tuple[str, bytes]:
+        return language, hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def _cache_get(self, key) -> Optional[List[Span]]:
+        if self.cache_size <= 0:
+            return None
+        with self._lock:
+            spans = self._cache.get(key)
+            if spans is not None:
+                self._cache.move_to_end(key)
+            return spans
+
+    def _cache_put(self, key, spans: List[Span]):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = spans
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def close(self):
+        """Stop the Presidio worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
     def _redact_with_regex(self, text: str) -> Tuple[str, Dict]:
-        """Redact PII using regex patterns (fallback)"""
-        redacted = text
-        entities_found = []
-
-        for pattern_name, pattern in self.REGEX_PATTERNS.items():
-            matches = list(re.finditer(pattern, redacted, re.IGNORECASE))
-
-            for match in matches:
-                entities_found.append({
-                    'type': pattern_name,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'score': 1.0
-                })
-
-                replacement = self.REPLACEMENT_TOKENS.get(pattern_name, f'<{pattern_name}>')
-                redacted = redacted[:match.start()] + replacement + redacted[match.end():]
-
-        self.redaction_stats['total_redactions'] += len(entities_found)
-        for entity in entities_found:
-            entity_type = entity['type']
+        """Redact PII using regex patterns (fallback): one re.sub pass over all patterns"""
+        findings = _Findings()
+
+        def replace(match):
+            findings.add(match.lastgroup, match.start(), match.end(), 1.0)
+            return self.REPLACEMENT_TOKENS.get(match.lastgroup, f'<{match.lastgroup}>')
+
+        redacted = self._regex.sub(replace, text)
+        return redacted, self._finish(findings, 'regex')
+
+    def _finish(self, findings: _Findings, method: str, streamed: bool = False) -> Dict:
+        """Record statistics and build the redaction metadata"""
+        self.redaction_stats['total_redactions'] += findings.total
+        for entity_type, count in findings.by_type.items():
             self.redaction_stats['by_type'][entity_type] = \
-                self.redaction_stats['by_type'].get(entity_type, 0) + 1
+                self.redaction_stats['by_type'].get(entity_type, 0) + count
 
-        return redacted, {
-            'redactions': len(entities_found),
-            'entities': entities_found,
-            'method': 'regex'
+        metadata = {
+            'redactions': findings.total,
+            'entities': findings.entities,
+            'method': method
         }
+        if streamed:
+            metadata['by_type'] = dict(findings.by_type)
+            metadata['streamed'] = True
+        return metadata
+
+    # ------------------------------------------------------------------
+    # Streaming (large texts)
+    # ------------------------------------------------------------------
+
+    def redact_stream(self, chunks: Iterable[str], metadata: Optional[Dict] = None,
+                      language: str = 'en') -> Iterator[str]:
+        """
+        Redact a text given as chunks (e.g. a console log read from a file)
+
+        Yields redacted text as soon as it is final. Each window is scanned
+        with STREAM_OVERLAP_CHARS of lookahead; a match that reaches into
+        the lookahead is deferred to the next window, so PII up to that
+        length is never split between chunks.
+
+        Args:
+            chunks: Text pieces, in order
+            metadata: Filled with the redaction metadata when the stream ends
+            language: Language code (Presidio)
+        """
+        use_presidio = self.use_presidio
+        piece_chars = PRESIDIO_CHUNK_CHARS if use_presidio else STREAM_CHUNK_CHARS
+        findings = _Findings()
+        buffer = ''
+        start = 0      # Scan position in buffer (text before it is context only)
+        consumed = 0   # Characters of the original text before buffer[0]
+
+        def pieces():
+            for chunk in chunks:
+                for offset in range(0, len(chunk), piece_chars):
+                    yield chunk[offset:offset + piece_chars]
+
+        for piece in pieces():
+            buffer += piece
+            if len(buffer) - start < piece_chars + STREAM_OVERLAP_CHARS:
+                continue
+            try:
+                redacted, resume = self._redact_window(buffer, start, False, findings, consumed,
+                                                       use_presidio, language)
+            except Exception as e:
+                if not use_presidio:
+                    raise
+                logger.error(f"Presidio redaction failed: {e}")
+                use_presidio = False
+                redacted, resume = self._redact_window(buffer, start, False, findings, consumed,
+                                                       False, language)
+            yield redacted
+
+            # Keep one character of context for word boundaries (\b)
+            keep = max(0, resume - 1)
+            buffer = buffer[keep:]
+            consumed += keep
+            start = resume - keep
+
+        redacted, _ = self._redact_window(buffer, start, True, findings, consumed, use_presidio, language)
+        if redacted:
+            yield redacted
+
+        result = self._finish(findings, 'presidio' if use_presidio else 'regex', streamed=True)
+        if metadata is not None:
+            metadata.update(result)
+
+    def _redact_window(self, buffer: str, start: int, final: bool, findings: _Findings,
+                       consumed: int, use_presidio: bool, language: str) -> Tuple[str, int]:
+        """
+        Redact buffer[start:] up to the lookahead
+
+        Returns:
+            (redacted text, buffer position where the next window resumes)
+        """
+        end = len(buffer)
+        cut = end if final else end - STREAM_OVERLAP_CHARS
+        spans = self._presidio_spans(buffer, start, language) if use_presidio else (
+            (m.start(), m.end(), m.lastgroup, 1.0) for m in self._regex.finditer(buffer, start)
+        )
+
+        parts = []
+        position = start
+        for span_start, span_end, entity_type, score in spans:
+            if not final and (span_start >= cut or span_end >= end):
+                cut = min(cut, span_start)  # Decided with more text in the next window
+                break
+            parts.append(buffer[position:span_start])
+            parts.append(self.REPLACEMENT_TOKENS.get(entity_type, f'<{entity_type}>'))
+            findings.add(entity_type, consumed + span_start, consumed + span_end, score)
+            position = span_end
+
+        resume = max(position, cut)
+        parts.append(buffer[position:resume])
+        return ''.join(parts), resume
+
+    def _presidio_spans(self, buffer: str, start: int, language: str) -> List[Span]:
+        """Non-overlapping Presidio results in buffer[start:], as buffer offsets"""
+        spans = self._analyze_many([buffer[start:]], language)[0]
+        return [(s + start, e + start, entity_type, score) for s, e, entity_type, score in spans]
 
     def redact_failure_data(self, failure_data: Dict) -> Tuple[Dict, Dict]:
         """
@@ -231,16 +537,29 @@ class PIIRedactor:
         }
 
         fields_to_redact = ['error_message', 'stack_trace', 'error_log', 'test_name']
+        fields = [field for field in fields_to_redact if field in redacted_data and redacted_data[field]]
+        texts = [str(redacted_data[field]) for field in fields]
+
+        # Analyze all fields at once (in parallel with worker processes)
+        analyzed = {}
+        if self.use_presidio:
+            indexes = [index for index, text in enumerate(texts) if len(text) <= STREAM_THRESHOLD_CHARS]
+            try:
+                analyzed = dict(zip(indexes, self._analyze_many([texts[index] for index in indexes], 'en')))
+            except Exception as e:
+                logger.error(f"Presidio redaction failed: {e}")
 
-        for field in fields_to_redact:
-            if field in redacted_data and redacted_data[field]:
-                original_text = str(redacted_data[field])
+        for index, field in enumerate(fields):
+            original_text = texts[index]
+            if index in analyzed:
+                redacted_text, metadata = self._redact_with_presidio(original_text, 'en', analyzed[index])
+            else:
                 redacted_text, metadata = self.redact(original_text)
 
-                if metadata['redactions'] > 0:
-                    redacted_data[field] = redacted_text
-                    all_metadata['fields_redacted'][field] = metadata
-                    all_metadata['total_redactions'] += metadata['redactions']
+            if metadata['redactions'] > 0:
+                redacted_data[field] = redacted_text
+                all_metadata['fields_redacted'][field] = metadata
+                all_metadata['total_redactions'] += metadata['redactions']
 
         redacted_data['pii_redacted'] = all_metadata['total_redactions'] > 0
         redacted_data['pii_redaction_metadata'] = all_metadata
@@ -253,7 +572,8 @@ class PIIRedactor:
             'total_redactions': self.redaction_stats['total_redactions'],
             'redactions_by_type': self.redaction_stats['by_type'].copy(),
             'method': 'presidio' if self.use_presidio else 'regex',
-            'presidio_available': PRESIDIO_AVAILABLE
+            'presidio_available': PRESIDIO_AVAILABLE,
+            'presidio': dict(self.presidio_stats, workers=self.workers, cached=len(self._cache))
         }
 
 
@@ -3,7 +3,8 @@ Slack Integration Service
 Port: 5007
 Purpose: Send test failure notifications to Slack channels with AI-generated insights
 Features:
-- Send rich messages with failure details
+- Send rich messages with failure details (queued, coalesced per
+  build/category into digests and retried in the background)
 - Interactive buttons for feedback
 - Thread updates for status changes
 - Channel routing based on severity
@@ -19,6 +20,8 @@ import os
 import json
 from datetime import datetime
 
+from notification_dispatcher import NotificationDispatcher
+
 app = Flask(__name__)
 CORS(app)
 
@@ -37,6 +40,9 @@ POSTGRES_CONFIG = {
 
 DASHBOARD_URL = os.getenv('DASHBOARD_URL', 'http://localhost:3000')
 
+# Failures listed in a digest message (Slack allows 50 blocks per message)
+DIGEST_MAX_FAILURES = 10
+
 # Slack API headers
 SLACK_HEADERS = {
     'Authorization': f'Bearer {SLACK_BOT_TOKEN}',
@@ -75,162 +81,232 @@ def get_color_by_confidence(confidence_score):
         return '#f44336'  # Red
 
 
-@app.route('/api/slack/send-notification', methods=['POST'])
-def send_slack_notification():
-    """
-    Send test failure notification to Slack
-    Request body:
-    {
-        "build_id": "12345",
-        "job_name": "Test Suite",
-        "error_category": "CODE_ERROR",
-        "root_cause": "...",
-        "fix_recommendation": "...",
-        "confidence_score": 0.95,
-        "consecutive_failures": 3,
-        "build_url": "http://jenkins/..."
-    }
-    """
-    try:
-        data = request.get_json()
-
-        build_id = data.get('build_id')
-        job_name = data.get('job_name', 'Unknown Job')
-        error_category = data.get('error_category')
-        root_cause = data.get('root_cause', 'N/A')
-        fix_recommendation = data.get('fix_recommendation', 'N/A')
-        confidence_score = data.get('confidence_score', 0)
-        consecutive_failures = data.get('consecutive_failures', 1)
-        build_url = data.get('build_url', '')
-
-        # Determine channel
-        channel = get_channel_by_category(error_category, consecutive_failures)
-        color = get_color_by_confidence(confidence_score)
-
-        # Build Slack message blocks
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"🚨 Test Failure Detected: {job_name}",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Build ID:*\n`{build_id}`"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Category:*\n{error_category}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Consecutive Failures:*\n{consecutive_failures}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*AI Confidence:*\n{int(confidence_score * 100)}%"
-                    }
-                ]
-            },
-            {
-                "type": "divider"
-            },
-            {
-                "type": "section",
-                "text": {
+def build_failure_blocks(notification):
+    """Slack message blocks for one failure notification"""
+    build_id = notification['build_id']
+    job_name = notification['job_name']
+    error_category = notification['error_category']
+    root_cause = notification['root_cause']
+    fix_recommendation = notification['fix_recommendation']
+    confidence_score = notification['confidence_score']
+    consecutive_failures = notification['consecutive_failures']
+    build_url = notification['build_url']
+
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"🚨 Test Failure Detected: {job_name}",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "fields": [
+                {
                     "type": "mrkdwn",
-                    "text": f"*🔍 Root Cause:*\n{root_cause[:500]}{'...' if len(root_cause) > 500 else ''}"
-                }
-            },
-            {
-                "type": "section",
-                "text": {
+                    "text": f"*Build ID:*\n`{build_id}`"
+                },
+                {
+                    "type": "mrkdwn",
+                    "text": f"*Category:*\n{error_category}"
+                },
+                {
                     "type": "mrkdwn",
-                    "text": f"*💡 Recommended Fix:*\n{fix_recommendation[:500]}{'...' if len(fix_recommendation) > 500 else ''}"
+                    "text": f"*Consecutive Failures:*\n{consecutive_failures}"
+                },
+                {
+                    "type": "mrkdwn",
+                    "text": f"*AI Confidence:*\n{int(confidence_score * 100)}%"
                 }
-            },
-            {
-                "type": "divider"
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "✅ Fix Worked",
-                            "emoji": True
-                        },
-                        "style": "primary",
-                        "value": json.dumps({"build_id": build_id, "feedback": "success"}),
-                        "action_id": "feedback_success"
+            ]
+        },
+        {
+            "type": "divider"
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*🔍 Root Cause:*\n{root_cause[:500]}{'...' if len(root_cause) > 500 else ''}"
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*💡 Recommended Fix:*\n{fix_recommendation[:500]}{'...' if len(fix_recommendation) > 500 else ''}"
+            }
+        },
+        {
+            "type": "divider"
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "✅ Fix Worked",
+                        "emoji": True
                     },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "❌ Fix Failed",
-                            "emoji": True
-                        },
-                        "style": "danger",
-                        "value": json.dumps({"build_id": build_id, "feedback": "failed"}),
-                        "action_id": "feedback_failed"
+                    "style": "primary",
+                    "value": json.dumps({"build_id": build_id, "feedback": "success"}),
+                    "action_id": "feedback_success"
+                },
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "❌ Fix Failed",
+                        "emoji": True
                     },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "📊 View Dashboard",
-                            "emoji": True
-                        },
-                        "url": f"{DASHBOARD_URL}/failures/{build_id}",
-                        "action_id": "view_dashboard"
+                    "style": "danger",
+                    "value": json.dumps({"build_id": build_id, "feedback": "failed"}),
+                    "action_id": "feedback_failed"
+                },
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "📊 View Dashboard",
+                        "emoji": True
                     },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "🔗 Jenkins Build",
-                            "emoji": True
-                        },
-                        "url": build_url,
-                        "action_id": "view_jenkins"
-                    }
-                ]
+                    "url": f"{DASHBOARD_URL}/failures/{build_id}",
+                    "action_id": "view_dashboard"
+                },
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "🔗 Jenkins Build",
+                        "emoji": True
+                    },
+                    "url": build_url,
+                    "action_id": "view_jenkins"
+                }
+            ]
+        }
+    ]
+    return blocks
+
+
+def build_digest_blocks(notifications):
+    """Slack message blocks for several failures of one build and category"""
+    first = notifications[0]
+    build_id = first['build_id']
+    build_url = next((n['build_url'] for n in notifications if n['build_url']), '')
+
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"🚨 {len(notifications)} Test Failures Detected: {first['job_name']}",
+                "emoji": True
             }
-        ]
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": f"*Build ID:*\n`{build_id}`"},
+                {"type": "mrkdwn", "text": f"*Category:*\n{first['error_category']}"},
+                {"type": "mrkdwn", "text": f"*Consecutive Failures:*\n"
+                                           f"{max(n['consecutive_failures'] for n in notifications)}"},
+                {"type": "mrkdwn", "text": f"*AI Confidence:*\n"
+                                           f"{int(min(n['confidence_score'] for n in notifications) * 100)}%"
+                                           f" - {int(max(n['confidence_score'] for n in notifications) * 100)}%"}
+            ]
+        },
+        {
+            "type": "divider"
+        }
+    ]
+
+    for notification in notifications[:DIGEST_MAX_FAILURES]:
+        root_cause = notification['root_cause']
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*{notification['job_name']}* ({int(notification['confidence_score'] * 100)}%)\n"
+                        f"🔍 {root_cause[:200]}{'...' if len(root_cause) > 200 else ''}"
+            }
+        })
+    if len(notifications) > DIGEST_MAX_FAILURES:
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn",
+                          "text": f"... and {len(notifications) - DIGEST_MAX_FAILURES} more failures"}]
+        })
 
-        # Send message to Slack
-        payload = {
-            'channel': channel,
-            'blocks': blocks,
-            'text': f'Test Failure: {job_name} - {error_category}'  # Fallback text
+    blocks.extend([
+        {
+            "type": "divider"
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "📊 View Dashboard", "emoji": True},
+                    "url": f"{DASHBOARD_URL}/failures/{build_id}",
+                    "action_id": "view_dashboard"
+                },
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "🔗 Jenkins Build", "emoji": True},
+                    "url": build_url,
+                    "action_id": "view_jenkins"
+                }
+            ]
         }
+    ])
+    return blocks
 
-        response = requests.post(
-            'https://slack.com/api/chat.postMessage',
-            headers=SLACK_HEADERS,
-            data=json.dumps(payload)
-        )
 
-        slack_response = response.json()
+def deliver_slack_notifications(key, notifications):
+    """
+    Post one message for the coalesced notifications of a build/category
 
-        if not slack_response.get('ok'):
-            return jsonify({
-                'status': 'error',
-                'message': f"Slack API error: {slack_response.get('error')}"
-            }), 500
+    Runs on the dispatcher thread; raising makes the dispatcher retry with
+    backoff. The message timestamp is stored for thread updates.
+    """
+    channel, build_id, error_category = key
+
+    if len(notifications) == 1:
+        blocks = build_failure_blocks(notifications[0])
+        text = f"Test Failure: {notifications[0]['job_name']} - {error_category}"  # Fallback text
+    else:
+        blocks = build_digest_blocks(notifications)
+        text = f"{len(notifications)} Test Failures: build {build_id} - {error_category}"
+
+    payload = {
+        'channel': channel,
+        'blocks': blocks,
+        'text': text
+    }
+
+    response = requests.post(
+        'https://slack.com/api/chat.postMessage',
+        headers=SLACK_HEADERS,
+        data=json.dumps(payload),
+        timeout=10
+    )
+    response.raise_for_status()
+
+    slack_response = response.json()
+
+    if not slack_response.get('ok'):
+        raise RuntimeError(f"Slack API error: {slack_response.get('error')}")
 
-        # Store message timestamp for thread updates
-        message_ts = slack_response.get('ts')
+    # Store message timestamp for thread updates (the message is already
+    # posted, so a database error must not trigger a retry)
+    message_ts = slack_response.get('ts')
 
+    try:
         conn = get_postgres_connection()
         cursor = conn.cursor()
 
@@ -243,12 +319,63 @@ def send_slack_notification():
         conn.commit()
         cursor.close()
         conn.close()
+    except Exception as e:
+        print(f"[Slack] Failed to store message timestamp for build {build_id}: {e}")
+
+
+# Notifications are posted in the background, coalesced per build/category
+slack_dispatcher = NotificationDispatcher(deliver_slack_notifications, name="Slack")
+
+
+@app.route('/api/slack/send-notification', methods=['POST'])
+def send_slack_notification():
+    """
+    Queue a test failure notification for Slack
+
+    The notification is posted by the background dispatcher; failures of the
+    same build and category arriving within NOTIFY_COALESCE_SECONDS are sent
+    as one digest message. Returns 202 once queued, 503 if the queue is full.
+
+    Request body:
+    {
+        "build_id": "12345",
+        "job_name": "Test Suite",
+        "error_category": "CODE_ERROR",
+        "root_cause": "...",
+        "fix_recommendation": "...",
+        "confidence_score": 0.95,
+        "consecutive_failures": 3,
+        "build_url": "http://jenkins/..."
+    }
+    """
+    try:
+        data = request.get_json()
+
+        notification = {
+            'build_id': data.get('build_id'),
+            'job_name': data.get('job_name', 'Unknown Job'),
+            'error_category': data.get('error_category'),
+            'root_cause': data.get('root_cause', 'N/A'),
+            'fix_recommendation': data.get('fix_recommendation', 'N/A'),
+            'confidence_score': data.get('confidence_score', 0),
+            'consecutive_failures': data.get('consecutive_failures', 1),
+            'build_url': data.get('build_url', '')
+        }
+
+        # Determine channel
+        channel = get_channel_by_category(notification['error_category'], notification['consecutive_failures'])
+
+        key = (channel, notification['build_id'], notification['error_category'])
+        if not slack_dispatcher.submit(key, notification):
+            return jsonify({
+                'status': 'error',
+                'message': 'Notification queue is full'
+            }), 503
 
         return jsonify({
-            'status': 'success',
-            'channel': channel,
-            'message_ts': message_ts
-        })
+            'status': 'queued',
+            'channel': channel
+        }), 202
 
     except Exception as e:
         return jsonify({
@@ -257,6 +384,12 @@ def send_slack_notification():
         }), 500
 
 
+@app.route('/api/slack/notifications/stats', methods=['GET'])
+def get_notification_stats():
+    """Notification queue depth, delivery counters and send latency"""
+    return jsonify(slack_dispatcher.get_stats())
+
+
 @app.route('/api/slack/interactions', methods=['POST'])
 def handle_slack_interactions():
     """
@@ -497,7 +630,8 @@ if __name__ == '__main__':
     print("=" * 60)
     print("\nAvailable Endpoints:")
     print("  GET  /health                      - Health check")
-    print("  POST /api/slack/send-notification - Send notification")
+    print("  POST /api/slack/send-notification - Queue notification")
+    print("  GET  /api/slack/notifications/stats - Notification queue stats")
     print("  POST /api/slack/interactions      - Handle button clicks")
     print("  POST /api/slack/update-thread     - Update message thread")
     print("  POST /api/slack/slash-command     - Handle slash commands")
@@ -24,6 +24,9 @@ load_dotenv()
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+# Failure-signature fingerprints (analysis dedup across workers)
+from failure_fingerprint import compute_fingerprint, raw_failure_key, get_fingerprint_cache, is_cacheable_analysis
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -79,6 +82,13 @@ app.conf.update(
     task_send_sent_event=True
 )
 
+# Seconds a task waits for another worker analyzing the same failure signature
+FINGERPRINT_DEDUP_WAIT_SECONDS = int(os.getenv('FINGERPRINT_DEDUP_WAIT_SECONDS', 60))
+
+# Time limits for in-process batch analysis (one ReAct batch per build)
+BATCH_TASK_SOFT_TIME_LIMIT = int(os.getenv('BATCH_TASK_SOFT_TIME_LIMIT', 900))
+BATCH_TASK_TIME_LIMIT = int(os.getenv('BATCH_TASK_TIME_LIMIT', 1200))
+
 logger.info(f"✓ Celery app configured")
 logger.info(f"  - Broker: {CELERY_BROKER_URL}")
 logger.info(f"  - Backend: {CELERY_RESULT_BACKEND}")
@@ -155,6 +165,42 @@ def analyze_test_failure(
 
     logger.info(f"[Task {task_id}] Starting analysis for build {failure_data.get('build_number', 'unknown')}")
 
+    # Dedup by failure signature: reuse a recent analysis, or wait for the
+    # worker already analyzing the same signature
+    signature = compute_fingerprint(
+        failure_data.get('error_message', ''),
+        failure_data.get('error_log', ''),
+        failure_data.get('stack_trace', '')
+    )
+    raw_key = raw_failure_key(
+        failure_data.get('error_message', ''),
+        failure_data.get('error_log', ''),
+        failure_data.get('stack_trace', '')
+    )
+    fingerprint_cache = get_fingerprint_cache()
+
+    cached_analysis = fingerprint_cache.get(signature, raw_key=raw_key)
+    claimed = False
+    if cached_analysis is None:
+        claimed = fingerprint_cache.acquire(signature, ttl_seconds=app.conf.task_time_limit)
+        if not claimed:
+            logger.info(f"[Task {task_id}] Waiting for in-flight analysis of signature {signature.fingerprint[:12]}")
+            cached_analysis = fingerprint_cache.wait_for(signature, FINGERPRINT_DEDUP_WAIT_SECONDS, raw_key=raw_key)
+
+    if cached_analysis is not None:
+        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        logger.info(f"[Task {task_id}] ✓ Reused analysis for signature {signature.fingerprint[:12]} "
+                    f"({cached_analysis['fingerprint_match']['match']} match)")
+        return {
+            'task_id': task_id,
+            'status': 'SUCCESS',
+            'analysis': cached_analysis,
+            'deduplicated': True,
+            'fingerprint': signature.fingerprint,
+            'execution_time_ms': execution_time,
+            'timestamp': datetime.now().isoformat()
+        }
+
     try:
         # Import AI service functions (inside task to avoid circular imports)
         from ai_analysis_service import analyze_with_react_agent, format_react_result_with_gemini, verify_react_result_with_crag
@@ -202,11 +248,17 @@ def analyze_test_failure(
         # Calculate execution time
         execution_time = (datetime.now() - start_time).total_seconds() * 1000
 
+        if react_result is not None and not verified_result.get('verification_failed') \
+                and is_cacheable_analysis(final_result):
+            fingerprint_cache.put(signature, final_result, raw_key=raw_key)
+
         # Prepare result
         result = {
             'task_id': task_id,
             'status': 'SUCCESS',
             'analysis': final_result,
+            'deduplicated': False,
+            'fingerprint': signature.fingerprint,
             'execution_time_ms': execution_time,
             'timestamp': datetime.now().isoformat()
         }
@@ -246,6 +298,10 @@ def analyze_test_failure(
             'timestamp': datetime.now().isoformat()
         }
 
+    finally:
+        if claimed:
+            fingerprint_cache.release(signature)
+
 
 # ============================================================================
 # TASK: BATCH ANALYZE FAILURES
@@ -253,7 +309,9 @@ def analyze_test_failure(
 
 @app.task(
     name='tasks.batch_analyze_failures',
-    bind=True
+    bind=True,
+    soft_time_limit=BATCH_TASK_SOFT_TIME_LIMIT,
+    time_limit=BATCH_TASK_TIME_LIMIT
 )
 def batch_analyze_failures(
     self,
@@ -262,32 +320,134 @@ def batch_analyze_failures(
     """
     Analyze multiple test failures in batch
 
+    Failures with a recent analysis of their signature reuse it. Signatures
+    this worker claims are analyzed together in-process with
+    ReActAgent.analyze_many() (shared classification and retrieval, one
+    analysis per signature). Signatures another worker is analyzing, and
+    everything if the ReAct agent is unavailable, are queued as individual
+    analyze_test_failure tasks (which wait for the in-flight analysis).
+
     Args:
         failure_list: List of failure_data dicts
 
     Returns:
         Dict with batch results:
             - total: Total number of failures
+            - analyzed: Number analyzed in this task
+            - deduplicated: Number served from the fingerprint cache
             - queued: Number of tasks queued
+            - results: Per-failure results (input order, None where queued)
             - task_ids: List of Celery task IDs
     """
     task_id = self.request.id
-    logger.info(f"[Batch {task_id}] Queuing {len(failure_list)} analyses")
+    start_time = datetime.now()
+    logger.info(f"[Batch {task_id}] Analyzing {len(failure_list)} failures")
+
+    from ai_analysis_service import react_agent, analyze_batch_with_react_agent, finalize_react_result
+
+    fingerprint_cache = get_fingerprint_cache()
+    results = [None] * len(failure_list)
+    signatures = {}
+    claimed = {}
+    to_analyze = []
+    to_queue = []
+
+    for index, failure_data in enumerate(failure_list):
+        texts = (
+            failure_data.get('error_message', ''),
+            failure_data.get('error_log', ''),
+            failure_data.get('stack_trace', '')
+        )
+        signature = compute_fingerprint(*texts)
+        raw_key = raw_failure_key(*texts)
+        signatures[index] = (signature, raw_key)
+
+        cached_analysis = fingerprint_cache.get(signature, raw_key=raw_key)
+        if cached_analysis is not None:
+            results[index] = {
+                'status': 'SUCCESS',
+                'analysis': cached_analysis,
+                'deduplicated': True,
+                'fingerprint': signature.fingerprint
+            }
+            continue
 
-    task_ids = []
+        if react_agent is None:
+            to_queue.append(index)
+        elif signature.fingerprint in claimed:
+            to_analyze.append(index)
+        elif fingerprint_cache.acquire(signature, ttl_seconds=BATCH_TASK_TIME_LIMIT):
+            claimed[signature.fingerprint] = signature
+            to_analyze.append(index)
+        else:
+            to_queue.append(index)
+
+    deduplicated = len(failure_list) - len(to_analyze) - len(to_queue)
 
-    for i, failure_data in enumerate(failure_list, 1):
+    try:
+        if to_analyze:
+            self.update_state(
+                state='PROCESSING',
+                meta={
+                    'current': deduplicated,
+                    'total': len(failure_list),
+                    'status': f'Running ReAct batch analysis of {len(to_analyze)} failures...'
+                }
+            )
+
+            react_results = analyze_batch_with_react_agent([failure_list[i] for i in to_analyze])
+
+            finalized = {}
+            for index, react_result in zip(to_analyze, react_results):
+                signature, raw_key = signatures[index]
+
+                if react_result is None:
+                    to_queue.append(index)
+                    continue
+
+                if signature.fingerprint not in finalized:
+                    final_result = finalize_react_result(react_result, failure_list[index])
+                    if is_cacheable_analysis(final_result):
+                        fingerprint_cache.put(signature, final_result, raw_key=raw_key)
+                    finalized[signature.fingerprint] = final_result
+
+                results[index] = {
+                    'status': 'SUCCESS',
+                    'analysis': finalized[signature.fingerprint],
+                    'deduplicated': False,
+                    'fingerprint': signature.fingerprint
+                }
+
+    except SoftTimeLimitExceeded:
+        logger.error(f"[Batch {task_id}] ⏱ Soft time limit exceeded - queuing remaining failures")
+        to_queue.extend(i for i in to_analyze if results[i] is None and i not in to_queue)
+
+    finally:
+        for signature in claimed.values():
+            fingerprint_cache.release(signature)
+
+    task_ids = []
+    for index in sorted(to_queue):
         # Queue individual analysis task
-        result = analyze_test_failure.delay(failure_data)
+        result = analyze_test_failure.delay(failure_list[index])
         task_ids.append(result.id)
 
-        logger.info(f"[Batch {task_id}] Queued {i}/{len(failure_list)}: {result.id}")
+        logger.info(f"[Batch {task_id}] Queued failure {index + 1}/{len(failure_list)}: {result.id}")
+
+    execution_time = (datetime.now() - start_time).total_seconds() * 1000
+    analyzed = len(to_analyze) - len([i for i in to_queue if i in to_analyze])
+    logger.info(f"[Batch {task_id}] ✓ {analyzed} analyzed, {deduplicated} reused, "
+                f"{len(task_ids)} queued in {execution_time:.0f}ms")
 
     return {
         'batch_id': task_id,
         'total': len(failure_list),
+        'analyzed': analyzed,
+        'deduplicated': deduplicated,
         'queued': len(task_ids),
+        'results': results,
         'task_ids': task_ids,
+        'execution_time_ms': execution_time,
         'timestamp': datetime.now().isoformat()
     }
 
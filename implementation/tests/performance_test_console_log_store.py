@@ -0,0 +1,225 @@
+"""
+Console Log Store Benchmark
+
+Stores synthetic console logs of 5-50 MB with ConsoleLogStore and times:
+- write: chunking + zlib compression (MB/s, compression ratio)
+- tail(200), read_range (1000 lines in the middle), grep (first 50 matches)
+against the previous full_log path (fetch the whole string, split('\\n')).
+
+MongoDB is an in-memory collection; "bytes fetched" is what the query
+would transfer from the server. full_log documents are limited to 16 MB,
+so the legacy path is only timed up to that size.
+
+Usage:
+    python tests/performance_test_console_log_store.py
+    python tests/performance_test_console_log_store.py --sizes 5 50
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+# Add MCP server modules to path
+mcp_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-configs')
+sys.path.insert(0, mcp_dir)
+
+from console_log_store import ConsoleLogStore
+
+MONGODB_DOCUMENT_LIMIT_MB = 16
+
+
+class MemoryCollection:
+    """Queries used by ConsoleLogStore, counting the bytes returned"""
+
+    def __init__(self):
+        self.docs = {}
+        self.bytes_fetched = 0
+
+    def _size(self, doc):
+        return sum(len(value) for value in doc.values() if isinstance(value, (str, bytes)))
+
+    def create_index(self, keys, **kwargs):
+        pass
+
+    def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            self.docs[doc['_id']] = doc
+
+    def find(self, query, projection=None):
+        seq = query['seq']
+        found = [doc for doc in self.docs.values()
+                 if doc['version'] == query['version'] and seq['$gte'] <= doc['seq'] <= seq['$lte']]
+        return _Cursor(self, found)
+
+    def find_one(self, query, projection=None):
+        doc = self.docs.get(query['build_id'])
+        if doc is None:
+            return None
+        if projection and projection.get('full_log') == 0:
+            doc = {key: value for key, value in doc.items() if key != 'full_log'}
+        self.bytes_fetched += self._size(doc) + 16 * len(doc.get('line_index', []))
+        return doc
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        previous = self.docs.get(query['build_id'])
+        self.docs[query['build_id']] = dict(update['$set'])
+        return previous
+
+    def delete_many(self, query):
+        for key in [key for key, doc in self.docs.items() if doc.get('version') == query['version']]:
+            del self.docs[key]
+
+
+class _Cursor:
+    """Counts the bytes of each batch as it is fetched"""
+
+    def __init__(self, collection, docs):
+        self.collection = collection
+        self.docs = docs
+        self.size = 101
+
+    def sort(self, key, direction=1):
+        self.docs.sort(key=lambda doc: doc[key])
+        return self
+
+    def batch_size(self, size):
+        self.size = size
+        return self
+
+    def __iter__(self):
+        for offset in range(0, len(self.docs), self.size):
+            batch = self.docs[offset:offset + self.size]
+            self.collection.bytes_fetched += sum(self.collection._size(doc) for doc in batch)
+            yield from batch
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.console_logs = MemoryCollection()
+        self.console_log_chunks = MemoryCollection()
+
+
+def make_log(size_mb: float, seed: int = 5) -> str:
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    lines, size, number = [], 0, 0
+    while size < target:
+        number += 1
+        level = 'ERROR' if rng.random() < 0.002 else rng.choice(['INFO', 'INFO', 'DEBUG', 'WARN'])
+        line = (f"2026-10-19 12:{number // 3600 % 60:02d}:{number % 60:02d} {level} [node-{rng.randint(1, 16)}] "
+                f"io={rng.randint(1, 9999)}MB/s latency={rng.random():.4f}s ost={rng.randint(0, 127)}")
+        lines.append(line)
+        size += len(line) + 1
+    return '\n'.join(lines) + '\n'
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+def _legacy(text: str, operation: str):
+    """The previous path: whole log string, split into lines"""
+    lines = text.split('\n')
+    if operation == 'tail':
+        return '\n'.join(lines[-200:])
+    if operation == 'range':
+        middle = len(lines) // 2
+        return '\n'.join(lines[middle:middle + 1000])
+    return [number for number, line in enumerate(lines, 1) if 'ERROR' in line][:50]
+
+
+def run_benchmark(sizes: List[float]) -> Dict:
+    """
+    Write each log, then time partial reads
+
+    Returns:
+        Dict with per-size timings and bytes fetched
+    """
+    results = []
+    for size_mb in sizes:
+        text = make_log(size_mb)
+        db = MemoryDatabase()
+        store = ConsoleLogStore(db)
+        blocks = (text[i:i + 1024 * 1024] for i in range(0, len(text), 1024 * 1024))
+        summary, write_ms = _timed(lambda: store.write('bench', blocks))
+        middle = summary['total_lines'] // 2
+
+        row = {
+            'size_mb': size_mb,
+            'lines': summary['total_lines'],
+            'chunks': summary['chunk_count'],
+            'write_ms': write_ms,
+            'write_mb_s': round(size_mb / (write_ms / 1000), 1),
+            'compression_ratio': round(len(text) / summary['compressed_bytes'], 1)
+        }
+        operations = {
+            'tail': lambda: store.tail('bench', 200),
+            'range': lambda: store.read_range('bench', middle + 1, middle + 1000),
+            'grep': lambda: store.grep('bench', 'ERROR', max_matches=50)
+        }
+        correct = True
+        for name, operation in operations.items():
+            before = db.console_logs.bytes_fetched + db.console_log_chunks.bytes_fetched
+            result, row[f'{name}_ms'] = _timed(operation)
+            row[f'{name}_kb_fetched'] = round((db.console_logs.bytes_fetched + db.console_log_chunks.bytes_fetched
+                                               - before) / 1024, 1)
+            expected = _legacy(text, name)
+            if name == 'grep':
+                correct &= [match['line'] for match in result['matches']] == expected
+            elif name == 'tail':
+                correct &= result['text'] == '\n'.join(text.rstrip('\n').split('\n')[-200:])
+            else:
+                correct &= result['text'] == expected
+
+            if size_mb <= MONGODB_DOCUMENT_LIMIT_MB:
+                _, row[f'{name}_legacy_ms'] = _timed(lambda: _legacy(text, name))
+        row['legacy_kb_fetched'] = round(len(text) / 1024, 1) if size_mb <= MONGODB_DOCUMENT_LIMIT_MB else None
+        row['correct'] = correct
+        results.append(row)
+
+    return {'results': results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Console log store benchmark")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[5, 15, 50], help="Log sizes in MB")
+    parser.add_argument('--output', help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark"""
+    args = parse_args(argv)
+    results = run_benchmark(args.sizes)
+
+    print("=" * 70)
+    print(" CONSOLE LOG STORE BENCHMARK")
+    print("=" * 70)
+    for row in results['results']:
+        print(f"  {row['size_mb']} MB, {row['lines']} lines, {row['chunks']} chunks, "
+              f"write {row['write_mb_s']} MB/s, compression {row['compression_ratio']}x")
+        for name in ('tail', 'range', 'grep'):
+            legacy = (f"{row[name + '_legacy_ms']} ms / {row['legacy_kb_fetched']} KB"
+                      if f'{name}_legacy_ms' in row else 'over 16 MB document limit')
+            print(f"    {name:<6} chunked {row[name + '_ms']:>8} ms / {row[name + '_kb_fetched']:>8} KB   "
+                  f"full_log {legacy}")
+        print(f"    correct: {row['correct']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if all(row['correct'] for row in results['results']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
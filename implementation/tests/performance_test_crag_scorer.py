@@ -0,0 +1,206 @@
+"""
+CRAG ConfidenceScorer Benchmark
+
+Compares the consistency and grounding scores of ConfidenceScorer with the
+original implementation (per-call regex word sets, pairwise Python Jaccard,
+substring scans of the concatenated documents) on large synthetic documents:
+- time per verification (cold: new documents, warm: cached token data)
+- absolute score difference (must stay within --tolerance)
+
+Usage:
+    python tests/performance_test_crag_scorer.py
+    python tests/performance_test_crag_scorer.py --docs 20 --words 20000 --runs 5
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+
+# Add verification module to path
+verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
+sys.path.insert(0, verification_dir)
+
+from crag_verifier import ConfidenceScorer
+
+
+# ============================================================================
+# REFERENCE (original ConfidenceScorer algorithms)
+# ============================================================================
+
+def reference_consistency(retrieved_docs: List[Dict]) -> float:
+    """Original calculate_consistency_score"""
+    if not retrieved_docs or len(retrieved_docs) < 2:
+        return 1.0
+
+    all_terms = [set(re.findall(r'\b\w{4,}\b', doc.get('text', '').lower())) for doc in retrieved_docs]
+
+    overlaps = []
+    for i in range(len(all_terms)):
+        for j in range(i + 1, len(all_terms)):
+            if all_terms[i] and all_terms[j]:
+                overlaps.append(len(all_terms[i] & all_terms[j]) / len(all_terms[i] | all_terms[j]))
+
+    if not overlaps:
+        return 0.5
+    return min(1.0, max(0.0, sum(overlaps) / len(overlaps)))
+
+
+def reference_grounding(generated_answer: str, retrieved_docs: List[Dict]) -> float:
+    """Original calculate_grounding_score"""
+    if not retrieved_docs:
+        return 0.0
+    if not generated_answer or len(generated_answer.strip()) == 0:
+        return 0.0
+
+    answer_sentences = [s.strip() for s in generated_answer.split('.') if len(s.strip()) > 20]
+    if not answer_sentences:
+        return 0.5
+
+    all_doc_text = ' '.join([doc.get('text', '') for doc in retrieved_docs]).lower()
+
+    grounded_count = 0
+    for sentence in answer_sentences:
+        key_terms = set(re.findall(r'\b\w{4,}\b', sentence.lower()))
+        if key_terms:
+            matched_terms = sum(1 for term in key_terms if term in all_doc_text)
+            if matched_terms / len(key_terms) > 0.5:
+                grounded_count += 1
+
+    return min(1.0, max(0.0, grounded_count / len(answer_sentences)))
+
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Pseudo-words of 3-12 letters"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 12))) for _ in range(size)]
+
+
+def make_workload(docs: int, words: int, sentences: int, seed: int = 7) -> Dict:
+    """Large documents drawing from overlapping slices of one vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(30000, rng)
+
+    retrieved_docs = []
+    for index in range(docs):
+        start = (index * 1500) % 18000
+        pool = vocabulary[start:start + 12000]
+        text = ' '.join(rng.choice(pool) for _ in range(words))
+        retrieved_docs.append({'text': text, 'similarity_score': 0.8})
+
+    answer_sentences = []
+    for index in range(sentences):
+        pool = vocabulary[:12000] if index % 3 else vocabulary[20000:]  # grounded / not grounded
+        answer_sentences.append(' '.join(rng.choice(pool) for _ in range(15)))
+
+    return {'docs': retrieved_docs, 'answer': '. '.join(answer_sentences) + '.'}
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _time(function, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def run_benchmark(docs: int = 10, words: int = 20000, sentences: int = 40, runs: int = 3) -> Dict:
+    """
+    Time reference and ConfidenceScorer scoring on one workload
+
+    Returns:
+        Dict with per-variant milliseconds, speedups and score differences
+    """
+    workload = make_workload(docs, words, sentences)
+    retrieved_docs, answer = workload['docs'], workload['answer']
+
+    reference = {
+        'consistency': reference_consistency(retrieved_docs),
+        'grounding': reference_grounding(answer, retrieved_docs)
+    }
+    reference_ms = _time(lambda: (reference_consistency(retrieved_docs),
+                                  reference_grounding(answer, retrieved_docs)), runs)
+
+    def score(scorer):
+        features = scorer._doc_features(retrieved_docs)
+        return {
+            'consistency': scorer.calculate_consistency_score(retrieved_docs, answer, features),
+            'grounding': scorer.calculate_grounding_score(answer, retrieved_docs, features)
+        }
+
+    # Cold: token data built for every verification
+    cold_ms = _time(lambda: score(ConfidenceScorer()), runs)
+
+    # Warm: the same documents verified again (self-correction re-score,
+    # recurring knowledge-base documents)
+    scorer = ConfidenceScorer()
+    scores = score(scorer)
+    warm_ms = _time(lambda: score(scorer), runs)
+
+    exact = ConfidenceScorer(minhash_min_docs=docs + 1)
+    exact_scores = score(exact)
+
+    return {
+        'workload': {'docs': docs, 'words_per_doc': words, 'answer_sentences': sentences},
+        'reference_ms': round(reference_ms, 2),
+        'cold_ms': round(cold_ms, 2),
+        'warm_ms': round(warm_ms, 2),
+        'cold_speedup': round(reference_ms / cold_ms, 1) if cold_ms else None,
+        'warm_speedup': round(reference_ms / warm_ms, 1) if warm_ms else None,
+        'reference_scores': reference,
+        'scores': scores,
+        'exact_scores': exact_scores,
+        'max_abs_diff': round(max(abs(scores[k] - reference[k]) for k in reference), 4)
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CRAG ConfidenceScorer benchmark")
+    parser.add_argument('--docs', type=int, default=10, help="Retrieved documents per verification")
+    parser.add_argument('--words', type=int, default=20000, help="Words per document")
+    parser.add_argument('--sentences', type=int, default=40, help="Answer sentences")
+    parser.add_argument('--runs', type=int, default=3, help="Timed runs per variant")
+    parser.add_argument('--tolerance', type=float, default=0.05, help="Maximum absolute score difference")
+    parser.add_argument('--output', help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark"""
+    args = parse_args(argv)
+    results = run_benchmark(args.docs, args.words, args.sentences, args.runs)
+
+    print("=" * 70)
+    print(" CRAG CONFIDENCE SCORER BENCHMARK")
+    print("=" * 70)
+    print(f"  Workload: {args.docs} docs x {args.words} words, {args.sentences} answer sentences")
+    print(f"  Reference: {results['reference_ms']} ms")
+    print(f"  Cold:      {results['cold_ms']} ms ({results['cold_speedup']}x)")
+    print(f"  Warm:      {results['warm_ms']} ms ({results['warm_speedup']}x)")
+    print(f"  Scores (reference): {results['reference_scores']}")
+    print(f"  Scores (scorer):    {results['scores']}")
+    print(f"  Max abs difference: {results['max_abs_diff']} (tolerance {args.tolerance})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results['max_abs_diff'] <= args.tolerance else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
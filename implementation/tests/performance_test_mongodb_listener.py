@@ -0,0 +1,153 @@
+"""
+MongoDB Robot Listener Overhead Benchmark
+
+Measures the time a failing test spends in the listener's end_test():
+- inline: the original synchronous insert_one per failure
+- writer: FailureWriter.submit() (background insert_many batches)
+
+MongoDB is simulated with a fixed round-trip latency per call, so the
+numbers show the run-time cost of a slow or remote cluster. The writer's
+drain time (close()) is reported separately; it overlaps with the
+remaining tests in a real run.
+
+Usage:
+    python tests/performance_test_mongodb_listener.py
+    python tests/performance_test_mongodb_listener.py --failures 500 --latency-ms 40
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+# Add implementation module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, implementation_dir)
+
+from mongodb_robot_listener import FailureWriter
+
+
+class SimulatedCollection:
+    """Collection with a fixed round-trip latency per call"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.stored = 0
+        self.calls = 0
+
+    def insert_one(self, doc):
+        time.sleep(self.latency)
+        self.calls += 1
+        self.stored += 1
+
+    def insert_many(self, docs, ordered=True):
+        time.sleep(self.latency)
+        self.calls += 1
+        self.stored += len(docs)
+
+
+def make_failure(index: int) -> Dict:
+    return {
+        'timestamp': datetime.utcnow(),
+        'test_name': f'Test Case {index}',
+        'test_suite': 'Benchmark Suite',
+        'error_message': f'Expected status 200 but was 500 (request {index})',
+        'stack_trace': 'Keyword: Verify Response\n' * 20,
+        'build_number': 'bench',
+        'job_name': 'robot-framework-tests',
+        'status': 'failed',
+        'test_type': 'robot_framework'
+    }
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p95_ms': round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3),
+        'total_ms': round(sum(samples) * 1000, 1)
+    }
+
+
+def run_benchmark(failures: int = 200, latency_ms: float = 20.0, batch_size: int = 100) -> Dict:
+    """
+    Time end_test() storage with inline inserts and with the background writer
+
+    Returns:
+        Dict with per-test overhead for both variants
+    """
+    inline = SimulatedCollection(latency_ms)
+    inline_samples = []
+    for index in range(failures):
+        doc = make_failure(index)
+        started = time.perf_counter()
+        inline.insert_one(doc)
+        inline_samples.append(time.perf_counter() - started)
+
+    collection = SimulatedCollection(latency_ms)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        writer = FailureWriter(collection, spool_path=os.path.join(tmp_dir, 'spool.ndjson'),
+                               batch_size=batch_size, flush_seconds=0.05)
+        writer_samples = []
+        for index in range(failures):
+            doc = make_failure(index)
+            started = time.perf_counter()
+            writer.submit(doc)
+            writer_samples.append(time.perf_counter() - started)
+
+        drain_started = time.perf_counter()
+        writer.close()
+        drain_ms = (time.perf_counter() - drain_started) * 1000
+
+    inline_summary = _summary(inline_samples)
+    writer_summary = _summary(writer_samples)
+    return {
+        'workload': {'failures': failures, 'latency_ms': latency_ms, 'batch_size': batch_size},
+        'inline': {**inline_summary, 'round_trips': inline.calls},
+        'writer': {**writer_summary, 'round_trips': collection.calls, 'drain_ms': round(drain_ms, 1),
+                   'stored': collection.stored},
+        'speedup': round(inline_summary['mean_ms'] / writer_summary['mean_ms'], 1)
+        if writer_summary['mean_ms'] else None
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MongoDB listener overhead benchmark")
+    parser.add_argument('--failures', type=int, default=200, help="Failing tests")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Simulated MongoDB round trip")
+    parser.add_argument('--batch-size', type=int, default=100, help="FailureWriter batch size")
+    parser.add_argument('--output', help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark"""
+    args = parse_args(argv)
+    results = run_benchmark(args.failures, args.latency_ms, args.batch_size)
+
+    print("=" * 70)
+    print(" MONGODB LISTENER OVERHEAD BENCHMARK")
+    print("=" * 70)
+    print(f"  Workload: {args.failures} failures, {args.latency_ms} ms MongoDB round trip")
+    print(f"  Inline insert_one: mean {results['inline']['mean_ms']} ms, p95 {results['inline']['p95_ms']} ms, "
+          f"{results['inline']['round_trips']} round trips")
+    print(f"  Background writer: mean {results['writer']['mean_ms']} ms, p95 {results['writer']['p95_ms']} ms, "
+          f"{results['writer']['round_trips']} round trips, drain {results['writer']['drain_ms']} ms")
+    print(f"  Per-test speedup: {results['speedup']}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results['writer']['stored'] == args.failures else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+PII Redaction Benchmark (regex engine)
+
+Redacts synthetic console logs of 1-50 MB with:
+- original: the previous _redact_with_regex (one re.finditer per pattern,
+  string rebuilt per match; quadratic, only run up to --original-max-mb)
+- sequential: one precompiled re.sub per pattern (nine passes)
+- single_pass: PIIRedactor, one combined alternation in a single re.sub
+- streamed: PIIRedactor.redact_stream over 1 MB reads (bounded memory)
+
+The single-pass and streamed outputs must equal the sequential output
+(the original corrupts offsets once a pattern matches more than once, so
+its output is not compared).
+
+Usage:
+    python tests/performance_test_pii_redaction.py
+    python tests/performance_test_pii_redaction.py --sizes 1 10 50 --original-max-mb 1
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+
+# Add security module to path
+security_dir = os.path.join(os.path.dirname(__file__), '..', 'security')
+sys.path.insert(0, security_dir)
+
+from pii_redaction import PIIRedactor
+
+
+# ============================================================================
+# REFERENCES
+# ============================================================================
+
+def original_redact(text: str) -> str:
+    """Previous _redact_with_regex (output kept as it was)"""
+    redacted = text
+    for pattern_name, pattern in PIIRedactor.REGEX_PATTERNS.items():
+        for match in list(re.finditer(pattern, redacted, re.IGNORECASE)):
+            replacement = PIIRedactor.REPLACEMENT_TOKENS.get(pattern_name, f'<{pattern_name}>')
+            redacted = redacted[:match.start()] + replacement + redacted[match.end():]
+    return redacted
+
+
+_SEQUENTIAL = [
+    (re.compile(pattern, re.IGNORECASE), PIIRedactor.REPLACEMENT_TOKENS.get(name, f'<{name}>'))
+    for name, pattern in PIIRedactor.REGEX_PATTERNS.items()
+]
+
+
+def sequential_redact(text: str) -> str:
+    """One re.sub per pattern, in pattern order"""
+    for pattern, replacement in _SEQUENTIAL:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+
+PII_LINES = [
+    "ERROR auth failed for user {name}.{n}@example.com from 10.{a}.{b}.{c}",
+    "WARN callback to +1-555-{a:03d}-{n:04d} timed out",
+    "DEBUG Authorization: bearer {token}",
+    "ERROR payment card 4111-1111-{n:04d}-{a:04d} declined",
+    "INFO aws credentials AKIA{aws} loaded",
+    "ERROR jwt eyJ{token}.eyJ{token}.{token} expired",
+    "WARN ssn 123-45-{n:04d} present in payload",
+    "INFO peer fe80:0:0:0:{a:x}:{b:x}:{c:x}:{n:x} connected"
+]
+
+
+def make_log(size_mb: float, pii_ratio: float = 0.05, seed: int = 7) -> str:
+    """Console log with a PII line every ~1/pii_ratio lines"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+    lines, size, index = [], 0, 0
+    while size < target:
+        index += 1
+        if rng.random() < pii_ratio:
+            line = rng.choice(PII_LINES).format(
+                name=rng.choice(['alice', 'bob', 'carol']), n=rng.randint(0, 9999),
+                a=rng.randint(0, 255), b=rng.randint(0, 255), c=rng.randint(0, 255),
+                token=''.join(rng.choice(alphabet) for _ in range(24)),
+                aws=''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567') for _ in range(16))
+            )
+        else:
+            line = (f"2026-10-19T12:{index // 60 % 60:02d}:{index % 60:02d} INFO [worker-{index % 8}] "
+                    f"step {index} completed in {rng.randint(1, 900)} ms (queue depth {rng.randint(0, 64)})")
+        lines.append(line)
+        size += len(line) + 1
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(sizes: List[float], original_max_mb: float = 1.0) -> Dict:
+    """
+    Time each variant per log size
+
+    Returns:
+        Dict with per-size milliseconds, MB/s and output checks
+    """
+    redactor = PIIRedactor(use_presidio=False)
+    results = []
+
+    for size_mb in sizes:
+        text = make_log(size_mb)
+        row = {'size_mb': size_mb, 'chars': len(text)}
+
+        if size_mb <= original_max_mb:
+            _, row['original_ms'] = _timed(lambda: original_redact(text))
+
+        expected, row['sequential_ms'] = _timed(lambda: sequential_redact(text))
+        (single, metadata), row['single_pass_ms'] = _timed(lambda: redactor._redact_with_regex(text))
+
+        def streamed():
+            reader = io.StringIO(text)
+            return ''.join(redactor.redact_stream(iter(lambda: reader.read(1024 * 1024), '')))
+
+        stream, row['streamed_ms'] = _timed(streamed)
+
+        row['redactions'] = metadata['redactions']
+        row['single_pass_mb_s'] = round(size_mb / (row['single_pass_ms'] / 1000), 1)
+        row['matches_sequential'] = single == expected
+        row['streamed_matches'] = stream == single
+        if 'original_ms' in row:
+            row['speedup_vs_original'] = round(row['original_ms'] / row['single_pass_ms'], 1)
+        row['speedup_vs_sequential'] = round(row['sequential_ms'] / row['single_pass_ms'], 2)
+        for key in ('original_ms', 'sequential_ms', 'single_pass_ms', 'streamed_ms'):
+            if key in row:
+                row[key] = round(row[key], 1)
+        results.append(row)
+
+    return {'results': results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PII redaction benchmark")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 10, 50], help="Log sizes in MB")
+    parser.add_argument('--original-max-mb', type=float, default=1.0,
+                        help="Largest log for the (quadratic) original implementation")
+    parser.add_argument('--output', help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark"""
+    args = parse_args(argv)
+    results = run_benchmark(args.sizes, args.original_max_mb)
+
+    print("=" * 70)
+    print(" PII REDACTION BENCHMARK (regex engine)")
+    print("=" * 70)
+    for row in results['results']:
+        print(f"  {row['size_mb']:>5} MB, {row['redactions']} redactions")
+        if 'original_ms' in row:
+            print(f"    original:    {row['original_ms']:>10} ms")
+        print(f"    sequential:  {row['sequential_ms']:>10} ms")
+        print(f"    single pass: {row['single_pass_ms']:>10} ms ({row['single_pass_mb_s']} MB/s)")
+        print(f"    streamed:    {row['streamed_ms']:>10} ms")
+        print(f"    output == sequential: {row['matches_sequential']}, streamed == single pass: "
+              f"{row['streamed_matches']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    ok = all(row['matches_sequential'] and row['streamed_matches'] for row in results['results'])
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Presidio Redaction Throughput Benchmark
+
+Redacts typical failure documents (recurring assertion messages, Python
+and Java stack traces, console log excerpts, some with e-mail addresses,
+IPs and user names) with PIIRedactor.redact_failure_data():
+- baseline: every field analyzed by Presidio on the calling thread
+- gate: fields without candidate spans skip Presidio
+- gate_cache: plus the per-text-hash result cache
+- gate_cache_workers: plus --workers analyzer processes
+
+Without --real, Presidio is simulated by an analyzer that burns CPU in
+proportion to the text length (--base-ms + --ms-per-kb) and reports
+e-mail addresses, IPs and capitalized names. All variants must produce
+the same redacted documents.
+
+Usage:
+    python tests/performance_test_presidio_gate.py
+    python tests/performance_test_presidio_gate.py --failures 1000 --workers 4
+    python tests/performance_test_presidio_gate.py --real   # presidio installed
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+from typing import Dict, List
+
+# Add security module to path
+security_dir = os.path.join(os.path.dirname(__file__), '..', 'security')
+sys.path.insert(0, security_dir)
+
+from pii_redaction import PIIRedactor, PRESIDIO_AVAILABLE
+
+
+SimulatedResult = namedtuple('SimulatedResult', 'entity_type start end score')
+
+
+class SimulatedAnalyzer:
+    """CPU cost per call similar to a spaCy-backed AnalyzerEngine"""
+
+    PATTERNS = [
+        ('EMAIL_ADDRESS', re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+'), 1.0),
+        ('IP_ADDRESS', re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'), 0.95),
+        ('PERSON', re.compile(r'(?<=user )[A-Z][a-z]+'), 0.85)
+    ]
+
+    def __init__(self, base_ms: float = None, ms_per_kb: float = None):
+        self.base = (base_ms if base_ms is not None else float(os.getenv('SIM_PRESIDIO_BASE_MS', 2))) / 1000
+        self.per_char = (ms_per_kb if ms_per_kb is not None
+                         else float(os.getenv('SIM_PRESIDIO_MS_PER_KB', 10))) / 1000 / 1024
+
+    def analyze(self, text, language, entities):
+        deadline = time.perf_counter() + self.base + self.per_char * len(text)
+        while time.perf_counter() < deadline:
+            pass
+        return [SimulatedResult(entity_type, m.start(), m.end(), score)
+                for entity_type, pattern, score in self.PATTERNS for m in pattern.finditer(text)]
+
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+
+MESSAGES = [
+    "Expected status 200 but was 500",
+    "Element 'id=submit' not visible after 10 seconds",
+    "Connection refused by 10.20.{a}.{b} during storage health check",
+    "AssertionError: quota mismatch for user {name} ({name_lower}@example.com)",
+    "Timeout waiting for lustre mount to become ready",
+    "KeyError: 'replication_factor'"
+]
+
+PYTHON_TRACE = ('Traceback (most recent call last):\n'
+                '  File "/opt/tests/storage/test_{module}.py", line {line}, in test_{module}\n'
+                '    response = client.request(path)\n'
+                '  File "/opt/tests/lib/client.py", line 88, in request\n'
+                '    raise ClientError(response.text)\n'
+                'ClientError: {message}')
+
+JAVA_TRACE = ('java.lang.IllegalStateException: {message}\n'
+              '\tat com.ddn.exascaler.client.Mount.verify(Mount.java:{line})\n'
+              '\tat com.ddn.exascaler.tests.MountTest.testMount(MountTest.java:57)\n'
+              '\tat org.junit.runners.ParentRunner.run(ParentRunner.java:363)')
+
+LOG_LINE = 'INFO [worker-{worker}] step {step} finished, checking mount state'
+
+
+def make_failures(count: int, seed: int = 11) -> List[Dict]:
+    """Failure documents: recurring messages, traces and log excerpts"""
+    rng = random.Random(seed)
+    failures = []
+    for index in range(count):
+        name = rng.choice(['Alice', 'Bob', 'Carol'])
+        message = rng.choice(MESSAGES).format(a=rng.randint(0, 3), b=rng.randint(1, 20),
+                                              name=name, name_lower=name.lower())
+        module = rng.choice(['quota', 'mount', 'replication', 'snapshot'])
+        trace = rng.choice([PYTHON_TRACE, JAVA_TRACE]).format(module=module, line=rng.randint(20, 400),
+                                                              message=message)
+        log = '\n'.join(LOG_LINE.format(worker=rng.randint(0, 7), step=step) for step in range(rng.randint(20, 60)))
+        failures.append({
+            'test_name': f'test_{module}_{rng.randint(1, 30)}',
+            'error_message': message,
+            'stack_trace': trace,
+            'error_log': log if rng.random() < 0.5 else f'{log}\nERROR {message}'
+        })
+    return failures
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _run(failures: List[Dict], **options) -> Dict:
+    redactor = PIIRedactor(use_presidio=True, **options)
+    try:
+        started = time.perf_counter()
+        redacted = [redactor.redact_failure_data(failure)[0] for failure in failures]
+        elapsed = time.perf_counter() - started
+        stats = redactor.get_statistics()
+    finally:
+        redactor.close()
+
+    fields = ('test_name', 'error_message', 'stack_trace', 'error_log')
+    return {
+        'seconds': round(elapsed, 3),
+        'docs_per_second': round(len(failures) / elapsed, 1),
+        'analyzer_calls': stats['presidio']['analyzed'],
+        'skipped': stats['presidio']['skipped'],
+        'cache_hits': stats['presidio']['cache_hits'],
+        'redactions': stats['total_redactions'],
+        'output': [tuple(doc.get(field) for field in fields) for doc in redacted]
+    }
+
+
+def run_benchmark(failures: int = 300, workers: int = 4, real: bool = False) -> Dict:
+    """
+    Redact the same failure documents with each variant
+
+    Returns:
+        Dict with throughput and analyzer calls per variant
+    """
+    documents = make_failures(failures)
+    factory = None if real else SimulatedAnalyzer
+    variants = {
+        'baseline': dict(prefilter=False, cache_size=0, workers=0),
+        'gate': dict(prefilter=True, cache_size=0, workers=0),
+        'gate_cache': dict(prefilter=True, cache_size=4096, workers=0),
+        'gate_cache_workers': dict(prefilter=True, cache_size=4096, workers=workers)
+    }
+
+    results = {}
+    for name, options in variants.items():
+        results[name] = _run(documents, analyzer_factory=factory, **options)
+
+    baseline = results['baseline']
+    identical = all(result['output'] == baseline['output'] for result in results.values())
+    for result in results.values():
+        del result['output']
+        result['speedup'] = round(result['docs_per_second'] / baseline['docs_per_second'], 1)
+
+    return {
+        'workload': {'failures': failures, 'workers': workers, 'analyzer': 'presidio' if real else 'simulated',
+                     'cpus': os.cpu_count()},
+        'variants': results,
+        'identical_output': identical
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Presidio redaction throughput benchmark")
+    parser.add_argument('--failures', type=int, default=300, help="Failure documents")
+    parser.add_argument('--workers', type=int, default=4, help="Presidio worker processes")
+    parser.add_argument('--real', action='store_true', help="Use Presidio instead of the simulated analyzer")
+    parser.add_argument('--base-ms', type=float, default=2.0, help="Simulated analyzer cost per call")
+    parser.add_argument('--ms-per-kb', type=float, default=10.0, help="Simulated analyzer cost per KB")
+    parser.add_argument('--output', help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark"""
+    args = parse_args(argv)
+    if args.real and not PRESIDIO_AVAILABLE:
+        print("Presidio is not installed")
+        return 1
+    # Read by the simulated analyzer, also in the worker processes
+    os.environ['SIM_PRESIDIO_BASE_MS'] = str(args.base_ms)
+    os.environ['SIM_PRESIDIO_MS_PER_KB'] = str(args.ms_per_kb)
+
+    results = run_benchmark(args.failures, args.workers, args.real)
+
+    print("=" * 70)
+    print(" PRESIDIO REDACTION THROUGHPUT BENCHMARK")
+    print("=" * 70)
+    workload = results['workload']
+    print(f"  Workload: {workload['failures']} failure documents, {workload['analyzer']} analyzer, "
+          f"{workload['workers']} workers on {workload['cpus']} CPU(s)")
+    for name, result in results['variants'].items():
+        print(f"  {name:<20} {result['docs_per_second']:>8} docs/s ({result['speedup']}x)  "
+              f"analyzer calls {result['analyzer_calls']}, skipped {result['skipped']}, "
+              f"cache hits {result['cache_hits']}")
+    print(f"  Identical output: {results['identical_output']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results['identical_output'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,8 +11,19 @@ Tests the ReAct agent with 20 diverse scenarios and measures:
 Target Performance:
 - 80% of cases: < 10 seconds
 - 20% of cases: < 30 seconds
+
+Record/replay (agents/agent_cassette.py):
+    # Record every external interaction per scenario (live services)
+    python performance_test_react_agent.py --record cassettes/
+
+    # Replay offline; zero latency measures agent overhead only
+    python performance_test_react_agent.py --replay cassettes/ --latency zero
+
+    # CI: fail if agent overhead regressed against a previous results file
+    python performance_test_react_agent.py --replay cassettes/ --baseline baseline.json
 """
 
+import argparse
 import json
 import time
 import sys
@@ -28,6 +39,7 @@ sys.path.insert(0, agents_dir)
 REACT_AVAILABLE = False
 try:
     from react_agent_service import create_react_agent
+    from agent_cassette import Cassette, use_cassette, create_replay_agent
     REACT_AVAILABLE = True
     print("[INFO] ReAct agent module found")
 except ImportError as e:
@@ -38,12 +50,19 @@ except ImportError as e:
 class PerformanceTestRunner:
     """Runs performance tests for ReAct agent"""
 
-    def __init__(self, scenarios_file='performance_test_scenarios.json'):
+    def __init__(self, scenarios_file='performance_test_scenarios.json',
+                 cassette_dir=None, cassette_mode=None, latency='zero', strict=False):
         self.scenarios_file = scenarios_file
         self.scenarios = []
         self.results = []
         self.react_agent = None
 
+        # Record/replay: one cassette per scenario in cassette_dir
+        self.cassette_dir = cassette_dir
+        self.cassette_mode = cassette_mode  # None, 'record' or 'replay'
+        self.latency = latency
+        self.strict = strict
+
     def load_scenarios(self):
         """Load test scenarios from JSON file"""
         scenarios_path = os.path.join(os.path.dirname(__file__), self.scenarios_file)
@@ -68,6 +87,13 @@ class PerformanceTestRunner:
             return False
 
         try:
+            if self.cassette_mode == 'replay':
+                # Offline agent rebuilt from the recorded configuration
+                cassette = Cassette.load(self._cassette_path(self.scenarios[0]))
+                self.react_agent = create_replay_agent(cassette)
+                print(f"[INFO] Replay agent initialized from {self.cassette_dir} (latency: {self.latency})")
+                return True
+
             self.react_agent = create_react_agent()
             print("[INFO] ReAct agent initialized successfully")
             return True
@@ -84,15 +110,26 @@ class PerformanceTestRunner:
         if self.react_agent:
             # Run with real ReAct agent
             try:
-                result = self.react_agent.analyze(
-                    build_id=scenario['id'],
-                    error_log=scenario['error_log'],
-                    error_message=scenario['error_message'],
-                    stack_trace=scenario.get('stack_trace', ''),
-                    test_name=scenario['test_name']
-                )
-
-                latency = time.time() - start_time
+                cassette_summary = None
+                if self.cassette_mode:
+                    with use_cassette(self.react_agent, self._cassette_path(scenario), mode=self.cassette_mode,
+                                      latency=self.latency, strict=self.strict) as session:
+                        start_time = time.time()
+                        result = self._analyze(scenario)
+                        latency = time.time() - start_time
+                    cassette_summary = session.get_summary()
+                else:
+                    result = self._analyze(scenario)
+                    latency = time.time() - start_time
+
+                # Time spent outside external calls = agent CPU/orchestration
+                external = cassette_summary['external_ms'] / 1000 if cassette_summary else None
+                if cassette_summary and cassette_summary['slept_ms'] == 0 and self.cassette_mode == 'replay':
+                    agent_seconds = latency
+                elif external is not None:
+                    agent_seconds = max(latency - external, 0.0)
+                else:
+                    agent_seconds = None
 
                 return {
                     'scenario_id': scenario['id'],
@@ -110,8 +147,11 @@ class PerformanceTestRunner:
                     'routing_stats': result.get('routing_stats', {}),
                     'multi_step': result.get('multi_step_reasoning', {}).get('multi_file_detected', False),
                     'self_correction_retries': self._count_retries(result),
-                    'root_cause': result.get('root_cause', '')[:100] + '...',
-                    'mode': 'real'
+                    'root_cause': (result.get('root_cause') or '')[:100] + '...',
+                    'agent_seconds': round(agent_seconds, 4) if agent_seconds is not None else None,
+                    'reasoning_budget': result.get('reasoning_budget'),
+                    'cassette': cassette_summary,
+                    'mode': self.cassette_mode or 'real'
                 }
             except Exception as e:
                 latency = time.time() - start_time
@@ -121,6 +161,20 @@ class PerformanceTestRunner:
             # Simulation mode (when ReAct not available)
             return self._simulate_scenario(scenario)
 
+    def _analyze(self, scenario: Dict) -> Dict:
+        """Run one scenario through the agent"""
+        return self.react_agent.analyze(
+            build_id=scenario['id'],
+            error_log=scenario['error_log'],
+            error_message=scenario['error_message'],
+            stack_trace=scenario.get('stack_trace', ''),
+            test_name=scenario['test_name']
+        )
+
+    def _cassette_path(self, scenario: Dict) -> str:
+        """Cassette file of a scenario"""
+        return os.path.join(self.cassette_dir, f"{scenario['id']}.json")
+
     def _count_retries(self, result: Dict) -> int:
         """Count self-correction retry attempts from result"""
         # Check if retry history is available
@@ -186,7 +240,8 @@ class PerformanceTestRunner:
         print(" REACT AGENT PERFORMANCE TEST SUITE (Task 0-ARCH.12)")
         print("=" * 70)
         print(f" Total Scenarios: {len(self.scenarios)}")
-        print(f" Mode: {'Real ReAct Agent' if self.react_agent else 'Simulation'}")
+        print(f" Mode: {'Real ReAct Agent' if self.react_agent else 'Simulation'}"
+              f"{f' ({self.cassette_mode})' if self.cassette_mode else ''}")
         print("=" * 70)
 
         for i, scenario in enumerate(self.scenarios, 1):
@@ -243,6 +298,18 @@ class PerformanceTestRunner:
         # Count multi-file errors
         multi_file_count = sum(1 for r in successful_tests if r.get('multi_step', False))
 
+        # Agent overhead (record/replay runs only)
+        agent_times = sorted(r['agent_seconds'] for r in successful_tests if r.get('agent_seconds') is not None)
+        overhead = {}
+        if agent_times:
+            overhead = {
+                'avg_agent_seconds': round(sum(agent_times) / len(agent_times), 4),
+                'p50_agent_seconds': round(agent_times[len(agent_times) // 2], 4),
+                'p95_agent_seconds': round(agent_times[min(int(len(agent_times) * 0.95), len(agent_times) - 1)], 4),
+                'max_agent_seconds': round(agent_times[-1], 4),
+                'cassette_mismatches': sum((r.get('cassette') or {}).get('mismatches', 0) for r in successful_tests)
+            }
+
         return {
             'total_tests': len(self.results),
             'successful_tests': len(successful_tests),
@@ -285,9 +352,38 @@ class PerformanceTestRunner:
 
             # Multi-step metrics
             'multi_file_count': multi_file_count,
-            'multi_file_percentage': round((multi_file_count / len(successful_tests)) * 100, 1)
+            'multi_file_percentage': round((multi_file_count / len(successful_tests)) * 100, 1),
+
+            # Reasoning budget metrics (early termination per category)
+            'reasoning_by_category': self._reasoning_by_category(successful_tests),
+
+            # Agent overhead metrics
+            **overhead
         }
 
+    @staticmethod
+    def _reasoning_by_category(results: List[Dict]) -> Dict:
+        """Iterations, iterations saved, early stops and latency per category"""
+        by_category = {}
+        for r in results:
+            by_category.setdefault(r['actual_category'], []).append(r)
+
+        report = {}
+        for category, category_results in sorted(by_category.items()):
+            budgets = [r['reasoning_budget'] for r in category_results if r.get('reasoning_budget')]
+            latencies = sorted(r['latency_seconds'] for r in category_results)
+            report[category] = {
+                'tests': len(category_results),
+                'avg_iterations': round(sum(r['iterations'] for r in category_results) / len(category_results), 2),
+                'iterations_saved': sum(b['iterations_saved'] for b in budgets),
+                'early_stops': sum(1 for b in budgets
+                                   if b['termination_reason'] in ('evidence_sufficient', 'token_budget')),
+                'p50_latency': latencies[len(latencies) // 2],
+                'p95_latency': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+                'max_latency': latencies[-1]
+            }
+        return report
+
     def generate_report(self):
         """Generate detailed performance report"""
         metrics = self.analyze_results()
@@ -342,6 +438,20 @@ class PerformanceTestRunner:
         print(f"\n[Multi-File Errors]")
         print(f"  Detected: {metrics['multi_file_count']}/{metrics['successful_tests']} ({metrics['multi_file_percentage']}%)")
 
+        if metrics['reasoning_by_category']:
+            print(f"\n[Reasoning Budget by Category]")
+            for category, stats in metrics['reasoning_by_category'].items():
+                print(f"  {category}: {stats['tests']} tests, {stats['avg_iterations']} avg iterations, "
+                      f"{stats['iterations_saved']} saved, {stats['early_stops']} early stops, "
+                      f"p50 {stats['p50_latency']}s / p95 {stats['p95_latency']}s")
+
+        if 'avg_agent_seconds' in metrics:
+            print(f"\n[Agent Overhead ({self.cassette_mode}, latency: {self.latency})]")
+            print(f"  Average: {metrics['avg_agent_seconds']}s")
+            print(f"  P50: {metrics['p50_agent_seconds']}s")
+            print(f"  P95: {metrics['p95_agent_seconds']}s")
+            print(f"  Cassette mismatches: {metrics['cassette_mismatches']}")
+
         # Overall assessment
         print("\n" + "=" * 70)
         print(" OVERALL ASSESSMENT")
@@ -374,7 +484,8 @@ class PerformanceTestRunner:
         output = {
             'test_run': {
                 'timestamp': datetime.now().isoformat(),
-                'mode': 'real' if self.react_agent else 'simulation',
+                'mode': (self.cassette_mode or 'real') if self.react_agent else 'simulation',
+                'latency': self.latency if self.cassette_mode == 'replay' else None,
                 'total_scenarios': len(self.scenarios)
             },
             'summary': self.analyze_results(),
@@ -392,10 +503,62 @@ class PerformanceTestRunner:
             print(f"\n[ERROR] Failed to save results: {e}")
             return False
 
+    def compare_with_baseline(self, baseline_file: str, max_regression: float = 0.20) -> bool:
+        """
+        Compare agent overhead with a previous results file.
+
+        Returns:
+            False if average or P95 agent time regressed by more than max_regression
+        """
+        try:
+            with open(baseline_file, 'r') as f:
+                baseline = json.load(f)['summary']
+        except (OSError, KeyError, json.JSONDecodeError) as e:
+            print(f"[ERROR] Failed to load baseline: {e}")
+            return False
 
-def main():
+        current = self.analyze_results()
+        passed = True
+
+        print(f"\n[Baseline Comparison] (max regression: {max_regression * 100:.0f}%)")
+        for metric in ('avg_agent_seconds', 'p95_agent_seconds'):
+            if metric not in baseline or metric not in current:
+                print(f"  [SKIP] {metric}: not available")
+                continue
+            before, after = baseline[metric], current[metric]
+            change = (after - before) / before if before else 0.0
+            status = "[PASS]" if change <= max_regression else "[FAIL]"
+            passed = passed and change <= max_regression
+            print(f"  {status} {metric}: {before}s -> {after}s ({change * 100:+.1f}%)")
+
+        return passed
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="ReAct agent performance tests")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='DIR', help='Record external interactions to cassettes in DIR')
+    cassette.add_argument('--replay', metavar='DIR', help='Replay cassettes from DIR (no live services)')
+    parser.add_argument('--latency', choices=['zero', 'recorded'], default='zero',
+                        help='Replay latency (zero = agent overhead only)')
+    parser.add_argument('--strict', action='store_true', help='Fail on requests missing from the cassette')
+    parser.add_argument('--baseline', help='Previous results JSON to compare agent overhead against')
+    parser.add_argument('--max-regression', type=float, default=0.20,
+                        help='Allowed agent overhead regression vs baseline (fraction)')
+    parser.add_argument('--output', default='performance_test_results.json', help='Results file name')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function"""
-    runner = PerformanceTestRunner()
+    args = parse_args(argv)
+    runner = PerformanceTestRunner(
+        cassette_dir=args.record or args.replay,
+        cassette_mode='record' if args.record else ('replay' if args.replay else None),
+        latency=args.latency,
+        strict=args.strict
+    )
 
     # Load test scenarios
     if not runner.load_scenarios():
@@ -412,12 +575,18 @@ def main():
     metrics = runner.generate_report()
 
     # Save detailed results
-    runner.save_detailed_results()
+    runner.save_detailed_results(args.output)
 
     # Exit with appropriate code
     if metrics.get('error'):
         return 1
 
+    # Replay runs gate on agent overhead, not on live-service latency targets
+    if args.baseline:
+        return 0 if runner.compare_with_baseline(args.baseline, args.max_regression) else 1
+    if runner.cassette_mode == 'replay':
+        return 0
+
     all_targets_met = (
         metrics['meets_80_percent_target'] and
         metrics['meets_100_percent_target'] and
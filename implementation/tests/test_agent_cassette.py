@@ -0,0 +1,316 @@
+"""
+Unit Tests for ReAct Agent Record/Replay Cassettes
+
+Records an analyze() run against local fakes for the LLM endpoint, Fusion
+RAG, GitHub, MongoDB and the PostgreSQL pool, then replays it with an
+offline agent and verifies that:
+- the replayed analysis matches the recorded one
+- no fake service is called during replay
+- zero-latency replay skips the recorded service latency
+- recorded errors are re-raised and unrecorded requests are detected
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import re
+import json
+import time
+import tempfile
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+try:
+    from react_agent_service import ReActAgent
+    from tool_registry import ToolRegistry
+    from thought_prompts import ThoughtPrompts
+    from correction_strategy import SelfCorrectionStrategy
+    from tool_result_cache import ToolResultCache
+    from reasoning_budget import ReasoningBudget
+    from llm_client import LLMClient
+    from github_client import GitHubFileResult
+    from agent_cassette import (
+        Cassette, CassetteMiss, ReplayedError, use_cassette, create_replay_agent
+    )
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+CATEGORIES = {
+    'CODE_ERROR': 'Code errors',
+    'INFRA_ERROR': 'Infrastructure errors'
+}
+
+STACK_TRACE = '''Traceback (most recent call last):
+  File "src/storage/client.py", line 88, in write
+    raise AttributeError("'NoneType' object has no attribute 'write'")'''
+
+SERVICE_DELAY = 0.02
+
+
+class FakeResponse:
+    """requests.Response stand-in for chat completions"""
+
+    def __init__(self, content: dict):
+        self._content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            'choices': [{'message': {'content': json.dumps(self._content)}}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+        }
+
+
+class FakeServices:
+    """Slow local stand-ins for every external service, counting calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        time.sleep(SERVICE_DELAY)
+
+    def chat_completion(self, url, headers=None, json=None, timeout=None):
+        self._call()
+        prompt = json['messages'][0]['content']
+        if prompt.startswith("Classify this test failure"):
+            return FakeResponse({'category': 'CODE_ERROR', 'confidence': 0.9, 'reasoning': 'null object'})
+        if 'Iteration:' in prompt:
+            iteration = int(re.search(r'Iteration: (\d+)/', prompt).group(1))
+            plan = ['pinecone_knowledge', 'github_get_file', 'mongodb_logs', 'postgres_history']
+            return FakeResponse({
+                'thought': f'iteration {iteration}',
+                'needs_more_info': iteration <= len(plan),
+                'next_action': plan[iteration - 1] if iteration <= len(plan) else 'DONE',
+                'confidence': 0.5
+            })
+        return FakeResponse({'root_cause': 'client is None', 'fix_recommendation': 'initialize client',
+                             'confidence': 0.8})
+
+    def retrieve(self, query, filters=None, expand_query=True, top_k=3):
+        self._call()
+        return [{'primary_source': 'pinecone', 'text': f'doc for {query}', 'rrf_score': 0.5}]
+
+    def get_file(self, file_path, branch="main", **kwargs):
+        self._call()
+        return GitHubFileResult(success=True, content="def write(): ...", file_path=file_path,
+                                branch=branch, size_bytes=16, total_lines=1)
+
+
+class FakeCursor:
+    description = [('build_id',)]
+
+    def __init__(self, services):
+        self.services = services
+
+    def execute(self, sql, params=None):
+        self.services._call()
+        self.params = params
+
+    def fetchall(self):
+        return [{'build_id': 'OLD', 'test_name': self.params[0], 'root_cause': 'previous'}]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, services):
+        self.services = services
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self.services)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, services):
+        self.services = services
+
+    def getconn(self):
+        return FakeConnection(self.services)
+
+    def putconn(self, conn, close=False):
+        pass
+
+
+class FakeMongoCursor(list):
+    def sort(self, *args):
+        return self
+
+
+class FakeCollection:
+    def __init__(self, services):
+        self.services = services
+
+    def find(self, query, limit=0):
+        self.services._call()
+        return FakeMongoCursor([{'_id': 'log-1', 'error_message': 'log entry'}])
+
+
+class FakeMongoDb:
+    def __init__(self, services):
+        self.test_results = FakeCollection(services)
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestAgentCassette(unittest.TestCase):
+    """Record with fake services, replay offline"""
+
+    def setUp(self):
+        ThoughtPrompts._pinecone_available = False
+        self.services = FakeServices()
+
+        with patch.object(ToolRegistry, '_discover_categories_from_pinecone', return_value=CATEGORIES):
+            registry = ToolRegistry(pinecone_api_key='test_key')
+
+        # Bypass __init__ (no external connections)
+        agent = ReActAgent.__new__(ReActAgent)
+        agent.openai_api_key = 'test_key'
+        agent.openai_base_url = 'http://llm.local/v1'
+        agent.llm_client = LLMClient(agent.openai_base_url, agent.openai_api_key)
+        agent.fast_classifier = None
+        agent.knowledge_index = 'ddn-knowledge-docs'
+        agent.error_library_index = 'ddn-error-library'
+        agent.tool_registry = registry
+        agent.correction_strategy = SelfCorrectionStrategy()
+        agent.tool_cache = ToolResultCache()
+        agent.reasoning_budget = ReasoningBudget(early_termination=False)  # run the full tool plan
+        agent.rag_router = None
+        agent.fusion_rag = self.services
+        agent.github_client = self.services
+        agent.github_prefetcher = None
+        agent.mongo_db = FakeMongoDb(self.services)
+        agent.postgres_pool = FakePool(self.services)
+        agent.workflow = agent.create_workflow()
+        self.agent = agent
+
+        self.path = os.path.join(tempfile.mkdtemp(), 'PERF-001.json')
+
+    def _analyze(self, agent):
+        return agent.analyze(
+            build_id='PERF-001',
+            error_log=STACK_TRACE,
+            error_message="AttributeError: 'NoneType' object has no attribute 'write'",
+            stack_trace=STACK_TRACE,
+            test_name='test_write'
+        )
+
+    def _record(self):
+        with patch.object(self.agent.llm_client.session, 'post', side_effect=self.services.chat_completion):
+            with use_cassette(self.agent, self.path, mode='record') as session:
+                result = self._analyze(self.agent)
+        return result, session.get_summary()
+
+    def test_replay_matches_recording(self):
+        """Test an offline replay reproduces the recorded analysis"""
+        recorded, record_summary = self._record()
+        live_calls = self.services.calls
+
+        self.assertTrue(recorded['success'], recorded.get('error'))
+        self.assertIn('github_get_file', recorded['tools_used'])
+        channels = record_summary['channels']
+        self.assertEqual(record_summary['calls'] - channels['pinecone_templates']['calls'], live_calls)
+        self.assertIs(self.agent.github_client, self.services)  # restored after the session
+
+        cassette = Cassette.load(self.path)
+        agent = create_replay_agent(cassette)
+        with use_cassette(agent, cassette, mode='replay', latency='zero', strict=True) as session:
+            replayed = self._analyze(agent)
+
+        summary = session.get_summary()
+        self.assertEqual(self.services.calls, live_calls)
+        self.assertEqual(summary['mismatches'], 0)
+        self.assertEqual(summary['unused'], 0)
+        self.assertEqual(summary['slept_ms'], 0)
+        self.assertEqual(set(summary['channels']), {'llm', 'fusion_rag', 'github', 'mongodb', 'postgres',
+                                                    'pinecone_templates'})
+        for field in ('error_category', 'root_cause', 'fix_recommendation', 'tools_used', 'iterations'):
+            self.assertEqual(replayed[field], recorded[field], field)
+
+    def test_zero_latency_replay_is_faster(self):
+        """Test zero-latency replay skips service time that recorded latency keeps"""
+        self._record()
+        cassette = Cassette.load(self.path)
+        agent = create_replay_agent(cassette)
+
+        timings = {}
+        for latency in ('recorded', 'zero'):
+            cassette.rewind()
+            with use_cassette(agent, cassette, mode='replay', latency=latency):
+                start = time.perf_counter()
+                self._analyze(agent)
+                timings[latency] = time.perf_counter() - start
+
+        external = cassette.get_summary()['external_ms'] / 1000
+        self.assertGreater(timings['recorded'], external * 0.9)
+        self.assertLess(timings['zero'], timings['recorded'] - external * 0.5)
+
+    def test_recorded_error_is_replayed(self):
+        """Test service errors are stored and re-raised on replay"""
+        cassette = Cassette()
+        self.agent.github_client = self.services
+
+        with patch.object(self.services, 'get_file', side_effect=TimeoutError("MCP server timed out")):
+            with use_cassette(self.agent, cassette, mode='record'):
+                with self.assertRaises(TimeoutError):
+                    self.agent.github_client.get_file(file_path='a.py', branch='main')
+
+        with use_cassette(self.agent, cassette, mode='replay'):
+            with self.assertRaises(ReplayedError) as ctx:
+                self.agent.github_client.get_file(file_path='a.py', branch='main')
+        self.assertIn('MCP server timed out', str(ctx.exception))
+
+    def test_strict_miss(self):
+        """Test strict replay fails on requests that were never recorded"""
+        cassette = Cassette()
+        cassette.add('github', {'method': 'get_file', 'args': [], 'kwargs': {'file_path': 'a.py'}}, response={})
+
+        cassette.rewind()
+        with self.assertRaises(CassetteMiss):
+            cassette.take('github', {'method': 'get_file', 'args': [], 'kwargs': {'file_path': 'b.py'}}, strict=True)
+
+        interaction, mismatched = cassette.take('github', {'method': 'get_file', 'args': [],
+                                                           'kwargs': {'file_path': 'b.py'}})
+        self.assertTrue(mismatched)
+        self.assertEqual(interaction['request']['kwargs']['file_path'], 'a.py')
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestAgentCassette))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,116 @@
+"""
+Unit Tests for Shared Database Connection Pools
+
+Tests postgres_connection(): commit/rollback, and waiting for a free
+connection when every connection of the pool is borrowed.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import threading
+import time
+
+# Add implementation directory to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, implementation_dir)
+
+try:
+    from psycopg2.pool import PoolError
+    from connection_pool import postgres_connection
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+
+class FakePool:
+    """psycopg2 pool stand-in that fails like it when all connections are out"""
+
+    def __init__(self, maxconn):
+        self.maxconn = maxconn
+        self.borrowed = 0
+        self.connections = []
+
+    def getconn(self):
+        if self.borrowed >= self.maxconn:
+            raise PoolError("connection pool exhausted")
+        self.borrowed += 1
+        conn = Mock(closed=False)
+        self.connections.append(conn)
+        return conn
+
+    def putconn(self, conn, close=False):
+        self.borrowed -= 1
+
+
+@unittest.skipUnless(PSYCOPG2_AVAILABLE, "psycopg2 not installed")
+class TestPostgresConnection(unittest.TestCase):
+    """Test borrowing connections from a pool"""
+
+    def test_commit_and_rollback(self):
+        """Test commit on success and rollback on error"""
+        pool = FakePool(maxconn=2)
+        with postgres_connection(pool):
+            pass
+        with self.assertRaises(ValueError):
+            with postgres_connection(pool):
+                raise ValueError("bad row")
+
+        self.assertTrue(pool.connections[0].commit.called)
+        self.assertTrue(pool.connections[1].rollback.called)
+        self.assertEqual(pool.borrowed, 0)
+
+    def test_waits_for_free_connection(self):
+        """Test a borrower waits for a returned connection instead of failing"""
+        pool = FakePool(maxconn=1)
+        borrowed = threading.Event()
+
+        def hold():
+            with postgres_connection(pool):
+                borrowed.set()
+                time.sleep(0.2)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        borrowed.wait()
+        with postgres_connection(pool, timeout=5):
+            self.assertEqual(pool.borrowed, 1)
+        holder.join()
+
+        self.assertEqual(len(pool.connections), 2)
+
+    def test_timeout_when_exhausted(self):
+        """Test PoolError after the timeout when no connection is returned"""
+        pool = FakePool(maxconn=1)
+
+        with postgres_connection(pool):
+            start = time.perf_counter()
+            with self.assertRaises(PoolError):
+                with postgres_connection(pool, timeout=0.1):
+                    pass
+            self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+        with postgres_connection(pool, timeout=0.1):
+            self.assertEqual(pool.borrowed, 1)
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestPostgresConnection))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
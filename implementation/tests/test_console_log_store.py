@@ -0,0 +1,299 @@
+"""
+Unit Tests for the Chunked Console Log Store
+
+Tests console_log_store of the MongoDB MCP server: chunking at line
+boundaries (and inside very long lines), tail / range / grep reading only
+the chunks they need, replacing a build's log, and reading and migrating
+logs stored as one full_log string.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import io
+import random
+import sys
+import os
+
+# Add MCP server modules to path
+mcp_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-configs')
+sys.path.insert(0, mcp_dir)
+
+try:
+    from console_log_store import ConsoleLogStore
+    STORE_AVAILABLE = True
+except ImportError:
+    STORE_AVAILABLE = False
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            for operator, operand in condition.items():
+                if operator == '$gte' and not value >= operand:
+                    return False
+                if operator == '$lte' and not value <= operand:
+                    return False
+                if operator == '$ne' and value == operand:
+                    return False
+                if operator == '$exists' and (key in doc) != operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor(list):
+    def sort(self, key, direction=1):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def batch_size(self, size):
+        return self
+
+
+class FakeCollection:
+    """The pymongo collection methods used by ConsoleLogStore"""
+
+    def __init__(self):
+        self.docs = []
+        self.fetched = 0
+
+    def create_index(self, keys, **kwargs):
+        pass
+
+    def insert_one(self, doc):
+        self.docs.append(dict(doc, _id=doc.get('_id', len(self.docs))))
+
+    def insert_many(self, docs, ordered=True):
+        self.docs.extend(dict(doc) for doc in docs)
+
+    def find(self, query, projection=None):
+        found = FakeCursor(doc for doc in self.docs if _matches(doc, query))
+        self.fetched += len(found)
+        return found
+
+    def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if _matches(doc, query):
+                if projection and 0 in projection.values():
+                    return {key: value for key, value in doc.items() if key not in projection}
+                return dict(doc)
+        return None
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        previous = self.find_one(query)
+        doc = next((doc for doc in self.docs if _matches(doc, query)), None)
+        if doc is None:
+            doc = dict(query, _id=len(self.docs))
+            self.docs.append(doc)
+        doc.update(update.get('$set', {}))
+        for key in update.get('$unset', {}):
+            doc.pop(key, None)
+        return previous
+
+    def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not _matches(doc, query)]
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.console_logs = FakeCollection()
+        self.console_log_chunks = FakeCollection()
+
+
+def _log_lines(count, seed=3):
+    rng = random.Random(seed)
+    lines = []
+    for number in range(1, count + 1):
+        level = rng.choice(['INFO', 'INFO', 'INFO', 'WARN', 'ERROR'])
+        lines.append(f'{level} [step {number}] ' + 'x' * rng.randint(0, 40))
+    return lines
+
+
+@unittest.skipUnless(STORE_AVAILABLE, "pymongo not installed")
+class TestConsoleLogStore(unittest.TestCase):
+    """Test chunked storage and partial reads"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.store = ConsoleLogStore(self.db, chunk_chars=200, max_chunk_chars=500)
+        self.lines = _log_lines(300)
+        # One line longer than a chunk is split across chunks
+        self.lines[120] = 'ERROR ' + 'y' * 1300
+        self.text = '\n'.join(self.lines) + '\n'
+
+    def _write(self, text=None, block=37):
+        text = self.text if text is None else text
+        return self.store.write('42', (text[i:i + block] for i in range(0, len(text), block)))
+
+    def test_write_index(self):
+        """Test the log is stored in bounded chunks with a line index"""
+        summary = self._write()
+
+        self.assertEqual(summary['total_lines'], 300)
+        self.assertEqual(summary['total_chars'], len(self.text))
+        chunks = self.db.console_log_chunks.docs
+        self.assertEqual(len(chunks), summary['chunk_count'])
+        self.assertTrue(all(len(chunk['data']) < 600 for chunk in chunks))
+        index = self.store.get_index('42')
+        self.assertEqual(index['line_index'][0], [0, False])
+        self.assertTrue(any(mid_line for _, mid_line in index['line_index']))
+
+    def test_ranges_match_full_text(self):
+        """Test every range returns the same lines as splitting the full log"""
+        self._write()
+        for start, end in [(1, 1), (1, 5), (119, 123), (121, 121), (122, 122), (250, 300), (299, 400)]:
+            with self.subTest(start=start, end=end):
+                result = self.store.read_range('42', start, end)
+                self.assertEqual(result['text'], '\n'.join(self.lines[start - 1:end]))
+                self.assertEqual(result['first_line'], start)
+
+    def test_tail_reads_last_chunks_only(self):
+        """Test tail(n) fetches only the chunks holding the last lines"""
+        summary = self._write()
+        self.db.console_log_chunks.fetched = 0
+
+        result = self.store.tail('42', 3)
+
+        self.assertEqual(result['text'], '\n'.join(self.lines[-3:]))
+        self.assertEqual(result['lines'], 3)
+        self.assertLessEqual(result['chunks_read'], 2)
+        self.assertLess(self.db.console_log_chunks.fetched, summary['chunk_count'] / 10)
+
+    def test_log_without_final_newline(self):
+        """Test the last line is counted when the log does not end with a newline"""
+        self._write(self.text.rstrip('\n'))
+
+        self.assertEqual(self.store.tail('42', 1)['text'], self.lines[-1])
+        self.assertEqual(self.store.get_index('42')['total_lines'], 300)
+
+    def test_grep(self):
+        """Test grep returns 1-based line numbers and stops at max_matches"""
+        summary = self._write()
+        expected = [number for number, line in enumerate(self.lines, 1) if line.startswith('ERROR')]
+
+        result = self.store.grep('42', r'^error', ignore_case=True, max_matches=1000)
+        self.assertEqual([match['line'] for match in result['matches']], expected)
+        self.assertEqual(result['chunks_read'], summary['chunk_count'])
+
+        result = self.store.grep('42', r'^ERROR', max_matches=2)
+        self.assertEqual([match['line'] for match in result['matches']], expected[:2])
+        self.assertTrue(result['truncated'])
+        self.assertLess(result['chunks_read'], summary['chunk_count'])
+
+    def test_rewrite_replaces_chunks(self):
+        """Test storing a build's log again removes the previous chunks"""
+        self._write()
+        self._write('only line\n')
+
+        self.assertEqual(self.store.read_all('42')['text'], 'only line')
+        self.assertEqual(len(self.db.console_log_chunks.docs), 1)
+
+    def test_full_log_tail(self):
+        """Test the end of the log is kept in full_log for the n8n workflows, in whole lines"""
+        self.store = ConsoleLogStore(self.db, chunk_chars=200, max_chunk_chars=500, tail_chars=100)
+        self._write()
+
+        doc = self.db.console_logs.find_one({'build_id': '42'})
+        self.assertTrue(doc['full_log_truncated'])
+        self.assertLessEqual(len(doc['full_log']), 100)
+        self.assertTrue(self.text.endswith('\n' + doc['full_log']))
+        self.assertNotIn('full_log', self.store.get_index('42'))
+        self.assertEqual(self.store.tail('42', 1)['text'], self.lines[-1])
+
+        self._write('only line\n')
+        doc = self.db.console_logs.find_one({'build_id': '42'})
+        self.assertEqual((doc['full_log'], doc['full_log_truncated']), ('only line\n', False))
+
+    def test_legacy_full_log(self):
+        """Test full_log documents are readable and can be migrated"""
+        self.db.console_logs.insert_one({'build_id': '7', 'full_log': self.text})
+
+        legacy_tail = self.store.tail('7', 2)
+        self.assertEqual(self.store.read_range('7', 10, 12)['text'], '\n'.join(self.lines[9:12]))
+        self.assertEqual(self.store.grep('7', 'step 5]')['matches'][0]['line'], 5)
+
+        self.assertEqual(self.store.migrate(), 1)
+        index = self.store.get_index('7')
+        self.assertEqual(index['storage'], 'chunked')
+        self.assertEqual(self.db.console_logs.find_one({'build_id': '7'})['full_log'], self.text)
+        self.assertEqual(self.store.tail('7', 1)['text'], self.lines[-1])
+        # Legacy reads kept the trailing empty line
+        self.assertEqual(legacy_tail['text'], self.lines[-1] + '\n')
+
+    def test_missing_build(self):
+        """Test reads of an unknown build return None"""
+        self.assertIsNone(self.store.tail('missing', 10))
+        self.assertIsNone(self.store.grep('missing', 'x'))
+
+
+@unittest.skipUnless(STORE_AVAILABLE, "pymongo not installed")
+class TestConsoleLogTools(unittest.TestCase):
+    """Test the MCP tools built on the store"""
+
+    def setUp(self):
+        try:
+            import mcp_mongodb_server
+        except ImportError:
+            self.skipTest("flask not installed")
+        self.server = mcp_mongodb_server
+        self.store = ConsoleLogStore(FakeDatabase(), chunk_chars=64)
+        self.store.write('42', ['line 1\nline 2\nERROR disk full\nline 4\n'])
+        patcher = patch.object(mcp_mongodb_server, 'get_console_log_store', return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_console_log_tools(self):
+        """Test tail, range, grep and the existing console log tool"""
+        self.assertEqual(self.server.mongodb_tail_console_log('42', 2)['text'], 'ERROR disk full\nline 4')
+        self.assertEqual(self.server.mongodb_get_console_log_range('42', 2, 2)['text'], 'line 2')
+        self.assertEqual(self.server.mongodb_grep_console_log('42', 'disk')['matches'],
+                         [{'line': 3, 'text': 'ERROR disk full'}])
+        result = self.server.mongodb_get_console_log('42', lines=1)
+        self.assertEqual((result['console_output'], result['total_lines']), ('line 4', 4))
+
+    def test_upload_decoding(self):
+        """Test characters split across upload blocks are decoded intact"""
+        body = 'déjà vu ✓\n'.encode('utf-8') * 3 + b'\xff'
+
+        text = ''.join(self.server._decode_blocks(io.BytesIO(body), block_size=4))
+
+        self.assertEqual(text, 'déjà vu ✓\n' * 3 + '\ufffd')
+
+    def test_invalid_pattern(self):
+        """Test an invalid grep pattern is reported"""
+        result = self.server.mongodb_grep_console_log('42', '(unclosed')
+        self.assertFalse(result['success'])
+        self.assertIn('Invalid pattern', result['error'])
+
+    def test_grep_route_status(self):
+        """Test the grep route returns 400 for an invalid pattern, 404 for a missing log"""
+        client = self.server.app.test_client()
+
+        response = client.get('/api/console-logs/42/grep?pattern=(unclosed')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('missing ), unterminated subpattern', response.get_json()['error'])
+        self.assertEqual(client.get('/api/console-logs/43/grep?pattern=disk').status_code, 404)
+        self.assertEqual(client.get('/api/console-logs/42/grep?pattern=disk').status_code, 200)
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestConsoleLogStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestConsoleLogTools))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
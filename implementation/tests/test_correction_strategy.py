@@ -0,0 +1,203 @@
+"""
+Unit Tests for ReAct Retry Scheduling (Task 0-ARCH.5)
+
+Tests per-analysis retry tracking in SelfCorrectionStrategy, the
+deadline-aware RetryScheduler, and the ReAct tool execution node running
+other planned tools while a failed tool backs off.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+import time
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+from correction_strategy import SelfCorrectionStrategy, RetryScheduler
+
+
+class TestPerAnalysisRetryHistory(unittest.TestCase):
+    """Test retry counts kept outside the shared strategy"""
+
+    def setUp(self):
+        self.strategy = SelfCorrectionStrategy()
+
+    def test_histories_are_independent(self):
+        """Test two analyses sharing a strategy keep separate counts"""
+        history_a, history_b = {}, {}
+
+        self.strategy.should_retry('mongodb_logs', TimeoutError('timed out'), history_a)
+        self.strategy.should_retry('mongodb_logs', TimeoutError('timed out'), history_a)
+        self.strategy.should_retry('mongodb_logs', TimeoutError('timed out'), history_b)
+
+        self.assertEqual(history_a['mongodb_logs'], 2)
+        self.assertEqual(history_b['mongodb_logs'], 1)
+        self.assertEqual(self.strategy.retry_history, {})
+
+    def test_backoff_from_history(self):
+        """Test backoff grows with the per-analysis retry count"""
+        self.assertEqual(self.strategy.get_backoff_time('t', {'t': 1}), 1)
+        self.assertEqual(self.strategy.get_backoff_time('t', {'t': 3}), 4)
+
+
+class TestRetryScheduler(unittest.TestCase):
+    """Test RetryScheduler class"""
+
+    def setUp(self):
+        self.strategy = SelfCorrectionStrategy()
+        self.history = {}
+
+    def test_schedules_transient_error(self):
+        """Test transient errors get a pending retry without sleeping"""
+        scheduler = RetryScheduler(self.strategy, self.history, deadline=time.time() + 60)
+
+        start = time.time()
+        self.assertTrue(scheduler.schedule_retry('pinecone_knowledge', ConnectionError('connection reset')))
+        self.assertLess(time.time() - start, 0.5)
+
+        self.assertTrue(scheduler.is_pending('pinecone_knowledge'))
+        self.assertGreater(scheduler.time_until_due('pinecone_knowledge'), 0)
+        self.assertEqual(self.history['pinecone_knowledge'], 1)
+
+    def test_permanent_error_abandoned(self):
+        """Test permanent errors are not scheduled"""
+        scheduler = RetryScheduler(self.strategy, self.history)
+
+        self.assertFalse(scheduler.schedule_retry('github_get_file', ValueError('404 not found')))
+        self.assertEqual(scheduler.abandoned['github_get_file'], 'permanent_error')
+
+    def test_max_retries_abandoned(self):
+        """Test retries stop after MAX_RETRIES"""
+        scheduler = RetryScheduler(self.strategy, self.history)
+        for _ in range(SelfCorrectionStrategy.MAX_RETRIES):
+            self.assertTrue(scheduler.schedule_retry('mongodb_logs', TimeoutError('timeout')))
+
+        self.assertFalse(scheduler.schedule_retry('mongodb_logs', TimeoutError('timeout')))
+        self.assertEqual(scheduler.abandoned['mongodb_logs'], 'max_retries')
+
+    def test_deadline_abandoned(self):
+        """Test retries whose backoff passes the deadline are abandoned"""
+        scheduler = RetryScheduler(self.strategy, self.history, deadline=time.time() + 0.5)
+
+        self.assertFalse(scheduler.schedule_retry('mongodb_logs', TimeoutError('timeout')))
+        self.assertEqual(scheduler.abandoned['mongodb_logs'], 'deadline')
+        self.assertFalse(scheduler.is_pending('mongodb_logs'))
+
+    def test_mark_success_resets(self):
+        """Test success clears pending retry and count"""
+        scheduler = RetryScheduler(self.strategy, self.history)
+        scheduler.schedule_retry('mongodb_logs', TimeoutError('timeout'))
+        scheduler.mark_success('mongodb_logs')
+
+        self.assertFalse(scheduler.is_pending('mongodb_logs'))
+        self.assertNotIn('mongodb_logs', self.history)
+
+
+try:
+    from react_agent_service import ReActAgent
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestToolExecutionScheduling(unittest.TestCase):
+    """Test the tool execution node with scheduled retries"""
+
+    def setUp(self):
+        from tool_result_cache import ToolResultCache
+        from reasoning_budget import ReasoningBudget
+
+        # Bypass __init__ (no external connections)
+        self.agent = ReActAgent.__new__(ReActAgent)
+        self.agent.correction_strategy = SelfCorrectionStrategy()
+        self.agent.tool_cache = ToolResultCache()
+        self.agent.reasoning_budget = ReasoningBudget()
+        self.agent.tool_registry = Mock()
+        self.agent.tool_registry.get_tools_for_category.return_value = [
+            'pinecone_knowledge', 'pinecone_error_library', 'mongodb_logs'
+        ]
+
+        self.calls = []
+
+    def _state(self, deadline_seconds=60):
+        return {
+            'build_id': 'B-1', 'error_log': 'log', 'error_message': 'ConnectionTimeout',
+            'error_category': 'INFRA_ERROR', 'iteration': 1, 'next_action': 'mongodb_logs',
+            'actions_taken': [], 'tool_results': {}, 'rag_results': [], 'github_files': [],
+            'mongodb_logs': [], 'postgres_history': [], 'retry_history': {},
+            'analysis_deadline': time.time() + deadline_seconds
+        }
+
+    def _flaky_mongodb(self, state):
+        self.calls.append(('mongodb_logs', time.time()))
+        if len([c for c in self.calls if c[0] == 'mongodb_logs']) == 1:
+            raise TimeoutError('connection timed out')
+        return [{'log': 'ok'}]
+
+    def _knowledge(self, state):
+        self.calls.append(('pinecone_knowledge', time.time()))
+        return [{'source': 'kb', 'content': 'doc', 'confidence': 0.8}]
+
+    def _error_library(self, state):
+        self.calls.append(('pinecone_error_library', time.time()))
+        return [{'source': 'lib', 'content': 'case', 'confidence': 0.7}]
+
+    def test_other_tools_run_during_backoff(self):
+        """Test planned tools run while the failed tool backs off"""
+        self.agent._tool_mongodb_logs = self._flaky_mongodb
+        self.agent._tool_pinecone_knowledge = self._knowledge
+        self.agent._tool_pinecone_error_library = self._error_library
+
+        with patch('correction_strategy.time.sleep') as sleep:
+            state = self.agent.tool_execution_node(self._state())
+
+        order = [name for name, _ in self.calls]
+        self.assertEqual(order, ['mongodb_logs', 'pinecone_knowledge', 'pinecone_error_library', 'mongodb_logs'])
+
+        primary = state['actions_taken'][-1]
+        self.assertEqual(primary['tool'], 'mongodb_logs')
+        self.assertTrue(primary['success'])
+        self.assertEqual(primary['retries'], 1)
+        self.assertTrue(all(a.get('during_backoff') for a in state['actions_taken'][:-1]))
+        self.assertEqual(state['retry_history'], {})
+        self.assertLessEqual(sleep.call_count, 1)
+
+    def test_retry_abandoned_at_deadline(self):
+        """Test no retry is attempted when the deadline is too close"""
+        self.agent._tool_mongodb_logs = self._flaky_mongodb
+
+        state = self.agent.tool_execution_node(self._state(deadline_seconds=0.2))
+
+        primary = state['actions_taken'][-1]
+        self.assertFalse(primary['success'])
+        self.assertEqual(primary['retry_abandoned'], 'deadline')
+        self.assertEqual(len(self.calls), 1)
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestPerAnalysisRetryHistory))
+    suite.addTests(loader.loadTestsFromTestCase(TestRetryScheduler))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolExecutionScheduling))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
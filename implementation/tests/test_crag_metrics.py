@@ -19,7 +19,7 @@ import json
 verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
 sys.path.insert(0, verification_dir)
 
-from crag_metrics import CRAGMetrics, get_metrics, reset_metrics
+from crag_metrics import CRAGMetrics, ScoreHistogram, get_metrics, reset_metrics, HOURLY_RETENTION
 
 
 class TestCRAGMetrics(unittest.TestCase):
@@ -80,12 +80,12 @@ class TestCRAGMetrics(unittest.TestCase):
         self.assertEqual(self.metrics.total_verifications, 1)
         self.assertEqual(self.metrics.confidence_counts['HIGH'], 1)
         self.assertEqual(self.metrics.routing_counts['PASS'], 1)
-        self.assertEqual(len(self.metrics.confidence_scores), 1)
-        self.assertEqual(self.metrics.confidence_scores[0], 0.92)
+        self.assertEqual(self.metrics.confidence_scores.count, 1)
+        self.assertAlmostEqual(self.metrics.confidence_scores.mean, 0.92)
 
         # Verify component scores
-        self.assertEqual(len(self.metrics.component_scores['relevance']), 1)
-        self.assertEqual(self.metrics.component_scores['relevance'][0], 0.95)
+        self.assertEqual(self.metrics.component_scores['relevance'].count, 1)
+        self.assertAlmostEqual(self.metrics.component_scores['relevance'].mean, 0.95)
 
     def test_record_verification_medium_confidence(self):
         """Test recording MEDIUM confidence verification"""
@@ -174,8 +174,8 @@ class TestCRAGMetrics(unittest.TestCase):
         self.assertEqual(self.metrics.self_correction_attempts, 1)
         self.assertEqual(self.metrics.self_correction_successes, 1)
         self.assertEqual(self.metrics.self_correction_failures, 0)
-        self.assertEqual(len(self.metrics.confidence_improvements), 1)
-        self.assertAlmostEqual(self.metrics.confidence_improvements[0], 0.13, places=2)
+        self.assertEqual(self.metrics.confidence_improvements.count, 1)
+        self.assertAlmostEqual(self.metrics.confidence_improvements.mean, 0.13, places=2)
 
     def test_record_self_correction_failure(self):
         """Test recording failed self-correction"""
@@ -187,7 +187,7 @@ class TestCRAGMetrics(unittest.TestCase):
         self.assertEqual(self.metrics.self_correction_attempts, 1)
         self.assertEqual(self.metrics.self_correction_successes, 0)
         self.assertEqual(self.metrics.self_correction_failures, 1)
-        self.assertEqual(len(self.metrics.confidence_improvements), 0)
+        self.assertEqual(self.metrics.confidence_improvements.count, 0)
 
     def test_record_hitl_queue(self):
         """Test recording HITL queue operations"""
@@ -236,8 +236,8 @@ class TestCRAGMetrics(unittest.TestCase):
         self.assertEqual(self.metrics.web_search_attempts, 1)
         self.assertEqual(self.metrics.web_search_successes, 1)
         self.assertEqual(self.metrics.web_search_failures, 0)
-        self.assertEqual(len(self.metrics.web_search_improvements), 1)
-        self.assertAlmostEqual(self.metrics.web_search_improvements[0], 0.23, places=2)
+        self.assertEqual(self.metrics.web_search_improvements.count, 1)
+        self.assertAlmostEqual(self.metrics.web_search_improvements.mean, 0.23, places=2)
 
     def test_record_web_search_failure(self):
         """Test recording failed web search"""
@@ -249,7 +249,7 @@ class TestCRAGMetrics(unittest.TestCase):
         self.assertEqual(self.metrics.web_search_attempts, 1)
         self.assertEqual(self.metrics.web_search_successes, 0)
         self.assertEqual(self.metrics.web_search_failures, 1)
-        self.assertEqual(len(self.metrics.web_search_improvements), 0)
+        self.assertEqual(self.metrics.web_search_improvements.count, 0)
 
     def test_get_statistics_empty(self):
         """Test get_statistics with no data"""
@@ -437,6 +437,96 @@ class TestCRAGMetrics(unittest.TestCase):
         self.assertEqual(len(self.metrics.recent_verifications), 100)
 
 
+class TestStreamingAggregates(unittest.TestCase):
+    """Test bounded aggregates, percentiles and Prometheus export"""
+
+    def setUp(self):
+        self.metrics = CRAGMetrics()
+
+    def _record(self, confidence, level='HIGH', status='PASS'):
+        self.metrics.record_verification({
+            'status': status,
+            'confidence': confidence,
+            'confidence_level': level,
+            'verification_metadata': {'confidence_scores': {'components': {'grounding': confidence}}}
+        })
+
+    def test_histogram_moments_and_percentiles(self):
+        """Test Welford moments match exact values and percentiles are within one bucket"""
+        values = [i / 1000 for i in range(1000)]
+        histogram = ScoreHistogram()
+        for value in values:
+            histogram.add(value)
+
+        mean = sum(values) / len(values)
+        variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+        self.assertAlmostEqual(histogram.mean, mean)
+        self.assertAlmostEqual(histogram.stddev, variance ** 0.5)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.5, delta=0.01)
+        self.assertAlmostEqual(histogram.quantile(0.95), 0.95, delta=0.01)
+        self.assertAlmostEqual(histogram.quantile(0.99), 0.99, delta=0.01)
+        self.assertEqual(histogram.cumulative_counts((0.5, 1.0)), [(0.5, 501), (1.0, 1000)])
+
+    def test_histogram_bound_is_inclusive(self):
+        """Test values equal to a bound are counted by it, as Prometheus le does"""
+        histogram = ScoreHistogram()
+        for value in (0.07, 0.3, 0.65, 0.7, 0.70001, 1.0):
+            histogram.add(value)
+
+        self.assertEqual(histogram.cumulative_counts((0.07, 0.3, 0.65, 0.7, 0.8, 1.0)),
+                         [(0.07, 1), (0.3, 2), (0.65, 3), (0.7, 4), (0.8, 5), (1.0, 6)])
+
+        deltas = ScoreHistogram(-1.0, 1.0, 200)
+        for value in (-0.1, 0.0, 0.05):
+            deltas.add(value)
+        self.assertEqual(deltas.cumulative_counts((-0.1, 0.0, 0.05)), [(-0.1, 1), (0.0, 2), (0.05, 3)])
+
+    def test_memory_is_bounded(self):
+        """Test many verifications do not grow the stored aggregates"""
+        for i in range(5000):
+            self._record((i % 100) / 100)
+
+        self.assertEqual(self.metrics.confidence_scores.count, 5000)
+        self.assertEqual(len(self.metrics.confidence_scores.buckets), 100)
+        self.assertEqual(len(self.metrics.recent_verifications), self.metrics.max_recent)
+
+        stats = self.metrics.get_statistics()
+        self.assertAlmostEqual(stats['summary']['average_confidence'], 0.495, places=3)
+        self.assertAlmostEqual(stats['summary']['confidence_percentiles']['p50'], 0.495, delta=0.01)
+        self.assertIn('p99', stats['component_percentiles']['grounding'])
+
+    def test_time_bucket_retention(self):
+        """Test hourly buckets older than the retention window are dropped"""
+        start = datetime(2026, 1, 1)
+        with patch('crag_metrics.datetime') as mock_datetime:
+            for hour in range(HOURLY_RETENTION + 5):
+                mock_datetime.now.return_value = start + timedelta(hours=hour)
+                self._record(0.9)
+
+        hourly = self.metrics.get_time_series('hourly')
+        self.assertEqual(len(hourly), HOURLY_RETENTION)
+        self.assertNotIn('2026-01-01 00:00', hourly)
+        self.assertEqual(len(self.metrics.get_time_series('daily')), 8)
+
+    def test_export_prometheus(self):
+        """Test Prometheus text exposition"""
+        self._record(0.9)
+        self._record(0.5, level='LOW', status='CORRECTED')
+        self.metrics.record_hitl_queue('high')
+
+        text = self.metrics.export_prometheus()
+
+        self.assertIn('# TYPE crag_confidence histogram', text)
+        self.assertIn('crag_verifications_total 2', text)
+        self.assertIn('crag_routing_total{status="CORRECTED"} 1', text)
+        self.assertIn('crag_confidence_bucket{le="0.6"} 1', text)
+        self.assertIn('crag_confidence_bucket{le="+Inf"} 2', text)
+        self.assertIn('crag_confidence_count 2', text)
+        self.assertIn('crag_component_score_bucket{component="grounding",le="1.0"} 2', text)
+        self.assertIn('crag_hitl_pending 1', text)
+        self.assertTrue(text.endswith('\n'))
+
+
 class TestGlobalMetrics(unittest.TestCase):
     """Test global metrics functions"""
 
@@ -477,6 +567,7 @@ def main():
 
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestCRAGMetrics))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingAggregates))
     suite.addTests(loader.loadTestsFromTestCase(TestGlobalMetrics))
 
     # Run tests
@@ -0,0 +1,247 @@
+"""
+Unit Tests for Shared CRAG Metrics Backends
+
+Tests fleet-wide aggregation of CRAGMetrics across processes through the
+Redis hash and shared memory backends: delta flushes, fleet statistics,
+fleet reset, failed flushes and time-series retention.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+import multiprocessing
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+
+# Add verification module to path
+verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
+sys.path.insert(0, verification_dir)
+
+from crag_metrics import CRAGMetrics
+from crag_metrics_backend import (
+    RedisMetricsBackend, SharedMemoryMetricsBackend, SHARED_MEMORY_AVAILABLE, prune_time_series
+)
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.Redis (hashes, pipelines)"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hincrby(self, key, field, amount):
+        if self.fail:
+            raise ConnectionError("redis down")
+        values = self.hashes.setdefault(key, {})
+        values[field] = str(int(float(values.get(field, 0))) + amount)
+
+    def hincrbyfloat(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = str(float(values.get(field, 0)) + amount)
+
+    def hsetnx(self, key, field, value):
+        self.hashes.setdefault(key, {}).setdefault(field, str(value))
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+
+class FakePipeline:
+    """Queues calls and runs them on execute()"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((getattr(self.client, name), args))
+
+    def execute(self):
+        return [method(*args) for method, args in self.calls]
+
+
+def _result(status, level, confidence):
+    return {
+        'status': status,
+        'confidence': confidence,
+        'confidence_level': level,
+        'verification_metadata': {'confidence_scores': {'components': {'grounding': confidence}}}
+    }
+
+
+def _record_and_flush(segment_name, count):
+    """Worker process: record verifications into its own CRAGMetrics"""
+    backend = SharedMemoryMetricsBackend(CRAGMetrics.state_keys(), segment_name)
+    metrics = CRAGMetrics(backend=backend, flush_interval=0)
+    for _ in range(count):
+        metrics.record_verification(_result('HITL', 'MEDIUM', 0.7))
+    metrics.flush()
+    backend.close()
+
+
+class TestRedisBackend(unittest.TestCase):
+    """Test aggregation through a Redis hash"""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.worker_a = CRAGMetrics(backend=RedisMetricsBackend(self.redis), flush_interval=0)
+        self.worker_b = CRAGMetrics(backend=RedisMetricsBackend(self.redis), flush_interval=0)
+
+    def test_fleet_statistics(self):
+        """Test statistics cover the verifications of every process"""
+        for _ in range(3):
+            self.worker_a.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.worker_b.record_verification(_result('WEB_SEARCH', 'VERY_LOW', 0.3))
+        self.worker_b.record_hitl_queue('high')
+        self.worker_b.flush()
+
+        stats = self.worker_a.get_statistics()
+
+        self.assertEqual(stats['summary']['scope'], 'fleet')
+        self.assertEqual(stats['summary']['backend'], 'redis')
+        self.assertEqual(stats['summary']['total_verifications'], 4)
+        self.assertEqual(stats['routing_distribution']['PASS']['count'], 3)
+        self.assertEqual(stats['routing_distribution']['WEB_SEARCH']['count'], 1)
+        self.assertEqual(stats['hitl_queue']['pending'], 1)
+        self.assertAlmostEqual(stats['summary']['average_confidence'], 0.75, places=3)
+        self.assertAlmostEqual(stats['summary']['confidence_percentiles']['p50'], 0.9, delta=0.01)
+        self.assertEqual(sum(self.worker_a.get_time_series('hourly').values()), 4)
+
+        # Local counters are unchanged
+        self.assertEqual(self.worker_a.total_verifications, 3)
+
+    def test_flush_sends_only_deltas(self):
+        """Test repeated flushes do not double count"""
+        self.worker_a.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.worker_a.flush()
+        self.worker_a.flush()
+        self.worker_a.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.worker_a.flush()
+
+        self.assertEqual(self.redis.hashes['ddn:crag:metrics']['total_verifications'], '2')
+
+    def test_failed_flush_is_retried(self):
+        """Test a delta that could not be pushed is sent by the next flush"""
+        self.worker_a.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.redis.fail = True
+        self.assertFalse(self.worker_a.flush())
+
+        self.redis.fail = False
+        self.redis.hashes.clear()
+        self.assertTrue(self.worker_a.flush())
+        self.assertEqual(self.worker_a.get_statistics()['summary']['total_verifications'], 1)
+
+    def test_fleet_reset(self):
+        """Test after a backend reset only new verifications are aggregated"""
+        self.worker_a.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.worker_b.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.worker_a.flush()
+        self.worker_b.flush()
+
+        self.worker_a.reset()
+        self.worker_a.backend.reset()
+        self.worker_b.record_verification(_result('HITL', 'MEDIUM', 0.7))
+        self.worker_b.flush()
+
+        stats = self.worker_a.get_statistics()
+        self.assertEqual(stats['summary']['total_verifications'], 1)
+        self.assertEqual(stats['routing_distribution']['HITL']['count'], 1)
+
+    def test_prune_time_series(self):
+        """Test time-series fields beyond retention are removed"""
+        state = {f'hourly.2026-01-01 {hour:02d}:00': 1.0 for hour in range(5)}
+        state['total_verifications'] = 5.0
+
+        removed = prune_time_series(state, hourly_retention=3, daily_retention=3)
+
+        self.assertEqual(removed, ['hourly.2026-01-01 00:00', 'hourly.2026-01-01 01:00'])
+        self.assertIn('total_verifications', state)
+
+
+@unittest.skipUnless(SHARED_MEMORY_AVAILABLE, "POSIX shared memory not available")
+class TestSharedMemoryBackend(unittest.TestCase):
+    """Test aggregation through a shared memory segment"""
+
+    def setUp(self):
+        self.segment_name = f"crag_test_{uuid.uuid4().hex[:12]}"
+        self.backend = SharedMemoryMetricsBackend(CRAGMetrics.state_keys(), self.segment_name)
+        self.metrics = CRAGMetrics(backend=self.backend, flush_interval=0)
+
+    def tearDown(self):
+        self.backend.unlink()
+        self.backend.close()
+
+    def test_aggregates_across_processes(self):
+        """Test verifications recorded in other processes are included"""
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_record_and_flush, args=(self.segment_name, 5)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            self.assertEqual(worker.exitcode, 0)
+
+        self.metrics.record_verification(_result('PASS', 'HIGH', 0.95))
+        stats = self.metrics.get_statistics()
+
+        self.assertEqual(stats['summary']['backend'], 'shm')
+        self.assertEqual(stats['summary']['total_verifications'], 11)
+        self.assertEqual(stats['routing_distribution']['HITL']['count'], 10)
+        self.assertAlmostEqual(stats['component_percentiles']['grounding']['p50'], 0.7, delta=0.01)
+        self.assertIn('crag_verifications_total 11', self.metrics.export_prometheus())
+
+    def test_time_series_ring(self):
+        """Test hourly counts are kept for the ring size and old slots recycled"""
+        start = datetime(2026, 1, 1)
+        for hour in range(self.backend.hourly_slots + 2):
+            key = (start + timedelta(hours=hour)).strftime('hourly.%Y-%m-%d %H:00')
+            self.backend.push({key: 1})
+
+        state = self.backend.read()
+        hourly = [key for key in state if key.startswith('hourly.')]
+
+        self.assertEqual(len(hourly), self.backend.hourly_slots)
+        self.assertNotIn('hourly.2026-01-01 00:00', state)
+        self.assertIn('hourly.2026-01-01 02:00', state)
+
+    def test_attach_keeps_existing_values(self):
+        """Test a second process attaching to the segment sees the same state"""
+        self.metrics.record_verification(_result('PASS', 'HIGH', 0.9))
+        self.metrics.flush()
+
+        attached = SharedMemoryMetricsBackend(CRAGMetrics.state_keys(), self.segment_name)
+        self.assertEqual(attached.read()['total_verifications'], 1)
+        attached.close()
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestRedisBackend))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharedMemoryBackend))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
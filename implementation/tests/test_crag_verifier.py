@@ -17,12 +17,15 @@ import unittest
 from datetime import datetime
 import sys
 import os
+import threading
 
 # Add verification module to path
 verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
 sys.path.insert(0, verification_dir)
+sys.path.insert(0, os.path.dirname(__file__))
 
-from crag_verifier import ConfidenceScorer, CRAGVerifier
+from crag_verifier import ConfidenceScorer, CRAGVerifier, NUMPY_AVAILABLE
+from performance_test_crag_scorer import make_workload, reference_consistency, reference_grounding
 
 
 class TestConfidenceScorer(unittest.TestCase):
@@ -530,6 +533,164 @@ class TestCRAGIntegration(unittest.TestCase):
         self.assertGreater(components['classification'], 0.95)  # High classification confidence
 
 
+class TestScorerTokenFeatures(unittest.TestCase):
+    """Test precomputed token sets, TermMatcher grounding and MinHash consistency"""
+
+    def setUp(self):
+        self.scorer = ConfidenceScorer()
+
+    def test_exact_scores_match_original(self):
+        """Test set-based scores equal the original regex/substring implementation"""
+        workload = make_workload(docs=6, words=2000, sentences=12)
+
+        self.assertEqual(self.scorer.calculate_consistency_score(workload['docs'], workload['answer']),
+                         reference_consistency(workload['docs']))
+        self.assertEqual(self.scorer.calculate_grounding_score(workload['answer'], workload['docs']),
+                         reference_grounding(workload['answer'], workload['docs']))
+
+    def test_grounding_keeps_substring_matches(self):
+        """Test a term inside a longer document word still counts as grounded"""
+        docs = [{'text': 'The request hit a Timeout while connecting'}]
+        answer = "The request time ran out while connecting."  # "time" only occurs inside "timeout"
+
+        self.assertEqual(self.scorer.calculate_grounding_score(answer, docs), 1.0)
+        self.assertEqual(reference_grounding(answer, docs), 1.0)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy not installed")
+    def test_minhash_consistency_within_tolerance(self):
+        """Test MinHash-estimated consistency stays close to exact Jaccard"""
+        workload = make_workload(docs=40, words=1000, sentences=1)
+        scorer = ConfidenceScorer(minhash_min_docs=32)
+
+        self.assertAlmostEqual(scorer.calculate_consistency_score(workload['docs'], ''),
+                               reference_consistency(workload['docs']), delta=0.05)
+
+    def test_features_cached_per_text(self):
+        """Test document token data is built once and reused"""
+        scorer = ConfidenceScorer()
+        text = 'Connection refused on port 5432 ' * 100
+
+        self.assertIs(scorer.get_features(text), scorer.get_features(text))
+
+
+class GatedSelfCorrector:
+    """SelfCorrector stand-in that blocks until released"""
+
+    def __init__(self, improved=True, error=None):
+        self.release = threading.Event()
+        self.improved = improved
+        self.error = error
+
+    def correct(self, react_result, scores, failure_data):
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return {
+            'improved': self.improved,
+            'new_confidence': 0.8 if self.improved else None,
+            'corrected_answer': {**react_result, 'root_cause': 'Expired token in auth/middleware.py'},
+            'method': 'query_expansion'
+        }
+
+
+class TestAsyncCorrection(unittest.TestCase):
+    """Test background correction tiers with provisional results"""
+
+    LOW_RESULT = {
+        'root_cause': ('Authentication token expired during the long-running test suite because '
+                       'TOKEN_EXPIRATION in auth/middleware.py is 1800 seconds'),
+        'fix_recommendation': 'Increase TOKEN_EXPIRATION to 3600 seconds and restart the authentication service',
+        'error_category': 'CODE_ERROR',
+        'classification_confidence': 0.6
+    }
+    LOW_DOCS = [
+        {'similarity_score': 0.60, 'text': 'Authentication token expired during test suite execution'},
+        {'similarity_score': 0.55, 'text': 'TOKEN_EXPIRATION setting controls how long tokens stay valid'}
+    ]
+
+    def setUp(self):
+        self.verifier = CRAGVerifier(async_correction=True, correction_workers=2)
+        self.published = []
+        self.published_event = threading.Event()
+
+    def tearDown(self):
+        self.verifier.shutdown()
+
+    def on_corrected(self, result):
+        self.published.append(result)
+        self.published_event.set()
+
+    def test_provisional_result_then_correction(self):
+        """Test LOW confidence returns CORRECTING before the correction finishes"""
+        self.verifier.self_corrector = GatedSelfCorrector()
+
+        result = self.verifier.verify(self.LOW_RESULT, self.LOW_DOCS, {'build_id': 'test-async-1'},
+                                      on_corrected=self.on_corrected)
+
+        self.assertEqual(result['status'], 'CORRECTING')
+        self.assertEqual(result['confidence_level'], 'LOW')
+        self.assertEqual(result['answer'], self.LOW_RESULT)
+        correction_id = result['verification_metadata']['correction_id']
+        self.assertEqual(result['verification_metadata']['correction_tier'], 'self_correction')
+        self.assertEqual(self.verifier.get_correction(correction_id)['status'], 'CORRECTING')
+        self.assertEqual(self.verifier.pending_corrections(), 1)
+        self.assertEqual(self.published, [])
+
+        self.verifier.self_corrector.release.set()
+        self.assertTrue(self.verifier.wait_for_corrections(timeout=5))
+        self.assertTrue(self.published_event.wait(5))
+
+        final = self.published[0]
+        self.assertEqual(final['status'], 'CORRECTED')
+        self.assertEqual(final['confidence'], 0.8)
+        self.assertEqual(final['verification_metadata']['correction_id'], correction_id)
+        self.assertEqual(self.verifier.get_correction(correction_id)['status'], 'CORRECTED')
+        self.assertEqual(self.verifier.pending_corrections(), 0)
+
+    def test_still_low_goes_to_hitl(self):
+        """Test a correction that does not help is published as HITL"""
+        self.verifier.self_corrector = GatedSelfCorrector(improved=False)
+        self.verifier.self_corrector.release.set()
+
+        self.verifier.verify(self.LOW_RESULT, self.LOW_DOCS, {'build_id': 'test-async-2'},
+                             on_corrected=self.on_corrected)
+
+        self.assertTrue(self.published_event.wait(5))
+        self.assertEqual(self.published[0]['status'], 'HITL')
+
+    def test_correction_error_goes_to_hitl(self):
+        """Test a failing correction tier is published as high-priority HITL"""
+        self.verifier.self_corrector = GatedSelfCorrector(error=RuntimeError('Pinecone unavailable'))
+        self.verifier.self_corrector.release.set()
+
+        self.verifier.verify(self.LOW_RESULT, self.LOW_DOCS, {'build_id': 'test-async-3'},
+                             on_corrected=self.on_corrected)
+
+        self.assertTrue(self.published_event.wait(5))
+        metadata = self.published[0]['verification_metadata']
+        self.assertEqual(self.published[0]['status'], 'HITL')
+        self.assertEqual(metadata['priority'], 'high')
+        self.assertEqual(metadata['reason'], 'self_correction_error')
+
+    def test_very_low_schedules_web_search(self):
+        """Test VERY_LOW confidence schedules the web search tier"""
+        react_result = {
+            'root_cause': 'Unknown error occurred',
+            'fix_recommendation': 'Fix the issue',
+            'error_category': 'UNKNOWN',
+            'classification_confidence': 0.25
+        }
+        docs = [{'similarity_score': 0.30, 'text': 'Some unrelated content about different topics'}]
+
+        result = self.verifier.verify(react_result, docs, {'build_id': 'test-async-4'},
+                                      on_corrected=self.on_corrected)
+
+        self.assertEqual(result['status'], 'CORRECTING')
+        self.assertEqual(result['verification_metadata']['correction_tier'], 'web_search')
+        self.assertTrue(self.published_event.wait(5))
+        self.assertEqual(self.published[0]['verification_metadata']['priority'], 'high')
+
+
 def main():
     """Run all tests"""
     # Create test suite
@@ -540,6 +701,8 @@ def main():
     suite.addTests(loader.loadTestsFromTestCase(TestConfidenceScorer))
     suite.addTests(loader.loadTestsFromTestCase(TestCRAGVerifier))
     suite.addTests(loader.loadTestsFromTestCase(TestCRAGIntegration))
+    suite.addTests(loader.loadTestsFromTestCase(TestScorerTokenFeatures))
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncCorrection))
 
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
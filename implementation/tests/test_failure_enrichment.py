@@ -0,0 +1,276 @@
+"""
+Unit Tests for Ingestion-Time Failure Enrichment
+
+Tests failure_enrichment: the stored entities, referenced files, signature
+and token counts, detection of stale enrichments, the analysis path giving
+the same context with and without them, saving enrichments of stored
+failures, the backfill and enrichment in the Robot listener writer.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+import tempfile
+
+# Add implementation and agents modules to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from failure_enrichment import (ENRICHMENT_VERSION, current_enrichment, detect_referenced_files,
+                                enrich_failure, ensure_enrichment, backfill, signature_from_enrichment)
+from context_engineering import ContextEngineer
+from failure_fingerprint import compute_fingerprint
+
+try:
+    from mongodb_robot_listener import FailureWriter
+    LISTENER_AVAILABLE = True
+except ImportError:
+    LISTENER_AVAILABLE = False
+
+try:
+    from react_agent_service import ReActAgent
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+STACK_TRACE = ('Traceback (most recent call last):\n'
+               '  File "/opt/tests/storage/test_quota.py", line 41, in test_quota\n'
+               '    client.set_quota(user, 10)\n'
+               '  File "/opt/tests/lib/client.py", line 88, in set_quota\n'
+               '    raise QuotaError(response.text)\n'
+               'QuotaError: E1042 quota exceeded for volume vol-7')
+
+ERROR_LOG = '\n'.join(
+    [f'2026-10-19 12:00:{second:02d} INFO polling mount state' for second in range(40)] +
+    ['2026-10-19 12:00:41 ERROR at com/ddn/Mount.java:77 mount failed with 503'] +
+    [f'2026-10-19 12:01:{second:02d} DEBUG retry {second} from lib/retry.js:12 ' + 'x' * 120
+     for second in range(60)]
+)
+
+FAILURE = {'error_message': 'QuotaError: E1042 quota exceeded for volume vol-7',
+           'error_log': ERROR_LOG, 'stack_trace': STACK_TRACE, 'test_name': 'test_quota'}
+
+
+class FakeCollection:
+    """The pymongo collection methods used by failure_enrichment"""
+
+    def __init__(self, docs=()):
+        self.docs = [dict(doc) for doc in docs]
+        self.updates = 0
+        self.fail_updates = False
+
+    def _get(self, _id):
+        return next(doc for doc in self.docs if doc['_id'] == _id)
+
+    def update_one(self, query, update):
+        if self.fail_updates:
+            raise RuntimeError("not primary")
+        self.updates += 1
+        self._get(query['_id']).update(update['$set'])
+
+    def find(self, query, projection=None):
+        version = query.get('enrichment.version', {}).get('$ne')
+        after = query.get('_id', {}).get('$gt')
+        docs = [doc for doc in self.docs
+                if (version is None or doc.get('enrichment', {}).get('version') != version)
+                and (after is None or doc['_id'] > after)]
+        return _Cursor([{key: doc[key] for key in ['_id', *projection] if key in doc} for doc in docs])
+
+    def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self.update_one(request._filter, request._doc)
+
+
+class _Cursor(list):
+    def sort(self, key, direction=1):
+        return _Cursor(sorted(self, key=lambda doc: doc[key]))
+
+    def limit(self, count):
+        return _Cursor(self[:count])
+
+
+class TestEnrichment(unittest.TestCase):
+    """Test the stored enrichment"""
+
+    def setUp(self):
+        self.engineer = ContextEngineer()
+        self.enrichment = enrich_failure(FAILURE, self.engineer)
+
+    def test_enrichment_fields(self):
+        """Test entities, files, signature and token counts are stored"""
+        enrichment = self.enrichment
+
+        self.assertEqual(enrichment['version'], ENRICHMENT_VERSION)
+        self.assertIn({'type': 'error_code', 'value': 'E1042'},
+                      [{key: e[key] for key in ('type', 'value')} for e in enrichment['entities']])
+        self.assertEqual(enrichment['referenced_files'][:2],
+                         ['/opt/tests/storage/test_quota.py', '/opt/tests/lib/client.py'])
+        self.assertEqual(signature_from_enrichment(enrichment),
+                         compute_fingerprint(FAILURE['error_message'], ERROR_LOG, STACK_TRACE))
+        self.assertEqual(enrichment['token_counts']['error_log'], self.engineer.estimate_tokens(ERROR_LOG))
+        self.assertEqual(enrichment['optimized_error_log'], self.engineer.optimize_error_log(ERROR_LOG)[0])
+
+    def test_referenced_files(self):
+        """Test files are found by each pattern, once each"""
+        files = detect_referenced_files('see src/app.ts: failed', STACK_TRACE + '\nfrom storage.quota import x',
+                                        'at com/ddn/Mount.java:77 and /opt/tests/lib/client.py')
+
+        self.assertEqual(files, ['/opt/tests/storage/test_quota.py', '/opt/tests/lib/client.py',
+                                 'com/ddn/Mount.java', 'src/app.ts', 'storage/quota.py'])
+
+    def test_stale_enrichment(self):
+        """Test enrichments of other text or versions are not used"""
+        failure = dict(FAILURE, enrichment=self.enrichment)
+        self.assertIs(current_enrichment(failure), self.enrichment)
+
+        edited = dict(failure, error_message='QuotaError: quota exceeded for <PERSON>')
+        self.assertIsNone(current_enrichment(edited))
+        outdated = dict(failure, enrichment=dict(self.enrichment, version=ENRICHMENT_VERSION - 1))
+        self.assertIsNone(current_enrichment(outdated))
+
+    def test_optimized_context_is_unchanged(self):
+        """Test the analysis context is the same with the stored enrichment"""
+        for failure in (FAILURE, {'error_message': 'Timeout after 30s', 'stack_trace': ''}):
+            with self.subTest(failure=failure['error_message']):
+                error_message = failure['error_message']
+                arguments = dict(error_log=failure.get('error_log', error_message), error_message=error_message,
+                                 error_category='CODE_ERROR', stack_trace=failure['stack_trace'])
+                expected = self.engineer.optimize_context(**arguments).to_dict()
+                enriched = self.engineer.optimize_context(
+                    **arguments, enrichment=enrich_failure(failure, self.engineer)).to_dict()
+
+                for result in (expected, enriched):
+                    result['metadata'].pop('timestamp')
+                self.assertEqual(enriched, expected)
+
+    def test_other_budget_recomputes(self):
+        """Test an enrichment optimized for another error log budget is ignored"""
+        engineer = ContextEngineer()
+        engineer.budget.error_log = 200
+        context = engineer.optimize_context(ERROR_LOG, FAILURE['error_message'], 'CODE_ERROR',
+                                            enrichment=self.enrichment)
+
+        self.assertEqual(context.error_log, engineer.optimize_error_log(ERROR_LOG)[0])
+
+
+class TestStoredFailures(unittest.TestCase):
+    """Test enrichment of failures already in MongoDB"""
+
+    def test_ensure_enrichment_saves_once(self):
+        """Test a stored failure is enriched and saved on its first analysis only"""
+        collection = FakeCollection([dict(FAILURE, _id=1)])
+        failure = dict(collection.docs[0])
+
+        first = ensure_enrichment(collection, failure)
+        second = ensure_enrichment(collection, failure)
+
+        self.assertIs(first, second)
+        self.assertEqual(collection.updates, 1)
+        self.assertEqual(collection.docs[0]['enrichment'], first)
+
+    def test_save_failure_is_ignored(self):
+        """Test the analysis gets the enrichment when saving it fails"""
+        collection = FakeCollection([dict(FAILURE, _id=1)])
+        collection.fail_updates = True
+
+        enrichment = ensure_enrichment(collection, dict(collection.docs[0]))
+
+        self.assertEqual(enrichment['referenced_files'], enrich_failure(FAILURE)['referenced_files'])
+        self.assertNotIn('enrichment', collection.docs[0])
+
+    def test_backfill(self):
+        """Test the backfill enriches failures without a current enrichment, in batches"""
+        docs = [dict(FAILURE, _id=index, error_message=f'failure {index}') for index in range(7)]
+        docs[3]['enrichment'] = enrich_failure(docs[3])
+        docs[3]['enrichment']['marker'] = True
+        collection = FakeCollection(docs)
+
+        self.assertEqual(backfill(collection, limit=4, batch_size=3), 4)
+        self.assertEqual(backfill(collection, batch_size=3), 2)
+
+        self.assertTrue(all(current_enrichment(doc) for doc in collection.docs))
+        self.assertTrue(collection.docs[3]['enrichment'].get('marker'))
+        self.assertEqual(backfill(collection, batch_size=3, everything=True), 7)
+        self.assertNotIn('marker', collection.docs[3]['enrichment'])
+
+
+@unittest.skipUnless(LISTENER_AVAILABLE, "pymongo not installed")
+class TestListenerEnrichment(unittest.TestCase):
+    """Test the Robot listener writer stores enriched failures"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def test_enriched_after_redaction(self):
+        """Test the stored enrichment is current for the redacted document"""
+
+        class Redactor:
+            def redact_failure_data(self, doc):
+                return dict(doc, error_message=doc['error_message'].replace('alice', '<PERSON>')), \
+                    {'total_redactions': 1}
+
+        class Collection:
+            def __init__(self):
+                self.docs = []
+
+            def insert_many(self, docs, ordered=True):
+                self.docs.extend(docs)
+
+        collection = Collection()
+        writer = FailureWriter(collection, redactor=Redactor(), enrich=True, flush_seconds=0.05,
+                               spool_path=os.path.join(self.tmp_dir, 'spool.ndjson'))
+        writer.submit({'error_message': 'quota exceeded for alice', 'stack_trace': STACK_TRACE})
+        writer.close()
+
+        stored = collection.docs[0]
+        self.assertEqual(stored['error_message'], 'quota exceeded for <PERSON>')
+        self.assertIs(current_enrichment(stored), stored['enrichment'])
+        self.assertEqual(writer.stats['enriched'], 1)
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestReActEnrichment(unittest.TestCase):
+    """Test the ReAct agent reads the stored referenced files"""
+
+    def test_referenced_files_from_enrichment(self):
+        """Test multi-file detection uses the enrichment when present"""
+        agent = ReActAgent.__new__(ReActAgent)
+        state = {'error_message': FAILURE['error_message'], 'error_log': ERROR_LOG, 'stack_trace': STACK_TRACE}
+        expected = agent._detect_multi_file_references(state)
+
+        state['enrichment'] = enrich_failure(FAILURE)
+        with patch.object(sys.modules['react_agent_service'], 'detect_referenced_files') as detect:
+            self.assertEqual(agent._detect_multi_file_references(state), expected)
+        detect.assert_not_called()
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestEnrichment))
+    suite.addTests(loader.loadTestsFromTestCase(TestStoredFailures))
+    suite.addTests(loader.loadTestsFromTestCase(TestListenerEnrichment))
+    suite.addTests(loader.loadTestsFromTestCase(TestReActEnrichment))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
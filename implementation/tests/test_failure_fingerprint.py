@@ -0,0 +1,337 @@
+"""
+Unit Tests for Failure-Signature Fingerprinting
+
+Tests the signature normalizer and the FingerprintCache second-level
+analysis cache (exact/fuzzy hits, collisions, in-flight dedup), which
+analyses are cached, plus the Celery analyze_test_failure and
+analyze_failure_deduplicated dedup paths.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import types
+import threading
+import time
+
+# Add implementation module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, implementation_dir)
+
+from failure_fingerprint import (
+    FingerprintCache, FailureSignature, compute_fingerprint,
+    normalize_failure_text, extract_top_frames, is_cacheable_analysis
+)
+
+
+PYTHON_TRACE = '''Traceback (most recent call last):
+  File "/srv/ci/{run}/tests/test_storage.py", line {line}, in test_write
+    client.write(data)
+  File "/srv/ci/{run}/app/client.py", line 88, in write
+    raise TimeoutError("timed out")
+TimeoutError: timed out'''
+
+JAVA_TRACE = '''java.lang.NullPointerException: value was null
+\tat com.ddn.storage.Client.write(Client.java:120)
+\tat com.ddn.storage.Service.save(Service.java:45)
+\tat com.ddn.storage.Main.main(Main.java:10)
+\tat java.base/java.lang.Thread.run(Thread.java:833)'''
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.Redis (decode_responses=True)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestSignatureNormalization(unittest.TestCase):
+    """Test normalize_failure_text and compute_fingerprint"""
+
+    def test_masks_volatile_tokens(self):
+        """Test timestamps, UUIDs, hex, paths and numbers are masked"""
+        text = ("2026-01-02T10:11:12.345Z worker 4411 failed on /tmp/pytest-77/run_3/out.log "
+                "object at 0x7f3a2b1c request 3fa85f64-5717-4562-b3fc-2c963f66afa6 id a1b2c3d4e5f6")
+
+        self.assertEqual(
+            normalize_failure_text(text),
+            "<ts> worker <n> failed on <path>/out.log object at <hex> request <uuid> id <hex>"
+        )
+
+    def test_same_failure_same_fingerprint(self):
+        """Test failures differing only in volatile tokens share a fingerprint"""
+        first = compute_fingerprint(
+            "TimeoutError: connect to 10.0.0.5:8080 timed out after 30s (pid 1234)",
+            stack_trace=PYTHON_TRACE.format(run='build-17', line=12)
+        )
+        second = compute_fingerprint(
+            "TimeoutError: connect to 10.0.3.9:9090 timed out after 45s (pid 98)",
+            stack_trace=PYTHON_TRACE.format(run='build-18', line=14)
+        )
+
+        self.assertEqual(first.fingerprint, second.fingerprint)
+        self.assertEqual(first.exception_type, 'TimeoutError')
+
+    def test_different_frames_different_fingerprint(self):
+        """Test the same message raised elsewhere is a different failure"""
+        first = compute_fingerprint("TimeoutError: timed out", stack_trace=PYTHON_TRACE.format(run='a', line=1))
+        second = compute_fingerprint("TimeoutError: timed out", stack_trace=PYTHON_TRACE.replace('in write', 'in read').format(run='a', line=1))
+
+        self.assertNotEqual(first.fingerprint, second.fingerprint)
+
+    def test_python_frames_nearest_raise_first(self):
+        """Test Python frames are basename:function, raising frame first"""
+        frames = extract_top_frames(PYTHON_TRACE.format(run='x', line=1))
+        self.assertEqual(frames, ['client.py:write', 'test_storage.py:test_write'])
+
+    def test_java_frames(self):
+        """Test Java frames keep the top of the trace"""
+        signature = compute_fingerprint("value was null", stack_trace=JAVA_TRACE)
+
+        self.assertEqual(signature.exception_type, 'java.lang.NullPointerException')
+        self.assertEqual(signature.frames, [
+            'com.ddn.storage.Client.write', 'com.ddn.storage.Service.save', 'com.ddn.storage.Main.main'
+        ])
+
+
+class TestFingerprintCache(unittest.TestCase):
+    """Test FingerprintCache class"""
+
+    def setUp(self):
+        self.signature = compute_fingerprint("TimeoutError: timed out after 30s")
+
+    def test_exact_and_fuzzy_hits(self):
+        """Test hits are classified by raw-text key"""
+        cache = FingerprintCache()
+        self.assertIsNone(cache.get(self.signature, raw_key='raw-1'))
+        cache.put(self.signature, {'root_cause': 'slow disk'}, raw_key='raw-1')
+
+        exact = cache.get(self.signature, raw_key='raw-1')
+        fuzzy = cache.get(self.signature, raw_key='raw-2')
+
+        self.assertEqual(exact['fingerprint_match']['match'], 'exact')
+        self.assertEqual(fuzzy['fingerprint_match']['match'], 'fuzzy')
+        self.assertEqual(fuzzy['root_cause'], 'slow disk')
+
+        stats = cache.get_stats()
+        self.assertEqual((stats['exact_hits'], stats['fuzzy_hits'], stats['misses']), (1, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+        self.assertEqual(stats['fuzzy_share'], 0.5)
+
+    def test_collision_is_a_miss(self):
+        """Test a fingerprint match with a different signature is not returned"""
+        cache = FingerprintCache()
+        other = FailureSignature('ValueError', 'bad value')
+        cache.put(self.signature, {'root_cause': 'slow disk'})
+
+        with patch.object(FailureSignature, 'fingerprint', new=self.signature.fingerprint):
+            self.assertIsNone(cache.get(other))
+
+        self.assertEqual(cache.get_stats()['collisions'], 1)
+
+    def test_expiry(self):
+        """Test entries expire after the TTL"""
+        cache = FingerprintCache(ttl_seconds=10)
+        with patch('failure_fingerprint.time.time', return_value=1000.0):
+            cache.put(self.signature, {'root_cause': 'x'})
+        with patch('failure_fingerprint.time.time', return_value=1011.0):
+            self.assertIsNone(cache.get(self.signature))
+
+    def test_redis_shared_between_instances(self):
+        """Test two processes (instances) share entries and claims via Redis"""
+        redis_client = FakeRedis()
+        worker_a = FingerprintCache(redis_client=redis_client)
+        worker_b = FingerprintCache(redis_client=redis_client)
+
+        self.assertTrue(worker_a.acquire(self.signature))
+        self.assertFalse(worker_b.acquire(self.signature))
+
+        worker_a.put(self.signature, {'root_cause': 'x'})
+        worker_a.release(self.signature)
+
+        self.assertIsNotNone(worker_b.get(self.signature))
+        self.assertTrue(worker_b.acquire(self.signature))
+
+    def test_wait_for_in_flight_result(self):
+        """Test a waiter receives the result stored by the claim holder"""
+        cache = FingerprintCache()
+        self.assertTrue(cache.acquire(self.signature))
+
+        def finish():
+            time.sleep(0.2)
+            cache.put(self.signature, {'root_cause': 'done'})
+            cache.release(self.signature)
+
+        threading.Thread(target=finish).start()
+        result = cache.wait_for(self.signature, timeout=2, poll_interval=0.05)
+
+        self.assertEqual(result['root_cause'], 'done')
+        self.assertEqual(cache.get_stats()['dedup_waits'], 1)
+
+
+try:
+    import celery  # noqa: F401
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+try:
+    import ai_analysis_service
+    AI_SERVICE_AVAILABLE = True
+except Exception:
+    AI_SERVICE_AVAILABLE = False
+
+CRAG_ERROR_ANALYSIS = {'root_cause': 'disk full', 'classification': 'INFRASTRUCTURE',
+                       'crag_metadata': {'status': 'ERROR', 'error': 'verifier unavailable'}}
+
+
+@unittest.skipUnless(CELERY_AVAILABLE, "celery not installed")
+class TestAnalyzeTaskDedup(unittest.TestCase):
+    """Test analyze_test_failure reuses analyses of the same signature"""
+
+    def setUp(self):
+        sys.path.insert(0, os.path.join(implementation_dir, 'tasks'))
+        import celery_tasks
+        self.celery_tasks = celery_tasks
+
+        self.calls = []
+        self.react_result = {'root_cause': 'disk full'}
+        service = types.ModuleType('ai_analysis_service')
+        service.analyze_with_react_agent = lambda data: self.calls.append(data) or dict(self.react_result)
+        service.verify_react_result_with_crag = lambda result, data: result
+        service.format_react_result_with_gemini = lambda result, data=None: dict(result, formatted=True)
+
+        patches = [
+            patch.dict(sys.modules, {'ai_analysis_service': service}),
+            patch.object(celery_tasks, 'get_fingerprint_cache', return_value=FingerprintCache()),
+            patch.object(celery_tasks.analyze_test_failure, 'update_state', create=True)
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_second_failure_deduplicated(self):
+        """Test a failure differing only in volatile tokens is not re-analyzed"""
+        first = self.celery_tasks.analyze_test_failure.apply(args=[{
+            'error_message': 'OSError: No space left on device: /tmp/run-17/out.bin', 'build_number': '17'
+        }]).get()
+        second = self.celery_tasks.analyze_test_failure.apply(args=[{
+            'error_message': 'OSError: No space left on device: /tmp/run-18/out.bin', 'build_number': '18'
+        }]).get()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertFalse(first['deduplicated'])
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(second['analysis']['root_cause'], 'disk full')
+        self.assertEqual(second['analysis']['fingerprint_match']['match'], 'fuzzy')
+        self.assertEqual(first['fingerprint'], second['fingerprint'])
+
+    def test_failed_analysis_not_cached(self):
+        """Test a failed AI analysis is not reused for the next failure"""
+        self.react_result = {'root_cause': 'quota exceeded', 'classification': 'AI_QUOTA_EXCEEDED'}
+        for build in ('17', '18'):
+            result = self.celery_tasks.analyze_test_failure.apply(args=[{
+                'error_message': 'OSError: No space left on device', 'build_number': build
+            }]).get()
+            self.assertFalse(result['deduplicated'])
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_crag_error_not_cached(self):
+        """Test an analysis whose CRAG verification errored is not reused"""
+        self.react_result = dict(CRAG_ERROR_ANALYSIS)
+        for build in ('17', '18'):
+            result = self.celery_tasks.analyze_test_failure.apply(args=[{
+                'error_message': 'OSError: No space left on device', 'build_number': build
+            }]).get()
+            self.assertFalse(result['deduplicated'])
+
+        self.assertEqual(len(self.calls), 2)
+
+
+class TestCacheableAnalysis(unittest.TestCase):
+    """Test which analyses may be reused for other failures"""
+
+    def test_is_cacheable_analysis(self):
+        """Test failed AI analyses and errored CRAG verifications are rejected"""
+        self.assertTrue(is_cacheable_analysis({'classification': 'INFRASTRUCTURE',
+                                               'crag_metadata': {'status': 'VERIFIED'}}))
+        self.assertFalse(is_cacheable_analysis(None))
+        self.assertFalse(is_cacheable_analysis({'classification': 'AI_QUOTA_EXCEEDED'}))
+        self.assertFalse(is_cacheable_analysis({'classification': 'UNKNOWN', 'ai_status': 'FAILED'}))
+        self.assertFalse(is_cacheable_analysis(CRAG_ERROR_ANALYSIS))
+
+
+@unittest.skipUnless(AI_SERVICE_AVAILABLE, "AI analysis service dependencies not installed")
+class TestAnalyzeFailureDeduplicated(unittest.TestCase):
+    """Test analyze_failure_deduplicated() caching"""
+
+    def setUp(self):
+        self.calls = []
+        self.analysis = {'root_cause': 'disk full', 'classification': 'INFRASTRUCTURE'}
+        patches = [
+            patch.object(ai_analysis_service, 'get_fingerprint_cache', return_value=FingerprintCache()),
+            patch.object(ai_analysis_service, 'analyze_failure_with_gemini',
+                         side_effect=lambda data: self.calls.append(data) or dict(self.analysis))
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _analyze_twice(self):
+        for build in ('17', '18'):
+            ai_analysis_service.analyze_failure_deduplicated({
+                'error_message': 'OSError: No space left on device', 'build_number': build
+            })
+
+    def test_verified_analysis_reused(self):
+        """Test a verified analysis is reused for the same signature"""
+        self._analyze_twice()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_crag_error_not_cached(self):
+        """Test an analysis whose CRAG verification errored is analyzed again"""
+        self.analysis = dict(CRAG_ERROR_ANALYSIS)
+        self._analyze_twice()
+        self.assertEqual(len(self.calls), 2)
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestSignatureNormalization))
+    suite.addTests(loader.loadTestsFromTestCase(TestFingerprintCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestAnalyzeTaskDedup))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheableAnalysis))
+    suite.addTests(loader.loadTestsFromTestCase(TestAnalyzeFailureDeduplicated))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
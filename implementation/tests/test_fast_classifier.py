@@ -0,0 +1,200 @@
+"""
+Unit Tests for Local Fast-Path Error Classifier
+
+Tests the FastPathClassifier class (hashed n-gram logistic regression with
+calibrated confidence) and its use in the ReAct classification node.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import random
+import tempfile
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+from fast_classifier import FastPathClassifier, extract_features, split_samples
+
+
+TEMPLATES = {
+    'INFRA_ERROR': [
+        "TimeoutError: connection to {host} timed out after {n}s",
+        "OSError: No space left on device while writing {path}",
+        "MemoryError: out of memory allocating {n} bytes",
+    ],
+    'DEPENDENCY_ERROR': [
+        "ModuleNotFoundError: No module named '{module}'",
+        "ImportError: cannot import name '{module}' from package",
+        "pkg_resources.VersionConflict: {module} version conflict",
+    ],
+    'TEST_FAILURE': [
+        "AssertionError: expected {n} but got {m}",
+        "AssertionError: assert response status == {n}",
+        "Expected value {n} does not match actual {m}",
+    ],
+    'CODE_ERROR': [
+        "TypeError: unsupported operand type(s) for +: 'int' and 'str' in {path}",
+        "AttributeError: 'NoneType' object has no attribute '{module}'",
+        "NameError: name '{module}' is not defined",
+    ],
+}
+
+
+def make_samples(count_per_label: int, seed: int = 7):
+    """Synthetic labeled failures with volatile values"""
+    rng = random.Random(seed)
+    samples = []
+    for label, templates in TEMPLATES.items():
+        for _ in range(count_per_label):
+            text = rng.choice(templates).format(
+                host=f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+                n=rng.randint(1, 9999),
+                m=rng.randint(1, 9999),
+                path=f"/srv/app/module_{rng.randint(1, 50)}.py",
+                module=rng.choice(['requests', 'numpy', 'yaml', 'boto3', 'redis'])
+            )
+            samples.append((text, label))
+    return samples
+
+
+class TestFastPathClassifier(unittest.TestCase):
+    """Test FastPathClassifier class"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = FastPathClassifier.train(make_samples(40), target_precision=0.95)
+
+    def test_features_ignore_numbers(self):
+        """Test volatile numbers do not change the features"""
+        self.assertEqual(
+            extract_features("TimeoutError after 30s on port 8080"),
+            extract_features("TimeoutError after 45s on port 9090")
+        )
+
+    def test_accuracy_on_unseen_samples(self):
+        """Test held-out accuracy and fast-path precision"""
+        report = self.model.evaluate(make_samples(10, seed=99))
+
+        self.assertGreaterEqual(report['accuracy'], 0.9)
+        self.assertGreater(report['fast_path_coverage'], 0.5)
+        self.assertGreaterEqual(report['fast_path_precision'], 0.95)
+
+    def test_obvious_failure_takes_fast_path(self):
+        """Test confident predictions are returned"""
+        prediction = self.model.classify("ModuleNotFoundError: No module named 'pandas'")
+
+        self.assertIsNotNone(prediction)
+        self.assertEqual(prediction[0], 'DEPENDENCY_ERROR')
+        self.assertGreaterEqual(prediction[1], self.model.threshold)
+
+    def test_unfamiliar_failure_falls_back(self):
+        """Test low-confidence predictions defer to the LLM"""
+        self.assertIsNone(self.model.classify("Jenkins agent lost: quux frobnicated the zorb"))
+        self.assertGreater(self.model.get_stats()['fallback'], 0)
+
+    def test_save_load_roundtrip(self):
+        """Test a saved model predicts identically"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.json')
+            self.model.save(path)
+            loaded = FastPathClassifier.load(path)
+
+        text = "AssertionError: expected 3 but got 4"
+        label, confidence = self.model.predict(text)
+        loaded_label, loaded_confidence = loaded.predict(text)
+        self.assertEqual(label, loaded_label)
+        self.assertAlmostEqual(confidence, loaded_confidence, places=4)
+        self.assertEqual(loaded.threshold, self.model.threshold)
+
+    def test_split_matches_training(self):
+        """Test split_samples() gives a reproducible holdout disjoint from training"""
+        samples = make_samples(40)
+        holdout, training = split_samples(samples)
+
+        self.assertEqual(len(holdout), int(len(samples) * 0.2))
+        self.assertEqual(sorted(holdout + training), sorted(samples))
+        self.assertEqual(split_samples(samples), (holdout, training))
+
+    def test_uncalibrated_model_never_fast_paths(self):
+        """Test a model without held-out precision never skips the LLM"""
+        noisy = [(text, random.Random(i).choice(list(TEMPLATES))) for i, (text, _) in enumerate(make_samples(10))]
+        model = FastPathClassifier.train(noisy, target_precision=0.99)
+
+        self.assertGreater(model.threshold, 1.0)
+        self.assertIsNone(model.classify("TimeoutError: connection timed out"))
+
+
+try:
+    from react_agent_service import ReActAgent
+    from reasoning_budget import ReasoningBudget
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestClassifyNodeFastPath(unittest.TestCase):
+    """Test classify_error_node with the fast path"""
+
+    def setUp(self):
+        # Bypass __init__ (no external connections)
+        self.agent = ReActAgent.__new__(ReActAgent)
+        self.agent.llm_client = Mock()
+        self.agent.rag_router = None
+        self.agent.reasoning_budget = ReasoningBudget()
+        self.state = {
+            'build_id': 'B-1', 'error_log': '', 'error_message': '', 'llm_usage': {}
+        }
+
+    def test_fast_path_skips_llm(self):
+        """Test confident local prediction avoids the LLM call"""
+        self.agent.fast_classifier = Mock()
+        self.agent.fast_classifier.classify.return_value = ('DEPENDENCY_ERROR', 0.97)
+
+        state = self.agent.classify_error_node(dict(self.state, error_message="No module named 'x'"))
+
+        self.agent.llm_client.chat.assert_not_called()
+        self.assertEqual(state['error_category'], 'DEPENDENCY_ERROR')
+        self.assertEqual(state['classification_source'], 'fast_path')
+
+    def test_low_confidence_uses_llm(self):
+        """Test the LLM is called when the fast path declines"""
+        self.agent.fast_classifier = Mock()
+        self.agent.fast_classifier.classify.return_value = None
+        self.agent.llm_client.chat.return_value = Mock(
+            content='{"category": "CONFIG_ERROR", "confidence": 0.8}',
+            cached=False, coalesced=False, usage={}, latency_ms=5.0
+        )
+
+        state = self.agent.classify_error_node(dict(self.state, error_message="permission denied"))
+
+        self.agent.llm_client.chat.assert_called_once()
+        self.assertEqual(state['error_category'], 'CONFIG_ERROR')
+        self.assertEqual(state['classification_source'], 'llm')
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestFastPathClassifier))
+    suite.addTests(loader.loadTestsFromTestCase(TestClassifyNodeFastPath))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,189 @@
+"""
+Unit Tests for Speculative GitHub File Prefetch
+
+Tests the GitHubPrefetcher/PrefetchSession classes and their use by the
+ReAct agent: prefetched files are consumed by github_get_file, and the
+prefetch is cancelled when routing decides the category needs no code.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import threading
+import time
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+from github_client import GitHubFileResult
+from github_prefetch import GitHubPrefetcher, current_prefetch_session
+
+
+STACK_TRACE = '''Traceback (most recent call last):
+  File "tests/test_storage.py", line 10, in test_write
+    client.write(data)
+  File "src/storage/client.py", line 88, in write
+    raise TimeoutError("timed out")'''
+
+
+class FakeGitHubClient:
+    """GitHubClient stand-in with a fixed fetch latency"""
+
+    def __init__(self, delay: float = 0.1, size: int = 100):
+        self.delay = delay
+        self.size = size
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_file(self, file_path, branch="main", **kwargs):
+        with self._lock:
+            self.calls.append(file_path)
+        time.sleep(self.delay)
+        return GitHubFileResult(
+            success=True, content=f"# {file_path}", file_path=file_path, branch=branch,
+            size_bytes=self.size, total_lines=1
+        )
+
+
+class TestPrefetchSession(unittest.TestCase):
+    """Test GitHubPrefetcher sessions"""
+
+    def test_take_returns_prefetched_result(self):
+        """Test a prefetched file is served without another fetch"""
+        client = FakeGitHubClient()
+        prefetcher = GitHubPrefetcher(client)
+
+        with prefetcher.session(['a.py'], branch='main') as session:
+            self.assertIs(current_prefetch_session(), session)
+            result = session.take('a.py', timeout=2)
+
+        self.assertEqual(result.file_path, 'a.py')
+        self.assertEqual(client.calls, ['a.py'])
+        self.assertIsNone(current_prefetch_session())
+        self.assertEqual(prefetcher.get_stats()['used'], 1)
+
+    def test_file_count_bounded(self):
+        """Test at most max_files files are fetched"""
+        client = FakeGitHubClient(delay=0)
+        prefetcher = GitHubPrefetcher(client, max_files=2)
+
+        with prefetcher.session(['a.py', 'b.py', 'c.py'], branch='main') as session:
+            self.assertIsNone(session.take('c.py', timeout=1))
+            time.sleep(0.1)  # let both fetches finish so they count as wasted
+
+        self.assertEqual(sorted(client.calls), ['a.py', 'b.py'])
+        self.assertEqual(prefetcher.get_stats()['wasted'], 2)
+
+    def test_byte_budget(self):
+        """Test results beyond the byte budget are discarded"""
+        client = FakeGitHubClient(delay=0, size=400)
+        prefetcher = GitHubPrefetcher(client, max_bytes=500, max_workers=1)
+
+        with prefetcher.session(['a.py', 'b.py'], branch='main') as session:
+            first = session.take('a.py', timeout=1)
+            second = session.take('b.py', timeout=1)
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(prefetcher.get_stats()['oversize'], 1)
+
+    def test_cancel_skips_pending_fetches(self):
+        """Test cancelling stops fetches that have not started"""
+        client = FakeGitHubClient(delay=0.2)
+        prefetcher = GitHubPrefetcher(client, max_workers=1)
+
+        with prefetcher.session(['a.py', 'b.py', 'c.py'], branch='main') as session:
+            session.cancel("INFRA_ERROR does not need code")
+            self.assertIsNone(session.take('a.py', timeout=1))
+
+        self.assertEqual(client.calls, ['a.py'])
+        self.assertEqual(prefetcher.get_stats()['cancelled'], 2)
+
+
+try:
+    from react_agent_service import ReActAgent
+    from tool_result_cache import ToolResultCache
+    from reasoning_budget import ReasoningBudget
+    from rag_router import create_rag_router
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestAgentPrefetch(unittest.TestCase):
+    """Test the ReAct agent with speculative prefetch"""
+
+    def setUp(self):
+        self.client = FakeGitHubClient(delay=0.2)
+
+        # Bypass __init__ (no external connections)
+        self.agent = ReActAgent.__new__(ReActAgent)
+        self.agent.github_client = self.client
+        self.agent.github_prefetcher = GitHubPrefetcher(self.client)
+        self.agent.tool_cache = ToolResultCache()
+        self.agent.reasoning_budget = ReasoningBudget()
+        self.agent.rag_router = create_rag_router()
+        self.agent.llm_client = Mock()
+
+    def _state(self):
+        return {
+            'build_id': 'B-1', 'error_message': 'TimeoutError: timed out', 'error_log': STACK_TRACE,
+            'stack_trace': STACK_TRACE, 'github_files': [], 'llm_usage': {},
+            'analysis_deadline': time.time() + 30
+        }
+
+    def test_tool_uses_prefetched_file(self):
+        """Test github_get_file consumes the prefetch instead of refetching"""
+        state = self._state()
+
+        with self.agent._github_prefetch_scope(state) as session:
+            time.sleep(0.25)  # LLM classification/reasoning would run here
+            start = time.time()
+            files = self.agent._tool_github_get_file(state)
+            elapsed = time.time() - start
+
+        self.assertEqual(files[0]['file_path'], 'tests/test_storage.py')
+        self.assertEqual(self.client.calls.count('tests/test_storage.py'), 1)
+        self.assertLess(elapsed, 0.15)
+        self.assertEqual(session.get_summary()['used'], 1)
+
+    def test_cancelled_when_category_needs_no_code(self):
+        """Test routing a non-code category cancels the prefetch"""
+        self.agent.fast_classifier = Mock()
+        self.agent.fast_classifier.classify.return_value = ('INFRA_ERROR', 0.97)
+        self.agent.github_prefetcher = GitHubPrefetcher(self.client, max_workers=1)
+        state = self._state()
+
+        with self.agent._github_prefetch_scope(state) as session:
+            self.agent.classify_error_node(state)
+
+        self.assertFalse(state['should_use_github'])
+        self.assertIn('INFRA_ERROR', session.cancelled_reason)
+        self.assertLess(len(self.client.calls), len(session.get_summary()['files']))
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestPrefetchSession))
+    suite.addTests(loader.loadTestsFromTestCase(TestAgentPrefetch))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -12,18 +12,29 @@ import unittest
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
-
-# Add verification module to path
-verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
+import threading
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Add verification module (and connection_pool) to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+verification_dir = os.path.join(implementation_dir, 'verification')
+sys.path.insert(0, implementation_dir)
 sys.path.insert(0, verification_dir)
 
-from hitl_manager import HITLManager, HITLPriority, HITLStatus
+from hitl_manager import (HITLManager, HITLMemoryQueue, HITLPriority, HITLStatus, CONNECTION_POOL_AVAILABLE,
+                          FCNTL_AVAILABLE)
 
 
 class TestHITLManager(unittest.TestCase):
     """Test HITLManager class"""
 
     def setUp(self):
+        # Tests must not share (or leave behind) a journal file
+        environment = patch.dict(os.environ, {'HITL_JOURNAL_PATH': ''})
+        environment.start()
+        self.addCleanup(environment.stop)
         self.manager = HITLManager()
 
     def test_queue_item_in_memory(self):
@@ -183,6 +194,11 @@ class TestHITLManager(unittest.TestCase):
 class TestHITLIntegration(unittest.TestCase):
     """Integration tests with CRAGVerifier"""
 
+    def setUp(self):
+        environment = patch.dict(os.environ, {'HITL_JOURNAL_PATH': ''})
+        environment.start()
+        self.addCleanup(environment.stop)
+
     def test_verifier_initializes_hitl_manager(self):
         """Test that CRAGVerifier can initialize HITLManager"""
         from crag_verifier import CRAGVerifier
@@ -223,6 +239,307 @@ class TestHITLIntegration(unittest.TestCase):
             self.assertIn('verification_metadata', result)
 
 
+def _queue(manager, build_id, priority='medium'):
+    return manager.queue(
+        react_result={'root_cause': f'Error {build_id}'},
+        confidence=0.72,
+        confidence_scores={'overall_confidence': 0.72, 'components': {}},
+        failure_data={'build_id': build_id},
+        priority=priority
+    )
+
+
+class TestHITLReviewQueue(unittest.TestCase):
+    """Test keyset listing and concurrent claiming (in-memory queue)"""
+
+    def setUp(self):
+        environment = patch.dict(os.environ, {'HITL_JOURNAL_PATH': ''})
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.manager = HITLManager(lease_minutes=30)
+        for index, priority in enumerate(['low', 'medium', 'high', 'medium', 'high']):
+            _queue(self.manager, f'Q-{index}', priority)
+
+    def test_list_pending_pages(self):
+        """Test pages follow queue order without full results"""
+        ids, cursor = [], None
+        while True:
+            page = self.manager.list_pending(limit=2, cursor=cursor)
+            ids.extend(item['failure_id'] for item in page['items'])
+            self.assertTrue(all('react_result' not in item for item in page['items']))
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, ['Q-2', 'Q-4', 'Q-1', 'Q-3', 'Q-0'])
+
+    def test_cursor_stable_while_claiming(self):
+        """Test claiming between pages neither repeats nor skips items"""
+        first = self.manager.list_pending(limit=2)
+        self.manager.claim('alice', n=1)   # Q-2, already listed
+        second = self.manager.list_pending(limit=2, cursor=first['next_cursor'])
+
+        self.assertEqual([item['failure_id'] for item in second['items']], ['Q-1', 'Q-3'])
+        with self.assertRaises(ValueError):
+            self.manager.list_pending(cursor='not-a-cursor')
+
+    def test_concurrent_claims_are_disjoint(self):
+        """Test reviewers claiming at the same time never get the same item"""
+        claimed = []
+        lock = threading.Lock()
+
+        def claim(reviewer):
+            items = self.manager.claim(reviewer, n=2)
+            with lock:
+                claimed.extend(item['failure_id'] for item in items)
+
+        threads = [threading.Thread(target=claim, args=(f'reviewer-{i}',)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(claimed), ['Q-0', 'Q-1', 'Q-2', 'Q-3', 'Q-4'])
+        self.assertEqual(self.manager.list_pending()['items'], [])
+
+    def test_expired_lease_returns_to_queue(self):
+        """Test an unreviewed claim can be claimed by another reviewer after expiry"""
+        item = self.manager.claim('alice', n=1, priority='high')[0]
+        self.assertEqual(item['status'], 'in_review')
+        self.assertTrue(self.manager.extend_lease(item['failure_id'], 'alice'))
+
+        self.manager.memory_queue.update(
+            item['failure_id'], lease_expires_at=(datetime.now() - timedelta(minutes=1)).isoformat()
+        )
+
+        self.assertFalse(self.manager.extend_lease(item['failure_id'], 'alice'))
+        reclaimed = self.manager.claim('bob', n=1, priority='high')
+        self.assertEqual(reclaimed[0]['failure_id'], item['failure_id'])
+        self.assertEqual(reclaimed[0]['reviewer'], 'bob')
+
+    def test_release(self):
+        """Test a released item is pending again"""
+        item = self.manager.claim('alice', n=1)[0]
+
+        self.assertFalse(self.manager.release(item['failure_id'], 'bob'))
+        self.assertTrue(self.manager.release(item['failure_id'], 'alice'))
+        self.assertEqual(self.manager.list_pending(limit=1)['items'][0]['failure_id'], item['failure_id'])
+
+
+class TestHITLMemoryQueue(unittest.TestCase):
+    """Test the heap-backed fallback queue, its journal and the drain"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_path = os.path.join(self.temp_dir, 'hitl_journal.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_claim_order_with_lazy_deletion(self):
+        """Test claims follow priority/age while skipping reviewed and re-prioritized items"""
+        manager = HITLManager(journal_path='')
+        priorities = ['low', 'medium', 'high']
+        for index in range(300):
+            _queue(manager, f'F-{index:03d}', priorities[index % 3])
+
+        manager.approve('F-002', 'alice')                 # first high item
+        _queue(manager, 'F-000', 'high')                  # low → high (upsert)
+
+        claimed = [item['failure_id'] for item in manager.claim('bob', n=3)]
+        self.assertEqual(claimed, ['F-000', 'F-005', 'F-008'])
+        self.assertEqual(len(manager.memory_queue), 300)
+        self.assertEqual(manager.get_statistics()['pending_count'], 296)
+
+        high = [item['failure_id'] for item in manager.claim('bob', n=200, priority='high')]
+        self.assertEqual(len(high), 97)
+        self.assertEqual(high, sorted(high))
+
+    def test_journal_replay(self):
+        """Test queue state survives a restart"""
+        manager = HITLManager(journal_path=self.journal_path)
+        for index, priority in enumerate(['medium', 'high', 'low', 'high']):
+            _queue(manager, f'J-{index}', priority)
+        manager.claim('alice', n=1)
+        manager.reject('J-3', 'alice', 'wrong', corrected_answer={'root_cause': 'fixed'})
+        manager.memory_queue.close()
+
+        with open(manager.memory_queue.journal_path, 'a') as journal:
+            journal.write('{"op": "set", "failure_id": "J-0"')   # torn write
+
+        restarted = HITLManager(journal_path=self.journal_path)
+
+        self.assertEqual([item['failure_id'] for item in restarted.get_pending_items()], ['J-0', 'J-2'])
+        self.assertEqual(restarted.memory_queue.get('J-1')['reviewer'], 'alice')
+        self.assertEqual(restarted.memory_queue.get('J-3')['corrected_answer'], {'root_cause': 'fixed'})
+        self.assertEqual(_queue(restarted, 'J-4')['id'], 5)
+
+    def test_journal_compaction(self):
+        """Test the journal is rewritten instead of growing per update"""
+        queue = HITLMemoryQueue(self.journal_path)
+        queue.COMPACT_MIN_RECORDS = 10
+        manager = HITLManager(journal_path='')
+        manager.memory_queue = queue
+        _queue(manager, 'C-1')
+
+        for _ in range(50):
+            manager.claim('alice', n=1)
+            manager.release('C-1', 'alice')
+
+        with open(self.journal_path) as journal:
+            self.assertLessEqual(len(journal.readlines()), 11)
+        self.assertEqual(HITLMemoryQueue(self.journal_path).get('C-1')['status'], 'pending')
+
+    @unittest.skipUnless(CONNECTION_POOL_AVAILABLE, "connection_pool not importable")
+    def test_drain_on_reconnect(self):
+        """Test journaled items are written to PostgreSQL once it is reachable"""
+        manager = HITLManager(journal_path=self.journal_path)
+        manager.postgres_pool = None
+        _queue(manager, 'D-1', 'high')
+        _queue(manager, 'D-2')
+        manager.approve('D-2', 'alice')
+
+        manager._explicit_pool = FakePool()
+        manager._next_reconnect = 0
+        with patch('hitl_manager.execute_values') as execute_values:
+            manager.get_pending_items()
+
+        rows = execute_values.call_args[0][2]
+        self.assertEqual([(row[0], row[9]) for row in rows], [('D-1', 'pending'), ('D-2', 'approved')])
+        self.assertEqual(len(manager.memory_queue), 0)
+        self.assertEqual(os.path.getsize(manager.memory_queue.journal_path), 0)
+        self.assertIs(manager.postgres_pool, manager._explicit_pool)
+
+    @unittest.skipUnless(FCNTL_AVAILABLE, "fcntl not available")
+    def test_adopt_exited_process_journal(self):
+        """Test journals of exited processes are taken over, running ones left alone"""
+        exited = HITLMemoryQueue(os.path.join(self.temp_dir, 'hitl_journal.101.jsonl'))
+        running = HITLMemoryQueue(os.path.join(self.temp_dir, 'hitl_journal.102.jsonl'))
+        manager = HITLManager(journal_path='')
+        for queue, build_id in ((exited, 'A-1'), (running, 'A-2')):
+            manager.memory_queue = queue
+            _queue(manager, build_id)
+        exited.close()
+
+        manager = HITLManager(journal_path=self.journal_path)
+
+        self.assertIsNotNone(manager.memory_queue.get('A-1'))
+        self.assertIsNone(manager.memory_queue.get('A-2'))
+        self.assertFalse(os.path.exists(exited.journal_path))
+        self.assertTrue(os.path.exists(running.journal_path))
+        manager.memory_queue.close()
+        self.assertIsNotNone(HITLManager(journal_path=self.journal_path).memory_queue.get('A-1'))
+        running.close()
+
+
+class FakeCursor:
+    """Records statements; returns the configured rows"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append((' '.join(sql.split()), params))
+        self.rowcount = self.connection.update_rowcount if sql.lstrip().startswith('UPDATE') else 0
+
+    def fetchall(self):
+        return self.connection.rows
+
+
+class FakePool:
+    """Connection pool with one fake connection"""
+
+    def __init__(self, rows=None):
+        self.connection = Mock(closed=False, statements=[], rows=rows or [], update_rowcount=1)
+        self.connection.cursor.side_effect = lambda cursor_factory=None: FakeCursor(self.connection)
+
+    def getconn(self):
+        return self.connection
+
+    def putconn(self, conn, close=False):
+        pass
+
+
+@unittest.skipUnless(CONNECTION_POOL_AVAILABLE, "connection_pool not importable")
+class TestHITLPostgresQueries(unittest.TestCase):
+    """Test the PostgreSQL statements issued on the pooled connection"""
+
+    def setUp(self):
+        environment = patch.dict(os.environ, {'HITL_JOURNAL_PATH': ''})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def test_claim_skips_locked_rows(self):
+        """Test claim releases expired leases and claims with SKIP LOCKED"""
+        now = datetime.now()
+        rows = [
+            {'id': 7, 'priority_rank': 2, 'created_at': now, 'failure_id': 'B'},
+            {'id': 3, 'priority_rank': 1, 'created_at': now, 'failure_id': 'A'}
+        ]
+        pool = FakePool(rows)
+        manager = HITLManager(postgres_pool=pool)
+
+        claimed = manager.claim('alice', n=2)
+
+        statements = [sql for sql, _ in pool.connection.statements]
+        self.assertIn('CREATE TABLE IF NOT EXISTS hitl_queue', statements[0])
+        self.assertIn("WHERE status = 'in_review' AND lease_expires_at < NOW()", statements[1])
+        self.assertIn('FOR UPDATE SKIP LOCKED', statements[2])
+        self.assertEqual(pool.connection.statements[2][1]['n'], 2)
+        self.assertEqual([item['failure_id'] for item in claimed], ['A', 'B'])
+        self.assertTrue(pool.connection.commit.called)
+
+    def test_list_pending_keyset_query(self):
+        """Test a cursor becomes a row comparison on the index order"""
+        now = datetime(2026, 1, 1, 12, 0)
+        pool = FakePool([{'id': i, 'priority_rank': 1, 'created_at': now} for i in (1, 2, 3)])
+        manager = HITLManager(postgres_pool=pool)
+
+        page = manager.list_pending(limit=2)
+        manager.list_pending(limit=2, cursor=page['next_cursor'])
+
+        sql, params = pool.connection.statements[-1]
+        self.assertIn('(priority_rank, created_at, id) > (%s, %s, %s)', sql)
+        self.assertNotIn('react_result', sql)
+        self.assertEqual(params, [1, now.isoformat(), 2, 3])
+
+    def test_review_of_unknown_item_fails(self):
+        """Test approve/reject report failure when no row was updated"""
+        pool = FakePool()
+        manager = HITLManager(postgres_pool=pool)
+        pool.connection.update_rowcount = 0
+
+        self.assertFalse(manager.approve('missing', 'alice'))
+        self.assertFalse(manager.reject('missing', 'alice', 'wrong'))
+
+    def test_review_of_undrained_item(self):
+        """Test a review of an in-memory item is kept until it is drained"""
+        manager = HITLManager(journal_path='')
+        manager.postgres_pool = None
+        _queue(manager, 'U-1')
+
+        pool = FakePool()
+        manager.postgres_pool = pool
+        manager._next_reconnect = float('inf')
+        self.assertTrue(manager.approve('U-1', 'alice'))
+        self.assertFalse(any(sql.startswith('UPDATE') for sql, _ in pool.connection.statements))
+
+        manager._next_reconnect = 0
+        with patch('hitl_manager.execute_values') as execute_values:
+            manager.get_pending_items()
+
+        rows = execute_values.call_args[0][2]
+        self.assertEqual([(row[0], row[9]) for row in rows], [('U-1', 'approved')])
+        self.assertEqual(len(manager.memory_queue), 0)
+
+
 def main():
     """Run all tests"""
     loader = unittest.TestLoader()
@@ -230,6 +547,9 @@ def main():
 
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestHITLManager))
+    suite.addTests(loader.loadTestsFromTestCase(TestHITLReviewQueue))
+    suite.addTests(loader.loadTestsFromTestCase(TestHITLMemoryQueue))
+    suite.addTests(loader.loadTestsFromTestCase(TestHITLPostgresQueries))
     suite.addTests(loader.loadTestsFromTestCase(TestHITLIntegration))
 
     # Run tests
@@ -0,0 +1,169 @@
+"""
+Unit Tests for Pooled LLM Gateway Client
+
+Tests the LLMClient class: deterministic-prompt caching, single-flight
+coalescing of identical in-flight requests and token/latency accounting.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add agents module to path
+agents_dir = os.path.join(os.path.dirname(__file__), '..', 'agents')
+sys.path.insert(0, agents_dir)
+
+import requests
+from llm_client import LLMClient, get_llm_client
+
+
+class FakeResponse:
+    """requests.Response stand-in for chat completions"""
+
+    def __init__(self, content: str, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return {
+            'choices': [{'message': {'content': self.content}}],
+            'usage': {'prompt_tokens': 50, 'completion_tokens': 10, 'total_tokens': 60}
+        }
+
+
+class TestLLMClient(unittest.TestCase):
+    """Test LLMClient class"""
+
+    def setUp(self):
+        self.client = LLMClient('http://llm.local/v1', 'test_key', cache_max_entries=2)
+        self.posts = []
+        self.lock = threading.Lock()
+
+    def _fake_post(self, delay: float = 0.0, status_code: int = 200):
+        def post(url, headers=None, json=None, timeout=None):
+            with self.lock:
+                self.posts.append(json)
+            time.sleep(delay)
+            return FakeResponse('{"answer": "%s"}' % json['messages'][0]['content'], status_code)
+        return post
+
+    def test_returns_content_and_usage(self):
+        """Test content, token usage and request payload"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post()):
+            response = self.client.chat('hello', temperature=0.2)
+
+        self.assertEqual(json.loads(response.content), {'answer': 'hello'})
+        self.assertEqual(response.usage['prompt_tokens'], 50)
+        self.assertFalse(response.cached)
+        self.assertEqual(self.posts[0]['response_format'], {'type': 'json_object'})
+
+    def test_deterministic_calls_cached(self):
+        """Test temperature-0 calls are served from cache"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post()):
+            first = self.client.chat('classify', temperature=0.0)
+            second = self.client.chat('classify', temperature=0.0)
+
+        self.assertEqual(len(self.posts), 1)
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.client.get_stats()['cache_hits'], 1)
+        self.assertEqual(first.usage['prompt_tokens'], 50)
+        self.assertEqual(second.usage, {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0})
+
+    def test_sampled_calls_not_cached(self):
+        """Test non-zero temperature calls always hit the endpoint"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post()):
+            self.client.chat('reason', temperature=0.2)
+            self.client.chat('reason', temperature=0.2)
+
+        self.assertEqual(len(self.posts), 2)
+
+    def test_cache_key_includes_model(self):
+        """Test the same prompt on another model is not a cache hit"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post()):
+            self.client.chat('classify', model='gpt-4o-mini')
+            self.client.chat('classify', model='gpt-4o')
+
+        self.assertEqual(len(self.posts), 2)
+
+    def test_cache_lru_bound(self):
+        """Test the cache keeps at most cache_max_entries responses"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post()):
+            for prompt in ('a', 'b', 'c'):
+                self.client.chat(prompt)
+            self.client.chat('a')
+
+        self.assertEqual(len(self.posts), 4)
+        self.assertEqual(self.client.get_stats()['cache_size'], 2)
+
+    def test_identical_in_flight_requests_coalesced(self):
+        """Test concurrent identical requests share one HTTP call"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post(delay=0.3)):
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                responses = list(executor.map(lambda _: self.client.chat('reason', temperature=0.7), range(5)))
+
+        self.assertEqual(len(self.posts), 1)
+        self.assertEqual({r.content for r in responses}, {'{"answer": "reason"}'})
+        self.assertEqual(sum(r.coalesced for r in responses), 4)
+        self.assertEqual(sum(r.usage['total_tokens'] for r in responses), 60)
+        self.assertEqual(self.client.get_stats()['coalesced'], 4)
+
+    def test_error_propagates_to_coalesced_callers(self):
+        """Test waiters see the leader's error and nothing is cached"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post(delay=0.2, status_code=400)):
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [executor.submit(self.client.chat, 'bad') for _ in range(3)]
+                errors = [f.exception() for f in futures]
+
+        self.assertTrue(all(isinstance(e, requests.HTTPError) for e in errors))
+        self.assertEqual(len(self.posts), 1)
+        self.assertEqual(self.client.get_stats()['cache_size'], 0)
+
+    def test_token_accounting(self):
+        """Test tokens are counted for HTTP calls only"""
+        with patch.object(self.client.session, 'post', side_effect=self._fake_post()):
+            self.client.chat('x')
+            self.client.chat('x')
+            self.client.chat('y')
+
+        stats = self.client.get_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['http_calls'], 2)
+        self.assertEqual(stats['prompt_tokens'], 100)
+        self.assertEqual(stats['per_model']['gpt-4o-mini']['calls'], 2)
+
+    def test_shared_client_per_endpoint(self):
+        """Test get_llm_client returns one client per endpoint"""
+        self.assertIs(get_llm_client('http://a/v1', 'k'), get_llm_client('http://a/v1', 'k'))
+        self.assertIsNot(get_llm_client('http://a/v1', 'k'), get_llm_client('http://b/v1', 'k'))
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestLLMClient))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,213 @@
+"""
+Unit Tests for the Per-Build Failure Collector
+
+Tests collector mode of the MongoDB Robot listener for parallel (pabot)
+runs: listeners streaming failures to one collector, the build summary
+document, spooling when the collector goes away, and the first listener of
+a build starting the collector for all worker processes.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import multiprocessing
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Add implementation module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, implementation_dir)
+
+try:
+    from mongodb_robot_listener import FailureWriter, collector_mode_enabled
+    import mongodb_failure_collector
+    from mongodb_failure_collector import FailureCollector, connect_to_collector, _connect
+    COLLECTOR_AVAILABLE = True
+except ImportError:
+    COLLECTOR_AVAILABLE = False
+
+
+class FakeCollection:
+    """insert_many / replace_one stand-in"""
+
+    def __init__(self):
+        self.docs = {}
+        self.replaced = []
+
+    def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            self.docs[doc['_id']] = doc
+
+    def replace_one(self, query, doc, upsert=False):
+        self.replaced.append((query, doc, upsert))
+
+
+class FakeRedactor:
+    def redact_failure_data(self, doc):
+        return dict(doc, error_message=doc['error_message'].replace('alice@example.com', '<EMAIL>')), \
+            {'total_redactions': 1}
+
+
+def _worker(build_number, count):
+    """pabot worker process: report `count` failures and one passing test"""
+    client = connect_to_collector(build_number, 'robot')
+    if client is None:
+        sys.exit(2)
+    for index in range(count):
+        client.record_test(f'Suite {os.getpid()}', 'FAIL')
+        client.submit({'test_name': f'test_{index}', 'build_number': build_number})
+    client.record_test(f'Suite {os.getpid()}', 'PASS')
+    client.close()
+
+
+@unittest.skipUnless(COLLECTOR_AVAILABLE, "pymongo not installed")
+class TestFailureCollector(unittest.TestCase):
+    """Test the collector with listeners in threads"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.tmp_dir, 'collector.json')
+        self.collection = FakeCollection()
+        self.summaries = FakeCollection()
+        writer = FailureWriter(self.collection, spool_path=os.path.join(self.tmp_dir, 'spool.ndjson'),
+                               flush_seconds=0.05)
+        self.collector = FailureCollector(writer, '42', 'robot', summaries=self.summaries,
+                                          state_file=self.state_file, idle_seconds=0.3)
+        self.collector.write_state()
+        self.result = {}
+        self.thread = threading.Thread(target=lambda: self.result.update(self.collector.serve()))
+        self.thread.start()
+
+    def tearDown(self):
+        self.thread.join(10)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_collects_and_summarizes(self):
+        """Test failures of several listeners are stored once and summarized"""
+        clients = [_connect(self.state_file) for _ in range(3)]
+        for number, client in enumerate(clients):
+            client.record_test(f'Suite {number}', 'PASS')
+            client.record_test(f'Suite {number}', 'FAIL')
+            client.submit({'test_name': f'test_{number}'})
+        for client in clients:
+            client.close()
+        self.thread.join(10)
+
+        self.assertEqual(len(self.collection.docs), 3)
+        self.assertEqual(self.result['total_tests'], 6)
+        self.assertEqual(self.result['failed'], 3)
+        self.assertEqual(self.result['failures_stored'], 3)
+        self.assertEqual(self.result['suites'][0], {'suite': 'Suite 0', 'passed': 1, 'failed': 1, 'skipped': 0})
+
+        query, summary, upsert = self.summaries.replaced[0]
+        self.assertEqual(query, {'_id': 'robot#42'})
+        self.assertTrue(upsert)
+        # Stopped collector is no longer published
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_waits_for_connected_listeners(self):
+        """Test the collector does not exit while a listener is connected"""
+        client = _connect(self.state_file)
+        time.sleep(0.8)
+        self.assertTrue(self.thread.is_alive())
+
+        client.submit({'test_name': 'late_failure'})
+        client.close()
+        self.thread.join(10)
+        self.assertEqual(len(self.collection.docs), 1)
+
+    def test_spools_when_collector_is_gone(self):
+        """Test a listener spools failures once the collector connection is lost"""
+        spool_path = os.path.join(self.tmp_dir, 'listener_spool.ndjson')
+        client = _connect(self.state_file)
+        client._conn.close()  # Connection lost
+
+        with patch.dict(os.environ, {'MONGODB_LISTENER_SPOOL': spool_path}), \
+                patch.object(mongodb_failure_collector, 'create_pii_redactor', return_value=FakeRedactor()):
+            client.submit({'test_name': 'test_lost', 'error_message': 'failed for alice@example.com'})
+            client.close()
+
+        with open(spool_path) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        # Replay inserts spooled documents as they are: they must be redacted
+        self.assertNotIn('alice@example.com', lines[0])
+        self.assertEqual(client.stats, {'sent': 0, 'spooled': 1})
+
+
+@unittest.skipUnless(COLLECTOR_AVAILABLE, "pymongo not installed")
+class TestCollectorStartup(unittest.TestCase):
+    """Test parallel worker processes share one automatically started collector"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {
+            'MONGODB_COLLECTOR_STATE': os.path.join(self.tmp_dir, 'collector.json'),
+            'MONGODB_COLLECTOR_IDLE_SECONDS': '1',
+            'MONGODB_LISTENER_SPOOL': os.path.join(self.tmp_dir, 'spool.ndjson'),
+            'MONGODB_URI': ''
+        })
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_single_collector_for_parallel_workers(self):
+        """Test the first worker starts the collector and all workers use it"""
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_worker, args=('7', 4)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            self.assertEqual(worker.exitcode, 0)
+
+        # Collector exits after the idle period (no MongoDB: failures spooled)
+        log_path = os.path.join(self.tmp_dir, 'collector.log')
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if os.path.exists(log_path) and 'Build 7:' in open(log_path).read():
+                break
+            time.sleep(0.2)
+
+        log = open(log_path).read()
+        self.assertEqual(log.count('Serving build 7'), 1)
+        self.assertIn('Build 7: 15 tests, 12 failed, 3 listener process(es)', log)
+        with open(os.path.join(self.tmp_dir, 'spool.ndjson')) as f:
+            self.assertEqual(len(f.readlines()), 12)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'collector.json')))
+
+    def test_mode_selection(self):
+        """Test collector mode is used in pabot workers unless configured"""
+        with patch.object(sys, 'argv', ['robot', '--variable', 'PABOTQUEUEINDEX:3', 'tests']):
+            self.assertTrue(collector_mode_enabled())
+            with patch.dict(os.environ, {'MONGODB_LISTENER_MODE': 'direct'}):
+                self.assertFalse(collector_mode_enabled())
+        with patch.object(sys, 'argv', ['robot', 'tests']):
+            self.assertFalse(collector_mode_enabled())
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestFailureCollector))
+    suite.addTests(loader.loadTestsFromTestCase(TestCollectorStartup))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,250 @@
+"""
+Unit Tests for the MongoDB Robot Listener Writer
+
+Tests the background FailureWriter of mongodb_robot_listener: batched
+insert_many, spooling while MongoDB is unreachable, idempotent spool replay,
+queue overflow and flushing on close().
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Add implementation module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, implementation_dir)
+
+try:
+    from bson import ObjectId
+    from pymongo.errors import BulkWriteError, ServerSelectionTimeoutError
+    from mongodb_robot_listener import FailureWriter, MongoDBListener
+    LISTENER_AVAILABLE = True
+except ImportError:
+    LISTENER_AVAILABLE = False
+
+
+class FakeCollection:
+    """insert_many stand-in with a unique _id index and an outage switch"""
+
+    def __init__(self, latency=0.0):
+        self.docs = {}
+        self.calls = []
+        self.down = False
+        self.latency = latency
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def insert_many(self, docs, ordered=True):
+        self.gate.wait(5)
+        time.sleep(self.latency)
+        if self.down:
+            raise ServerSelectionTimeoutError("connection refused")
+        self.calls.append((len(docs), ordered))
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc['_id'] in self.docs:
+                errors.append({'index': index, 'code': 11000, 'errmsg': 'duplicate key'})
+            else:
+                self.docs[doc['_id']] = doc
+        if errors:
+            raise BulkWriteError({'writeErrors': errors})
+
+
+class FakeRedactor:
+    def redact_failure_data(self, doc):
+        redacted = dict(doc, error_message=doc['error_message'].replace('alice@example.com', '<EMAIL>'))
+        return redacted, {'total_redactions': 1}
+
+
+def _doc(index):
+    return {'test_name': f'test_{index}', 'error_message': 'failed for alice@example.com',
+            'timestamp': datetime(2026, 10, 19, 12, 0, index)}
+
+
+@unittest.skipUnless(LISTENER_AVAILABLE, "pymongo not installed")
+class TestFailureWriter(unittest.TestCase):
+    """Test batching, spooling and replay"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.spool_path = os.path.join(self.tmp_dir, 'spool.ndjson')
+        self.collection = FakeCollection()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _writer(self, **kwargs):
+        options = {'spool_path': self.spool_path, 'batch_size': 10, 'flush_seconds': 0.05, 'retry_seconds': 60}
+        options.update(kwargs)
+        return FailureWriter(self.collection, **options)
+
+    def _spooled(self):
+        if not os.path.exists(self.spool_path):
+            return 0
+        with open(self.spool_path) as f:
+            return sum(1 for _ in f)
+
+    def test_batches_inserts(self):
+        """Test queued documents are written with few unordered insert_many calls"""
+        self.collection.gate.clear()  # Let the queue fill up first
+        writer = self._writer()
+        for index in range(25):
+            writer.submit(_doc(index))
+        self.collection.gate.set()
+        writer.close()
+
+        self.assertEqual(len(self.collection.docs), 25)
+        self.assertLessEqual(len(self.collection.calls), 4)
+        self.assertTrue(all(ordered is False for _, ordered in self.collection.calls))
+        self.assertEqual(writer.stats['inserted'], 25)
+
+    def test_redacts_on_writer_thread(self):
+        """Test PII is redacted before the document is stored"""
+        writer = self._writer(redactor=FakeRedactor())
+        writer.submit(_doc(1))
+        writer.close()
+
+        stored = list(self.collection.docs.values())[0]
+        self.assertEqual(stored['error_message'], 'failed for <EMAIL>')
+        self.assertEqual(writer.stats['redactions'], 1)
+
+    def test_spools_and_replays(self):
+        """Test failures are spooled during an outage and replayed by the next writer"""
+        self.collection.down = True
+        writer = self._writer()
+        for index in range(5):
+            writer.submit(_doc(index))
+        writer.close()
+
+        self.assertEqual(self._spooled(), 5)
+        self.assertEqual(self.collection.docs, {})
+
+        self.collection.down = False
+        writer = self._writer()
+        writer.close()
+
+        self.assertEqual(len(self.collection.docs), 5)
+        self.assertEqual(self._spooled(), 0)
+        self.assertEqual(writer.stats['replayed'], 5)
+        # Datetimes and ObjectIds survive the NDJSON round trip
+        stored = sorted(self.collection.docs.values(), key=lambda doc: doc['test_name'])
+        self.assertEqual([doc['timestamp'].second for doc in stored], list(range(5)))
+        self.assertTrue(all(isinstance(doc['_id'], ObjectId) for doc in stored))
+
+    def test_replay_is_idempotent(self):
+        """Test documents already stored before a partial failure are not duplicated"""
+        writer = self._writer()
+        doc = _doc(1)
+        writer.submit(doc)
+        writer.close()
+        writer._spool([doc])  # e.g. the insert succeeded but its reply was lost
+
+        writer = self._writer()
+        writer.close()
+
+        self.assertEqual(len(self.collection.docs), 1)
+        self.assertEqual(writer.stats['duplicates'], 1)
+        self.assertEqual(self._spooled(), 0)
+
+    def test_overflow_is_spooled(self):
+        """Test submit() never blocks: a full queue spills to the spool"""
+        self.collection.gate.clear()
+        writer = self._writer(max_queue=2, batch_size=1)
+        writer.submit(_doc(0))
+        time.sleep(0.1)  # Taken by the writer thread, blocked in insert_many
+
+        started = time.monotonic()
+        for index in range(1, 6):
+            writer.submit(_doc(index))
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertEqual(self._spooled(), 3)
+
+        # The spilled documents are replayed once MongoDB accepts writes
+        self.collection.gate.set()
+        writer.close()
+        self.assertEqual(len(self.collection.docs), 6)
+        self.assertEqual(self._spooled(), 0)
+
+    def test_spooled_on_close_are_redacted(self):
+        """Test documents still queued when close() times out are spooled redacted"""
+        self.collection.gate.clear()
+        writer = self._writer(redactor=FakeRedactor(), batch_size=1)
+        for index in range(3):
+            writer.submit(_doc(index))
+        time.sleep(0.1)  # First one taken by the writer thread, blocked in insert_many
+        writer.close(timeout=0.1)
+
+        with open(self.spool_path) as f:
+            spooled = f.read()
+        self.assertEqual(self._spooled(), 2)
+        self.assertNotIn('alice@example.com', spooled)
+        self.collection.gate.set()
+
+
+class FakeTestResult:
+    def __init__(self, name, status, message=''):
+        self.name = name
+        self.status = status
+        self.message = message
+        self.body = []
+        self.starttime = self.endtime = '20261019 12:00:00.000'
+        self.elapsedtime = 10
+
+
+@unittest.skipUnless(LISTENER_AVAILABLE, "pymongo not installed")
+class TestListenerEndTest(unittest.TestCase):
+    """Test end_test() only queues the failure"""
+
+    def test_end_test_does_not_wait_for_mongodb(self):
+        """Test a slow MongoDB does not lengthen end_test()"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        collection = FakeCollection(latency=0.2)
+
+        # Bypass __init__ (no MongoDB connection)
+        listener = MongoDBListener.__new__(MongoDBListener)
+        listener.current_suite = 'Suite'
+        listener.build_number = '42'
+        listener.job_name = 'robot'
+        listener.end_test_seconds = []
+        listener.writer = FailureWriter(collection, spool_path=os.path.join(tmp_dir, 'spool.ndjson'),
+                                        flush_seconds=0.05)
+        listener.collector = None
+
+        for index in range(5):
+            listener.start_test(FakeTestResult(f'test_{index}', 'NOT RUN'), FakeTestResult(f'test_{index}', 'NOT RUN'))
+            listener.end_test(None, FakeTestResult(f'test_{index}', 'FAIL', 'boom'))
+
+        self.assertEqual(len(listener.end_test_seconds), 5)
+        self.assertLess(max(listener.end_test_seconds), 0.1)
+
+        listener.writer.close()
+        self.assertEqual(len(collection.docs), 5)
+        self.assertEqual({doc['build_number'] for doc in collection.docs.values()}, {'42'})
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestFailureWriter))
+    suite.addTests(loader.loadTestsFromTestCase(TestListenerEndTest))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
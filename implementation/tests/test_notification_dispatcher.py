@@ -0,0 +1,259 @@
+"""
+Unit Tests for the Notification Dispatcher
+
+Tests background delivery of notifications: coalescing per key into
+digests, the bounded non-blocking queue, retries with backoff, statistics,
+and HITLManager handing its review notifications to the dispatcher.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+import threading
+import time
+
+# Add implementation and verification modules to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(implementation_dir, 'verification'))
+sys.path.insert(0, implementation_dir)
+
+os.environ["HITL_JOURNAL_PATH"] = ""
+
+from notification_dispatcher import NotificationDispatcher
+from hitl_manager import HITLManager
+
+
+class FakeSender:
+    """Records delivered digests; fails the first `failures` calls"""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.sent = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, key, items):
+        self.release.wait(5)
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("webhook down")
+        self.sent.append((key, items))
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    """Test coalescing, bounded queue, retries and statistics"""
+
+    def _dispatcher(self, sender, **kwargs):
+        options = {'window_seconds': 0.2, 'backoff_seconds': 0.05}
+        options.update(kwargs)
+        dispatcher = NotificationDispatcher(sender, name='test', **options)
+        self.addCleanup(dispatcher.close, 1.0)
+        return dispatcher
+
+    def test_coalesces_per_key(self):
+        """Test items of one key within the window are sent as one digest"""
+        sender = FakeSender()
+        dispatcher = self._dispatcher(sender)
+
+        for index in range(5):
+            dispatcher.submit(('B-1', 'INFRA_ERROR'), index)
+        dispatcher.submit(('B-2', 'CODE_ERROR'), 'other')
+
+        self.assertEqual(sender.sent, [])  # Still inside the window
+        time.sleep(0.5)
+
+        self.assertEqual(dict(sender.sent), {('B-1', 'INFRA_ERROR'): [0, 1, 2, 3, 4],
+                                             ('B-2', 'CODE_ERROR'): ['other']})
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['digests_sent'], 2)
+        self.assertEqual(stats['items_sent'], 6)
+        self.assertEqual(stats['coalesced'], 4)
+
+    def test_max_batch_sends_early(self):
+        """Test a full digest does not wait for the window"""
+        sender = FakeSender()
+        dispatcher = self._dispatcher(sender, window_seconds=60, max_batch=3)
+
+        for index in range(3):
+            dispatcher.submit('B-1', index)
+        time.sleep(0.2)
+
+        self.assertEqual(sender.sent, [('B-1', [0, 1, 2])])
+
+    def test_submit_never_blocks(self):
+        """Test a full queue drops items instead of blocking the caller"""
+        sender = FakeSender()
+        sender.release.clear()  # Sender stuck: nothing leaves the queue
+        dispatcher = self._dispatcher(sender, max_queue=3, window_seconds=0, max_batch=1)
+
+        dispatcher.submit('stuck', 0)
+        time.sleep(0.1)  # Taken by the dispatcher thread, blocked in send
+
+        started = time.monotonic()
+        accepted = [dispatcher.submit('B-1', index) for index in range(5)]
+        self.assertLess(time.monotonic() - started, 0.1)
+
+        self.assertEqual(accepted, [True, True, True, False, False])
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['dropped'], 2)
+        self.assertEqual(stats['queue_depth'], 3)
+        sender.release.set()
+
+    def test_retries_with_backoff(self):
+        """Test a failed digest is retried and then delivered"""
+        sender = FakeSender(failures=2)
+        dispatcher = self._dispatcher(sender, window_seconds=0)
+
+        dispatcher.submit('B-1', 'item')
+        time.sleep(0.5)
+
+        self.assertEqual(sender.sent, [('B-1', ['item'])])
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['digests_sent'], 1)
+
+    def test_gives_up_after_max_attempts(self):
+        """Test a digest is dropped after max_attempts failures"""
+        sender = FakeSender(failures=10)
+        dispatcher = self._dispatcher(sender, window_seconds=0, max_attempts=3)
+
+        dispatcher.submit('B-1', 'item')
+        time.sleep(0.5)
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(sender.calls, 3)
+        self.assertEqual(stats['digests_failed'], 1)
+        self.assertEqual(stats['items_failed'], 1)
+        self.assertEqual(stats['pending_digests'], 0)
+
+    def test_flush_and_latency(self):
+        """Test flush() delivers before the window ends and latency is recorded"""
+        sender = FakeSender(delay=0.02)
+        dispatcher = self._dispatcher(sender, window_seconds=60)
+
+        dispatcher.submit('B-1', 'item')
+        self.assertTrue(dispatcher.flush(timeout=2))
+
+        self.assertEqual(sender.sent, [('B-1', ['item'])])
+        stats = dispatcher.get_stats()
+        self.assertGreaterEqual(stats['send_latency_ms']['p50'], 20)
+        self.assertGreaterEqual(stats['delivery_latency_ms']['max'], stats['send_latency_ms']['max'])
+
+
+class TestHITLNotifications(unittest.TestCase):
+    """Test HITLManager notifications through the dispatcher"""
+
+    def setUp(self):
+        environment = patch.dict(os.environ, {'HITL_JOURNAL_PATH': ''})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        self.manager = HITLManager()
+        self.manager.notifications = NotificationDispatcher(self.manager._deliver_notifications,
+                                                            name='HITL', window_seconds=60)
+        self.addCleanup(self.manager.notifications.close, 1.0)
+
+        environment = patch.dict(os.environ, {'SLACK_WEBHOOK_URL': 'http://hooks.local/slack'})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def _queue(self, build_id, category='INFRA_ERROR'):
+        return self.manager.queue(
+            react_result={'error_category': category},
+            confidence=0.7,
+            confidence_scores={'components': {'grounding': 0.6}},
+            failure_data={'build_id': build_id, 'error_message': 'timeout'}
+        )
+
+    def _notification(self, failure_id, priority):
+        return {
+            'failure_id': failure_id, 'build_id': 'B-1', 'error_category': 'INFRA_ERROR',
+            'confidence': 0.7, 'priority': priority, 'concerns': [], 'sla_deadline': '2026-10-19T12:00:00'
+        }
+
+    def test_queue_does_not_send(self):
+        """Test queue() returns before the notification is delivered"""
+        self._queue('B-1')
+
+        self.assertFalse(self.manager.memory_queue.get('B-1')['notification_sent'])
+        stats = self.manager.get_statistics()['notifications']
+        self.assertEqual(stats['submitted'], 1)
+        self.assertEqual(stats['items_sent'], 0)
+
+    def test_digest_per_build_and_category(self):
+        """Test items of one build/category are posted as one webhook message"""
+        self.manager._send_notification(self._notification('B-1-a', 'low'))
+        self.manager._send_notification(self._notification('B-1-b', 'high'))
+        self._queue('B-2')
+
+        with patch('hitl_manager.requests.post') as post:
+            self.assertTrue(self.manager.notifications.flush(timeout=2))
+
+        messages = sorted(call.kwargs['json']['text'] for call in post.call_args_list)
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith('🔴 **2 New HITL Review Requests**'))
+        self.assertLess(messages[0].index('B-1-b'), messages[0].index('B-1-a'))
+        self.assertIn('Failure ID: B-2', messages[1])
+        self.assertTrue(self.manager.memory_queue.get('B-2')['notification_sent'])
+
+    def test_failed_webhook_is_retried(self):
+        """Test the item stays unnotified until the webhook accepts the message"""
+        self.manager.notifications.backoff_seconds = 60
+        self._queue('B-3')
+
+        with patch('hitl_manager.requests.post', side_effect=ConnectionError("down")):
+            self.manager.notifications.flush(timeout=2)
+
+        self.assertFalse(self.manager.memory_queue.get('B-3')['notification_sent'])
+        self.assertEqual(self.manager.notifications.get_stats()['retrying_digests'], 1)
+
+        with patch('hitl_manager.requests.post'):
+            self.assertTrue(self.manager.notifications.flush(timeout=2))
+        self.assertTrue(self.manager.memory_queue.get('B-3')['notification_sent'])
+
+    def test_channels_retried_separately(self):
+        """Test a failing webhook is retried without posting again to the one that accepted"""
+        self.manager.notifications.backoff_seconds = 60
+        with patch.dict(os.environ, {'TEAMS_WEBHOOK_URL': 'http://hooks.local/teams'}):
+            self._queue('B-4')
+
+            def post(url, **kwargs):
+                if url.endswith('/teams'):
+                    raise ConnectionError("down")
+                return Mock()
+
+            with patch('hitl_manager.requests.post', side_effect=post) as failing:
+                self.manager.notifications.flush(timeout=2)
+            with patch('hitl_manager.requests.post') as working:
+                self.assertTrue(self.manager.notifications.flush(timeout=2))
+
+        self.assertEqual(sorted(call.args[0] for call in failing.call_args_list),
+                         ['http://hooks.local/slack', 'http://hooks.local/teams'])
+        self.assertEqual([call.args[0] for call in working.call_args_list], ['http://hooks.local/teams'])
+        self.assertTrue(self.manager.memory_queue.get('B-4')['notification_sent'])
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestNotificationDispatcher))
+    suite.addTests(loader.loadTestsFromTestCase(TestHITLNotifications))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
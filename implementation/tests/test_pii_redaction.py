@@ -0,0 +1,193 @@
+"""
+Unit Tests for PII Redaction (regex engine)
+
+Tests the single-pass regex redaction of pii_redaction: several matches
+per pattern, offsets in the original text, streaming of large texts with
+PII across chunk boundaries, and bounded entity details. Presidio is
+replaced by a fake analyzer to test the candidate gate, the result cache
+and the worker processes.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import io
+import re
+import sys
+import os
+from collections import namedtuple
+
+# Add security module to path
+security_dir = os.path.join(os.path.dirname(__file__), '..', 'security')
+sys.path.insert(0, security_dir)
+
+import pii_redaction
+from pii_redaction import PIIRedactor
+
+
+FakeResult = namedtuple('FakeResult', 'entity_type start end score')
+
+
+class FakeAnalyzer:
+    """AnalyzerEngine stand-in: e-mail addresses and the name Alice"""
+
+    calls = 0
+
+    def analyze(self, text, language, entities):
+        FakeAnalyzer.calls += 1
+        results = [FakeResult('EMAIL_ADDRESS', m.start(), m.end(), 1.0) for m in re.finditer(r'[\w.]+@[\w.]+', text)]
+        results += [FakeResult('PERSON', m.start(), m.end(), 0.85) for m in re.finditer(r'Alice', text)]
+        return results
+
+
+STACK_TRACE = ('Traceback (most recent call last):\n  File "/app/tests/test_login.py", line 12, in test_login\n'
+               '    assert response.status == 200\nAssertionError: Expected status 200 but was 500')
+
+SAMPLE = ("mail a.b@example.com and c@ex.org from 10.0.0.1 then 10.0.0.22, "
+          "key token=abcdefghijklmnopqrstuvwxyz (card 4111 1111 1111 1111)\n")
+
+
+class TestRegexRedaction(unittest.TestCase):
+    """Test the single-pass regex engine"""
+
+    def setUp(self):
+        self.redactor = PIIRedactor(use_presidio=False)
+
+    def test_redacts_repeated_matches(self):
+        """Test every match of every pattern is replaced"""
+        redacted, metadata = self.redactor.redact(SAMPLE)
+
+        self.assertEqual(redacted, "mail <EMAIL> and <EMAIL> from <IP_ADDRESS> then <IP_ADDRESS>, "
+                                   "key <API_KEY> (card <CREDIT_CARD>)\n")
+        self.assertEqual(metadata['redactions'], 6)
+        self.assertEqual(metadata['method'], 'regex')
+        self.assertEqual(self.redactor.get_statistics()['redactions_by_type']['EMAIL'], 2)
+
+    def test_offsets_refer_to_original_text(self):
+        """Test entity offsets point at the PII in the input"""
+        _, metadata = self.redactor.redact(SAMPLE)
+
+        found = [SAMPLE[entity['start']:entity['end']] for entity in metadata['entities']]
+        self.assertEqual(found, ['a.b@example.com', 'c@ex.org', '10.0.0.1', '10.0.0.22',
+                                 'token=abcdefghijklmnopqrstuvwxyz', '4111 1111 1111 1111'])
+
+    def test_entity_details_are_capped(self):
+        """Test counts stay complete when entity details are capped"""
+        with patch.object(pii_redaction, 'MAX_ENTITY_DETAILS', 3):
+            _, metadata = self.redactor.redact(SAMPLE * 2)
+
+        self.assertEqual(metadata['redactions'], 12)
+        self.assertEqual(len(metadata['entities']), 3)
+
+
+class TestStreamingRedaction(unittest.TestCase):
+    """Test chunked redaction of large texts"""
+
+    def setUp(self):
+        self.redactor = PIIRedactor(use_presidio=False)
+        self.text = SAMPLE * 50
+        self.expected, self.expected_metadata = self.redactor.redact(self.text)
+
+    def _small_windows(self, chunk_chars, overlap_chars=64):
+        return patch.multiple(pii_redaction, STREAM_CHUNK_CHARS=chunk_chars,
+                              STREAM_OVERLAP_CHARS=overlap_chars, STREAM_THRESHOLD_CHARS=100)
+
+    def test_stream_matches_single_pass(self):
+        """Test PII split across chunk boundaries is redacted like in one pass"""
+        for chunk_chars in (7, 16, 33, 100):
+            with self.subTest(chunk_chars=chunk_chars), self._small_windows(chunk_chars):
+                redacted, metadata = self.redactor.redact(self.text)
+
+                self.assertTrue(metadata['streamed'])
+                self.assertEqual(redacted, self.expected)
+                self.assertEqual(metadata['redactions'], self.expected_metadata['redactions'])
+                self.assertEqual(metadata['entities'], self.expected_metadata['entities'])
+
+    def test_stream_from_file(self):
+        """Test a file read in small pieces is redacted incrementally"""
+        reader = io.StringIO(self.text)
+        metadata = {}
+        with self._small_windows(50):
+            parts = list(self.redactor.redact_stream(iter(lambda: reader.read(10), ''), metadata=metadata))
+
+        self.assertGreater(len(parts), 10)
+        self.assertEqual(''.join(parts), self.expected)
+        self.assertEqual(metadata['by_type']['EMAIL'], 100)
+
+
+class TestPresidioGate(unittest.TestCase):
+    """Test the candidate gate, result cache and worker processes"""
+
+    def setUp(self):
+        FakeAnalyzer.calls = 0
+        self.redactor = PIIRedactor(workers=0, cache_size=16, prefilter=True, analyzer_factory=FakeAnalyzer)
+
+    def test_texts_without_candidates_skip_presidio(self):
+        """Test a stack trace without candidate spans is not analyzed"""
+        redacted, metadata = self.redactor.redact(STACK_TRACE)
+
+        self.assertEqual(redacted, STACK_TRACE)
+        self.assertEqual(metadata['redactions'], 0)
+        self.assertEqual(FakeAnalyzer.calls, 0)
+        self.assertEqual(self.redactor.get_statistics()['presidio']['skipped'], 1)
+
+    def test_candidates_are_redacted(self):
+        """Test Presidio results are replaced; overlaps keep the higher score"""
+        text = 'login failed for user Alice (Alice.w@example.com)'
+        redacted, metadata = self.redactor.redact(text)
+
+        self.assertEqual(redacted, 'login failed for user <PERSON> (<EMAIL_ADDRESS>)')
+        self.assertEqual(metadata['method'], 'presidio')
+        self.assertEqual([entity['type'] for entity in metadata['entities']], ['PERSON', 'EMAIL_ADDRESS'])
+        self.assertEqual(FakeAnalyzer.calls, 1)
+
+    def test_results_are_cached(self):
+        """Test recurring failure texts are analyzed once"""
+        failure = {'error_message': 'timeout for user Alice', 'stack_trace': STACK_TRACE,
+                   'test_name': 'Login Test'}
+        first, _ = self.redactor.redact_failure_data(failure)
+        second, _ = self.redactor.redact_failure_data(failure)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['error_message'], 'timeout for user <PERSON>')
+        # Stack trace skipped twice; message and test name analyzed once each
+        self.assertEqual(FakeAnalyzer.calls, 2)
+        stats = self.redactor.get_statistics()['presidio']
+        self.assertEqual((stats['analyzed'], stats['cache_hits'], stats['skipped']), (2, 2, 2))
+
+    def test_worker_processes(self):
+        """Test analysis in worker processes gives the in-process result"""
+        failure = {'error_message': 'mail alice@example.com', 'error_log': 'user Alice ' + STACK_TRACE,
+                   'stack_trace': STACK_TRACE}
+        expected, expected_metadata = self.redactor.redact_failure_data(failure)
+
+        redactor = PIIRedactor(workers=2, cache_size=0, analyzer_factory=FakeAnalyzer)
+        self.addCleanup(redactor.close)
+        redacted, metadata = redactor.redact_failure_data(failure)
+
+        self.assertEqual(redacted, expected)
+        self.assertEqual(metadata['total_redactions'], expected_metadata['total_redactions'])
+        self.assertIsNone(redactor.analyzer)  # Loaded in the workers only
+        self.assertEqual(redactor.get_statistics()['presidio']['analyzed'], 2)
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestRegexRedaction))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingRedaction))
+    suite.addTests(loader.loadTestsFromTestCase(TestPresidioGate))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,276 @@
+"""
+Concurrency Stress Test for ReAct Agent
+
+Runs many analyze() calls in parallel against a single ReActAgent using
+local fakes for the LLM endpoint, Pinecone tools, MongoDB and the
+PostgreSQL connection pool. Verifies that:
+- every analysis returns its own results (no state bleed between threads)
+- the workflow is compiled once, not per analyze() call
+- pooled PostgreSQL connections are always returned
+- routing statistics are isolated per analysis
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+try:
+    from react_agent_service import ReActAgent
+    from tool_registry import ToolRegistry
+    from thought_prompts import ThoughtPrompts
+    from correction_strategy import SelfCorrectionStrategy
+    from tool_result_cache import ToolResultCache
+    from reasoning_budget import ReasoningBudget, CategoryBudget
+    from llm_client import LLMClient
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+CATEGORIES = {
+    'INFRA_ERROR': 'Infrastructure errors',
+    'CODE_ERROR': 'Code errors'
+}
+
+
+class FakeResponse:
+    """requests.Response stand-in for chat completions"""
+
+    def __init__(self, content: dict):
+        self._content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            'choices': [{'message': {'content': json.dumps(self._content)}}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+        }
+
+
+def fake_chat_completion(url, headers=None, json=None, timeout=None):
+    """Deterministic local LLM: classification, reasoning and answer prompts"""
+    prompt = json['messages'][0]['content']
+
+    if prompt.startswith("Classify this test failure"):
+        return FakeResponse({'category': 'INFRA_ERROR', 'confidence': 0.9, 'reasoning': 'timeout'})
+
+    if 'Iteration:' in prompt:
+        iteration = int(re.search(r'Iteration: (\d+)/', prompt).group(1))
+        plan = ['pinecone_knowledge', 'mongodb_logs', 'postgres_history']
+        return FakeResponse({
+            'thought': f'iteration {iteration}',
+            'needs_more_info': iteration <= len(plan),
+            'next_action': plan[iteration - 1] if iteration <= len(plan) else 'DONE',
+            'confidence': 0.5
+        })
+
+    build = re.search(r'BUILD-[a-z]+', prompt)
+    return FakeResponse({
+        'root_cause': f"root cause for {build.group(0) if build else 'unknown'}",
+        'fix_recommendation': 'restart service',
+        'confidence': 0.8
+    })
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.params = None
+
+    def execute(self, sql, params=None):
+        self.params = params
+
+    def fetchall(self):
+        return [{'build_id': 'OLD', 'test_name': self.params[0], 'root_cause': 'previous'}]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    closed = False
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    """psycopg2 ThreadedConnectionPool stand-in that tracks checkouts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak = 0
+        self.checkouts = 0
+
+    def getconn(self):
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.peak = max(self.peak, self.in_use)
+        return FakeConnection()
+
+    def putconn(self, conn, close=False):
+        with self._lock:
+            self.in_use -= 1
+
+
+class FakeMongoCursor(list):
+    def sort(self, *args):
+        return self
+
+
+class FakeCollection:
+    def find(self, query, limit=0):
+        test_name = query['$or'][2]['test_name']
+        return FakeMongoCursor([{'_id': f'log-{test_name}', 'error_message': f'log for {test_name}'}])
+
+
+class FakeMongoDb:
+    test_results = FakeCollection()
+
+
+def _letters(number: int) -> str:
+    """Encode a number as letters (digits would be masked by cache signatures)"""
+    return ''.join(chr(ord('a') + int(d)) for d in str(number))
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestReActAgentConcurrency(unittest.TestCase):
+    """Stress analyze() from many threads"""
+
+    def setUp(self):
+        ThoughtPrompts._pinecone_available = False
+
+        with patch.object(ToolRegistry, 'get_available_categories', return_value=CATEGORIES):
+            registry = ToolRegistry(pinecone_api_key='test_key')
+        patcher = patch.object(ToolRegistry, 'get_available_categories', return_value=CATEGORIES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Bypass __init__ (no external connections)
+        agent = ReActAgent.__new__(ReActAgent)
+        agent.openai_api_key = 'test_key'
+        agent.openai_base_url = 'http://llm.local/v1'
+        agent.llm_client = LLMClient(agent.openai_base_url, agent.openai_api_key)
+        agent.fast_classifier = None
+        agent.tool_registry = registry
+        agent.correction_strategy = SelfCorrectionStrategy()
+        agent.tool_cache = ToolResultCache()
+        # Unbudgeted loop: every analysis runs the full tool plan
+        agent.reasoning_budget = ReasoningBudget(budgets={c: CategoryBudget() for c in CATEGORIES},
+                                                 early_termination=False)
+        agent.rag_router = None
+        agent.fusion_rag = None
+        agent.github_client = None
+        agent.mongo_db = FakeMongoDb()
+        agent.postgres_pool = FakePool()
+        agent._tool_pinecone_knowledge = self._fake_rag('kb')
+        agent._tool_pinecone_error_library = self._fake_rag('lib')
+        agent.workflow = agent.create_workflow()
+        self.agent = agent
+
+    def _fake_rag(self, source):
+        def tool(state):
+            results = [{'source': source, 'content': f"doc for {state['error_message']}", 'confidence': 0.7}]
+            state['rag_results'].extend(results)
+            return results
+        return tool
+
+    def _analyze(self, number: int) -> dict:
+        build = f"BUILD-{_letters(number)}"
+        return self.agent.analyze(
+            build_id=build,
+            error_log=f"ConnectionTimeout in {build}",
+            error_message=f"ConnectionTimeout talking to {build}",
+            test_name=f"test_{_letters(number)}",
+            job_name="stress"
+        )
+
+    def test_concurrent_analyses_isolated(self):
+        """Test parallel analyses do not share state"""
+        total = 32
+
+        with patch.object(self.agent.llm_client.session, 'post', side_effect=fake_chat_completion), \
+                patch.object(ReActAgent, 'create_workflow', side_effect=AssertionError("recompiled")):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(self._analyze, range(total)))
+
+        for number, result in enumerate(results):
+            build = f"BUILD-{_letters(number)}"
+            self.assertTrue(result['success'], result.get('error'))
+            self.assertEqual(result['build_id'], build)
+            self.assertEqual(result['error_category'], 'INFRA_ERROR')
+            self.assertEqual(result['root_cause'], f"root cause for {build}")
+            for case in result['similar_cases']:
+                self.assertIn(build, case['content'])
+
+        # Identical flows -> identical per-analysis routing statistics
+        decisions = {r['routing_stats']['total_decisions'] for r in results}
+        self.assertEqual(len(decisions), 1)
+
+        pool = self.agent.postgres_pool
+        self.assertEqual(pool.in_use, 0)
+        self.assertEqual(pool.checkouts, total)
+
+        # Token accounting is per analysis; the client aggregates all of them
+        for result in results:
+            self.assertGreater(result['llm_usage']['calls'], 0)
+            self.assertEqual(
+                result['llm_usage']['prompt_tokens'],
+                100 * (result['llm_usage']['calls'] - result['llm_usage']['cached'] - result['llm_usage']['coalesced'])
+            )
+        stats = self.agent.llm_client.get_stats()
+        self.assertEqual(stats['requests'], sum(r['llm_usage']['calls'] for r in results))
+
+    def test_routing_scope_isolated(self):
+        """Test routing stats inside a scope do not touch registry-wide stats"""
+        registry = self.agent.tool_registry
+
+        with registry.analysis_scope() as scope:
+            registry.get_tools_for_category('INFRA_ERROR', 0.5, 1, [])
+            self.assertGreater(scope['stats']['total_routing_decisions'], 0)
+
+        self.assertEqual(registry.get_routing_stats()['total_decisions'], 0)
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestReActAgentConcurrency))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,273 @@
+"""
+Unit Tests for ReAct Agent Batch Analysis
+
+Tests ReActAgent.analyze_many() against local fakes for the LLM endpoint
+and Fusion RAG:
+- identical failures are grouped by fingerprint and analyzed once
+- results are fanned back out in input order with per-failure build IDs
+- distinct failures are classified in a single batched LLM call
+- RAG retrieval is batched and served to the tools from the shared cache
+- analyze_failures_batch() does not cache or fan out unverified results
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import re
+import json
+import threading
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+try:
+    from react_agent_service import ReActAgent
+    from tool_registry import ToolRegistry
+    from thought_prompts import ThoughtPrompts
+    from correction_strategy import SelfCorrectionStrategy
+    from tool_result_cache import ToolResultCache
+    from reasoning_budget import ReasoningBudget
+    from llm_client import LLMClient
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+try:
+    import ai_analysis_service
+    from failure_fingerprint import FingerprintCache
+    AI_SERVICE_AVAILABLE = True
+except Exception:
+    AI_SERVICE_AVAILABLE = False
+
+
+CATEGORIES = {
+    'CODE_ERROR': 'Code errors',
+    'INFRA_ERROR': 'Infrastructure errors'
+}
+
+FAILURES = [
+    {'build_id': 'B-1', 'test_name': 'test_upload',
+     'error_message': 'TimeoutError: connection to 10.0.0.12:9000 timed out after 30s'},
+    {'build_id': 'B-2', 'test_name': 'test_upload',
+     'error_message': 'TimeoutError: connection to 10.0.0.57:9000 timed out after 31s'},
+    {'build_id': 'B-3', 'test_name': 'test_write',
+     'error_message': "AttributeError: 'NoneType' object has no attribute 'write'"},
+    {'build_id': 'B-4', 'test_name': 'test_upload',
+     'error_message': 'TimeoutError: connection to 10.0.0.99:9000 timed out after 29s'},
+    {'build_id': 'B-5', 'test_name': 'test_login',
+     'error_message': 'AssertionError: expected status 200, got 401'},
+]
+
+
+class FakeResponse:
+    """requests.Response stand-in for chat completions"""
+
+    def __init__(self, content: dict):
+        self._content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            'choices': [{'message': {'content': json.dumps(self._content)}}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+        }
+
+
+class FakeServices:
+    """Local LLM endpoint and Fusion RAG, counting calls per kind"""
+
+    def __init__(self):
+        self.calls = {'batch_classify': 0, 'classify': 0, 'retrieve': 0, 'retrieve_many': 0}
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def _count(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def chat_completion(self, url, headers=None, json=None, timeout=None):
+        prompt = json['messages'][0]['content']
+        if prompt.startswith("Classify each of these"):
+            self._count('batch_classify')
+            count = int(re.search(r'each of these (\d+)', prompt).group(1))
+            self.batch_sizes.append(count)
+            return FakeResponse({'classifications': [
+                {'id': number, 'category': 'INFRA_ERROR', 'confidence': 0.85} for number in range(count)
+            ]})
+        if prompt.startswith("Classify this test failure"):
+            self._count('classify')
+            return FakeResponse({'category': 'INFRA_ERROR', 'confidence': 0.85, 'reasoning': 'n/a'})
+        if 'Iteration:' in prompt:
+            iteration = int(re.search(r'Iteration: (\d+)/', prompt).group(1))
+            return FakeResponse({
+                'thought': f'iteration {iteration}',
+                'needs_more_info': iteration == 1,
+                'next_action': 'pinecone_knowledge' if iteration == 1 else 'DONE',
+                'confidence': 0.6
+            })
+        return FakeResponse({'root_cause': 'network timeout', 'fix_recommendation': 'retry',
+                             'confidence': 0.8})
+
+    def retrieve(self, query, filters=None, expand_query=True, top_k=3):
+        self._count('retrieve')
+        return [{'primary_source': 'pinecone', 'text': f'doc for {query}', 'rrf_score': 0.5}]
+
+    def retrieve_many(self, requests, expand_query=False, top_k=5, retrieve_k=50, max_workers=None):
+        self._count('retrieve_many')
+        self.batch_sizes.append(len(requests))
+        return [[{'primary_source': 'pinecone', 'text': f"doc for {request['query']}", 'rrf_score': 0.5}]
+                for request in requests]
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestAnalyzeMany(unittest.TestCase):
+    """Test ReActAgent.analyze_many() grouping, batching and fan-out"""
+
+    def setUp(self):
+        ThoughtPrompts._pinecone_available = False
+        self.services = FakeServices()
+
+        with patch.object(ToolRegistry, '_discover_categories_from_pinecone', return_value=CATEGORIES):
+            registry = ToolRegistry(pinecone_api_key='test_key')
+
+        # Bypass __init__ (no external connections)
+        agent = ReActAgent.__new__(ReActAgent)
+        agent.openai_api_key = 'test_key'
+        agent.openai_base_url = 'http://llm.local/v1'
+        agent.llm_client = LLMClient(agent.openai_base_url, agent.openai_api_key)
+        agent.fast_classifier = None
+        agent.knowledge_index = 'ddn-knowledge-docs'
+        agent.error_library_index = 'ddn-error-library'
+        agent.tool_registry = registry
+        agent.correction_strategy = SelfCorrectionStrategy()
+        agent.tool_cache = ToolResultCache()
+        agent.reasoning_budget = ReasoningBudget()
+        agent.rag_router = None
+        agent.fusion_rag = self.services
+        agent.github_client = None
+        agent.github_prefetcher = None
+        agent.mongo_db = None
+        agent.postgres_pool = None
+        agent.workflow = agent.create_workflow()
+        self.agent = agent
+
+    def _analyze_many(self, failures):
+        with patch.object(self.agent.llm_client.session, 'post', side_effect=self.services.chat_completion):
+            return self.agent.analyze_many(failures, max_workers=2)
+
+    def test_groups_and_fans_out(self):
+        """Test identical failures share one analysis and results keep input order"""
+        results = self._analyze_many(FAILURES)
+
+        self.assertEqual([r['build_id'] for r in results], ['B-1', 'B-2', 'B-3', 'B-4', 'B-5'])
+        self.assertTrue(all(r['success'] for r in results))
+
+        timeouts = [results[0], results[1], results[3]]
+        self.assertEqual({r['batch']['fingerprint'] for r in timeouts}, {results[0]['batch']['fingerprint']})
+        self.assertEqual([r['batch']['deduplicated'] for r in timeouts], [False, True, True])
+        self.assertEqual(timeouts[1]['batch']['representative_build_id'], 'B-1')
+        self.assertEqual(results[2]['batch']['group_size'], 1)
+        self.assertEqual(len({r['batch']['fingerprint'] for r in results}), 3)
+
+        # Fanned-out results are independent copies
+        results[1]['root_cause'] = 'changed'
+        self.assertNotEqual(results[3]['root_cause'], 'changed')
+
+    def test_classification_is_batched(self):
+        """Test distinct failures are classified in one LLM call"""
+        results = self._analyze_many(FAILURES)
+
+        self.assertEqual(self.services.calls['batch_classify'], 1)
+        self.assertEqual(self.services.calls['classify'], 0)
+        self.assertEqual(self.services.batch_sizes[0], 3)
+        self.assertEqual({r['classification_source'] for r in results}, {'batch_llm'})
+
+    def test_retrieval_is_batched_into_shared_cache(self):
+        """Test the RAG tools are served by one batched retrieval"""
+        results = self._analyze_many(FAILURES)
+
+        self.assertEqual(self.services.calls['retrieve_many'], 1)
+        self.assertEqual(self.services.calls['retrieve'], 0)
+        self.assertTrue(all('pinecone_knowledge' in r['tools_used'] for r in results))
+        self.assertEqual(self.agent.tool_cache.get_stats()['per_tool']['pinecone_knowledge']['hits'], 3)
+
+    def test_single_failure_uses_regular_classification(self):
+        """Test a batch of one falls back to the single-failure prompt"""
+        results = self._analyze_many(FAILURES[:1])
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(self.services.calls['batch_classify'], 0)
+        self.assertEqual(self.services.calls['classify'], 1)
+        self.assertFalse(results[0]['batch']['deduplicated'])
+
+
+@unittest.skipUnless(AI_SERVICE_AVAILABLE, "AI analysis service dependencies not installed")
+class TestAnalyzeFailuresBatch(unittest.TestCase):
+    """Test analyze_failures_batch() caching of finalized results"""
+
+    def setUp(self):
+        self.cache = FingerprintCache()
+        self.finalized = []
+        self.crag_metadata = {'status': 'VERIFIED'}
+
+        def finalize(react_result, failure):
+            self.finalized.append(failure['build_id'])
+            return {'root_cause': react_result['root_cause'], 'classification': 'INFRASTRUCTURE',
+                    'crag_metadata': dict(self.crag_metadata)}
+
+        patches = [
+            patch.object(ai_analysis_service, 'get_fingerprint_cache', return_value=self.cache),
+            patch.object(ai_analysis_service, 'analyze_batch_with_react_agent',
+                         side_effect=lambda failures: [{'root_cause': 'timeout'} for _ in failures]),
+            patch.object(ai_analysis_service, 'finalize_react_result', side_effect=finalize)
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_verified_result_fanned_out_and_cached(self):
+        """Test duplicates share the verified result and later builds reuse it"""
+        ai_analysis_service.analyze_failures_batch(FAILURES)
+        ai_analysis_service.analyze_failures_batch(FAILURES)
+
+        self.assertEqual(self.finalized, ['B-1', 'B-3', 'B-5'])
+
+    def test_crag_error_not_cached_or_fanned_out(self):
+        """Test a result whose CRAG verification errored is finalized per failure"""
+        self.crag_metadata = {'status': 'ERROR', 'error': 'verifier unavailable'}
+        analyses = ai_analysis_service.analyze_failures_batch(FAILURES)
+
+        self.assertEqual(self.finalized, ['B-1', 'B-2', 'B-3', 'B-4', 'B-5'])
+        self.assertEqual(len(analyses), 5)
+        signature, raw_key = ai_analysis_service.failure_signature(FAILURES[0])
+        self.assertIsNone(self.cache.get(signature, raw_key=raw_key))
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestAnalyzeMany))
+    suite.addTests(loader.loadTestsFromTestCase(TestAnalyzeFailuresBatch))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,255 @@
+"""
+Unit Tests for Adaptive Reasoning Budget
+
+Tests the evidence-sufficiency estimate, per-category budgets and
+statistics, and the ReAct loop stopping early once the retrieved evidence
+answers the failure.
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+
+# Add agents module to path
+implementation_dir = os.path.join(os.path.dirname(__file__), '..')
+agents_dir = os.path.join(implementation_dir, 'agents')
+sys.path.insert(0, agents_dir)
+sys.path.insert(0, implementation_dir)
+
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from reasoning_budget import (
+    ReasoningBudget, CategoryBudget, document_relevance, estimate_evidence_sufficiency,
+    load_budget_overrides, DEFAULT_CATEGORY_BUDGETS
+)
+
+
+def _state(rag_results, category='INFRA_ERROR', should_use_github=False, **extra):
+    return {
+        'error_category': category, 'classification_confidence': 0.9, 'rag_results': rag_results,
+        'github_files': [], 'should_use_github': should_use_github, 'llm_usage': {}, **extra
+    }
+
+
+class TestEvidenceSufficiency(unittest.TestCase):
+    """Test relevance and sufficiency scoring"""
+
+    def test_relevance_sources(self):
+        """Test rerank logits, RRF agreement and unscored results map to [0, 1]"""
+        self.assertGreater(document_relevance({'rerank_score': 6.0}), 0.99)
+        self.assertLess(document_relevance({'rerank_score': -6.0}), 0.01)
+        self.assertAlmostEqual(document_relevance({'rrf_score': 2 / 61}), 1.0)
+        self.assertAlmostEqual(document_relevance({'rrf_score': 1 / 61}), 0.5)
+        self.assertEqual(document_relevance({'confidence': 0.9}), 0.6)
+
+    def test_clear_match_is_sufficient(self):
+        """Test a strong, unambiguous match scores high"""
+        score, breakdown = estimate_evidence_sufficiency(_state([{'rerank_score': 5.0}, {'rerank_score': -2.0}]))
+
+        self.assertGreater(score, 0.9)
+        self.assertEqual(breakdown['missing'], [])
+
+    def test_ambiguous_match_scores_lower(self):
+        """Test two equally good matches lower the score (small rerank margin)"""
+        clear, _ = estimate_evidence_sufficiency(_state([{'rerank_score': 3.0}, {'rerank_score': -3.0}]))
+        ambiguous, _ = estimate_evidence_sufficiency(_state([{'rerank_score': 3.0}, {'rerank_score': 2.9}]))
+
+        self.assertLess(ambiguous, clear)
+        self.assertLess(ambiguous, DEFAULT_CATEGORY_BUDGETS['INFRA_ERROR'].sufficiency_threshold)
+
+    def test_routed_code_required(self):
+        """Test code routed by RAGRouter must be fetched before evidence is sufficient"""
+        state = _state([{'rerank_score': 5.0}], category='CODE_ERROR', should_use_github=True)
+        score, breakdown = estimate_evidence_sufficiency(state)
+        self.assertEqual(breakdown['missing'], ['github'])
+        self.assertLess(score, 0.5)
+
+        state['github_files'] = [{'path': 'src/client.py'}]
+        self.assertGreater(estimate_evidence_sufficiency(state)[0], 0.85)
+
+        # No GitHub client: code cannot be required
+        state['github_files'] = []
+        self.assertGreater(estimate_evidence_sufficiency(state, code_available=False)[0], 0.85)
+
+
+class TestReasoningBudget(unittest.TestCase):
+    """Test budgets, stop reasons and statistics"""
+
+    def test_stop_reasons(self):
+        """Test token budget and sufficient evidence stop the loop"""
+        policy = ReasoningBudget()
+
+        self.assertEqual(policy.stop_reason(_state([{'rerank_score': 5.0}])), "evidence_sufficient")
+        self.assertIsNone(policy.stop_reason(_state([])))
+
+        spent = _state([], llm_usage={'prompt_tokens': 9500, 'completion_tokens': 600})
+        self.assertEqual(policy.stop_reason(spent), "token_budget")
+
+        disabled = ReasoningBudget(early_termination=False)
+        self.assertIsNone(disabled.stop_reason(_state([{'rerank_score': 5.0}])))
+
+    def test_stats_per_category(self):
+        """Test iterations saved, early stops and latency percentiles"""
+        policy = ReasoningBudget()
+
+        self.assertEqual(policy.record('INFRA_ERROR', 1, 800, 100.0, 'evidence_sufficient'), 4)
+        self.assertEqual(policy.record('INFRA_ERROR', 3, 2400, 300.0, 'max_iterations'), 2)
+        self.assertEqual(policy.record('CODE_ERROR', 2, 1600, 200.0, 'agent_done'), 0)
+
+        stats = policy.get_stats()
+        self.assertEqual(stats['INFRA_ERROR']['analyses'], 2)
+        self.assertEqual(stats['INFRA_ERROR']['iterations_saved'], 6)
+        self.assertEqual(stats['INFRA_ERROR']['early_stops'], 1)
+        self.assertEqual(stats['INFRA_ERROR']['latency_ms']['p95'], 300.0)
+        self.assertEqual(stats['INFRA_ERROR']['latency_ms']['max'], 300.0)
+        self.assertEqual(stats['CODE_ERROR']['termination'], {'agent_done': 1})
+        self.assertEqual(stats['CODE_ERROR']['budget']['max_iterations'], 5)
+
+    def test_overrides(self):
+        """Test REACT_REASONING_BUDGETS overrides only the given fields"""
+        overrides = load_budget_overrides(json.dumps({'INFRA_ERROR': {'max_iterations': 2}, 'NEW': {'max_tokens': 5}}))
+
+        self.assertEqual(overrides['INFRA_ERROR'].max_iterations, 2)
+        self.assertEqual(overrides['INFRA_ERROR'].max_tokens, DEFAULT_CATEGORY_BUDGETS['INFRA_ERROR'].max_tokens)
+        self.assertEqual(overrides['NEW'], CategoryBudget(max_tokens=5))
+        self.assertEqual(load_budget_overrides('not json'), {})
+
+
+try:
+    from react_agent_service import ReActAgent
+    from tool_registry import ToolRegistry
+    from thought_prompts import ThoughtPrompts
+    from correction_strategy import SelfCorrectionStrategy
+    from tool_result_cache import ToolResultCache
+    from llm_client import LLMClient
+    from rag_router import create_rag_router
+    REACT_AGENT_AVAILABLE = True
+except Exception:
+    REACT_AGENT_AVAILABLE = False
+
+
+class FakeResponse:
+    """requests.Response stand-in for chat completions"""
+
+    def __init__(self, content: dict):
+        self._content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            'choices': [{'message': {'content': json.dumps(self._content)}}],
+            'usage': {'prompt_tokens': 400, 'completion_tokens': 50, 'total_tokens': 450}
+        }
+
+
+class FakeServices:
+    """LLM that always wants more information, and a Fusion RAG with a clear match"""
+
+    def __init__(self):
+        self.reasoning_calls = 0
+
+    def chat_completion(self, url, headers=None, json=None, timeout=None):
+        prompt = json['messages'][0]['content']
+        if prompt.startswith("Classify this test failure"):
+            return FakeResponse({'category': 'INFRA_ERROR', 'confidence': 0.9, 'reasoning': 'timeout'})
+        if 'Iteration:' in prompt:
+            self.reasoning_calls += 1
+            return FakeResponse({'thought': 'check more sources', 'needs_more_info': True,
+                                 'next_action': 'pinecone_knowledge', 'confidence': 0.5})
+        return FakeResponse({'root_cause': 'network timeout', 'fix_recommendation': 'retry', 'confidence': 0.8})
+
+    def retrieve(self, query, filters=None, expand_query=True, top_k=3):
+        return [
+            {'primary_source': 'pinecone', 'text': 'Timeouts to 9000: restart the gateway', 'rerank_score': 4.0},
+            {'primary_source': 'bm25', 'text': 'Unrelated disk issue', 'rerank_score': -3.0}
+        ]
+
+
+@unittest.skipUnless(REACT_AGENT_AVAILABLE, "ReAct agent dependencies not installed")
+class TestAgentEarlyTermination(unittest.TestCase):
+    """Test the ReAct loop with the budget policy"""
+
+    def _agent(self, reasoning_budget):
+        ThoughtPrompts._pinecone_available = False
+        with patch.object(ToolRegistry, '_discover_categories_from_pinecone',
+                          return_value={'INFRA_ERROR': 'Infrastructure errors'}):
+            registry = ToolRegistry(pinecone_api_key='test_key')
+
+        # Bypass __init__ (no external connections)
+        agent = ReActAgent.__new__(ReActAgent)
+        agent.llm_client = LLMClient('http://llm.local/v1', 'test_key')
+        agent.fast_classifier = None
+        agent.tool_registry = registry
+        agent.correction_strategy = SelfCorrectionStrategy()
+        agent.tool_cache = ToolResultCache()
+        agent.reasoning_budget = reasoning_budget
+        agent.rag_router = create_rag_router()
+        agent.fusion_rag = self.services
+        agent.github_client = None
+        agent.github_prefetcher = None
+        agent.mongo_db = None
+        agent.postgres_pool = None
+        agent.workflow = agent.create_workflow()
+        return agent
+
+    def _analyze(self, agent):
+        with patch.object(agent.llm_client.session, 'post', side_effect=self.services.chat_completion):
+            return agent.analyze(build_id='B-1', error_log='', test_name='test_upload',
+                                 error_message='TimeoutError: connection to gateway:9000 timed out')
+
+    def setUp(self):
+        self.services = FakeServices()
+
+    def test_sufficient_evidence_skips_reasoning(self):
+        """Test the loop ends after the first retrieval answers the failure"""
+        policy = ReasoningBudget()
+        result = self._analyze(self._agent(policy))
+
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(self.services.reasoning_calls, 1)
+        self.assertEqual(result['iterations'], 1)
+        self.assertEqual(result['reasoning_budget']['termination_reason'], 'evidence_sufficient')
+        self.assertEqual(result['reasoning_budget']['iterations_saved'], 4)
+        self.assertEqual(policy.get_stats()['INFRA_ERROR']['early_stops'], 1)
+
+    def test_category_iteration_budget(self):
+        """Test without early termination the category budget still caps the loop"""
+        result = self._analyze(self._agent(ReasoningBudget(early_termination=False)))
+
+        self.assertEqual(self.services.reasoning_calls, DEFAULT_CATEGORY_BUDGETS['INFRA_ERROR'].max_iterations)
+        self.assertEqual(result['reasoning_budget']['termination_reason'], 'max_iterations')
+
+    def test_token_budget(self):
+        """Test the loop stops once the category token budget is spent"""
+        policy = ReasoningBudget(budgets={'INFRA_ERROR': CategoryBudget(max_tokens=800)}, early_termination=False)
+        result = self._analyze(self._agent(policy))
+
+        self.assertEqual(self.services.reasoning_calls, 1)
+        self.assertEqual(result['reasoning_budget']['termination_reason'], 'token_budget')
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestEvidenceSufficiency))
+    suite.addTests(loader.loadTestsFromTestCase(TestReasoningBudget))
+    suite.addTests(loader.loadTestsFromTestCase(TestAgentEarlyTermination))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -18,6 +18,8 @@ import unittest
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import threading
+import time
 
 # Add verification module to path
 verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
@@ -264,11 +266,14 @@ class TestSelfCorrector(unittest.TestCase):
         if not self.corrector.embeddings:
             self.skipTest("OpenAI embeddings not available")
 
+        # Query embedded once, then searched by vector
+        self.corrector.embeddings = Mock(embed_query=Mock(return_value=[0.1, 0.2, 0.3]))
+
         # Mock the vectorstore
         mock_store = MagicMock()
         mock_vectorstore.return_value = mock_store
 
-        # Mock similarity_search_with_score to return docs
+        # Mock similarity_search_by_vector_with_score to return docs
         mock_doc1 = MagicMock()
         mock_doc1.page_content = "Document 1 content"
         mock_doc1.metadata = {'source': 'test'}
@@ -277,7 +282,7 @@ class TestSelfCorrector(unittest.TestCase):
         mock_doc2.page_content = "Document 2 content"
         mock_doc2.metadata = {'source': 'test'}
 
-        mock_store.similarity_search_with_score.return_value = [
+        mock_store.similarity_search_by_vector_with_score.return_value = [
             (mock_doc1, 0.85),
             (mock_doc2, 0.78)
         ]
@@ -345,6 +350,100 @@ class TestSelfCorrector(unittest.TestCase):
         self.assertEqual(stats['success_rate'], 0.0)
 
 
+def _doc(text):
+    doc = MagicMock()
+    doc.page_content = text
+    doc.metadata = {}
+    return doc
+
+
+class TestConcurrentRetrieval(unittest.TestCase):
+    """Test single-embedding, concurrent two-index retrieval"""
+
+    SEARCH_DELAY = 0.2
+
+    def setUp(self):
+        self.corrector = SelfCorrector()
+        self.corrector.embeddings = Mock()
+        self.corrector.embeddings.embed_query.return_value = [0.1, 0.2, 0.3]
+        self.corrector.pinecone_api_key = 'test_key'
+
+        results = {
+            'ddn-knowledge-docs': [(_doc('knowledge A'), 0.50), (_doc('knowledge B'), 0.25)],
+            'ddn-error-library': [(_doc('library A'), 0.90), (_doc('library B'), 0.81)]
+        }
+
+        def vectorstore(index_name, embedding, pinecone_api_key):
+            def search(vector, k):
+                time.sleep(self.SEARCH_DELAY)
+                return results[index_name][:k]
+            store = MagicMock()
+            store.similarity_search_by_vector_with_score.side_effect = search
+            return store
+
+        patcher = patch('self_correction.PineconeVectorStore', side_effect=vectorstore)
+        self.vectorstore_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_query_embedded_once_and_handles_reused(self):
+        """Test one embedding per query and one vector store per index"""
+        self.corrector._retrieve_additional_docs("TimeoutError gateway", "INFRA_ERROR")
+        self.corrector._retrieve_additional_docs("TimeoutError gateway retry", "INFRA_ERROR")
+
+        self.assertEqual(self.corrector.embeddings.embed_query.call_count, 2)
+        self.assertEqual(self.vectorstore_class.call_count, 2)
+
+    def test_indexes_queried_concurrently(self):
+        """Test both index searches overlap and timings are reported"""
+        timings = {}
+        start = time.perf_counter()
+        docs = self.corrector._retrieve_additional_docs("TimeoutError gateway", "INFRA_ERROR", timings=timings)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(docs), 4)
+        self.assertLess(elapsed, self.SEARCH_DELAY * 1.75)
+        for field in ('embed_ms', 'knowledge_docs_ms', 'error_library_ms', 'retrieval_ms'):
+            self.assertIn(field, timings)
+        self.assertGreaterEqual(timings['knowledge_docs_ms'], self.SEARCH_DELAY * 1000 * 0.9)
+
+    def test_concurrent_corrections_not_serialized(self):
+        """Test corrections running at the same time query their indexes in parallel"""
+        corrector = SelfCorrector(concurrent_corrections=3)
+        corrector.embeddings = self.corrector.embeddings
+        corrector.pinecone_api_key = 'test_key'
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=corrector._retrieve_additional_docs,
+                                    args=("TimeoutError gateway", "INFRA_ERROR")) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLess(time.perf_counter() - start, self.SEARCH_DELAY * 1.75)
+
+    def test_scores_normalized_per_index(self):
+        """Test the best match of each index ranks above weaker matches of the other"""
+        docs = self.corrector._retrieve_additional_docs("TimeoutError gateway", "INFRA_ERROR")
+
+        self.assertEqual([d['text'] for d in docs], ['library A', 'knowledge A', 'library B', 'knowledge B'])
+        self.assertEqual(docs[1]['normalized_score'], 1.0)
+        self.assertEqual(docs[1]['similarity_score'], 0.50)
+
+    def test_correction_metadata_includes_timing(self):
+        """Test correct() reports retrieval timings per attempt"""
+        result = self.corrector.correct(
+            {'root_cause': 'Timeout', 'error_category': 'INFRA_ERROR'},
+            {'overall_confidence': 0.5, 'components': {'relevance': 0.5}},
+            {'error_message': 'TimeoutError: gateway', 'error_category': 'INFRA_ERROR'}
+        )
+
+        self.assertIn('total_ms', result['timing'])
+        self.assertIn('retrieval_ms', result['timing']['attempts'][0])
+        if result['improved']:
+            self.assertIn('embed_ms', result['corrected_answer']['correction_metadata']['timing'])
+
+
 class TestSelfCorrectionIntegration(unittest.TestCase):
     """Integration tests for self-correction with CRAGVerifier"""
 
@@ -409,6 +508,7 @@ def main():
 
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestSelfCorrector))
+    suite.addTests(loader.loadTestsFromTestCase(TestConcurrentRetrieval))
     suite.addTests(loader.loadTestsFromTestCase(TestSelfCorrectionIntegration))
 
     # Run tests
@@ -0,0 +1,180 @@
+"""
+Unit Tests for Shared Tool Result Cache
+
+Tests the ToolResultCache class that shares ReAct tool results across
+analyses (local LRU + optional Redis level).
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+
+# Add agents module to path
+agents_dir = os.path.join(os.path.dirname(__file__), '..', 'agents')
+sys.path.insert(0, agents_dir)
+
+from tool_result_cache import ToolResultCache, GITHUB_BRANCH_TTL_SECONDS
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.Redis"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def ttl(self, key):
+        return self.ttls.get(key, -2)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestToolResultCache(unittest.TestCase):
+    """Test ToolResultCache class"""
+
+    def setUp(self):
+        self.cache = ToolResultCache(max_entries=3)
+        self.state = {
+            'build_id': 'BUILD-1',
+            'error_message': 'TimeoutError: request to 10.0.0.5:8080 timed out after 30s',
+            'error_category': 'INFRA_ERROR',
+            'test_name': 'test_storage'
+        }
+
+    def test_miss_then_hit(self):
+        """Test value stored after a miss is returned on the next lookup"""
+        key = self.cache.build_key('pinecone_knowledge', self.state)
+
+        self.assertIsNone(self.cache.get('pinecone_knowledge', key))
+        self.assertTrue(self.cache.put('pinecone_knowledge', key, [{'content': 'doc'}]))
+        self.assertEqual(self.cache.get('pinecone_knowledge', key), [{'content': 'doc'}])
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['per_tool']['pinecone_knowledge']['hits'], 1)
+
+    def test_key_ignores_volatile_tokens(self):
+        """Test error messages differing only in numbers share a key"""
+        other = dict(self.state, error_message='TimeoutError: request to 10.0.0.9:9090 timed out after 45s')
+
+        self.assertEqual(
+            self.cache.build_key('pinecone_error_library', self.state),
+            self.cache.build_key('pinecone_error_library', other)
+        )
+
+    def test_github_key_uses_commit_sha(self):
+        """Test GitHub keys depend on file path and commit SHA"""
+        state_a = dict(self.state, commit_sha='abc123')
+        state_b = dict(self.state, commit_sha='def456')
+
+        key_a = self.cache.build_key('github_get_file', state_a, target='src/main.py')
+        key_b = self.cache.build_key('github_get_file', state_b, target='src/main.py')
+
+        self.assertNotEqual(key_a, key_b)
+        self.assertIsNone(self.cache.build_key('github_get_file', state_a))
+
+    def test_github_ttl_shorter_without_sha(self):
+        """Test files fetched from a branch get the short TTL"""
+        self.assertEqual(self.cache.get_ttl('github_get_file', self.state), GITHUB_BRANCH_TTL_SECONDS)
+        self.assertGreater(
+            self.cache.get_ttl('github_get_file', dict(self.state, commit_sha='abc')),
+            GITHUB_BRANCH_TTL_SECONDS
+        )
+
+    def test_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = ToolResultCache(ttl_policy={'mongodb_logs': 10})
+        key = cache.build_key('mongodb_logs', self.state)
+
+        with patch('tool_result_cache.time.time', return_value=1000.0):
+            cache.put('mongodb_logs', key, [{'log': 1}])
+        with patch('tool_result_cache.time.time', return_value=1005.0):
+            self.assertIsNotNone(cache.get('mongodb_logs', key))
+        with patch('tool_result_cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.get('mongodb_logs', key))
+
+        self.assertEqual(cache.get_stats()['expirations'], 1)
+
+    def test_lru_eviction(self):
+        """Test oldest entries are evicted beyond max_entries"""
+        for i in range(4):
+            self.cache.put('pinecone_knowledge', f'k{i}', [i])
+
+        self.assertIsNone(self.cache.get('pinecone_knowledge', 'k0'))
+        self.assertEqual(self.cache.get('pinecone_knowledge', 'k3'), [3])
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+
+    def test_empty_and_uncacheable_not_stored(self):
+        """Test empty results and tools without TTL are not cached"""
+        key = self.cache.build_key('pinecone_knowledge', self.state)
+
+        self.assertFalse(self.cache.put('pinecone_knowledge', key, []))
+        self.assertIsNone(self.cache.build_key('github_search_code', self.state))
+
+    def test_returns_copies(self):
+        """Test mutating a returned value does not corrupt the cache"""
+        self.cache.put('pinecone_knowledge', 'k', [{'content': 'doc'}])
+
+        first = self.cache.get('pinecone_knowledge', 'k')
+        first.append({'content': 'mutated'})
+
+        self.assertEqual(len(self.cache.get('pinecone_knowledge', 'k')), 1)
+
+    def test_redis_level_shared(self):
+        """Test a value stored by one cache is visible to another via Redis"""
+        redis_client = FakeRedis()
+        writer = ToolResultCache(redis_client=redis_client)
+        reader = ToolResultCache(redis_client=redis_client)
+
+        key = writer.build_key('postgres_history', self.state)
+        writer.put('postgres_history', key, [{'root_cause': 'disk full'}])
+
+        self.assertEqual(reader.get('postgres_history', key), [{'root_cause': 'disk full'}])
+        self.assertEqual(reader.get_stats()['redis_hits'], 1)
+
+        # Second lookup is served by the local level
+        reader.get('postgres_history', key)
+        self.assertEqual(reader.get_stats()['local_hits'], 1)
+
+    def test_redis_values_json_serializable(self):
+        """Test non-JSON values (datetimes from databases) are stringified"""
+        from datetime import datetime
+
+        redis_client = FakeRedis()
+        cache = ToolResultCache(redis_client=redis_client)
+        cache.put('postgres_history', 'k', [{'analyzed_at': datetime(2026, 1, 1)}])
+
+        stored = json.loads(list(redis_client.data.values())[0])
+        self.assertEqual(stored[0]['analyzed_at'], '2026-01-01 00:00:00')
+
+
+def main():
+    """Run all tests"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestToolResultCache))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
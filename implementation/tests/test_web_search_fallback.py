@@ -12,12 +12,16 @@ import unittest
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 # Add verification module to path
 verification_dir = os.path.join(os.path.dirname(__file__), '..', 'verification')
 sys.path.insert(0, verification_dir)
 
-from web_search_fallback import WebSearchFallback
+from web_search_fallback import WebSearchFallback, TokenBucket
 
 
 class TestWebSearchFallback(unittest.TestCase):
@@ -371,6 +375,196 @@ class TestWebSearchFallback(unittest.TestCase):
         self.assertEqual(stats['confidence_improvements'], 5)
 
 
+class SearchStub:
+    """Local HTTP server answering like the DuckDuckGo API/HTML and Bing endpoints"""
+
+    def __init__(self):
+        self.delays = {'/ddg': 0.0, '/ddg-html': 0.0, '/bing': 0.0}
+        self.hits = {'/ddg': 0, '/ddg-html': 0, '/bing': 0}
+        self.empty = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                path = self.path.split('?')[0]
+                stub.hits[path] += 1
+                time.sleep(stub.delays[path])
+
+                if path == '/ddg-html':
+                    body = '' if path in stub.empty else (
+                        '<div class="result"><a class="result__a" href="https://example.com/html">HTML result</a>'
+                        '<a class="result__snippet">Restart the gateway service</a></div>'
+                    )
+                    content_type = 'text/html'
+                elif path == '/bing':
+                    body = json.dumps({'webPages': {'value': [] if path in stub.empty else [
+                        {'url': 'https://example.com/bing', 'name': 'Bing result', 'snippet': 'Increase the timeout'}
+                    ]}})
+                    content_type = 'application/json'
+                else:
+                    body = json.dumps({} if path in stub.empty else {
+                        'Abstract': 'Gateway timeouts are fixed by raising the client timeout',
+                        'AbstractURL': 'https://example.com/api', 'Heading': 'API result'
+                    })
+                    content_type = 'application/json'
+
+                encoded = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            do_GET = _answer
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self._answer()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True  # don't wait for slow answers on close
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.endpoints = {'duckduckgo': base + '/ddg', 'duckduckgo_html': base + '/ddg-html', 'bing': base + '/bing'}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSearchPath(unittest.TestCase):
+    """Test result cache, hedged engines and rate limiting against a local HTTP stub"""
+
+    def setUp(self):
+        self.stub = SearchStub()
+        self.addCleanup(self.stub.close)
+
+    def _searcher(self, **kwargs):
+        searcher = WebSearchFallback(endpoints=self.stub.endpoints, **kwargs)
+        searcher.google_api_key = searcher.google_cse_id = searcher.bing_api_key = None
+        searcher.search_engine = 'duckduckgo'
+        return searcher
+
+    def test_repeated_query_served_from_cache(self):
+        """Test identical queries issue one search"""
+        searcher = self._searcher(hedge_after_ms=0)
+
+        first = searcher._search_web('TimeoutError gateway solution')
+        second = searcher._search_web('timeouterror  GATEWAY solution')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]['engine'], 'duckduckgo')
+        self.assertEqual(self.stub.hits['/ddg'], 1)
+        self.assertEqual(searcher.get_statistics()['cache']['hits'], 1)
+
+    def test_cache_disabled(self):
+        """Test cache_ttl=0 searches every time"""
+        searcher = self._searcher(cache_ttl=0, hedge_after_ms=0)
+
+        searcher._search_web('TimeoutError gateway solution')
+        searcher._search_web('TimeoutError gateway solution')
+
+        self.assertEqual(self.stub.hits['/ddg'], 2)
+
+    def test_slow_engine_is_hedged(self):
+        """Test the second engine answers when the first exceeds the latency budget"""
+        self.stub.delays['/ddg'] = 1.0
+        searcher = self._searcher(hedge_after_ms=100)
+
+        start = time.perf_counter()
+        results = searcher._search_web('TimeoutError gateway solution')
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(results[0]['engine'], 'duckduckgo_html')
+        self.assertEqual(results[0]['url'], 'https://example.com/html')
+        stats = searcher.get_statistics()
+        self.assertEqual((stats['hedged_searches'], stats['hedge_wins']), (1, 1))
+
+    def test_fast_engine_not_hedged(self):
+        """Test no second request when the first engine answers in time"""
+        searcher = self._searcher(hedge_after_ms=500)
+
+        results = searcher._search_web('TimeoutError gateway solution')
+
+        self.assertEqual(results[0]['engine'], 'duckduckgo')
+        self.assertEqual(self.stub.hits['/ddg-html'], 0)
+        self.assertEqual(searcher.get_statistics()['hedged_searches'], 0)
+
+    def test_empty_answer_fails_over(self):
+        """Test an empty answer moves on to the next engine without waiting"""
+        self.stub.empty.update({'/ddg', '/ddg-html'})
+        searcher = self._searcher(hedge_after_ms=0)
+        searcher.bing_api_key = 'test_key'
+
+        results = searcher._search_web('TimeoutError gateway solution')
+
+        self.assertEqual(results[0]['engine'], 'bing')
+
+    def test_no_instant_answer_uses_html_engine(self):
+        """Test an empty DuckDuckGo answer reaches the HTML engine only through its rate limiter"""
+        self.stub.empty.add('/ddg')
+        searcher = self._searcher(hedge_after_ms=0, rate_limits={'duckduckgo_html': (0.001, 1)})
+
+        results = searcher._search_web('first query')
+        self.assertEqual(results[0]['engine'], 'duckduckgo_html')
+
+        self.assertEqual(searcher._search_web('second query'), [])
+        self.assertEqual(self.stub.hits['/ddg-html'], 1)
+        self.assertEqual(searcher.get_statistics()['rate_limited'], {'duckduckgo_html': 1})
+
+    def test_hedge_order_includes_bing(self):
+        """Test configured API engines are hedge candidates"""
+        self.stub.delays['/ddg'] = 1.0
+        searcher = self._searcher(hedge_after_ms=100)
+        searcher.bing_api_key = 'test_key'
+
+        results = searcher._search_web('TimeoutError gateway solution')
+
+        self.assertEqual(searcher.engine_order(), ['duckduckgo', 'bing', 'duckduckgo_html'])
+        self.assertEqual(results[0]['engine'], 'bing')
+
+    def test_rate_limited_engine_skipped(self):
+        """Test an engine without tokens is skipped for the next one"""
+        searcher = self._searcher(hedge_after_ms=0, rate_limits={'duckduckgo': (0.001, 1)})
+
+        searcher._search_web('first query')
+        results = searcher._search_web('second query')
+
+        self.assertEqual(self.stub.hits['/ddg'], 1)
+        self.assertEqual(results[0]['engine'], 'duckduckgo_html')
+        self.assertEqual(searcher.get_statistics()['rate_limited'], {'duckduckgo': 1})
+
+    def test_fallback_search_reports_answering_engine(self):
+        """Test fallback_search reports the engine that answered"""
+        self.stub.delays['/ddg'] = 1.0
+        searcher = self._searcher(hedge_after_ms=100)
+
+        result = searcher.fallback_search(
+            {'error_category': 'INFRA_ERROR'},
+            {'overall_confidence': 0.3},
+            {'error_message': 'TimeoutError: gateway timed out'}
+        )
+
+        self.assertEqual(result['search_engine'], 'duckduckgo_html')
+
+    def test_token_bucket_refills(self):
+        """Test burst capacity and refill rate"""
+        now = [0.0]
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        now[0] = 0.5
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+
 class TestWebSearchIntegration(unittest.TestCase):
     """Integration tests with CRAGVerifier"""
 
@@ -436,6 +630,7 @@ def main():
 
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestWebSearchFallback))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchPath))
     suite.addTests(loader.loadTestsFromTestCase(TestWebSearchIntegration))
 
     # Run tests
@@ -12,16 +12,162 @@ Metrics tracked:
 - Component score averages
 - Time-based trends
 
+Memory and lock hold time stay constant in a long-running service:
+scores are kept as running (Welford) moments plus fixed-width histograms
+for p50/p95/p99, recent verifications in a ring buffer, and hourly/daily
+counts for a retention window. export_prometheus() renders the metrics in
+the Prometheus text exposition format.
+
+With CRAG_METRICS_BACKEND=shm|redis (see crag_metrics_backend) every process
+flushes its metric deltas to a shared backend every
+CRAG_METRICS_FLUSH_INTERVAL seconds and statistics are fleet-wide.
+
 Author: AI Analysis System
 Date: 2025-11-02
 """
 
+import atexit
+import logging
+import math
+import os
 import threading
-from typing import Dict, List, Any, Optional
+import weakref
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, deque
 import json
 
+try:
+    from .crag_metrics_backend import create_metrics_backend, HOURLY_PREFIX, DAILY_PREFIX, START_TIME_FIELD
+    METRICS_BACKEND_AVAILABLE = True
+except ImportError:
+    METRICS_BACKEND_AVAILABLE = False
+    HOURLY_PREFIX, DAILY_PREFIX, START_TIME_FIELD = 'hourly.', 'daily.', 'start_time'
+
+logger = logging.getLogger(__name__)
+
+
+# Retention of time-series buckets
+HOURLY_RETENTION = 24 * 7    # hours
+DAILY_RETENTION = 90         # days
+
+# Histogram resolution for scores in [0, 1] (percentiles within 0.01)
+SCORE_BUCKETS = 100
+
+# Prometheus histogram bucket bounds (CRAG routing thresholds included)
+PROMETHEUS_SCORE_BOUNDS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.65, 0.7, 0.8, 0.85, 0.9, 1.0)
+PROMETHEUS_DELTA_BOUNDS = (-0.2, -0.1, 0.0, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0)
+
+# Seconds between flushes to the shared metrics backend
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Additive state: plain counters and per-key counter dicts of CRAGMetrics
+_STATE_COUNTERS = (
+    'total_verifications',
+    'self_correction_attempts', 'self_correction_successes', 'self_correction_failures',
+    'hitl_queued', 'hitl_pending', 'hitl_approved', 'hitl_rejected',
+    'web_search_attempts', 'web_search_successes', 'web_search_failures'
+)
+_STATE_COUNTER_DICTS = ('confidence_counts', 'routing_counts', 'hitl_priorities')
+
+
+class ScoreHistogram:
+    """
+    Streaming distribution of a bounded value
+
+    Welford running mean/variance plus a fixed-width bucket histogram, so
+    memory does not grow with the number of observations. Quantiles are
+    interpolated within a bucket (error at most one bucket width).
+
+    Buckets include their upper edge, (edge, edge + width], like Prometheus
+    `le` buckets, so a value on an edge counts towards that bound.
+    """
+
+    __slots__ = ('low', 'high', 'width', 'buckets', 'count', 'total', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self, low: float = 0.0, high: float = 1.0, buckets: int = SCORE_BUCKETS):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / buckets
+        self.buckets = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        """Record one observation (clamped to [low, high] for bucketing)"""
+        value = float(value)
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        # Rounded so a value on an edge is not pushed over it by float error
+        index = math.ceil(round((value - self.low) / self.width, 9)) - 1
+        self.buckets[max(0, min(len(self.buckets) - 1, index))] += 1
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimated q-quantile (0 <= q <= 1); 0.0 without observations"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and cumulative + bucket_count >= target:
+                fraction = (target - cumulative) / bucket_count
+                estimate = self.low + self.width * (index + fraction)
+                return min(self.max, max(self.min, estimate))
+            cumulative += bucket_count
+        return self.max
+
+    def percentiles(self) -> Dict[str, float]:
+        return {name: round(self.quantile(q), 3) for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))}
+
+    def export_state(self, prefix: str, state: Dict[str, float], dense: bool = False):
+        """Add count, sum, sum of squares and buckets (non-empty unless dense) to state"""
+        state[f'{prefix}.count'] = self.count
+        state[f'{prefix}.sum'] = self.total
+        state[f'{prefix}.sumsq'] = self._m2 + self.count * self.mean * self.mean
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count or dense:
+                state[f'{prefix}.b{index}'] = bucket_count
+
+    def load_state(self, prefix: str, state: Dict[str, float]):
+        """Restore from export_state() output (min/max become bucket edges)"""
+        self.count = int(round(state.get(f'{prefix}.count', 0)))
+        self.total = state.get(f'{prefix}.sum', 0.0)
+        self.buckets = [int(round(state.get(f'{prefix}.b{index}', 0))) for index in range(len(self.buckets))]
+        if self.count:
+            self.mean = self.total / self.count
+            self._m2 = max(0.0, state.get(f'{prefix}.sumsq', 0.0) - self.count * self.mean * self.mean)
+            filled = [index for index, bucket_count in enumerate(self.buckets) if bucket_count]
+            if filled:
+                self.min = self.low + self.width * filled[0]
+                self.max = self.low + self.width * (filled[-1] + 1)
+
+    def cumulative_counts(self, bounds: Tuple[float, ...]) -> List[Tuple[float, int]]:
+        """Observations <= each bound (bounds should fall on bucket edges)"""
+        counts = []
+        cumulative = 0
+        index = 0
+        for bound in bounds:
+            edge = int(round((bound - self.low) / self.width))
+            while index < min(edge, len(self.buckets)):
+                cumulative += self.buckets[index]
+                index += 1
+            counts.append((bound, cumulative))
+        return counts
+
 
 class CRAGMetrics:
     """
@@ -31,17 +177,41 @@ class CRAGMetrics:
     CRAG performance and effectiveness.
     """
 
-    def __init__(self):
-        """Initialize metrics tracker"""
+    def __init__(self, backend=None, flush_interval: Optional[float] = None):
+        """
+        Initialize metrics tracker
+
+        Args:
+            backend: Shared metrics backend (crag_metrics_backend) for
+                fleet-wide statistics, or None for this process only
+            flush_interval: Seconds between background flushes to the backend
+                (env CRAG_METRICS_FLUSH_INTERVAL, 0 = flush only on read/exit)
+        """
         # Thread lock for thread-safe operations
         self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self.backend = backend
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else float(os.getenv('CRAG_METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+        )
+        self._flushed_state: Dict[str, float] = {}
+        self._flush_thread = None
+        self._flush_stop = threading.Event()
 
         # Reset all metrics
         self.reset()
 
+        if backend is not None:
+            _backed_metrics.add(self)
+            self._start_flusher()
+
     def reset(self):
-        """Reset all metrics to zero"""
-        with self._lock:
+        """Reset this process's metrics to zero (reset_metrics() also clears the backend)"""
+        with self._flush_lock, self._lock:
+            self._flushed_state = {}
+
             # Overall statistics
             self.total_verifications = 0
             self.start_time = datetime.now()
@@ -63,23 +233,23 @@ class CRAGMetrics:
                 'ERROR': 0           # Verification errors
             }
 
-            # Confidence scores (for averaging)
-            self.confidence_scores = []
+            # Confidence scores (running moments + histogram)
+            self.confidence_scores = ScoreHistogram()
 
-            # Component scores (for averaging)
+            # Component scores
             self.component_scores = {
-                'relevance': [],
-                'consistency': [],
-                'grounding': [],
-                'completeness': [],
-                'classification': []
+                'relevance': ScoreHistogram(),
+                'consistency': ScoreHistogram(),
+                'grounding': ScoreHistogram(),
+                'completeness': ScoreHistogram(),
+                'classification': ScoreHistogram()
             }
 
             # Self-correction metrics
             self.self_correction_attempts = 0
             self.self_correction_successes = 0
             self.self_correction_failures = 0
-            self.confidence_improvements = []  # Delta values
+            self.confidence_improvements = ScoreHistogram(-1.0, 1.0, 2 * SCORE_BUCKETS)  # Delta values
 
             # HITL metrics
             self.hitl_queued = 0
@@ -96,15 +266,15 @@ class CRAGMetrics:
             self.web_search_attempts = 0
             self.web_search_successes = 0
             self.web_search_failures = 0
-            self.web_search_improvements = []  # Delta values
+            self.web_search_improvements = ScoreHistogram(-1.0, 1.0, 2 * SCORE_BUCKETS)  # Delta values
 
-            # Time-based tracking
-            self.hourly_counts = defaultdict(int)  # Hour -> count
-            self.daily_counts = defaultdict(int)   # Date -> count
+            # Time-based tracking (oldest buckets dropped past retention)
+            self.hourly_counts = OrderedDict()  # Hour -> count
+            self.daily_counts = OrderedDict()   # Date -> count
 
-            # Recent verifications (last 100)
-            self.recent_verifications = []
+            # Recent verifications (ring buffer, last 100)
             self.max_recent = 100
+            self.recent_verifications = deque(maxlen=self.max_recent)
 
     def record_verification(self, verification_result: Dict[str, Any]):
         """
@@ -134,7 +304,7 @@ class CRAGMetrics:
                 self.routing_counts['ERROR'] += 1
 
             # Store confidence score
-            self.confidence_scores.append(confidence)
+            self.confidence_scores.add(confidence)
 
             # Store component scores
             confidence_scores = metadata.get('confidence_scores', {})
@@ -142,14 +312,12 @@ class CRAGMetrics:
             for component_name in self.component_scores.keys():
                 score = components.get(component_name)
                 if score is not None:
-                    self.component_scores[component_name].append(score)
+                    self.component_scores[component_name].add(score)
 
             # Time-based tracking
             now = datetime.now()
-            hour_key = now.strftime('%Y-%m-%d %H:00')
-            day_key = now.strftime('%Y-%m-%d')
-            self.hourly_counts[hour_key] += 1
-            self.daily_counts[day_key] += 1
+            _increment_bucket(self.hourly_counts, now.strftime('%Y-%m-%d %H:00'), HOURLY_RETENTION)
+            _increment_bucket(self.daily_counts, now.strftime('%Y-%m-%d'), DAILY_RETENTION)
 
             # Store recent verification
             recent_entry = {
@@ -160,8 +328,6 @@ class CRAGMetrics:
                 'action': action
             }
             self.recent_verifications.append(recent_entry)
-            if len(self.recent_verifications) > self.max_recent:
-                self.recent_verifications.pop(0)
 
     def record_self_correction(self, success: bool, original_confidence: float,
                                new_confidence: Optional[float] = None):
@@ -180,7 +346,7 @@ class CRAGMetrics:
                 self.self_correction_successes += 1
                 if new_confidence is not None:
                     improvement = new_confidence - original_confidence
-                    self.confidence_improvements.append(improvement)
+                    self.confidence_improvements.add(improvement)
             else:
                 self.self_correction_failures += 1
 
@@ -228,7 +394,7 @@ class CRAGMetrics:
                 self.web_search_successes += 1
                 if new_confidence is not None:
                     improvement = new_confidence - original_confidence
-                    self.web_search_improvements.append(improvement)
+                    self.web_search_improvements.add(improvement)
             else:
                 self.web_search_failures += 1
 
@@ -236,9 +402,23 @@ class CRAGMetrics:
         """
         Get comprehensive CRAG metrics
 
+        Fleet-wide when a backend is configured (recent verifications are
+        always this process's).
+
         Returns:
             dict: All collected metrics and calculated statistics
         """
+        view = self._fleet_view()
+        stats = view._compute_statistics()
+        stats['summary']['scope'] = 'process' if view is self else 'fleet'
+        if view is not self:
+            stats['summary']['backend'] = self.backend.name
+            with self._lock:
+                stats['recent_verifications'] = list(self.recent_verifications)[-10:]
+        return stats
+
+    def _compute_statistics(self) -> Dict[str, Any]:
+        """Statistics from this instance's aggregates"""
         with self._lock:
             # Calculate uptime
             uptime = datetime.now() - self.start_time
@@ -264,17 +444,13 @@ class CRAGMetrics:
             }
 
             # Average confidence
-            avg_confidence = (
-                sum(self.confidence_scores) / len(self.confidence_scores)
-                if self.confidence_scores else 0.0
-            )
+            avg_confidence = self.confidence_scores.mean
 
             # Average component scores
-            avg_components = {}
-            for component_name, scores in self.component_scores.items():
-                avg_components[component_name] = (
-                    sum(scores) / len(scores) if scores else 0.0
-                )
+            avg_components = {
+                component_name: scores.mean
+                for component_name, scores in self.component_scores.items()
+            }
 
             # Self-correction statistics
             self_correction_rate = (
@@ -283,11 +459,7 @@ class CRAGMetrics:
                 else 0.0
             )
 
-            avg_improvement = (
-                sum(self.confidence_improvements) / len(self.confidence_improvements)
-                if self.confidence_improvements
-                else 0.0
-            )
+            avg_improvement = self.confidence_improvements.mean
 
             # HITL statistics
             hitl_total_processed = self.hitl_approved + self.hitl_rejected
@@ -304,11 +476,7 @@ class CRAGMetrics:
                 else 0.0
             )
 
-            avg_web_improvement = (
-                sum(self.web_search_improvements) / len(self.web_search_improvements)
-                if self.web_search_improvements
-                else 0.0
-            )
+            avg_web_improvement = self.web_search_improvements.mean
 
             # Throughput
             verifications_per_hour = (
@@ -323,7 +491,9 @@ class CRAGMetrics:
                     'uptime_hours': round(uptime_hours, 2),
                     'verifications_per_hour': round(verifications_per_hour, 2),
                     'start_time': self.start_time.isoformat(),
-                    'average_confidence': round(avg_confidence, 3)
+                    'average_confidence': round(avg_confidence, 3),
+                    'confidence_stddev': round(self.confidence_scores.stddev, 3),
+                    'confidence_percentiles': self.confidence_scores.percentiles()
                 },
                 'confidence_distribution': confidence_distribution,
                 'routing_distribution': routing_distribution,
@@ -331,6 +501,10 @@ class CRAGMetrics:
                     component: round(score, 3)
                     for component, score in avg_components.items()
                 },
+                'component_percentiles': {
+                    component: scores.percentiles()
+                    for component, scores in self.component_scores.items()
+                },
                 'self_correction': {
                     'total_attempts': self.self_correction_attempts,
                     'successes': self.self_correction_successes,
@@ -355,7 +529,7 @@ class CRAGMetrics:
                     'average_improvement': round(avg_web_improvement, 3),
                     'target_success_rate': 50.0  # From design doc
                 },
-                'recent_verifications': self.recent_verifications[-10:]  # Last 10
+                'recent_verifications': list(self.recent_verifications)[-10:]  # Last 10
             }
 
     def get_time_series(self, period: str = 'hourly') -> Dict[str, int]:
@@ -368,11 +542,12 @@ class CRAGMetrics:
         Returns:
             dict: Time period -> count
         """
-        with self._lock:
+        view = self._fleet_view()
+        with view._lock:
             if period == 'hourly':
-                return dict(self.hourly_counts)
+                return dict(view.hourly_counts)
             elif period == 'daily':
-                return dict(self.daily_counts)
+                return dict(view.daily_counts)
             else:
                 return {}
 
@@ -393,45 +568,264 @@ class CRAGMetrics:
         Returns:
             dict: Health status with warnings
         """
+        # One consistent snapshot (get_statistics takes the lock itself)
+        stats = self.get_statistics()
+        total_verifications = stats['summary']['total_verifications']
+        hitl_pending = stats['hitl_queue']['pending']
+        warnings = []
+        health = 'healthy'
+
+        # Check if HITL queue is growing
+        if hitl_pending > 50:
+            warnings.append(f"HITL queue large ({hitl_pending} pending)")
+            health = 'warning'
+
+        # Check self-correction success rate
+        self_correction_rate = stats['self_correction']['success_rate']
+        if stats['self_correction']['total_attempts'] >= 10 and self_correction_rate < 40:
+            warnings.append(f"Low self-correction rate ({self_correction_rate:.1f}%)")
+            health = 'warning'
+
+        # Check web search success rate
+        web_search_rate = stats['web_search']['success_rate']
+        if stats['web_search']['total_attempts'] >= 10 and web_search_rate < 30:
+            warnings.append(f"Low web search success rate ({web_search_rate:.1f}%)")
+            health = 'warning'
+
+        # Check confidence distribution (should have some HIGH confidence)
+        high_percentage = stats['confidence_distribution']['HIGH']['percentage']
+        if total_verifications >= 20 and high_percentage < 30:
+            warnings.append(f"Low high-confidence rate ({high_percentage:.1f}%)")
+            health = 'warning'
+
+        return {
+            'status': health,
+            'warnings': warnings,
+            'metrics_summary': {
+                'total_verifications': total_verifications,
+                'hitl_pending': hitl_pending,
+                'high_confidence_rate': high_percentage,
+                'self_correction_rate': self_correction_rate,
+                'web_search_rate': web_search_rate
+            }
+        }
+
+    def export_prometheus(self) -> str:
+        """
+        Export metrics in the Prometheus text exposition format (0.0.4)
+
+        Returns:
+            str: Exposition text for a /metrics scrape
+        """
+        view = self._fleet_view()
+        if view is not self:
+            return view.export_prometheus()
+
+        lines: List[str] = []
+
+        def metric(name: str, metric_type: str, help_text: str, samples: List[Tuple[str, Dict, float]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+
+        def histogram_samples(histogram: ScoreHistogram, bounds, labels=None) -> List[Tuple[str, Dict, float]]:
+            labels = labels or {}
+            samples = [('_bucket', {**labels, 'le': str(bound)}, count)
+                       for bound, count in histogram.cumulative_counts(bounds)]
+            samples.append(('_bucket', {**labels, 'le': '+Inf'}, histogram.count))
+            samples.append(('_sum', labels, round(histogram.total, 6)))
+            samples.append(('_count', labels, histogram.count))
+            return samples
+
         with self._lock:
-            stats = self.get_statistics()
-            warnings = []
-            health = 'healthy'
-
-            # Check if HITL queue is growing
-            if self.hitl_pending > 50:
-                warnings.append(f"HITL queue large ({self.hitl_pending} pending)")
-                health = 'warning'
-
-            # Check self-correction success rate
-            self_correction_rate = stats['self_correction']['success_rate']
-            if self.self_correction_attempts >= 10 and self_correction_rate < 40:
-                warnings.append(f"Low self-correction rate ({self_correction_rate:.1f}%)")
-                health = 'warning'
-
-            # Check web search success rate
-            web_search_rate = stats['web_search']['success_rate']
-            if self.web_search_attempts >= 10 and web_search_rate < 30:
-                warnings.append(f"Low web search success rate ({web_search_rate:.1f}%)")
-                health = 'warning'
-
-            # Check confidence distribution (should have some HIGH confidence)
-            high_percentage = stats['confidence_distribution']['HIGH']['percentage']
-            if self.total_verifications >= 20 and high_percentage < 30:
-                warnings.append(f"Low high-confidence rate ({high_percentage:.1f}%)")
-                health = 'warning'
+            uptime = (datetime.now() - self.start_time).total_seconds()
+
+            metric('crag_verifications_total', 'counter', 'CRAG verifications',
+                   [('', {}, self.total_verifications)])
+            metric('crag_confidence_level_total', 'counter', 'Verifications by confidence level',
+                   [('', {'level': level}, count) for level, count in self.confidence_counts.items()])
+            metric('crag_routing_total', 'counter', 'Verifications by routing decision',
+                   [('', {'status': status}, count) for status, count in self.routing_counts.items()])
+            metric('crag_confidence', 'histogram', 'Overall CRAG confidence',
+                   histogram_samples(self.confidence_scores, PROMETHEUS_SCORE_BOUNDS))
+
+            component_samples = []
+            for component_name, scores in self.component_scores.items():
+                component_samples.extend(histogram_samples(scores, PROMETHEUS_SCORE_BOUNDS,
+                                                           {'component': component_name}))
+            metric('crag_component_score', 'histogram', 'CRAG confidence component scores', component_samples)
+
+            metric('crag_self_correction_total', 'counter', 'Self-correction attempts by outcome', [
+                ('', {'outcome': 'success'}, self.self_correction_successes),
+                ('', {'outcome': 'failure'}, self.self_correction_failures)
+            ])
+            metric('crag_self_correction_improvement', 'histogram', 'Confidence gained by self-correction',
+                   histogram_samples(self.confidence_improvements, PROMETHEUS_DELTA_BOUNDS))
+            metric('crag_web_search_total', 'counter', 'Web search fallbacks by outcome', [
+                ('', {'outcome': 'success'}, self.web_search_successes),
+                ('', {'outcome': 'failure'}, self.web_search_failures)
+            ])
+            metric('crag_web_search_improvement', 'histogram', 'Confidence gained by web search',
+                   histogram_samples(self.web_search_improvements, PROMETHEUS_DELTA_BOUNDS))
+            metric('crag_hitl_queued_total', 'counter', 'Answers queued for human review by priority',
+                   [('', {'priority': priority}, count) for priority, count in self.hitl_priorities.items()])
+            metric('crag_hitl_reviews_total', 'counter', 'Human review decisions', [
+                ('', {'decision': 'approved'}, self.hitl_approved),
+                ('', {'decision': 'rejected'}, self.hitl_rejected)
+            ])
+            metric('crag_hitl_pending', 'gauge', 'Answers awaiting human review', [('', {}, self.hitl_pending)])
+            metric('crag_uptime_seconds', 'gauge', 'Seconds since metrics were reset', [('', {}, round(uptime, 1))])
+
+        return '\n'.join(lines) + '\n'
+
+
+    # ------------------------------------------------------------------
+    # Fleet-wide aggregation
+    # ------------------------------------------------------------------
+
+    def _flat_state(self, dense: bool = False) -> Dict[str, float]:
+        """Additive metrics state as flat key -> value (call with the lock held)"""
+        state = {name: getattr(self, name) for name in _STATE_COUNTERS}
+        for dict_name in _STATE_COUNTER_DICTS:
+            for key, count in getattr(self, dict_name).items():
+                state[f'{dict_name}.{key}'] = count
+        for prefix, histogram in self._histograms():
+            histogram.export_state(prefix, state, dense)
+        if not dense:
+            for key, count in self.hourly_counts.items():
+                state[HOURLY_PREFIX + key] = count
+            for key, count in self.daily_counts.items():
+                state[DAILY_PREFIX + key] = count
+        return state
+
+    def _histograms(self):
+        yield 'confidence', self.confidence_scores
+        for component_name, scores in self.component_scores.items():
+            yield f'component.{component_name}', scores
+        yield 'self_correction_improvement', self.confidence_improvements
+        yield 'web_search_improvement', self.web_search_improvements
+
+    @classmethod
+    def state_keys(cls) -> List[str]:
+        """All fixed state keys (layout of the shared memory backend)"""
+        return list(cls()._flat_state(dense=True))
+
+    @classmethod
+    def from_state(cls, state: Dict[str, float]) -> 'CRAGMetrics':
+        """Metrics instance holding an aggregated state (backend read)"""
+        metrics = cls()
+        for name in _STATE_COUNTERS:
+            setattr(metrics, name, int(round(state.get(name, 0))))
+        metrics.hitl_pending = max(0, metrics.hitl_pending)
+        for dict_name in _STATE_COUNTER_DICTS:
+            counts = getattr(metrics, dict_name)
+            for key in counts:
+                counts[key] = int(round(state.get(f'{dict_name}.{key}', 0)))
+        for prefix, histogram in metrics._histograms():
+            histogram.load_state(prefix, state)
+        for key in sorted(state):
+            if key.startswith(HOURLY_PREFIX):
+                metrics.hourly_counts[key[len(HOURLY_PREFIX):]] = int(state[key])
+            elif key.startswith(DAILY_PREFIX):
+                metrics.daily_counts[key[len(DAILY_PREFIX):]] = int(state[key])
+        if state.get(START_TIME_FIELD):
+            metrics.start_time = datetime.fromtimestamp(state[START_TIME_FIELD])
+        return metrics
+
+    def flush(self) -> bool:
+        """
+        Push the metric changes since the previous flush to the backend
 
-            return {
-                'status': health,
-                'warnings': warnings,
-                'metrics_summary': {
-                    'total_verifications': self.total_verifications,
-                    'hitl_pending': self.hitl_pending,
-                    'high_confidence_rate': high_percentage,
-                    'self_correction_rate': self_correction_rate,
-                    'web_search_rate': web_search_rate
-                }
+        Returns:
+            bool: False if the push failed (the delta is retried next flush)
+        """
+        if self.backend is None:
+            return False
+
+        with self._flush_lock:
+            with self._lock:
+                state = self._flat_state()
+            delta = {
+                key: value - self._flushed_state.get(key, 0)
+                for key, value in state.items()
+                if value != self._flushed_state.get(key, 0)
             }
+            if delta:
+                try:
+                    self.backend.push(delta)
+                except Exception as e:
+                    logger.warning(f"⚠️  CRAG metrics flush to {self.backend.name} failed: {e}")
+                    return False
+            self._flushed_state = state
+            return True
+
+    def _fleet_view(self) -> 'CRAGMetrics':
+        """Aggregated metrics of all processes (self without a backend)"""
+        if self.backend is None:
+            return self
+        self.flush()
+        try:
+            return CRAGMetrics.from_state(self.backend.read())
+        except Exception as e:
+            logger.warning(f"⚠️  CRAG metrics read from {self.backend.name} failed: {e} - process metrics only")
+            return self
+
+    def _start_flusher(self):
+        if self.flush_interval <= 0:
+            return
+        self._flush_stop = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, name='crag-metrics-flush', daemon=True)
+        self._flush_thread.start()
+
+    def _flush_loop(self):
+        while not self._flush_stop.wait(self.flush_interval):
+            self.flush()
+
+    def _after_fork(self):
+        """Forked child: counts inherited from the parent are the parent's to flush"""
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flushed_state = self._flat_state()
+        self.backend.after_fork()
+        self._start_flusher()
+
+    def close(self):
+        """Stop the background flusher and flush once more"""
+        self._flush_stop.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=5)
+        self.flush()
+
+
+# Instances with a backend (flushed at exit, restarted in forked workers)
+_backed_metrics = weakref.WeakSet()
+
+
+def _flush_all():
+    for metrics in list(_backed_metrics):
+        metrics.flush()
+
+
+def _after_fork_in_child():
+    for metrics in list(_backed_metrics):
+        metrics._after_fork()
+
+
+atexit.register(_flush_all)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _increment_bucket(buckets: OrderedDict, key: str, retention: int):
+    """Count into a time bucket, dropping the oldest beyond retention"""
+    if key in buckets:
+        buckets[key] += 1
+        return
+    buckets[key] = 1
+    while len(buckets) > retention:
+        buckets.popitem(last=False)
 
 
 # Global metrics instance
@@ -451,12 +845,17 @@ def get_metrics() -> CRAGMetrics:
     if _global_metrics is None:
         with _global_metrics_lock:
             if _global_metrics is None:  # Double-check locking
-                _global_metrics = CRAGMetrics()
+                backend = None
+                if METRICS_BACKEND_AVAILABLE:
+                    backend = create_metrics_backend(CRAGMetrics.state_keys(), HOURLY_RETENTION, DAILY_RETENTION)
+                _global_metrics = CRAGMetrics(backend=backend)
 
     return _global_metrics
 
 
 def reset_metrics():
-    """Reset global metrics"""
+    """Reset global metrics (fleet-wide when a backend is configured)"""
     metrics = get_metrics()
     metrics.reset()
+    if metrics.backend is not None:
+        metrics.backend.reset()
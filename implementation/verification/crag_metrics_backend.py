@@ -0,0 +1,300 @@
+"""
+Shared Backends for CRAG Metrics
+
+CRAGMetrics is a per-process singleton, so with several gunicorn processes
+and Celery workers each process only sees its own verifications. A metrics
+backend aggregates the additive metrics state (counters, histogram buckets,
+score sums, time-series counts) of every process:
+
+- SharedMemoryMetricsBackend: fixed-layout float64 segment in /dev/shm,
+  for all processes on one host (POSIX only, flock-serialized)
+- RedisMetricsBackend: one Redis hash, for processes on several hosts
+
+Processes never write on the record path; CRAGMetrics pushes the delta
+since its previous flush every CRAG_METRICS_FLUSH_INTERVAL seconds.
+
+Configuration:
+    CRAG_METRICS_BACKEND=local|shm|redis   (default: local, no aggregation)
+    CRAG_METRICS_SHM_NAME=ddn_crag_metrics
+    REDIS_HOST / REDIS_PORT / REDIS_DB     (redis backend)
+
+Author: AI Analysis System
+Date: 2026-10-19
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+    from multiprocessing import shared_memory, resource_tracker
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+REDIS_KEY = "ddn:crag:metrics"
+DEFAULT_SHM_NAME = "ddn_crag_metrics"
+
+# Non-additive field: when aggregation started (epoch seconds)
+START_TIME_FIELD = "start_time"
+
+HOURLY_PREFIX = "hourly."
+DAILY_PREFIX = "daily."
+HOURLY_FORMAT = '%Y-%m-%d %H:00'
+DAILY_FORMAT = '%Y-%m-%d'
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def prune_time_series(state: Dict[str, float], hourly_retention: int, daily_retention: int) -> List[str]:
+    """
+    Drop hourly/daily counts older than the retention window (in place)
+
+    Returns:
+        list: Removed keys
+    """
+    removed = []
+    for prefix, retention in ((HOURLY_PREFIX, hourly_retention), (DAILY_PREFIX, daily_retention)):
+        keys = sorted(key for key in state if key.startswith(prefix))
+        for key in keys[:max(0, len(keys) - retention)]:
+            del state[key]
+            removed.append(key)
+    return removed
+
+
+class RedisMetricsBackend:
+    """Aggregate metrics in one Redis hash (HINCRBY / HINCRBYFLOAT)"""
+
+    name = 'redis'
+
+    def __init__(self, client, key: str = REDIS_KEY, hourly_retention: int = 168, daily_retention: int = 90):
+        """
+        Args:
+            client: redis.Redis client
+            key: Hash holding the fleet-wide state
+            hourly_retention / daily_retention: Time-series buckets kept
+        """
+        self.client = client
+        self.key = key
+        self.hourly_retention = hourly_retention
+        self.daily_retention = daily_retention
+
+    def push(self, delta: Dict[str, float]):
+        """Add a delta to the shared state (one round trip)"""
+        pipeline = self.client.pipeline(transaction=False)
+        for field, value in delta.items():
+            if isinstance(value, int):
+                pipeline.hincrby(self.key, field, value)
+            else:
+                pipeline.hincrbyfloat(self.key, field, value)
+        pipeline.hsetnx(self.key, START_TIME_FIELD, time.time())
+        pipeline.execute()
+
+    def read(self) -> Dict[str, float]:
+        """Fleet-wide state (expired time-series fields are deleted)"""
+        state = {_decode(field): float(_decode(value)) for field, value in self.client.hgetall(self.key).items()}
+        expired = prune_time_series(state, self.hourly_retention, self.daily_retention)
+        if expired:
+            self.client.hdel(self.key, *expired)
+        return state
+
+    def reset(self):
+        self.client.delete(self.key)
+
+    def after_fork(self):
+        pass  # redis-py reconnects in a new process
+
+    def close(self):
+        pass
+
+
+class SharedMemoryMetricsBackend:
+    """
+    Aggregate metrics in a POSIX shared-memory segment
+
+    Fixed layout: [layout checksum, start time, one float64 per state key,
+    hourly ring (tag, count) x hourly_slots, daily ring (tag, count) x
+    daily_slots]. Time-series slots are addressed by epoch hour/day modulo
+    the ring size; a slot whose tag differs is recycled. Updates from all
+    processes are serialized with flock on a lock file.
+    """
+
+    name = 'shm'
+
+    def __init__(self, keys: List[str], name: str = DEFAULT_SHM_NAME,
+                 hourly_slots: int = 168, daily_slots: int = 90):
+        """
+        Args:
+            keys: Additive state keys (CRAGMetrics.state_keys())
+            name: Segment name (shared by all processes on the host)
+            hourly_slots / daily_slots: Time-series buckets kept
+        """
+        if not SHARED_MEMORY_AVAILABLE:
+            raise RuntimeError("shared memory metrics backend requires a POSIX platform")
+
+        self.keys = list(keys)
+        self.index = {key: 2 + position for position, key in enumerate(self.keys)}
+        self.hourly_offset = 2 + len(self.keys)
+        self.daily_offset = self.hourly_offset + 2 * hourly_slots
+        self.hourly_slots = hourly_slots
+        self.daily_slots = daily_slots
+        size = 8 * (self.daily_offset + 2 * daily_slots)
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # The segment outlives this process (other workers keep using it)
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        if self._shm.size < size:
+            self._shm.close()
+            raise RuntimeError(f"shared memory segment {name} too small ({self._shm.size} < {size} bytes)")
+
+        self._values = self._shm.buf.cast('d')
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), 'a+')
+
+        checksum = float(zlib.crc32('\n'.join(self.keys).encode()))
+        with self._locked():
+            if self._values[0] != checksum:
+                # New segment or a different layout (upgrade): start over
+                self._zero()
+                self._values[0] = checksum
+                self._values[1] = time.time()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def after_fork(self):
+        """Re-open the lock file in a forked child (flock is per open file)"""
+        self._lock = threading.Lock()
+        self._lock_file = open(self._lock_file.name, 'a+')
+
+    def _zero(self):
+        for position in range(2, len(self._values)):
+            self._values[position] = 0.0
+
+    def _ring_slot(self, key: str) -> Optional[tuple]:
+        """(slot position, tag) of an hourly/daily key"""
+        if key.startswith(HOURLY_PREFIX):
+            tag = int((datetime.strptime(key[len(HOURLY_PREFIX):], HOURLY_FORMAT) - _EPOCH).total_seconds() // 3600)
+            return self.hourly_offset + 2 * (tag % self.hourly_slots), tag
+        if key.startswith(DAILY_PREFIX):
+            tag = (datetime.strptime(key[len(DAILY_PREFIX):], DAILY_FORMAT) - _EPOCH).days
+            return self.daily_offset + 2 * (tag % self.daily_slots), tag
+        return None
+
+    def push(self, delta: Dict[str, float]):
+        """Add a delta to the shared state"""
+        with self._locked():
+            for key, value in delta.items():
+                position = self.index.get(key)
+                if position is not None:
+                    self._values[position] += value
+                    continue
+
+                slot = self._ring_slot(key)
+                if slot is None:
+                    continue  # Not part of the layout
+                position, tag = slot
+                if self._values[position] != tag:
+                    self._values[position] = tag
+                    self._values[position + 1] = 0.0
+                self._values[position + 1] += value
+
+    def read(self) -> Dict[str, float]:
+        """Fleet-wide state"""
+        with self._locked():
+            values = self._values.tolist()
+
+        state = {key: values[position] for key, position in self.index.items() if values[position]}
+        state[START_TIME_FIELD] = values[1]
+
+        for prefix, offset, slots, fmt, unit in (
+            (HOURLY_PREFIX, self.hourly_offset, self.hourly_slots, HOURLY_FORMAT, 'hours'),
+            (DAILY_PREFIX, self.daily_offset, self.daily_slots, DAILY_FORMAT, 'days')
+        ):
+            ring = [(int(values[offset + 2 * i]), values[offset + 2 * i + 1]) for i in range(slots)]
+            newest = max((tag for tag, count in ring if count), default=None)
+            for tag, count in ring:
+                if count and tag > newest - slots:
+                    state[prefix + (_EPOCH + timedelta(**{unit: tag})).strftime(fmt)] = count
+        return state
+
+    def reset(self):
+        with self._locked():
+            self._zero()
+            self._values[1] = time.time()
+
+    def close(self):
+        self._values.release()
+        self._shm.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """Remove the segment and its lock file (all processes must have closed it)"""
+        shared_memory.SharedMemory(name=self._shm.name).unlink()
+        try:
+            os.remove(self._lock_file.name)
+        except OSError:
+            pass
+
+
+def _create_redis_client():
+    """Create Redis client for the redis metrics backend"""
+    import redis
+    client = redis.Redis(
+        host=os.getenv('REDIS_HOST', 'localhost'),
+        port=int(os.getenv('REDIS_PORT', 6379)),
+        db=int(os.getenv('REDIS_DB', 0)),
+        decode_responses=True,
+        socket_connect_timeout=2,
+        socket_timeout=2
+    )
+    client.ping()
+    return client
+
+
+def create_metrics_backend(keys: List[str], hourly_retention: int, daily_retention: int):
+    """
+    Create the backend selected by CRAG_METRICS_BACKEND
+
+    Returns:
+        Backend instance, or None for per-process metrics (default, or when
+        the backend is unavailable)
+    """
+    backend = os.getenv("CRAG_METRICS_BACKEND", "local").lower()
+    try:
+        if backend == 'redis':
+            instance = RedisMetricsBackend(_create_redis_client(), hourly_retention=hourly_retention,
+                                           daily_retention=daily_retention)
+        elif backend == 'shm':
+            instance = SharedMemoryMetricsBackend(keys, os.getenv("CRAG_METRICS_SHM_NAME", DEFAULT_SHM_NAME),
+                                                  hourly_retention, daily_retention)
+        else:
+            return None
+        logger.info(f"✅ CRAG metrics: {backend} backend enabled (fleet-wide aggregation)")
+        return instance
+    except Exception as e:
+        logger.warning(f"⚠️  CRAG metrics: {backend} backend unavailable ({e}) - per-process metrics only")
+        return None
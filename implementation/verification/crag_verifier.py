@@ -8,18 +8,38 @@ Classes:
 - ConfidenceScorer: Multi-dimensional confidence scoring
 - CRAGVerifier: Main verification and routing orchestrator
 
+Asynchronous correction (CRAG_ASYNC_CORRECTION=true): LOW and VERY_LOW
+results return the provisional answer immediately with status CORRECTING;
+self-correction / web search run on a background worker and the final
+result is handed to the caller's on_corrected callback.
+
 Author: AI Analysis System
 Date: 2025-11-02
 """
 
+import os
 import re
+import time
+import uuid
+import zlib
+import hashlib
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Tuple, Optional, Callable
 from datetime import datetime
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# numpy for vectorized MinHash (exact Jaccard without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Import self-correction module (Task 0-ARCH.15)
 try:
     from .self_correction import SelfCorrector
@@ -53,6 +73,91 @@ except ImportError:
     logger.warning("CRAG Metrics not available - metrics will not be tracked")
 
 
+# Words the scorer compares (same pattern as the original per-call regex scans)
+_TERM_PATTERN = re.compile(r'\b\w{4,}\b')
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Background corrections remembered for get_correction() (oldest finished dropped)
+MAX_TRACKED_CORRECTIONS = 1000
+
+# MinHash: prime modulus above 2^32 (crc32 range); multipliers < 2^31 keep
+# a * x + b inside uint64
+_MINHASH_PRIME = 4294967311
+
+
+class DocumentFeatures:
+    """
+    Token data of one retrieved document, computed once and shared by every
+    verification (and self-correction re-score) that sees the same text.
+
+    Attributes:
+        tokens: Set of lowercased word-character runs (grounding)
+        terms: Tokens with 4+ characters (consistency)
+    """
+
+    __slots__ = ('tokens', 'terms', '_by_length', '_signatures')
+
+    def __init__(self, text: str):
+        self.tokens = frozenset(_TOKEN_PATTERN.findall(text.lower()))
+        self.terms = frozenset(token for token in self.tokens if len(token) >= 4)
+        self._by_length: Optional[Dict[int, str]] = None
+        self._signatures: Dict[int, Any] = {}
+
+    def contains(self, term: str) -> bool:
+        """
+        Whether a term (a run of word characters) occurs anywhere in the text.
+
+        Such a term can only occur inside a single token, so this is a set
+        lookup for whole-word matches and otherwise a substring scan of the
+        unique tokens longer than the term.
+        """
+        if term in self.tokens:
+            return True
+
+        if self._by_length is None:
+            groups: Dict[int, List[str]] = {}
+            for token in self.tokens:
+                groups.setdefault(len(token), []).append(token)
+            self._by_length = {length: ' '.join(group) for length, group in groups.items()}
+
+        length = len(term)
+        return any(term in joined for token_length, joined in self._by_length.items() if token_length > length)
+
+    def signature(self, hash_params) -> Any:
+        """MinHash signature of the term set (cached per permutation set)"""
+        key = id(hash_params)
+        signature = self._signatures.get(key)
+        if signature is None:
+            a, b = hash_params
+            hashes = np.fromiter((zlib.crc32(term.encode('utf-8')) for term in self.terms),
+                                 dtype=np.uint64, count=len(self.terms))
+            signature = ((np.outer(hashes, a) + b) % _MINHASH_PRIME).min(axis=0)
+            self._signatures[key] = signature
+        return signature
+
+
+class TermMatcher:
+    """
+    Grounding matcher: does a term occur in any of the retrieved documents?
+
+    Equivalent to a substring test against the concatenated document text,
+    answered from per-document token sets and memoized for the terms of all
+    answer sentences.
+    """
+
+    def __init__(self, features: List[DocumentFeatures]):
+        self.features = features
+        self._memo: Dict[str, bool] = {}
+
+    def contains(self, term: str) -> bool:
+        found = self._memo.get(term)
+        if found is None:
+            found = any(term in f.tokens for f in self.features) or \
+                any(f.contains(term) for f in self.features)
+            self._memo[term] = found
+        return found
+
+
 class ConfidenceScorer:
     """
     Multi-dimensional confidence scorer for CRAG verification
@@ -65,7 +170,33 @@ class ConfidenceScorer:
     5. Classification Confidence (weight: 0.15) - ReAct's confidence
     """
 
-    def __init__(self):
+    def __init__(self,
+                 feature_cache_size: int = 2048,
+                 minhash_permutations: int = 128,
+                 minhash_min_docs: int = 32):
+        """
+        Args:
+            feature_cache_size: Documents whose token data is kept (LRU by text)
+            minhash_permutations: MinHash signature length (Jaccard error
+                ~ 1/sqrt(permutations) per document pair)
+            minhash_min_docs: Document count from which consistency uses
+                MinHash-estimated Jaccard (pairwise exact set comparisons grow
+                quadratically; below this count they are cheaper than hashing)
+        """
+        # Per-document token sets, reused across verifications
+        self.feature_cache_size = feature_cache_size
+        self._feature_cache: "OrderedDict[str, DocumentFeatures]" = OrderedDict()
+        self._feature_lock = threading.Lock()
+
+        self.minhash_min_docs = minhash_min_docs
+        self._minhash_params = None
+        if NUMPY_AVAILABLE:
+            rng = np.random.default_rng(1)
+            self._minhash_params = (
+                rng.integers(1, 2 ** 31, size=minhash_permutations, dtype=np.uint64),
+                rng.integers(0, _MINHASH_PRIME, size=minhash_permutations, dtype=np.uint64)
+            )
+
         # Default weights (tunable per error category)
         self.weights = {
             'relevance': 0.25,
@@ -85,6 +216,25 @@ class ConfidenceScorer:
             'UNKNOWN': ['root_cause', 'fix_steps']
         }
 
+    def get_features(self, text: str) -> DocumentFeatures:
+        """Token data for a document text (cached by text)"""
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest() if len(text) > 256 else text
+        with self._feature_lock:
+            features = self._feature_cache.get(key)
+            if features is not None:
+                self._feature_cache.move_to_end(key)
+                return features
+
+        features = DocumentFeatures(text)
+        with self._feature_lock:
+            self._feature_cache[key] = features
+            while len(self._feature_cache) > self.feature_cache_size:
+                self._feature_cache.popitem(last=False)
+        return features
+
+    def _doc_features(self, retrieved_docs: List[Dict]) -> List[DocumentFeatures]:
+        return [self.get_features(doc.get('text', '')) for doc in retrieved_docs]
+
     def calculate_relevance_score(self, retrieved_docs: List[Dict]) -> float:
         """
         Calculate relevance score based on document similarity scores
@@ -115,13 +265,18 @@ class ConfidenceScorer:
         return min(1.0, max(0.0, relevance))  # Clamp to [0, 1]
 
     def calculate_consistency_score(self, retrieved_docs: List[Dict],
-                                   generated_answer: str) -> float:
+                                   generated_answer: str,
+                                   features: Optional[List[DocumentFeatures]] = None) -> float:
         """
         Calculate consistency score - do retrieved documents agree?
 
+        Mean pairwise Jaccard similarity of the documents' term sets; exact
+        below minhash_min_docs documents, MinHash-estimated from there on.
+
         Args:
             retrieved_docs: List of retrieved documents
             generated_answer: The generated answer text
+            features: Precomputed document features (see get_features)
 
         Returns:
             float: Consistency score (0.0-1.0)
@@ -130,44 +285,45 @@ class ConfidenceScorer:
             # Only one doc - assume consistent (1.0)
             return 1.0
 
-        # Extract key terms from documents
-        doc_texts = [doc.get('text', '') for doc in retrieved_docs]
-
-        # Simple heuristic: Check for common keywords across documents
-        # More sophisticated: Use embedding similarity between docs
-        all_terms = []
-        for text in doc_texts:
-            # Extract important terms (simple word extraction)
-            terms = set(re.findall(r'\b\w{4,}\b', text.lower()))
-            all_terms.append(terms)
-
-        if not all_terms:
-            return 0.5  # Neutral - can't determine
-
-        # Calculate pairwise overlap
-        overlaps = []
-        for i in range(len(all_terms)):
-            for j in range(i + 1, len(all_terms)):
-                if all_terms[i] and all_terms[j]:
-                    overlap = len(all_terms[i] & all_terms[j]) / len(all_terms[i] | all_terms[j])
-                    overlaps.append(overlap)
-
-        if not overlaps:
+        # Extract key terms from documents (once per document text)
+        features = features or self._doc_features(retrieved_docs)
+        non_empty = [f for f in features if f.terms]
+
+        if len(non_empty) < 2:
             return 0.5
 
-        consistency = sum(overlaps) / len(overlaps)
+        pairs = len(non_empty) * (len(non_empty) - 1) // 2
 
-        logger.debug(f"Consistency score: {consistency:.3f} from {len(overlaps)} pairs")
+        if self._minhash_params is not None and len(non_empty) >= self.minhash_min_docs:
+            # Estimated Jaccard: fraction of equal MinHash positions, all pairs at once
+            signatures = np.stack([f.signature(self._minhash_params) for f in non_empty])
+            agreement = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+            consistency = float(agreement[np.triu_indices(len(non_empty), k=1)].mean())
+        else:
+            overlaps = []
+            for i in range(len(non_empty)):
+                for j in range(i + 1, len(non_empty)):
+                    a, b = non_empty[i].terms, non_empty[j].terms
+                    intersection = len(a & b)
+                    overlaps.append(intersection / (len(a) + len(b) - intersection))
+            consistency = sum(overlaps) / len(overlaps)
+
+        logger.debug(f"Consistency score: {consistency:.3f} from {pairs} pairs")
         return min(1.0, max(0.0, consistency))
 
     def calculate_grounding_score(self, generated_answer: str,
-                                  retrieved_docs: List[Dict]) -> float:
+                                  retrieved_docs: List[Dict],
+                                  features: Optional[List[DocumentFeatures]] = None) -> float:
         """
         Calculate grounding score - is answer supported by retrieved docs?
 
+        A sentence is grounded when more than half of its terms occur in the
+        documents (substring match, via TermMatcher set lookups).
+
         Args:
             generated_answer: The generated answer text
             retrieved_docs: List of retrieved documents
+            features: Precomputed document features (see get_features)
 
         Returns:
             float: Grounding score (0.0-1.0)
@@ -185,18 +341,18 @@ class ConfidenceScorer:
         if not answer_sentences:
             return 0.5  # Short answer, hard to verify
 
-        # Combine all retrieved doc text
-        all_doc_text = ' '.join([doc.get('text', '') for doc in retrieved_docs]).lower()
+        # Term matcher over all retrieved docs (token sets built once per text)
+        matcher = TermMatcher(features or self._doc_features(retrieved_docs))
 
         # Check how many answer sentences have support in docs
         grounded_count = 0
         for sentence in answer_sentences:
             # Extract key terms from sentence
-            key_terms = set(re.findall(r'\b\w{4,}\b', sentence.lower()))
+            key_terms = set(_TERM_PATTERN.findall(sentence.lower()))
 
             # Check if significant terms appear in documents
             if key_terms:
-                matched_terms = sum(1 for term in key_terms if term in all_doc_text)
+                matched_terms = sum(1 for term in key_terms if matcher.contains(term))
                 # If >50% of terms found in docs, consider grounded
                 if matched_terms / len(key_terms) > 0.5:
                     grounded_count += 1
@@ -285,10 +441,13 @@ class ConfidenceScorer:
         error_category = react_result.get('error_category', 'UNKNOWN')
         classification_conf = react_result.get('classification_confidence', 0.5)
 
+        # Document token data shared by the consistency and grounding checks
+        features = self._doc_features(retrieved_docs)
+
         # Calculate individual scores
         relevance = self.calculate_relevance_score(retrieved_docs)
-        consistency = self.calculate_consistency_score(retrieved_docs, answer)
-        grounding = self.calculate_grounding_score(answer, retrieved_docs)
+        consistency = self.calculate_consistency_score(retrieved_docs, answer, features)
+        grounding = self.calculate_grounding_score(answer, retrieved_docs, features)
         completeness = self.calculate_completeness_score(react_result, error_category)
 
         # Weighted average
@@ -328,6 +487,9 @@ class CRAGVerifier:
     - MEDIUM (0.65-0.85): Queue for HITL
     - LOW (0.40-0.65): Attempt self-correction
     - VERY_LOW (<0.40): Web search fallback
+
+    With async_correction, LOW and VERY_LOW return a provisional CORRECTING
+    result and the correction tier runs on a background worker.
     """
 
     # Threshold constants
@@ -335,13 +497,31 @@ class CRAGVerifier:
     THRESHOLD_MEDIUM = 0.65
     THRESHOLD_LOW = 0.40
 
-    def __init__(self):
+    def __init__(self, async_correction: Optional[bool] = None,
+                 correction_workers: Optional[int] = None):
+        """
+        Initialize the verifier
+
+        Args:
+            async_correction: Run correction tiers in the background
+                (default: CRAG_ASYNC_CORRECTION env, false)
+            correction_workers: Background correction threads
+                (default: CRAG_CORRECTION_WORKERS env, 4)
+        """
         self.confidence_scorer = ConfidenceScorer()
 
+        if async_correction is None:
+            async_correction = os.getenv('CRAG_ASYNC_CORRECTION', 'false').lower() == 'true'
+        self.async_correction = async_correction
+        self.correction_workers = correction_workers or int(os.getenv('CRAG_CORRECTION_WORKERS', '4'))
+        self._correction_executor: Optional[ThreadPoolExecutor] = None
+        self._corrections: OrderedDict = OrderedDict()
+        self._corrections_lock = threading.Lock()
+
         # Task 0-ARCH.15: Self-correction module
         if SELF_CORRECTION_AVAILABLE:
             try:
-                self.self_corrector = SelfCorrector()
+                self.self_corrector = SelfCorrector(concurrent_corrections=self.correction_workers)
                 logger.info("✓ SelfCorrector initialized (query expansion + re-retrieval)")
             except Exception as e:
                 logger.error(f"✗ SelfCorrector initialization failed: {e}")
@@ -371,10 +551,11 @@ class CRAGVerifier:
         else:
             self.web_searcher = None
 
-        logger.info("CRAGVerifier initialized")
+        logger.info(f"CRAGVerifier initialized (async correction: {self.async_correction})")
 
     def verify(self, react_result: Dict, retrieved_docs: List[Dict],
-              failure_data: Dict) -> Dict[str, Any]:
+              failure_data: Dict,
+              on_corrected: Optional[Callable[[Dict], None]] = None) -> Dict[str, Any]:
         """
         Main verification method - verifies ReAct agent output
 
@@ -382,10 +563,12 @@ class CRAGVerifier:
             react_result: ReAct agent result dictionary
             retrieved_docs: List of retrieved documents from Pinecone
             failure_data: Original failure data context
+            on_corrected: Called from the background worker with the final
+                result of an asynchronous correction (async_correction only)
 
         Returns:
             dict: {
-                'status': 'PASS' | 'HITL' | 'CORRECTED' | 'WEB_SEARCH',
+                'status': 'PASS' | 'HITL' | 'CORRECTED' | 'WEB_SEARCH' | 'CORRECTING',
                 'answer': verified_answer,
                 'confidence': float,
                 'confidence_level': 'HIGH' | 'MEDIUM' | 'LOW' | 'VERY_LOW',
@@ -405,13 +588,21 @@ class CRAGVerifier:
         elif confidence >= self.THRESHOLD_MEDIUM:
             result = self._queue_hitl(react_result, confidence, scores, failure_data)
 
+        elif self.async_correction:
+            # Metrics are recorded when the background correction finishes
+            return self._schedule_correction(react_result, confidence, scores, failure_data, on_corrected)
+
         elif confidence >= self.THRESHOLD_LOW:
             result = self._self_correct(react_result, confidence, scores, failure_data)
 
         else:
             result = self._web_search(react_result, confidence, scores, failure_data)
 
-        # Task 0-ARCH.19: Record metrics
+        self._record_verification_metrics(result)
+        return result
+
+    def _record_verification_metrics(self, result: Dict):
+        """Task 0-ARCH.19: Record metrics"""
         if METRICS_AVAILABLE:
             try:
                 metrics = get_metrics()
@@ -419,8 +610,145 @@ class CRAGVerifier:
             except Exception as e:
                 logger.warning(f"Failed to record metrics: {e}")
 
+    def _schedule_correction(self, react_result: Dict, confidence: float, scores: Dict,
+                             failure_data: Dict,
+                             on_corrected: Optional[Callable[[Dict], None]]) -> Dict[str, Any]:
+        """
+        LOW / VERY_LOW confidence with async_correction - return the
+        provisional answer now, run the correction tier in the background
+        """
+        if confidence >= self.THRESHOLD_LOW:
+            confidence_level, tier = 'LOW', 'self_correction'
+        else:
+            confidence_level, tier = 'VERY_LOW', 'web_search'
+
+        correction_id = uuid.uuid4().hex
+        logger.info(f"[CRAG] ⏳ {confidence_level} confidence ({confidence:.3f}) - "
+                    f"{tier} scheduled in background ({correction_id[:8]})")
+
+        with self._corrections_lock:
+            if self._correction_executor is None:
+                self._correction_executor = ThreadPoolExecutor(
+                    max_workers=self.correction_workers, thread_name_prefix='crag-correction'
+                )
+            self._corrections[correction_id] = {
+                'correction_id': correction_id,
+                'status': 'CORRECTING',
+                'tier': tier,
+                'build_id': failure_data.get('build_id', 'unknown'),
+                'scheduled_at': datetime.now().isoformat(),
+                'result': None
+            }
+            self._corrections[correction_id]['future'] = self._correction_executor.submit(
+                self._run_correction, correction_id, tier, react_result, confidence,
+                scores, failure_data, on_corrected
+            )
+            self._prune_corrections()
+
+        return {
+            'status': 'CORRECTING',
+            'confidence_level': confidence_level,
+            'answer': react_result,  # Provisional answer
+            'confidence': confidence,
+            'action_taken': 'correction_scheduled',
+            'verification_metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'correction_id': correction_id,
+                'correction_tier': tier,
+                'confidence_scores': scores,
+                'reasoning': f'{confidence_level} confidence ({confidence:.3f}) - {tier} running in background'
+            }
+        }
+
+    def _run_correction(self, correction_id: str, tier: str, react_result: Dict, confidence: float,
+                        scores: Dict, failure_data: Dict,
+                        on_corrected: Optional[Callable[[Dict], None]]) -> Dict[str, Any]:
+        """Background worker: run one correction tier and publish its result"""
+        start = time.perf_counter()
+        try:
+            if tier == 'self_correction':
+                result = self._self_correct(react_result, confidence, scores, failure_data)
+            else:
+                result = self._web_search(react_result, confidence, scores, failure_data)
+        except Exception as e:
+            # Still low - hand it to a human
+            logger.error(f"[CRAG] Background {tier} failed ({correction_id[:8]}): {e}")
+            result = self._queue_hitl(react_result, confidence, scores, failure_data)
+            result['verification_metadata']['priority'] = 'high'
+            result['verification_metadata']['reason'] = f'{tier}_error'
+            result['verification_metadata']['error'] = str(e)
+
+        correction_ms = round((time.perf_counter() - start) * 1000, 1)
+        result['verification_metadata']['correction_id'] = correction_id
+        result['verification_metadata']['correction_tier'] = tier
+        result['verification_metadata']['correction_ms'] = correction_ms
+        logger.info(f"[CRAG] ✓ Background {tier} finished ({correction_id[:8]}): "
+                    f"{result['status']} in {correction_ms:.0f}ms")
+
+        self._record_verification_metrics(result)
+
+        with self._corrections_lock:
+            entry = self._corrections.get(correction_id)
+            if entry is not None:
+                entry.update(status=result['status'], result=result,
+                             completed_at=datetime.now().isoformat())
+
+        if on_corrected:
+            try:
+                on_corrected(result)
+            except Exception as e:
+                logger.error(f"[CRAG] Failed to publish correction {correction_id[:8]}: {e}")
+
         return result
 
+    def _prune_corrections(self):
+        """Drop the oldest finished corrections beyond MAX_TRACKED_CORRECTIONS (lock held)"""
+        excess = len(self._corrections) - MAX_TRACKED_CORRECTIONS
+        if excess <= 0:
+            return
+        finished = [cid for cid, entry in self._corrections.items() if entry['status'] != 'CORRECTING']
+        for correction_id in finished[:excess]:
+            del self._corrections[correction_id]
+
+    def get_correction(self, correction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the state of a background correction
+
+        Returns:
+            dict with status ('CORRECTING' while running, then the final
+            verification status), tier, build_id and the final result; None
+            if unknown
+        """
+        with self._corrections_lock:
+            entry = self._corrections.get(correction_id)
+            if entry is None:
+                return None
+            return {key: value for key, value in entry.items() if key != 'future'}
+
+    def pending_corrections(self) -> int:
+        """Number of background corrections still running"""
+        with self._corrections_lock:
+            return sum(1 for entry in self._corrections.values() if entry['status'] == 'CORRECTING')
+
+    def wait_for_corrections(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for all background corrections scheduled so far
+
+        Returns:
+            True if all finished within the timeout
+        """
+        with self._corrections_lock:
+            futures = [entry['future'] for entry in self._corrections.values() if entry['status'] == 'CORRECTING']
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def shutdown(self, wait_for_pending: bool = True):
+        """Stop the background correction worker"""
+        with self._corrections_lock:
+            executor, self._correction_executor = self._correction_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait_for_pending)
+
     def _pass_through(self, react_result: Dict, confidence: float,
                      scores: Dict, failure_data: Dict) -> Dict[str, Any]:
         """
@@ -554,6 +882,7 @@ class CRAGVerifier:
                         'original_confidence': confidence,
                         'new_confidence': correction_result['new_confidence'],
                         'correction_method': correction_result.get('method', 'query_expansion'),
+                        'correction_timing': correction_result.get('timing', {}),
                         'confidence_scores': scores
                     }
                 }
@@ -674,7 +1003,12 @@ class CRAGVerifier:
         if METRICS_AVAILABLE:
             try:
                 metrics = get_metrics()
-                return metrics.get_statistics()
+                statistics = metrics.get_statistics()
+                statistics['async_correction'] = {
+                    'enabled': self.async_correction,
+                    'pending': self.pending_corrections()
+                }
+                return statistics
             except Exception as e:
                 logger.error(f"Failed to get metrics: {e}")
                 return {'error': str(e)}
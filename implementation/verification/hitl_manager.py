@@ -7,31 +7,153 @@ Features:
 1. PostgreSQL-based queue (hitl_queue table)
 2. Priority-based queueing (high/medium/low)
 3. SLA tracking (target: <2 hours)
-4. Notification integration (Teams/Slack stubs)
+4. Notifications (Teams/Slack webhooks) delivered in the background,
+   coalesced per build/category into digests (notification_dispatcher)
 5. Review workflow (pending → in_review → approved/rejected)
+6. Concurrent reviewers: claim(reviewer, n) locks items with
+   FOR UPDATE SKIP LOCKED and leases them; expired leases return to pending
+7. Keyset (cursor) pagination over a covering index for queue listings
 
 Author: AI Analysis System
 Date: 2025-11-02
 """
 
+import base64
+import glob
+import heapq
 import logging
 import os
 import json
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: journals of exited processes are not adopted
+    FCNTL_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # PostgreSQL connection
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor, Json
+    from psycopg2.extras import RealDictCursor, Json, execute_values
     PSYCOPG2_AVAILABLE = True
 except ImportError:
     PSYCOPG2_AVAILABLE = False
     logger.warning("psycopg2 not available - HITL queue will be in-memory only")
 
+# Shared connection pool (implementation/connection_pool.py)
+try:
+    from connection_pool import get_postgres_pool, postgres_connection
+    CONNECTION_POOL_AVAILABLE = True
+except ImportError:
+    CONNECTION_POOL_AVAILABLE = False
+
+# Background notification delivery (implementation/notification_dispatcher.py)
+try:
+    from notification_dispatcher import NotificationDispatcher
+    NOTIFICATION_DISPATCHER_AVAILABLE = True
+except ImportError:
+    NOTIFICATION_DISPATCHER_AVAILABLE = False
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+
+# Queue order: priority rank, then age (stored as hitl_queue.priority_rank)
+PRIORITY_RANKS = {'high': 1, 'medium': 2, 'low': 3}
+UNKNOWN_PRIORITY_RANK = 4
+
+# Columns of the queue listing (all in the covering index)
+LIST_COLUMNS = (
+    "id, failure_id, build_id, error_category, confidence, priority, "
+    "priority_rank, created_at, sla_deadline"
+)
+
+# Columns of a full queue item (claim / get_pending_items)
+ITEM_COLUMNS = (
+    "id, failure_id, build_id, error_category, error_message, react_result, "
+    "confidence, confidence_scores, concerns, priority, priority_rank, status, "
+    "created_at, sla_deadline, reviewer, assigned_at, lease_expires_at"
+)
+
+
+# Notification channels and the environment variables holding their webhooks
+NOTIFICATION_WEBHOOKS = {
+    'teams': 'TEAMS_WEBHOOK_URL',
+    'slack': 'SLACK_WEBHOOK_URL'
+}
+
+# Journal of the in-memory fallback queue (HITL_JOURNAL_PATH, empty = off).
+# Each process writes its own <name>.<pid>.jsonl next to it.
+DEFAULT_JOURNAL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'hitl_journal.jsonl'
+)
+
+
+def process_journal_path(journal_path: str) -> str:
+    """This process's journal for a HITL_JOURNAL_PATH (<name>.<pid>.jsonl)"""
+    root, ext = os.path.splitext(journal_path)
+    return f"{root}.{os.getpid()}{ext or '.jsonl'}"
+
+
+def _lock_journal(journal_path: str):
+    """
+    Exclusive lock on a journal, held while the returned file is open
+
+    The lock is released when its process exits, so a journal that can be
+    locked is not written by any running process.
+
+    Returns:
+        Open lock file, or None if another process holds the lock
+    """
+    if not FCNTL_AVAILABLE:
+        return None
+    lock_file = open(journal_path + '.lock', 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+
+def priority_rank(priority: Optional[str]) -> int:
+    """Sort rank of a priority (1 = reviewed first)"""
+    return PRIORITY_RANKS.get(priority, UNKNOWN_PRIORITY_RANK)
+
+
+def encode_cursor(item: Dict) -> str:
+    """Opaque keyset cursor after a listed item: (priority_rank, created_at, id)"""
+    created_at = item['created_at']
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([item['priority_rank'], created_at, item['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str, int]:
+    """
+    Decode a cursor from encode_cursor()
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        rank, created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(rank), str(created_at), int(item_id)
+    except Exception as e:
+        raise ValueError(f"Invalid HITL queue cursor: {cursor!r}") from e
+
 
 class HITLPriority(Enum):
     """Priority levels for HITL queue"""
@@ -49,6 +171,333 @@ class HITLStatus(Enum):
     CORRECTED = "corrected"       # Corrected after rejection
 
 
+class HITLMemoryQueue:
+    """
+    In-memory HITL queue used while PostgreSQL is unavailable
+
+    - failure_id → item map: O(1) lookup for approve/reject
+    - one heap per priority rank of (created_at, id, seq, failure_id):
+      O(log n) enqueue and claim; entries of items that were claimed,
+      reviewed or re-queued stay in the heap and are skipped when they
+      reach the top (lazy deletion, seq identifies the live entry)
+    - lease heap of (lease_expires_at, seq, failure_id) for claim expiry
+    - optional append-only JSON-lines journal, replayed on startup so the
+      queue survives restarts; HITLManager drains it into PostgreSQL once
+      the database is reachable again. Every process has its own journal
+      (for_process()), locked while the process runs; journals of exited
+      processes are adopted by the next one that starts
+
+    Thread-safe.
+    """
+
+    # Rewrite the journal once it holds this many records per live item
+    COMPACT_RATIO = 4
+    COMPACT_MIN_RECORDS = 1000
+
+    def __init__(self, journal_path: Optional[str] = None):
+        """
+        Args:
+            journal_path: Journal file (None = not persisted)
+        """
+        self.journal_path = journal_path
+        self._lock = threading.RLock()
+        self._items: Dict[str, Dict] = {}
+        self._heaps: Dict[int, List[Tuple]] = {}
+        self._leases: List[Tuple] = []
+        self._live_seq: Dict[str, int] = {}
+        self._seq = 0
+        self._next_id = 1
+        self._journal = None
+        self._journal_records = 0
+        self._journal_lock = None
+
+        if journal_path:
+            self._journal_lock = _lock_journal(journal_path)
+            self._replay(journal_path)
+            self._journal = open(journal_path, 'a', encoding='utf-8')
+
+    @classmethod
+    def for_process(cls, journal_path: str) -> 'HITLMemoryQueue':
+        """
+        Queue journaled in this process's file for journal_path, holding the
+        items of journals left by processes that exited
+        """
+        queue = cls(process_journal_path(journal_path))
+        root, ext = os.path.splitext(journal_path)
+        queue.adopt([journal_path] + sorted(glob.glob(f"{glob.escape(root)}.*{ext or '.jsonl'}")))
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # ------------------------------------------------------------------
+    # Queue operations
+    # ------------------------------------------------------------------
+
+    def put(self, item: Dict) -> Dict:
+        """
+        Queue an item; an item with the same failure_id is updated like the
+        PostgreSQL upsert (scores and priority, status unchanged)
+
+        Returns:
+            dict: Stored item (with id)
+        """
+        with self._lock:
+            existing = self._items.get(item['failure_id'])
+            if existing is not None:
+                fields = {key: item[key] for key in ('confidence', 'confidence_scores', 'concerns', 'priority')}
+                fields['priority_rank'] = priority_rank(item['priority'])
+                return self.update(item['failure_id'], **fields)
+
+            item['id'] = self._next_id
+            self._apply_put(item)
+            self._write({'op': 'put', 'item': item})
+            return item
+
+    def get(self, failure_id: str) -> Optional[Dict]:
+        with self._lock:
+            item = self._items.get(failure_id)
+            return dict(item) if item is not None else None
+
+    def update(self, failure_id: str, **fields) -> Optional[Dict]:
+        """Change item fields (re-indexed when status/priority/lease change)"""
+        with self._lock:
+            if failure_id not in self._items:
+                return None
+            item = self._apply_set(failure_id, fields)
+            self._write({'op': 'set', 'failure_id': failure_id, 'fields': fields})
+            return item
+
+    def pending(self, priority: Optional[str] = None, after: Optional[Tuple] = None,
+                limit: Optional[int] = None) -> List[Dict]:
+        """
+        Pending items in queue order, optionally after a keyset position
+
+        Returns:
+            list: Item copies
+        """
+        with self._lock:
+            self._expire_leases()
+            ranks = [priority_rank(priority)] if priority else sorted(self._heaps)
+            keys = [
+                (rank, created_at, item_id, failure_id)
+                for rank in ranks
+                for created_at, item_id, seq, failure_id in self._heaps.get(rank, [])
+                if self._live_seq.get(failure_id) == seq and self._items[failure_id]['status'] == 'pending'
+                and (after is None or (rank, created_at, item_id) > after)
+            ]
+            keys = heapq.nsmallest(limit, keys) if limit is not None else sorted(keys)
+            return [dict(self._items[key[3]]) for key in keys]
+
+    def claim(self, reviewer: str, n: int, priority: Optional[str], lease_minutes: int) -> List[Dict]:
+        """Pop up to n pending items (highest priority, oldest first) and lease them"""
+        with self._lock:
+            self._expire_leases()
+            lease_expires_at = (datetime.now() + timedelta(minutes=lease_minutes)).isoformat()
+            claimed = []
+            while len(claimed) < n:
+                failure_id = self._pop_pending(priority)
+                if failure_id is None:
+                    break
+                claimed.append(self.update(
+                    failure_id,
+                    status=HITLStatus.IN_REVIEW.value,
+                    reviewer=reviewer,
+                    assigned_at=datetime.now().isoformat(),
+                    lease_expires_at=lease_expires_at
+                ))
+            return [dict(item) for item in claimed]
+
+    def claimed_by(self, failure_id: str, reviewer: str, include_expired: bool = False) -> bool:
+        """Whether the reviewer holds a (live) claim on the item"""
+        with self._lock:
+            item = self._items.get(failure_id)
+            if (item is None or item['status'] != HITLStatus.IN_REVIEW.value
+                    or item.get('reviewer') != reviewer):
+                return False
+            return include_expired or (item.get('lease_expires_at') or '') > datetime.now().isoformat()
+
+    def unclaim(self, failure_id: str):
+        self.update(failure_id, status=HITLStatus.PENDING.value, reviewer=None,
+                    assigned_at=None, lease_expires_at=None)
+
+    def items(self) -> List[Dict]:
+        """Copies of all items (any status)"""
+        with self._lock:
+            return [dict(item) for item in self._items.values()]
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            self._expire_leases()
+            counts: Dict[str, int] = {}
+            for item in self._items.values():
+                counts[item['status']] = counts.get(item['status'], 0) + 1
+            return counts
+
+    def remove(self, failure_ids: List[str]):
+        """Drop items (after they were written to PostgreSQL)"""
+        with self._lock:
+            for failure_id in failure_ids:
+                self._items.pop(failure_id, None)
+                self._live_seq.pop(failure_id, None)
+            if not self._items:
+                self._heaps.clear()
+                self._leases.clear()
+            self._compact()
+
+    def drain(self, write) -> int:
+        """
+        Hand all items to write(items) and drop them once it returns
+
+        The queue is locked throughout, so changes made meanwhile (a new
+        item, a review) wait and are not dropped with the written snapshot.
+        If write raises, the items stay queued.
+
+        Returns:
+            int: Number of items written
+        """
+        with self._lock:
+            items = [dict(item) for item in self._items.values()]
+            if items:
+                write(items)
+                self.remove([item['failure_id'] for item in items])
+            return len(items)
+
+    def adopt(self, journal_paths: List[str]) -> int:
+        """
+        Take over the items of journals no running process holds
+
+        Adopted items are written to this queue's journal before the
+        adopted files are removed.
+
+        Returns:
+            int: Number of journals adopted
+        """
+        adopted = []
+        with self._lock:
+            for path in journal_paths:
+                if path == self.journal_path or not os.path.exists(path):
+                    continue
+                lock_file = _lock_journal(path)
+                if lock_file is None:
+                    continue  # Written by a running process
+                self._replay(path)
+                adopted.append((path, lock_file))
+
+            if adopted:
+                self._compact()
+            for path, lock_file in adopted:
+                for name in (path, path + '.lock'):
+                    try:
+                        os.remove(name)
+                    except OSError:
+                        pass
+                lock_file.close()
+        return len(adopted)
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self._journal_lock is not None:
+                self._journal_lock.close()
+                self._journal_lock = None
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _apply_put(self, item: Dict):
+        self._items[item['failure_id']] = item
+        self._next_id = max(self._next_id, item['id'] + 1)
+        self._index(item)
+
+    def _apply_set(self, failure_id: str, fields: Dict) -> Dict:
+        item = self._items[failure_id]
+        item.update(fields)
+        if {'status', 'priority_rank', 'lease_expires_at'} & fields.keys():
+            self._index(item)
+        return item
+
+    def _index(self, item: Dict):
+        """Push the item's current heap entry; older entries become stale"""
+        self._seq += 1
+        failure_id = item['failure_id']
+        self._live_seq[failure_id] = self._seq
+        if item['status'] == HITLStatus.PENDING.value:
+            heapq.heappush(self._heaps.setdefault(item['priority_rank'], []),
+                           (item['created_at'], item['id'], self._seq, failure_id))
+        elif item['status'] == HITLStatus.IN_REVIEW.value and item.get('lease_expires_at'):
+            heapq.heappush(self._leases, (item['lease_expires_at'], self._seq, failure_id))
+
+    def _pop_pending(self, priority: Optional[str]) -> Optional[str]:
+        """Remove and return the next live pending failure_id"""
+        for rank in ([priority_rank(priority)] if priority else sorted(self._heaps)):
+            heap = self._heaps.get(rank, [])
+            while heap:
+                _, _, seq, failure_id = heapq.heappop(heap)
+                if self._live_seq.get(failure_id) == seq and self._items[failure_id]['status'] == 'pending':
+                    return failure_id
+        return None
+
+    def _expire_leases(self):
+        """Return claims whose lease expired to the queue"""
+        now = datetime.now().isoformat()
+        while self._leases and self._leases[0][0] < now:
+            _, seq, failure_id = heapq.heappop(self._leases)
+            item = self._items.get(failure_id)
+            if (self._live_seq.get(failure_id) == seq and item is not None
+                    and item['status'] == HITLStatus.IN_REVIEW.value):
+                self.unclaim(failure_id)
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def _write(self, record: Dict):
+        """Append an applied change to the journal"""
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(record, default=str) + '\n')
+        self._journal.flush()
+        self._journal_records += 1
+        if self._journal_records > max(self.COMPACT_MIN_RECORDS, self.COMPACT_RATIO * len(self._items)):
+            self._compact()
+
+    def _replay(self, journal_path: str):
+        """Rebuild the queue from a journal (a torn last line is ignored)"""
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("[HITL] Ignoring corrupt journal record")
+                    continue
+                if record['op'] == 'put':
+                    self._apply_put(record['item'])
+                elif record['failure_id'] in self._items:
+                    self._apply_set(record['failure_id'], record['fields'])
+                self._journal_records += 1
+        logger.info(f"[HITL] Replayed {len(self._items)} item(s) from {journal_path}")
+
+    def _compact(self):
+        """Rewrite the journal as one put record per live item"""
+        if self.journal_path is None:
+            return
+        if self._journal is not None:
+            self._journal.close()
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as journal:
+            for item in self._items.values():
+                journal.write(json.dumps({'op': 'put', 'item': item}, default=str) + '\n')
+        os.replace(temp_path, self.journal_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal_records = len(self._items)
+
+
 class HITLManager:
     """
     Human-in-the-Loop queue manager for CRAG verification
@@ -60,6 +509,12 @@ class HITLManager:
     # SLA targets
     SLA_TARGET_HOURS = 2  # Target: review within 2 hours
 
+    # Claimed items return to the queue if not reviewed within the lease
+    CLAIM_LEASE_MINUTES = 30
+
+    # Seconds between PostgreSQL reconnect attempts in in-memory mode
+    RECONNECT_INTERVAL_SECONDS = 60
+
     # SQL schema for hitl_queue table
     CREATE_TABLE_SQL = """
     CREATE TABLE IF NOT EXISTS hitl_queue (
@@ -79,11 +534,15 @@ class HITLManager:
 
         -- Queue metadata
         priority VARCHAR(10) NOT NULL,  -- high, medium, low
+        priority_rank SMALLINT GENERATED ALWAYS AS (
+            CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 ELSE 4 END
+        ) STORED,
         status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, in_review, approved, rejected, corrected
 
         -- Timestamps
         created_at TIMESTAMP NOT NULL DEFAULT NOW(),
         assigned_at TIMESTAMP,
+        lease_expires_at TIMESTAMP,  -- claim lease (status in_review)
         reviewed_at TIMESTAMP,
 
         -- Review data
@@ -104,49 +563,163 @@ class HITLManager:
         CONSTRAINT unique_failure_id UNIQUE(failure_id)
     );
 
+    -- Tables created before priority_rank / leases existed
+    ALTER TABLE hitl_queue ADD COLUMN IF NOT EXISTS priority_rank SMALLINT GENERATED ALWAYS AS (
+        CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 ELSE 4 END
+    ) STORED;
+    ALTER TABLE hitl_queue ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+
     CREATE INDEX IF NOT EXISTS idx_hitl_status ON hitl_queue(status);
-    CREATE INDEX IF NOT EXISTS idx_hitl_priority ON hitl_queue(priority, created_at);
     CREATE INDEX IF NOT EXISTS idx_hitl_sla ON hitl_queue(sla_deadline) WHERE status = 'pending';
+
+    -- Queue order; INCLUDE covers the listing projection (index-only scans)
+    DROP INDEX IF EXISTS idx_hitl_priority;
+    CREATE INDEX IF NOT EXISTS idx_hitl_pending_order ON hitl_queue(priority_rank, created_at, id)
+        INCLUDE (failure_id, build_id, error_category, confidence, priority, sla_deadline)
+        WHERE status = 'pending';
+    CREATE INDEX IF NOT EXISTS idx_hitl_lease ON hitl_queue(lease_expires_at) WHERE status = 'in_review';
     """
 
-    def __init__(self):
-        """Initialize HITL manager with PostgreSQL connection"""
-        self.postgres_conn = None
-        self.in_memory_queue: List[Dict] = []  # Fallback if PostgreSQL unavailable
+    def __init__(self, postgres_pool=None, lease_minutes: Optional[int] = None,
+                 journal_path: Optional[str] = None, notification_dispatcher=None):
+        """
+        Initialize HITL manager on the shared PostgreSQL connection pool
+
+        Args:
+            postgres_pool: Connection pool (default: connection_pool.get_postgres_pool())
+            lease_minutes: Claim lease (default: HITL_CLAIM_LEASE_MINUTES or 30)
+            journal_path: Journal of the in-memory fallback queue; each
+                process writes <name>.<pid>.jsonl next to it
+                (default: HITL_JOURNAL_PATH or DEFAULT_JOURNAL_PATH, '' = off)
+            notification_dispatcher: Background notification delivery
+                (default: a NotificationDispatcher sending through the webhooks)
+        """
+        self.postgres_pool = None
+        if journal_path is None:
+            journal_path = os.getenv("HITL_JOURNAL_PATH", DEFAULT_JOURNAL_PATH)
+        # Fallback if PostgreSQL unavailable (drained into PostgreSQL on reconnect)
+        self.memory_queue = HITLMemoryQueue.for_process(journal_path) if journal_path else HITLMemoryQueue()
+        self._explicit_pool = postgres_pool
+        self._next_reconnect = 0.0
+        self._reconnect_lock = threading.Lock()
+        self.lease_minutes = lease_minutes or int(
+            os.getenv("HITL_CLAIM_LEASE_MINUTES", self.CLAIM_LEASE_MINUTES)
+        )
 
         # Statistics
         self.total_queued = 0
         self.total_approved = 0
         self.total_rejected = 0
 
-        # Initialize PostgreSQL connection
-        if PSYCOPG2_AVAILABLE:
-            self._initialize_postgres()
+        # Notifications are sent off the queue() path (synchronously without a dispatcher)
+        self.notifications = notification_dispatcher
+        if self.notifications is None and NOTIFICATION_DISPATCHER_AVAILABLE:
+            self.notifications = NotificationDispatcher(self._deliver_notifications, name="HITL")
+
+        # Initialize PostgreSQL connection pool
+        if postgres_pool is not None or (PSYCOPG2_AVAILABLE and CONNECTION_POOL_AVAILABLE):
+            self._connect()
+            self._next_reconnect = time.monotonic() + self.RECONNECT_INTERVAL_SECONDS
         else:
             logger.warning("[HITL] Running in memory-only mode (no PostgreSQL)")
 
-    def _initialize_postgres(self):
-        """Initialize PostgreSQL connection and create table if needed"""
-        try:
-            self.postgres_conn = psycopg2.connect(
-                host=os.getenv("POSTGRES_HOST", "localhost"),
-                port=os.getenv("POSTGRES_PORT", "5432"),
-                database=os.getenv("POSTGRES_DATABASE", "ddn_ai"),
-                user=os.getenv("POSTGRES_USER", "postgres"),
-                password=os.getenv("POSTGRES_PASSWORD")
-            )
+    def _connect(self):
+        """Set up PostgreSQL and move journaled in-memory items into it"""
+        self._initialize_postgres(self._explicit_pool or get_postgres_pool())
+        if self.postgres_pool and len(self.memory_queue):
+            self._drain_memory_queue()
+
+    def _use_postgres(self) -> bool:
+        """
+        Whether to use PostgreSQL
+
+        While it is down (or in-memory items are waiting to be drained) the
+        connection and drain are retried every RECONNECT_INTERVAL_SECONDS.
+        """
+        if self.postgres_pool and not len(self.memory_queue):
+            return True
+        if not (self.postgres_pool or self._explicit_pool or (PSYCOPG2_AVAILABLE and CONNECTION_POOL_AVAILABLE)):
+            return False
+
+        now = time.monotonic()
+        if now >= self._next_reconnect and self._reconnect_lock.acquire(blocking=False):
+            try:
+                self._next_reconnect = now + self.RECONNECT_INTERVAL_SECONDS
+                if self.postgres_pool:
+                    self._drain_memory_queue()
+                else:
+                    self._connect()
+            finally:
+                self._reconnect_lock.release()
+        return bool(self.postgres_pool)
+
+    def _in_memory(self, failure_id: str) -> bool:
+        """Whether the item is in the in-memory queue (not yet drained)"""
+        return self.memory_queue.get(failure_id) is not None
+
+    def _initialize_postgres(self, pool):
+        """Create the hitl_queue table if needed on the pooled connection"""
+        if pool is None:
+            logger.warning("[HITL] PostgreSQL pool unavailable - falling back to in-memory queue")
+            return
 
-            # Create table if it doesn't exist
-            with self.postgres_conn.cursor() as cursor:
-                cursor.execute(self.CREATE_TABLE_SQL)
-                self.postgres_conn.commit()
+        try:
+            with postgres_connection(pool) as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(self.CREATE_TABLE_SQL)
 
+            self.postgres_pool = pool
             logger.info("[HITL] ✓ PostgreSQL connected, hitl_queue table ready")
 
         except Exception as e:
             logger.error(f"[HITL] ✗ PostgreSQL connection failed: {e}")
             logger.warning("[HITL] Falling back to in-memory queue")
-            self.postgres_conn = None
+            self.postgres_pool = None
+
+    def _drain_memory_queue(self):
+        """Write the in-memory items (with their review state) to PostgreSQL"""
+        try:
+            drained = self.memory_queue.drain(self._insert_items)
+            if drained:
+                logger.info(f"[HITL] ✓ Drained {drained} in-memory item(s) into PostgreSQL")
+
+        except Exception as e:
+            logger.error(f"[HITL] Failed to drain in-memory queue into PostgreSQL: {e}")
+
+    def _insert_items(self, items: List[Dict]):
+        """Upsert queue items, including their review state"""
+        with postgres_connection(self.postgres_pool) as conn, conn.cursor() as cursor:
+            execute_values(cursor, """
+                INSERT INTO hitl_queue (
+                    failure_id, build_id, error_category, error_message,
+                    react_result, confidence, confidence_scores, concerns,
+                    priority, status, created_at, sla_deadline, reviewer, assigned_at,
+                    lease_expires_at, reviewed_at, review_notes, corrected_answer,
+                    feedback_rating, notification_sent
+                ) VALUES %s
+                ON CONFLICT (failure_id) DO UPDATE SET
+                    confidence = EXCLUDED.confidence,
+                    confidence_scores = EXCLUDED.confidence_scores,
+                    concerns = EXCLUDED.concerns,
+                    priority = EXCLUDED.priority,
+                    status = EXCLUDED.status,
+                    reviewer = EXCLUDED.reviewer,
+                    assigned_at = EXCLUDED.assigned_at,
+                    lease_expires_at = EXCLUDED.lease_expires_at,
+                    reviewed_at = EXCLUDED.reviewed_at,
+                    review_notes = EXCLUDED.review_notes,
+                    corrected_answer = EXCLUDED.corrected_answer,
+                    feedback_rating = EXCLUDED.feedback_rating
+            """, [(
+                item['failure_id'], item.get('build_id'), item.get('error_category'),
+                item.get('error_message'), Json(item['react_result']), item['confidence'],
+                Json(item['confidence_scores']), Json(item.get('concerns')), item['priority'],
+                item['status'], item['created_at'], item.get('sla_deadline'), item.get('reviewer'),
+                item.get('assigned_at'), item.get('lease_expires_at'), item.get('reviewed_at'),
+                item.get('review_notes'),
+                Json(item['corrected_answer']) if item.get('corrected_answer') else None,
+                item.get('feedback_rating'), bool(item.get('notification_sent'))
+            ) for item in items])
 
     def queue(self, react_result: Dict, confidence: float, confidence_scores: Dict,
              failure_data: Dict, priority: str = "medium") -> Dict[str, Any]:
@@ -182,6 +755,7 @@ class HITLManager:
             'confidence_scores': confidence_scores,
             'concerns': concerns,
             'priority': priority,
+            'priority_rank': priority_rank(priority),
             'status': HITLStatus.PENDING.value,
             'created_at': datetime.now().isoformat(),
             'sla_deadline': sla_deadline.isoformat(),
@@ -189,11 +763,10 @@ class HITLManager:
         }
 
         # Store in PostgreSQL or in-memory
-        if self.postgres_conn:
+        if self._use_postgres():
             queue_item = self._queue_to_postgres(queue_item)
         else:
-            queue_item['id'] = len(self.in_memory_queue) + 1
-            self.in_memory_queue.append(queue_item)
+            queue_item = self.memory_queue.put(queue_item)
 
         logger.info(f"[HITL] Queued failure {queue_item['failure_id']} "
                    f"(confidence={confidence:.3f}, priority={priority})")
@@ -206,7 +779,8 @@ class HITLManager:
     def _queue_to_postgres(self, item: Dict) -> Dict:
         """Store queue item in PostgreSQL"""
         try:
-            with self.postgres_conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            with postgres_connection(self.postgres_pool) as conn, \
+                    conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute("""
                     INSERT INTO hitl_queue (
                         failure_id, build_id, error_category, error_message,
@@ -231,7 +805,6 @@ class HITLManager:
                 })
 
                 result = cursor.fetchone()
-                self.postgres_conn.commit()
 
                 item['id'] = result['id']
                 item['created_at'] = result['created_at'].isoformat()
@@ -240,10 +813,8 @@ class HITLManager:
 
         except Exception as e:
             logger.error(f"[HITL] Failed to store in PostgreSQL: {e}")
-            self.postgres_conn.rollback()
             # Fallback to in-memory
-            item['id'] = len(self.in_memory_queue) + 1
-            self.in_memory_queue.append(item)
+            item = self.memory_queue.put(item)
 
         return item
 
@@ -260,57 +831,113 @@ class HITLManager:
 
     def _send_notification(self, item: Dict):
         """
-        Send notification about new HITL item
+        Hand a new HITL item to the notification dispatcher (never blocks)
 
-        Currently a stub. In production, would integrate with:
-        - Microsoft Teams webhook
-        - Slack webhook
-        - Email (SMTP)
+        Items of the same build and category queued within the coalescing
+        window are delivered as one digest per channel by
+        _deliver_notifications(), so a failing webhook is retried without
+        posting again to the others.
         """
         # Check if already notified
         if item.get('notification_sent'):
             return
 
+        notification = {field: item.get(field) for field in (
+            'failure_id', 'error_category', 'confidence', 'priority', 'concerns', 'sla_deadline'
+        )}
+
+        for channel in self._notification_channels():
+            key = (item.get('build_id') or item['failure_id'], item['error_category'], channel)
+            if self.notifications is not None:
+                self.notifications.submit(key, notification)
+                continue
+
+            try:
+                self._deliver_notifications(key, [notification])
+            except Exception as e:
+                logger.error(f"[HITL] Failed to send {channel} notification for {item['failure_id']}: {e}")
+
+    @staticmethod
+    def _notification_channels() -> List[str]:
+        """Channels with a configured webhook ('log' when there are none)"""
+        channels = [channel for channel, variable in NOTIFICATION_WEBHOOKS.items() if os.getenv(variable)]
+        return channels if channels and REQUESTS_AVAILABLE else ['log']
+
+    def _format_notification(self, key: Tuple[str, str, str], items: List[Dict]) -> str:
+        """Message for one item, or a digest of several items of one build/category"""
         priority_emoji = {
             'high': '🔴',
             'medium': '🟡',
             'low': '🟢'
         }
 
-        message = (
-            f"{priority_emoji.get(item['priority'], '⚪')} **New HITL Review Request**\n"
-            f"Failure ID: {item['failure_id']}\n"
-            f"Category: {item['error_category']}\n"
-            f"Confidence: {item['confidence']:.2%}\n"
-            f"Priority: {item['priority'].upper()}\n"
-            f"Concerns: {', '.join(item['concerns']) if item['concerns'] else 'None'}\n"
-            f"SLA Deadline: {item['sla_deadline']}\n"
-            f"Review URL: /review/{item['failure_id']}"
-        )
+        if len(items) == 1:
+            item = items[0]
+            return (
+                f"{priority_emoji.get(item['priority'], '⚪')} **New HITL Review Request**\n"
+                f"Failure ID: {item['failure_id']}\n"
+                f"Category: {item['error_category']}\n"
+                f"Confidence: {item['confidence']:.2%}\n"
+                f"Priority: {item['priority'].upper()}\n"
+                f"Concerns: {', '.join(item['concerns']) if item['concerns'] else 'None'}\n"
+                f"SLA Deadline: {item['sla_deadline']}\n"
+                f"Review URL: /review/{item['failure_id']}"
+            )
+
+        top = min(items, key=lambda item: priority_rank(item['priority']))
+        lines = [
+            f"{priority_emoji.get(top['priority'], '⚪')} **{len(items)} New HITL Review Requests**\n"
+            f"Build: {key[0]}\n"
+            f"Category: {key[1]}\n"
+            f"Earliest SLA Deadline: {min(item['sla_deadline'] for item in items)}"
+        ]
+        for item in sorted(items, key=lambda item: (priority_rank(item['priority']), item['confidence'])):
+            lines.append(
+                f"- {item['failure_id']}: {item['priority'].upper()}, confidence {item['confidence']:.2%}"
+                f" (/review/{item['failure_id']})"
+            )
+        return "\n".join(lines)
 
-        # TODO Task 0-ARCH.16: Integrate with Teams/Slack
-        # Example Teams webhook:
-        # teams_webhook_url = os.getenv("TEAMS_WEBHOOK_URL")
-        # if teams_webhook_url:
-        #     requests.post(teams_webhook_url, json={'text': message})
+    def _deliver_notifications(self, key: Tuple[str, str, str], items: List[Dict]):
+        """
+        Send one message for the coalesced items to key's channel and mark
+        them notified (by the first channel that delivers)
 
-        # Example Slack webhook:
-        # slack_webhook_url = os.getenv("SLACK_WEBHOOK_URL")
-        # if slack_webhook_url:
-        #     requests.post(slack_webhook_url, json={'text': message})
+        Runs on the dispatcher thread; raising makes the dispatcher retry
+        this channel with backoff. The 'log' channel (no TEAMS_WEBHOOK_URL /
+        SLACK_WEBHOOK_URL) only logs the message.
+        """
+        # A re-queued failure appears once, with its latest values
+        items = list({item['failure_id']: item for item in items}.values())
+        message = self._format_notification(key, items)
+
+        channel = key[2]
+        url = os.getenv(NOTIFICATION_WEBHOOKS.get(channel, ''), '')
+        if url and REQUESTS_AVAILABLE:
+            response = requests.post(url, json={'text': message}, timeout=10)
+            response.raise_for_status()
+            logger.info(f"[HITL] Notification sent to {channel}: {len(items)} item(s) for {key[0]} ({key[1]})")
+        else:
+            logger.info(f"[HITL] Notification (stub): {message.replace(chr(10), ' | ')}")
 
-        logger.info(f"[HITL] Notification (stub): {message.replace(chr(10), ' | ')}")
+        self._mark_notified([item['failure_id'] for item in items])
 
-        # Mark as notified
-        if self.postgres_conn:
+    def _mark_notified(self, failure_ids: List[str]):
+        """Record notification_sent for delivered items"""
+        in_memory = [fid for fid in failure_ids if self.memory_queue.get(fid) is not None]
+        for failure_id in in_memory:
+            self.memory_queue.update(failure_id, notification_sent=True,
+                                     notification_sent_at=datetime.now().isoformat())
+
+        stored = [fid for fid in failure_ids if fid not in in_memory]
+        if stored and self.postgres_pool:
             try:
-                with self.postgres_conn.cursor() as cursor:
+                with postgres_connection(self.postgres_pool) as conn, conn.cursor() as cursor:
                     cursor.execute("""
                         UPDATE hitl_queue
                         SET notification_sent = TRUE, notification_sent_at = NOW()
-                        WHERE failure_id = %s
-                    """, (item['failure_id'],))
-                    self.postgres_conn.commit()
+                        WHERE failure_id = ANY(%s)
+                    """, (stored,))
             except Exception as e:
                 logger.error(f"[HITL] Failed to update notification status: {e}")
 
@@ -318,6 +945,9 @@ class HITLManager:
         """
         Get pending HITL items, ordered by priority and age
 
+        Returns full items (including react_result); use list_pending() for
+        queue listings.
+
         Args:
             limit: Maximum number of items to return
             priority: Filter by priority (optional)
@@ -325,32 +955,18 @@ class HITLManager:
         Returns:
             list: Pending queue items
         """
-        if self.postgres_conn:
+        if self._use_postgres():
             try:
-                with self.postgres_conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    query = """
-                        SELECT id, failure_id, build_id, error_category, error_message,
-                               react_result, confidence, confidence_scores, concerns,
-                               priority, status, created_at, sla_deadline
-                        FROM hitl_queue
-                        WHERE status = 'pending'
-                    """
+                with postgres_connection(self.postgres_pool) as conn, \
+                        conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    query = f"SELECT {ITEM_COLUMNS} FROM hitl_queue WHERE status = 'pending'"
                     params = []
 
                     if priority:
-                        query += " AND priority = %s"
-                        params.append(priority)
-
-                    query += """
-                        ORDER BY
-                            CASE priority
-                                WHEN 'high' THEN 1
-                                WHEN 'medium' THEN 2
-                                WHEN 'low' THEN 3
-                            END,
-                            created_at ASC
-                        LIMIT %s
-                    """
+                        query += " AND priority_rank = %s"
+                        params.append(priority_rank(priority))
+
+                    query += " ORDER BY priority_rank, created_at, id LIMIT %s"
                     params.append(limit)
 
                     cursor.execute(query, params)
@@ -363,15 +979,196 @@ class HITLManager:
                 return []
         else:
             # In-memory fallback
-            filtered = [item for item in self.in_memory_queue if item['status'] == 'pending']
-            if priority:
-                filtered = [item for item in filtered if item['priority'] == priority]
+            return self.memory_queue.pending(priority, limit=limit)
+
+    def list_pending(self, limit: int = 50, cursor: Optional[str] = None,
+                     priority: Optional[str] = None) -> Dict[str, Any]:
+        """
+        List pending items, one page at a time (keyset pagination)
+
+        Returns the lightweight listing projection (LIST_COLUMNS, no
+        react_result / confidence scores). Pages are stable while items are
+        queued or claimed concurrently, and each page is an index-only range
+        scan regardless of how deep the reviewer has paged.
 
-            # Sort by priority then age
-            priority_order = {'high': 1, 'medium': 2, 'low': 3}
-            filtered.sort(key=lambda x: (priority_order.get(x['priority'], 4), x['created_at']))
+        Args:
+            limit: Page size
+            cursor: next_cursor of the previous page (None = first page)
+            priority: Filter by priority (optional)
 
-            return filtered[:limit]
+        Returns:
+            dict: {'items': [...], 'next_cursor': str or None}
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+
+        if self._use_postgres():
+            try:
+                with postgres_connection(self.postgres_pool) as conn, \
+                        conn.cursor(cursor_factory=RealDictCursor) as db_cursor:
+                    query = f"SELECT {LIST_COLUMNS} FROM hitl_queue WHERE status = 'pending'"
+                    params: List[Any] = []
+
+                    if priority:
+                        query += " AND priority_rank = %s"
+                        params.append(priority_rank(priority))
+                    if after:
+                        query += " AND (priority_rank, created_at, id) > (%s, %s, %s)"
+                        params.extend(after)
+
+                    query += " ORDER BY priority_rank, created_at, id LIMIT %s"
+                    params.append(limit + 1)
+
+                    db_cursor.execute(query, params)
+                    items = [dict(item) for item in db_cursor.fetchall()]
+
+            except Exception as e:
+                logger.error(f"[HITL] Failed to list pending items: {e}")
+                return {'items': [], 'next_cursor': None}
+        else:
+            items = [
+                {column: item.get(column) for column in LIST_COLUMNS.split(', ')}
+                for item in self.memory_queue.pending(priority, after=after, limit=limit + 1)
+            ]
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        return {
+            'items': items,
+            'next_cursor': encode_cursor(items[-1]) if has_more else None
+        }
+
+    def claim(self, reviewer: str, n: int = 1, priority: Optional[str] = None,
+              lease_minutes: Optional[int] = None) -> List[Dict]:
+        """
+        Claim up to n pending items for a reviewer
+
+        Claimed items move to in_review with a lease; concurrent reviewers
+        skip each other's locked rows (FOR UPDATE SKIP LOCKED) instead of
+        waiting or claiming the same item. Items whose lease expired before
+        approve/reject are returned to the queue first.
+
+        Args:
+            reviewer: Reviewer name/email
+            n: Maximum number of items
+            priority: Only claim this priority (optional)
+            lease_minutes: Lease length (default: self.lease_minutes)
+
+        Returns:
+            list: Claimed full items, in queue order
+        """
+        lease_minutes = lease_minutes or self.lease_minutes
+
+        if self._use_postgres():
+            try:
+                with postgres_connection(self.postgres_pool) as conn, \
+                        conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    self._release_expired_leases(cursor)
+
+                    priority_filter = "AND priority_rank = %(rank)s" if priority else ""
+                    cursor.execute(f"""
+                        UPDATE hitl_queue
+                        SET status = 'in_review',
+                            reviewer = %(reviewer)s,
+                            assigned_at = NOW(),
+                            lease_expires_at = NOW() + make_interval(mins => %(lease_minutes)s)
+                        WHERE id IN (
+                            SELECT id FROM hitl_queue
+                            WHERE status = 'pending' {priority_filter}
+                            ORDER BY priority_rank, created_at, id
+                            LIMIT %(n)s
+                            FOR UPDATE SKIP LOCKED
+                        )
+                        RETURNING {ITEM_COLUMNS}
+                    """, {
+                        'reviewer': reviewer,
+                        'lease_minutes': lease_minutes,
+                        'rank': priority_rank(priority),
+                        'n': n
+                    })
+                    claimed = [dict(item) for item in cursor.fetchall()]
+
+                claimed.sort(key=lambda item: (item['priority_rank'], item['created_at'], item['id']))
+                logger.info(f"[HITL] {reviewer} claimed {len(claimed)} item(s)")
+                return claimed
+
+            except Exception as e:
+                logger.error(f"[HITL] Failed to claim items for {reviewer}: {e}")
+                return []
+        else:
+            return self.memory_queue.claim(reviewer, n, priority, lease_minutes)
+
+    def extend_lease(self, failure_id: str, reviewer: str, lease_minutes: Optional[int] = None) -> bool:
+        """
+        Extend the lease of an item the reviewer still holds
+
+        Returns:
+            bool: False if the item is not (or no longer) claimed by the reviewer
+        """
+        lease_minutes = lease_minutes or self.lease_minutes
+
+        if self._use_postgres() and not self._in_memory(failure_id):
+            try:
+                with postgres_connection(self.postgres_pool) as conn, conn.cursor() as cursor:
+                    cursor.execute("""
+                        UPDATE hitl_queue
+                        SET lease_expires_at = NOW() + make_interval(mins => %s)
+                        WHERE failure_id = %s AND reviewer = %s
+                          AND status = 'in_review' AND lease_expires_at > NOW()
+                    """, (lease_minutes, failure_id, reviewer))
+                    return cursor.rowcount == 1
+
+            except Exception as e:
+                logger.error(f"[HITL] Failed to extend lease of {failure_id}: {e}")
+                return False
+        else:
+            if not self.memory_queue.claimed_by(failure_id, reviewer):
+                return False
+            self.memory_queue.update(
+                failure_id, lease_expires_at=(datetime.now() + timedelta(minutes=lease_minutes)).isoformat()
+            )
+            return True
+
+    def release(self, failure_id: str, reviewer: str) -> bool:
+        """
+        Return a claimed item to the queue without reviewing it
+
+        Returns:
+            bool: False if the item is not claimed by the reviewer
+        """
+        if self._use_postgres() and not self._in_memory(failure_id):
+            try:
+                with postgres_connection(self.postgres_pool) as conn, conn.cursor() as cursor:
+                    cursor.execute("""
+                        UPDATE hitl_queue
+                        SET status = 'pending', reviewer = NULL,
+                            assigned_at = NULL, lease_expires_at = NULL
+                        WHERE failure_id = %s AND reviewer = %s AND status = 'in_review'
+                    """, (failure_id, reviewer))
+                    return cursor.rowcount == 1
+
+            except Exception as e:
+                logger.error(f"[HITL] Failed to release {failure_id}: {e}")
+                return False
+        else:
+            if not self.memory_queue.claimed_by(failure_id, reviewer, include_expired=True):
+                return False
+            self.memory_queue.unclaim(failure_id)
+            return True
+
+    def _release_expired_leases(self, cursor) -> int:
+        """Return in_review items with an expired lease to the queue"""
+        cursor.execute("""
+            UPDATE hitl_queue
+            SET status = 'pending', reviewer = NULL,
+                assigned_at = NULL, lease_expires_at = NULL
+            WHERE status = 'in_review' AND lease_expires_at < NOW()
+        """)
+        if cursor.rowcount:
+            logger.info(f"[HITL] {cursor.rowcount} expired claim(s) returned to the queue")
+        return cursor.rowcount
 
     def approve(self, failure_id: str, reviewer: str, notes: Optional[str] = None,
                rating: Optional[int] = None) -> bool:
@@ -389,9 +1186,21 @@ class HITLManager:
         """
         self.total_approved += 1
 
-        if self.postgres_conn:
+        # Items queued in memory stay there until drained into PostgreSQL
+        if self.memory_queue.update(
+            failure_id,
+            status='approved',
+            reviewer=reviewer,
+            review_notes=notes,
+            feedback_rating=rating,
+            reviewed_at=datetime.now().isoformat(),
+            lease_expires_at=None
+        ) is not None:
+            return True
+
+        if self._use_postgres():
             try:
-                with self.postgres_conn.cursor() as cursor:
+                with postgres_connection(self.postgres_pool) as conn, conn.cursor() as cursor:
                     cursor.execute("""
                         UPDATE hitl_queue
                         SET status = 'approved',
@@ -399,29 +1208,21 @@ class HITLManager:
                             review_notes = %s,
                             feedback_rating = %s,
                             reviewed_at = NOW(),
+                            lease_expires_at = NULL,
                             sla_met = (NOW() <= sla_deadline)
                         WHERE failure_id = %s
                     """, (reviewer, notes, rating, failure_id))
 
-                    self.postgres_conn.commit()
+                    if cursor.rowcount == 0:
+                        logger.warning(f"[HITL] Cannot approve {failure_id}: not in the queue")
+                        return False
                     logger.info(f"[HITL] Approved: {failure_id} by {reviewer}")
                     return True
 
             except Exception as e:
                 logger.error(f"[HITL] Failed to approve {failure_id}: {e}")
                 return False
-        else:
-            # In-memory fallback
-            for item in self.in_memory_queue:
-                if item['failure_id'] == failure_id:
-                    item['status'] = 'approved'
-                    item['reviewer'] = reviewer
-                    item['review_notes'] = notes
-                    item['feedback_rating'] = rating
-                    item['reviewed_at'] = datetime.now().isoformat()
-                    return True
-
-            return False
+        return False
 
     def reject(self, failure_id: str, reviewer: str, notes: str,
               corrected_answer: Optional[Dict] = None) -> bool:
@@ -440,9 +1241,21 @@ class HITLManager:
         self.total_rejected += 1
         new_status = 'corrected' if corrected_answer else 'rejected'
 
-        if self.postgres_conn:
+        # Items queued in memory stay there until drained into PostgreSQL
+        if self.memory_queue.update(
+            failure_id,
+            status=new_status,
+            reviewer=reviewer,
+            review_notes=notes,
+            corrected_answer=corrected_answer,
+            reviewed_at=datetime.now().isoformat(),
+            lease_expires_at=None
+        ) is not None:
+            return True
+
+        if self._use_postgres():
             try:
-                with self.postgres_conn.cursor() as cursor:
+                with postgres_connection(self.postgres_pool) as conn, conn.cursor() as cursor:
                     cursor.execute("""
                         UPDATE hitl_queue
                         SET status = %s,
@@ -450,31 +1263,23 @@ class HITLManager:
                             review_notes = %s,
                             corrected_answer = %s,
                             reviewed_at = NOW(),
+                            lease_expires_at = NULL,
                             sla_met = (NOW() <= sla_deadline)
                         WHERE failure_id = %s
                     """, (new_status, reviewer, notes,
                          Json(corrected_answer) if corrected_answer else None,
                          failure_id))
 
-                    self.postgres_conn.commit()
+                    if cursor.rowcount == 0:
+                        logger.warning(f"[HITL] Cannot reject {failure_id}: not in the queue")
+                        return False
                     logger.info(f"[HITL] Rejected: {failure_id} by {reviewer}")
                     return True
 
             except Exception as e:
                 logger.error(f"[HITL] Failed to reject {failure_id}: {e}")
                 return False
-        else:
-            # In-memory fallback
-            for item in self.in_memory_queue:
-                if item['failure_id'] == failure_id:
-                    item['status'] = new_status
-                    item['reviewer'] = reviewer
-                    item['review_notes'] = notes
-                    item['corrected_answer'] = corrected_answer
-                    item['reviewed_at'] = datetime.now().isoformat()
-                    return True
-
-            return False
+        return False
 
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -491,9 +1296,10 @@ class HITLManager:
                 if self.total_queued > 0 else 0.0
         }
 
-        if self.postgres_conn:
+        if self._use_postgres():
             try:
-                with self.postgres_conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                with postgres_connection(self.postgres_pool) as conn, \
+                        conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     # Get queue size by status
                     cursor.execute("""
                         SELECT status, COUNT(*) as count
@@ -535,20 +1341,15 @@ class HITLManager:
 
         else:
             # In-memory statistics
+            status_counts = self.memory_queue.status_counts()
             stats.update({
-                'pending_count': len([i for i in self.in_memory_queue if i['status'] == 'pending']),
-                'in_review_count': len([i for i in self.in_memory_queue if i['status'] == 'in_review']),
-                'approved_count': len([i for i in self.in_memory_queue if i['status'] == 'approved']),
-                'rejected_count': len([i for i in self.in_memory_queue if i['status'] == 'rejected'])
+                'pending_count': status_counts.get('pending', 0),
+                'in_review_count': status_counts.get('in_review', 0),
+                'approved_count': status_counts.get('approved', 0),
+                'rejected_count': status_counts.get('rejected', 0)
             })
 
-        return stats
+        if self.notifications is not None:
+            stats['notifications'] = self.notifications.get_stats()
 
-    def __del__(self):
-        """Close PostgreSQL connection on cleanup"""
-        if self.postgres_conn:
-            try:
-                self.postgres_conn.close()
-                logger.debug("[HITL] PostgreSQL connection closed")
-            except:
-                pass
+        return stats
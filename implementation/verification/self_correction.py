@@ -6,7 +6,8 @@ Implements query expansion and re-retrieval to improve low-confidence answers.
 Strategy:
 1. Identify low-scoring components (relevance, grounding, completeness)
 2. Expand query with related terms
-3. Re-retrieve from Pinecone with expanded query
+3. Re-retrieve from Pinecone with expanded query (embedded once, both
+   indexes queried concurrently, scores normalized per index before merge)
 4. Compare new vs old results
 5. Return improved answer if confidence increased
 
@@ -15,8 +16,11 @@ Date: 2025-11-02
 """
 
 import re
+import time
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from langchain_pinecone import PineconeVectorStore
@@ -42,8 +46,14 @@ class SelfCorrector:
     # Target confidence after correction
     TARGET_CONFIDENCE = 0.65  # To escape LOW range
 
-    def __init__(self):
-        """Initialize self-corrector with Pinecone connection"""
+    def __init__(self, concurrent_corrections: Optional[int] = None):
+        """
+        Initialize self-corrector with Pinecone connection
+
+        Args:
+            concurrent_corrections: Corrections that may run at the same time
+                (default: CRAG_CORRECTION_WORKERS env, 4)
+        """
         self.pinecone_api_key = os.getenv("PINECONE_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
 
@@ -56,9 +66,16 @@ class SelfCorrector:
             except Exception as e:
                 logger.warning(f"Failed to initialize OpenAI embeddings: {e}")
 
-        # Pinecone indexes
+        # Pinecone indexes (vector store handles built once, on first use)
         self.knowledge_index = "ddn-knowledge-docs"
         self.error_library_index = "ddn-error-library"
+        self._vectorstores: Dict[str, PineconeVectorStore] = {}
+        self._vectorstores_lock = threading.Lock()
+
+        # Both indexes are queried at the same time, for every concurrent correction
+        concurrent_corrections = concurrent_corrections or int(os.getenv('CRAG_CORRECTION_WORKERS', '4'))
+        self._retrieval_executor = ThreadPoolExecutor(max_workers=2 * concurrent_corrections,
+                                                      thread_name_prefix="self-correction-rag")
 
         # Correction statistics
         self.correction_attempts = 0
@@ -97,9 +114,13 @@ class SelfCorrector:
         # Try corrections (max 2 attempts)
         best_result = None
         best_confidence = original_confidence
+        start = time.perf_counter()
+        timing = {'attempts': []}
 
         for attempt in range(1, self.MAX_RETRIES + 1):
             logger.info(f"[Self-Correction] Attempt {attempt}/{self.MAX_RETRIES}")
+            attempt_timing = {'attempt': attempt}
+            timing['attempts'].append(attempt_timing)
 
             # Expand query based on low components
             expanded_query = self._expand_query(
@@ -113,7 +134,8 @@ class SelfCorrector:
             new_docs = self._retrieve_additional_docs(
                 expanded_query,
                 failure_data.get('error_category', 'UNKNOWN'),
-                top_k=10  # Get more docs than usual
+                top_k=10,  # Get more docs than usual
+                timings=attempt_timing
             )
 
             if not new_docs:
@@ -123,7 +145,7 @@ class SelfCorrector:
             # Simulate improved result (in real implementation, would call ReAct agent again)
             # For now, we'll enhance the existing result with additional context
             improved_result = self._create_improved_result(
-                react_result, new_docs, expanded_query
+                react_result, new_docs, expanded_query, timing=attempt_timing
             )
 
             # Calculate new confidence (would use ConfidenceScorer in real implementation)
@@ -143,6 +165,10 @@ class SelfCorrector:
                 if new_confidence >= self.TARGET_CONFIDENCE:
                     break
 
+        timing['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"[Self-Correction] Retrieval finished in {timing['total_ms']:.0f}ms "
+                    f"({len(timing['attempts'])} attempts)")
+
         # Determine success
         if best_result and best_confidence > original_confidence + self.MIN_IMPROVEMENT:
             self.successful_corrections += 1
@@ -153,7 +179,8 @@ class SelfCorrector:
                 'new_confidence': best_confidence,
                 'method': 'query_expansion',
                 'attempts': self.MAX_RETRIES,
-                'improvement_delta': best_confidence - original_confidence
+                'improvement_delta': best_confidence - original_confidence,
+                'timing': timing
             }
         else:
             self.failed_corrections += 1
@@ -162,7 +189,8 @@ class SelfCorrector:
                 'improved': False,
                 'method': 'query_expansion',
                 'attempts': self.MAX_RETRIES,
-                'improvement_delta': 0.0
+                'improvement_delta': 0.0,
+                'timing': timing
             }
 
     def _identify_low_components(self, components: Dict[str, float]) -> List[str]:
@@ -248,14 +276,21 @@ class SelfCorrector:
         return expanded_query
 
     def _retrieve_additional_docs(self, query: str, error_category: str,
-                                  top_k: int = 10) -> List[Dict]:
+                                  top_k: int = 10,
+                                  timings: Optional[Dict[str, float]] = None) -> List[Dict]:
         """
         Retrieve additional documents from Pinecone with expanded query
 
+        The query is embedded once and both indexes are searched concurrently
+        with that vector. Raw similarity scores are not comparable across
+        indexes, so results are merged by their score relative to the best
+        match of their own index ('normalized_score').
+
         Args:
             query: Expanded query
             error_category: Error category
             top_k: Number of docs to retrieve
+            timings: Filled with embed_ms, <source>_ms and retrieval_ms
 
         Returns:
             list: Retrieved documents with similarity scores
@@ -264,65 +299,71 @@ class SelfCorrector:
             logger.warning("[Self-Correction] Pinecone not available - cannot retrieve additional docs")
             return []
 
-        all_docs = []
+        timings = timings if timings is not None else {}
+        start = time.perf_counter()
 
         try:
-            # Query knowledge docs index
-            knowledge_vectorstore = PineconeVectorStore(
-                index_name=self.knowledge_index,
-                embedding=self.embeddings,
-                pinecone_api_key=self.pinecone_api_key
-            )
-
-            knowledge_docs = knowledge_vectorstore.similarity_search_with_score(
-                query, k=top_k // 2  # Half from knowledge, half from error library
-            )
-
-            for doc, score in knowledge_docs:
-                all_docs.append({
-                    'text': doc.page_content,
-                    'similarity_score': float(score),
-                    'source': 'knowledge_docs',
-                    'metadata': doc.metadata
-                })
-
-            logger.info(f"[Self-Correction] Retrieved {len(knowledge_docs)} from knowledge_docs")
-
+            embedding = self.embeddings.embed_query(query)
         except Exception as e:
-            logger.error(f"[Self-Correction] Failed to query knowledge_docs: {e}")
+            logger.error(f"[Self-Correction] Failed to embed expanded query: {e}")
+            return []
+        timings['embed_ms'] = round((time.perf_counter() - start) * 1000, 1)
 
-        try:
-            # Query error library index
-            error_vectorstore = PineconeVectorStore(
-                index_name=self.error_library_index,
-                embedding=self.embeddings,
-                pinecone_api_key=self.pinecone_api_key
-            )
+        # Half from knowledge, half from error library
+        sources = {'knowledge_docs': self.knowledge_index, 'error_library': self.error_library_index}
+        futures = {
+            source: self._retrieval_executor.submit(self._search_index, index_name, embedding, top_k // 2)
+            for source, index_name in sources.items()
+        }
 
-            error_docs = error_vectorstore.similarity_search_with_score(
-                query, k=top_k // 2
-            )
+        all_docs = []
+        for source, future in futures.items():
+            try:
+                results, elapsed_ms = future.result()
+            except Exception as e:
+                logger.error(f"[Self-Correction] Failed to query {source}: {e}")
+                continue
 
-            for doc, score in error_docs:
+            timings[f'{source}_ms'] = elapsed_ms
+            best_score = max((float(score) for _, score in results), default=0.0)
+            for doc, score in results:
                 all_docs.append({
                     'text': doc.page_content,
                     'similarity_score': float(score),
-                    'source': 'error_library',
+                    'normalized_score': float(score) / best_score if best_score > 0 else 0.0,
+                    'source': source,
                     'metadata': doc.metadata
                 })
 
-            logger.info(f"[Self-Correction] Retrieved {len(error_docs)} from error_library")
+            logger.info(f"[Self-Correction] Retrieved {len(results)} from {source} ({elapsed_ms:.0f}ms)")
 
-        except Exception as e:
-            logger.error(f"[Self-Correction] Failed to query error_library: {e}")
-
-        # Sort by similarity score (descending)
-        all_docs.sort(key=lambda x: x['similarity_score'], reverse=True)
+        # Sort by per-index normalized score, raw similarity breaks ties (descending)
+        all_docs.sort(key=lambda x: (x['normalized_score'], x['similarity_score']), reverse=True)
 
+        timings['retrieval_ms'] = round((time.perf_counter() - start) * 1000, 1)
         return all_docs[:top_k]
 
+    def _search_index(self, index_name: str, embedding: List[float], k: int):
+        """Search one index by vector; returns ([(doc, score)], elapsed_ms)"""
+        start = time.perf_counter()
+        results = self._vectorstore(index_name).similarity_search_by_vector_with_score(embedding, k=k)
+        return results, round((time.perf_counter() - start) * 1000, 1)
+
+    def _vectorstore(self, index_name: str) -> PineconeVectorStore:
+        """Reused vector store handle for an index"""
+        with self._vectorstores_lock:
+            vectorstore = self._vectorstores.get(index_name)
+            if vectorstore is None:
+                vectorstore = PineconeVectorStore(
+                    index_name=index_name,
+                    embedding=self.embeddings,
+                    pinecone_api_key=self.pinecone_api_key
+                )
+                self._vectorstores[index_name] = vectorstore
+            return vectorstore
+
     def _create_improved_result(self, original_result: Dict, new_docs: List[Dict],
-                               expanded_query: str) -> Dict:
+                               expanded_query: str, timing: Optional[Dict] = None) -> Dict:
         """
         Create improved result by enhancing with additional context
 
@@ -333,6 +374,7 @@ class SelfCorrector:
             original_result: Original ReAct result
             new_docs: Newly retrieved documents
             expanded_query: Expanded query used
+            timing: Retrieval timings of the attempt
 
         Returns:
             dict: Enhanced result
@@ -345,7 +387,8 @@ class SelfCorrector:
         improved['correction_metadata'] = {
             'expanded_query': expanded_query[:200],
             'additional_docs_count': len(new_docs),
-            'correction_timestamp': datetime.now().isoformat()
+            'correction_timestamp': datetime.now().isoformat(),
+            'timing': timing or {}
         }
 
         # In real implementation, would:
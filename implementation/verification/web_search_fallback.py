@@ -12,6 +12,14 @@ Strategy:
 6. Re-verify confidence
 7. If still low, escalate to high-priority HITL
 
+Search path:
+- TTL cache keyed by the generated query (repeated failures do not
+  re-issue identical searches)
+- Token-bucket rate limit per engine (a limited engine is skipped)
+- Hedged requests: if the first engine has not answered within
+  hedge_after_ms, the next engine is queried too and the first non-empty
+  answer wins (DuckDuckGo API vs HTML, Bing, Google)
+
 Author: AI Analysis System
 Date: 2025-11-02
 """
@@ -19,15 +27,65 @@ Date: 2025-11-02
 import os
 import re
 import json
+import time
 import logging
+import threading
 import requests
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 
+# Search endpoints (override per instance, e.g. a local stub in tests)
+DEFAULT_ENDPOINTS = {
+    'google': "https://www.googleapis.com/customsearch/v1",
+    'bing': "https://api.bing.microsoft.com/v7.0/search",
+    'duckduckgo': "https://api.duckduckgo.com/",
+    'duckduckgo_html': "https://html.duckduckgo.com/html/"
+}
+
+# Per-engine token buckets: (requests per second, burst)
+DEFAULT_RATE_LIMITS = {
+    'google': (1.0, 5),
+    'bing': (3.0, 3),
+    'duckduckgo': (1.0, 2),
+    'duckduckgo_html': (0.5, 1)
+}
+
+
+class TokenBucket:
+    """Token-bucket rate limiter (non-blocking)"""
+
+    def __init__(self, rate: float, capacity: int, clock=time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst
+            clock: Monotonic time source
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take one token if available"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
 class WebSearchFallback:
     """
     Web search fallback for very low confidence answers
@@ -51,8 +109,25 @@ class WebSearchFallback:
     # Request timeout (seconds)
     TIMEOUT = 10
 
-    def __init__(self):
-        """Initialize web search fallback with API keys"""
+    # Cached search results
+    CACHE_MAX_ENTRIES = 512
+
+    def __init__(self,
+                 endpoints: Optional[Dict[str, str]] = None,
+                 cache_ttl: Optional[int] = None,
+                 hedge_after_ms: Optional[int] = None,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        """
+        Initialize web search fallback with API keys
+
+        Args:
+            endpoints: Per-engine URL overrides (merged over DEFAULT_ENDPOINTS)
+            cache_ttl: Result cache TTL in seconds, 0 disables
+                (default: WEB_SEARCH_CACHE_TTL env, 3600)
+            hedge_after_ms: Latency budget before the next engine is queried,
+                0 disables hedging (default: WEB_SEARCH_HEDGE_MS env, 1500)
+            rate_limits: Per-engine (requests per second, burst) overrides
+        """
         # Google Custom Search API
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.google_cse_id = os.getenv("GOOGLE_CSE_ID")
@@ -71,11 +146,33 @@ class WebSearchFallback:
             self.search_engine = 'duckduckgo'
             logger.info("WebSearchFallback initialized with DuckDuckGo (no API key required)")
 
+        self.endpoints = dict(DEFAULT_ENDPOINTS)
+        if endpoints:
+            self.endpoints.update(endpoints)
+
+        self.cache_ttl = cache_ttl if cache_ttl is not None else int(os.getenv("WEB_SEARCH_CACHE_TTL", "3600"))
+        self.hedge_after_ms = (hedge_after_ms if hedge_after_ms is not None
+                               else int(os.getenv("WEB_SEARCH_HEDGE_MS", "1500")))
+
+        limits = dict(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            limits.update(rate_limits)
+        self._rate_limiters = {engine: TokenBucket(rate, burst) for engine, (rate, burst) in limits.items()}
+
+        self._cache: OrderedDict = OrderedDict()   # query -> (expires_at, results)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-search")
+
         # Search statistics
         self.search_attempts = 0
         self.successful_searches = 0
         self.failed_searches = 0
         self.confidence_improvements = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.hedged_searches = 0
+        self.hedge_wins = 0
+        self.rate_limited: Dict[str, int] = {}
 
     def fallback_search(self, react_result: Dict, confidence_scores: Dict,
                        failure_data: Dict) -> Dict[str, Any]:
@@ -127,6 +224,7 @@ class WebSearchFallback:
             }
 
         logger.info(f"[Web Search] Found {len(search_results)} results")
+        search_engine = search_results[0].get('engine', self.search_engine)
 
         # Extract and clean snippets
         web_snippets = self._extract_snippets(search_results)
@@ -154,7 +252,7 @@ class WebSearchFallback:
                 'enhanced_answer': enhanced_result,
                 'new_confidence': new_confidence,
                 'web_sources': [r['url'] for r in search_results],
-                'search_engine': self.search_engine,
+                'search_engine': search_engine,
                 'search_query': search_query,
                 'improvement_delta': new_confidence - original_confidence
             }
@@ -165,7 +263,7 @@ class WebSearchFallback:
             return {
                 'improved': False,
                 'web_sources': [r['url'] for r in search_results],
-                'search_engine': self.search_engine,
+                'search_engine': search_engine,
                 'search_query': search_query,
                 'improvement_delta': new_confidence - original_confidence
             }
@@ -282,25 +380,130 @@ class WebSearchFallback:
 
     def _search_web(self, query: str) -> List[Dict]:
         """
-        Search the web using configured search engine
+        Search the web, from the result cache when possible
+
+        Engines are tried in engine_order(); the next one is queried when
+        the running ones have not answered within hedge_after_ms, or at once
+        when they answered empty. Rate-limited engines are skipped.
 
         Args:
             query: Search query
 
         Returns:
-            list: Search results [{url, title, snippet}, ...]
+            list: Search results [{url, title, snippet, engine}, ...]
         """
+        cache_key = re.sub(r'\s+', ' ', query).strip().lower()
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"[Web Search] Cache hit for query: {query[:60]}")
+            return cached
+
         try:
-            if self.search_engine == 'google':
-                return self._search_google(query)
-            elif self.search_engine == 'bing':
-                return self._search_bing(query)
-            else:
-                return self._search_duckduckgo(query)
+            results = self._search_hedged(query)
         except Exception as e:
             logger.error(f"[Web Search] Search failed: {e}")
             return []
 
+        if results:
+            self._cache_put(cache_key, results)
+        return results
+
+    def engine_order(self) -> List[str]:
+        """Configured engine first, then the other engines usable without extra setup"""
+        engines = [self.search_engine]
+        if self.google_api_key and self.google_cse_id:
+            engines.append('google')
+        if self.bing_api_key:
+            engines.append('bing')
+        engines.extend(['duckduckgo', 'duckduckgo_html'])
+        return list(dict.fromkeys(engines))
+
+    def _search_hedged(self, query: str) -> List[Dict]:
+        """Query engines with hedging; first non-empty answer wins"""
+        candidates = iter(self.engine_order())
+        hedge_after = self.hedge_after_ms / 1000 if self.hedge_after_ms else None
+        pending = {}
+
+        def launch_next() -> bool:
+            for engine in candidates:
+                limiter = self._rate_limiters.get(engine)
+                if limiter is not None and not limiter.try_acquire():
+                    logger.warning(f"[Web Search] {engine} rate limited - skipping")
+                    with self._lock:
+                        self.rate_limited[engine] = self.rate_limited.get(engine, 0) + 1
+                    continue
+                if pending:
+                    logger.info(f"[Web Search] Hedging with {engine}")
+                    with self._lock:
+                        self.hedged_searches += 1
+                pending[self._executor.submit(self._search_engine, engine, query)] = engine
+                return True
+            return False
+
+        if not launch_next():
+            return []
+
+        first_engine = next(iter(pending.values()))
+        while pending:
+            done, _ = wait(list(pending), timeout=hedge_after, return_when=FIRST_COMPLETED)
+            if not done:
+                # Latency budget exceeded - query the next engine as well
+                launch_next()
+                continue
+
+            for future in done:
+                engine = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"[Web Search] {engine} search failed: {e}")
+                    results = []
+                if results:
+                    if engine != first_engine:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    for result in results:
+                        result['engine'] = engine
+                    return results
+
+            # Empty or failed answer - fail over now
+            if not pending:
+                launch_next()
+
+        return []
+
+    def _search_engine(self, engine: str, query: str) -> List[Dict]:
+        """Run one engine's search"""
+        if engine == 'google':
+            return self._search_google(query)
+        elif engine == 'bing':
+            return self._search_bing(query)
+        elif engine == 'duckduckgo_html':
+            return self._search_duckduckgo_html(query)
+        else:
+            return self._search_duckduckgo(query)
+
+    def _cache_get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return [dict(result) for result in entry[1]]
+            if entry is not None:
+                del self._cache[key]
+            self.cache_misses += 1
+            return None
+
+    def _cache_put(self, key: str, results: List[Dict]):
+        if self.cache_ttl <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (time.time() + self.cache_ttl, [dict(result) for result in results])
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
     def _search_google(self, query: str) -> List[Dict]:
         """
         Search using Google Custom Search API
@@ -316,7 +519,7 @@ class WebSearchFallback:
             return []
 
         try:
-            url = "https://www.googleapis.com/customsearch/v1"
+            url = self.endpoints['google']
             params = {
                 'key': self.google_api_key,
                 'cx': self.google_cse_id,
@@ -359,7 +562,7 @@ class WebSearchFallback:
             return []
 
         try:
-            url = "https://api.bing.microsoft.com/v7.0/search"
+            url = self.endpoints['bing']
             headers = {'Ocp-Apim-Subscription-Key': self.bing_api_key}
             params = {'q': query, 'count': self.MAX_RESULTS}
 
@@ -395,7 +598,7 @@ class WebSearchFallback:
         """
         try:
             # Use DuckDuckGo Instant Answer API (free, no API key)
-            url = "https://api.duckduckgo.com/"
+            url = self.endpoints['duckduckgo']
             params = {
                 'q': query,
                 'format': 'json',
@@ -426,9 +629,8 @@ class WebSearchFallback:
                         'snippet': topic.get('Text', '')
                     })
 
-            # If no instant answers, fallback to HTML scraping (simple)
-            if not results:
-                results = self._search_duckduckgo_html(query)
+            # No instant answers: _search_hedged() fails over to duckduckgo_html
+            # (through its rate limiter)
 
             logger.info(f"[Web Search] DuckDuckGo returned {len(results)} results")
             return results
@@ -448,7 +650,7 @@ class WebSearchFallback:
             list: Search results
         """
         try:
-            url = "https://html.duckduckgo.com/html/"
+            url = self.endpoints['duckduckgo_html']
             data = {'q': query}
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
 
@@ -609,5 +811,14 @@ class WebSearchFallback:
             'confidence_improvements': self.confidence_improvements,
             'success_rate': round(success_rate, 1),
             'search_engine': self.search_engine,
-            'target_success_rate': 50.0  # Target: >50% of web searches succeed
+            'target_success_rate': 50.0,  # Target: >50% of web searches succeed
+            'cache': {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'entries': len(self._cache),
+                'ttl_seconds': self.cache_ttl
+            },
+            'hedged_searches': self.hedged_searches,
+            'hedge_wins': self.hedge_wins,
+            'rate_limited': dict(self.rate_limited)
         }
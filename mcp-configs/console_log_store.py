@@ -0,0 +1,367 @@
+"""
+Chunked Console Log Store for DDN AI Test Failure Analysis
+Stores build console logs as compressed chunks with a per-build line index
+
+A console log is split at line boundaries into chunks of about
+CONSOLE_LOG_CHUNK_CHARS characters, each zlib-compressed into its own
+document in `console_log_chunks` (no 16 MB document limit on the log).
+The build's `console_logs` document keeps the line index: the first line
+number of every chunk. Reads fetch only the chunks they need:
+1. tail(n): the last chunks of the log
+2. read_range(start, end): the chunks holding those lines
+3. grep(pattern): chunk by chunk, stopping at max_matches
+
+Builds stored before chunking (a `full_log` string) are still readable,
+and `python console_log_store.py migrate` converts them.
+
+Chunked builds keep the last CONSOLE_LOG_TAIL_CHARS of the log (whole
+lines) in `full_log`, with `full_log_truncated` set when that is not the
+whole log. The n8n workflows read `console_data.full_log` through a
+$lookup on console_logs and keep getting the end of the console output.
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bson import Binary, ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Target chunk size (chunks end at a line boundary)
+CONSOLE_LOG_CHUNK_CHARS = int(os.getenv("CONSOLE_LOG_CHUNK_CHARS", 256 * 1024))
+# A line longer than this is split across chunks
+CONSOLE_LOG_MAX_CHUNK_CHARS = int(os.getenv("CONSOLE_LOG_MAX_CHUNK_CHARS", 4 * 1024 * 1024))
+# End of the log kept in console_logs.full_log for the n8n workflows (0 = none)
+CONSOLE_LOG_TAIL_CHARS = int(os.getenv("CONSOLE_LOG_TAIL_CHARS", 64 * 1024))
+# Chunks inserted per insert_many / fetched per cursor batch
+CONSOLE_LOG_WRITE_BATCH = 16
+CONSOLE_LOG_READ_BATCH = 4
+# Line length returned by grep (long lines are truncated)
+GREP_MAX_LINE_CHARS = 2000
+
+
+class ConsoleLogStore:
+    """Chunked console logs in MongoDB (console_logs + console_log_chunks)"""
+
+    def __init__(self, db, chunk_chars: int = None, max_chunk_chars: int = None, tail_chars: int = None):
+        """
+        Args:
+            db: pymongo Database
+            chunk_chars: Target chunk size in characters
+            max_chunk_chars: Hard limit for a chunk (splits very long lines)
+            tail_chars: End of the log kept in full_log (0 = none)
+        """
+        self.logs = db.console_logs
+        self.chunks = db.console_log_chunks
+        self.chunk_chars = chunk_chars or CONSOLE_LOG_CHUNK_CHARS
+        self.max_chunk_chars = max(max_chunk_chars or CONSOLE_LOG_MAX_CHUNK_CHARS, self.chunk_chars)
+        self.tail_chars = CONSOLE_LOG_TAIL_CHARS if tail_chars is None else tail_chars
+
+    def ensure_indexes(self):
+        """Create the chunk lookup index"""
+        self.chunks.create_index([("version", ASCENDING), ("seq", ASCENDING)], unique=True)
+        self.chunks.create_index([("build_id", ASCENDING)])
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write(self, build_id: str, pieces: Iterable[str], **fields) -> Dict[str, Any]:
+        """
+        Store a console log, replacing the build's previous log
+
+        The chunks are written first; the line index in console_logs is
+        switched to them in one update, so readers never see a partial log.
+        The same update stores the end of the log in full_log.
+
+        Args:
+            build_id: Build the log belongs to
+            pieces: Log text in pieces of any size (e.g. a file read in blocks)
+            **fields: Extra fields for the console_logs document
+
+        Returns:
+            The stored log's index (lines, sizes, chunks)
+        """
+        version = ObjectId()
+        line_index = []
+        batch = []
+        totals = {"total_lines": 0, "total_chars": 0, "compressed_bytes": 0}
+        ends_with_newline = True
+        tail = ""
+
+        for seq, (text, first_line, mid_line) in enumerate(self._split(pieces)):
+            data = zlib.compress(text.encode("utf-8"), 6)
+            batch.append({"_id": f"{version}:{seq}", "build_id": build_id, "version": version,
+                          "seq": seq, "data": Binary(data)})
+            line_index.append([first_line, mid_line])
+            totals["total_lines"] = first_line + text.count("\n")
+            totals["total_chars"] += len(text)
+            totals["compressed_bytes"] += len(data)
+            ends_with_newline = text.endswith("\n")
+            tail = (tail + text)[-self.tail_chars:] if self.tail_chars else ""
+            if len(batch) >= CONSOLE_LOG_WRITE_BATCH:
+                self.chunks.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            self.chunks.insert_many(batch, ordered=False)
+        if not ends_with_newline:
+            totals["total_lines"] += 1  # Last line without a newline
+        tail_truncated = len(tail) < totals["total_chars"]
+        if tail_truncated and "\n" in tail[:-1]:
+            tail = tail[tail.index("\n") + 1:]  # Drop the partial first line
+
+        manifest = {
+            "build_id": build_id,
+            "storage": "chunked",
+            "version": version,
+            "line_index": line_index,
+            "chunk_count": len(line_index),
+            **totals,
+            "full_log": tail,
+            "full_log_truncated": tail_truncated,
+            "timestamp": datetime.utcnow(),
+            **fields
+        }
+        previous = self.logs.find_one_and_update(
+            {"build_id": build_id},
+            {"$set": manifest},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous and previous.get("version"):
+            self.chunks.delete_many({"version": previous["version"]})
+
+        logger.info(f"✅ Stored console log for {build_id}: {totals['total_lines']} lines, "
+                    f"{len(line_index)} chunks, {totals['compressed_bytes']} bytes compressed")
+        return {key: manifest[key] for key in ("build_id", "chunk_count", "total_lines", "total_chars",
+                                                "compressed_bytes")}
+
+    def _split(self, pieces: Iterable[str]) -> Iterator[Tuple[str, int, bool]]:
+        """Yield (chunk text, line number of its first character, starts inside a line)"""
+        buffer = ""
+        line = 0
+        mid_line = False
+
+        for piece in pieces:
+            buffer += piece
+            while len(buffer) >= self.chunk_chars:
+                cut = buffer.rfind("\n", 0, self.chunk_chars) + 1
+                if not cut:
+                    cut = buffer.find("\n", self.chunk_chars, self.max_chunk_chars) + 1
+                if not cut:
+                    if len(buffer) < self.max_chunk_chars:
+                        break  # Wait for the end of this line
+                    cut = self.max_chunk_chars
+                text, buffer = buffer[:cut], buffer[cut:]
+                yield text, line, mid_line
+                line += text.count("\n")
+                mid_line = not text.endswith("\n")
+
+        if buffer:
+            yield buffer, line, mid_line
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def get_index(self, build_id: str) -> Optional[Dict[str, Any]]:
+        """The build's console_logs document without the log text (or tail)"""
+        return self.logs.find_one({"build_id": build_id}, {"full_log": 0})
+
+    def tail(self, build_id: str, lines: int) -> Optional[Dict[str, Any]]:
+        """Last `lines` lines of the log"""
+        index = self.get_index(build_id)
+        if index is None:
+            return None
+        lines = max(lines, 0)
+        if index.get("storage") != "chunked":
+            return self._legacy(build_id, index, lambda total: (max(total - lines, 0), total - 1))
+        start = max(index["total_lines"] - lines, 0)
+        return self._read(index, start, index["total_lines"] - 1)
+
+    def read_range(self, build_id: str, start_line: int, end_line: int) -> Optional[Dict[str, Any]]:
+        """Lines start_line..end_line (1-based, inclusive)"""
+        index = self.get_index(build_id)
+        if index is None:
+            return None
+        first, last = max(start_line, 1) - 1, end_line - 1
+        if index.get("storage") != "chunked":
+            return self._legacy(build_id, index, lambda total: (first, last))
+        return self._read(index, first, min(last, index["total_lines"] - 1))
+
+    def read_all(self, build_id: str) -> Optional[Dict[str, Any]]:
+        """The whole log"""
+        return self.read_range(build_id, 1, sys.maxsize)
+
+    def grep(self, build_id: str, pattern: str, ignore_case: bool = False, max_matches: int = 100,
+             start_line: int = 1, end_line: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Lines matching a regular expression, with 1-based line numbers
+
+        Chunks are decompressed one at a time and reading stops once
+        max_matches lines were found.
+
+        Raises:
+            re.error: Invalid pattern
+        """
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        index = self.get_index(build_id)
+        if index is None:
+            return None
+
+        matches = []
+        progress = {"chunks_read": 0}
+        for number, line in self._iter_lines(build_id, index, max(start_line, 1) - 1,
+                                             (end_line or sys.maxsize) - 1, progress):
+            if regex.search(line):
+                matches.append({"line": number + 1, "text": line[:GREP_MAX_LINE_CHARS]})
+                if len(matches) >= max_matches:
+                    break
+
+        return {
+            "matches": matches,
+            "truncated": len(matches) >= max_matches,
+            "total_lines": index.get("total_lines"),
+            "chunks_read": progress["chunks_read"]
+        }
+
+    def _chunk_span(self, line_index: List[List], first: int, last: int) -> Tuple[int, int]:
+        """Chunks holding lines first..last (0-based)"""
+        start = 0
+        end = 0
+        for seq, (chunk_line, mid_line) in enumerate(line_index):
+            if chunk_line < first or (chunk_line == first and not mid_line):
+                start = seq
+            if chunk_line <= last:
+                end = seq
+        return start, end
+
+    def _fetch(self, index: Dict, start: int, end: int) -> Iterator[str]:
+        """Decompressed chunks start..end (small batches: grep may stop early)"""
+        cursor = self.chunks.find({"version": index["version"], "seq": {"$gte": start, "$lte": end}})
+        for chunk in cursor.sort("seq", ASCENDING).batch_size(CONSOLE_LOG_READ_BATCH):
+            yield zlib.decompress(chunk["data"]).decode("utf-8")
+
+    def _read(self, index: Dict, first: int, last: int) -> Dict[str, Any]:
+        """Lines first..last (0-based) of a chunked log"""
+        if last < first or not index["line_index"]:
+            return {"text": "", "first_line": first + 1, "lines": 0, "chunks_read": 0,
+                    "total_lines": index["total_lines"], "timestamp": index.get("timestamp")}
+
+        start, end = self._chunk_span(index["line_index"], first, last)
+        text = "".join(self._fetch(index, start, end))
+        offset = index["line_index"][start][0]
+        selected = text.split("\n")[first - offset:last - offset + 1]
+        return {
+            "text": "\n".join(selected),
+            "first_line": first + 1,
+            "lines": len(selected),
+            "chunks_read": end - start + 1,
+            "total_lines": index["total_lines"],
+            "timestamp": index.get("timestamp")
+        }
+
+    def _iter_lines(self, build_id: str, index: Dict, first: int, last: int,
+                    progress: Dict[str, int]) -> Iterator[Tuple[int, str]]:
+        """(line number, line) for lines first..last (0-based), one chunk in memory at a time"""
+        if index.get("storage") != "chunked":
+            log = (self.logs.find_one({"build_id": build_id}, {"full_log": 1}) or {}).get("full_log") or ""
+            yield from enumerate(log.split("\n")[first:last + 1], first)
+            return
+        if not index["line_index"]:
+            return
+
+        start, end = self._chunk_span(index["line_index"], first, min(last, index["total_lines"] - 1))
+        number = index["line_index"][start][0]
+        partial = ""
+        for text in self._fetch(index, start, end):
+            progress["chunks_read"] += 1
+            lines = (partial + text).split("\n")
+            partial = lines.pop()
+            for line in lines:
+                if first <= number <= last:
+                    yield number, line
+                number += 1
+        if partial and first <= number <= last:
+            yield number, partial
+
+    def _legacy(self, build_id: str, index: Dict, bounds) -> Dict[str, Any]:
+        """Read a build stored as one full_log string (bounds: total lines -> first, last)"""
+        log = (self.logs.find_one({"build_id": build_id}, {"full_log": 1}) or {}).get("full_log") or ""
+        all_lines = log.split("\n") if log else []
+        first, last = bounds(len(all_lines))
+        selected = all_lines[first:last + 1]
+        return {
+            "text": "\n".join(selected),
+            "first_line": first + 1,
+            "lines": len(selected),
+            "chunks_read": 0,
+            "total_lines": len(all_lines),
+            "timestamp": index.get("timestamp")
+        }
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def migrate(self, build_id: str = None) -> int:
+        """Convert full_log documents to chunks; returns the number of builds migrated"""
+        query = {"full_log": {"$exists": True}, "storage": {"$ne": "chunked"}}
+        if build_id:
+            query["build_id"] = build_id
+
+        migrated = 0
+        for doc in self.logs.find(query, {"build_id": 1}):
+            log = self.logs.find_one({"_id": doc["_id"]}, {"full_log": 1}).get("full_log") or ""
+            self.write(doc["build_id"], [log])
+            migrated += 1
+        return migrated
+
+
+def read_file(path: str, block_chars: int = 1024 * 1024) -> Iterator[str]:
+    """Log file in blocks (undecodable bytes replaced)"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                return
+            yield block
+
+
+def main(argv=None):
+    """Store a console log file or migrate full_log documents"""
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Chunked console log store")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    put = subcommands.add_parser("put", help="Store a console log file for a build")
+    put.add_argument("build_id")
+    put.add_argument("path")
+    migrate = subcommands.add_parser("migrate", help="Convert full_log documents to chunks")
+    migrate.add_argument("--build-id", help="Only this build")
+    args = parser.parse_args(argv)
+
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/ddn"), serverSelectionTimeoutMS=5000)
+    store = ConsoleLogStore(client.get_database())
+    store.ensure_indexes()
+
+    if args.command == "put":
+        print(store.write(args.build_id, read_file(args.path)))
+    else:
+        print(f"Migrated {store.migrate(args.build_id)} console log(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
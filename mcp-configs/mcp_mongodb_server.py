@@ -6,8 +6,10 @@ MCP Protocol: Model Context Protocol
 Allows AI models to call tools/functions to retrieve data on-demand
 """
 
+import codecs
 import json
 import logging
+import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from flask import Flask, request, jsonify, Response
@@ -17,6 +19,8 @@ import os
 from dotenv import load_dotenv
 import time
 
+from console_log_store import ConsoleLogStore
+
 # Load environment
 load_dotenv()
 
@@ -49,6 +53,20 @@ def get_mongo_connection():
 
     return db
 
+
+console_log_store = None
+
+def get_console_log_store() -> ConsoleLogStore:
+    """Get or create the chunked console log store"""
+    global console_log_store
+
+    if console_log_store is None:
+        store = ConsoleLogStore(get_mongo_connection())
+        store.ensure_indexes()
+        console_log_store = store
+
+    return console_log_store
+
 # ============================================================================
 # MCP TOOL DEFINITIONS
 # ============================================================================
@@ -87,6 +105,75 @@ MCP_TOOLS = [
             "required": ["build_id"]
         }
     },
+    {
+        "name": "mongodb_tail_console_log",
+        "description": "Get the last N lines of a build's console log (reads only the end of the log)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "build_id": {
+                    "type": "string",
+                    "description": "The build ID to query"
+                },
+                "lines": {
+                    "type": "integer",
+                    "description": "Number of last lines to return",
+                    "default": 200
+                }
+            },
+            "required": ["build_id"]
+        }
+    },
+    {
+        "name": "mongodb_get_console_log_range",
+        "description": "Get a range of lines of a build's console log, e.g. around a line found with grep",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "build_id": {
+                    "type": "string",
+                    "description": "The build ID to query"
+                },
+                "start_line": {
+                    "type": "integer",
+                    "description": "First line (1-based)"
+                },
+                "end_line": {
+                    "type": "integer",
+                    "description": "Last line (inclusive)"
+                }
+            },
+            "required": ["build_id", "start_line", "end_line"]
+        }
+    },
+    {
+        "name": "mongodb_grep_console_log",
+        "description": "Find console log lines matching a regular expression, with line numbers",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "build_id": {
+                    "type": "string",
+                    "description": "The build ID to query"
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Regular expression (Python syntax)"
+                },
+                "ignore_case": {
+                    "type": "boolean",
+                    "description": "Case-insensitive match",
+                    "default": False
+                },
+                "max_matches": {
+                    "type": "integer",
+                    "description": "Maximum number of matching lines",
+                    "default": 100
+                }
+            },
+            "required": ["build_id", "pattern"]
+        }
+    },
     {
         "name": "mongodb_get_test_results",
         "description": "Get detailed test execution results including passed/failed tests",
@@ -225,30 +312,28 @@ def mongodb_get_full_error_details(build_id: str) -> Dict[str, Any]:
 def mongodb_get_console_log(build_id: str, lines: int = -1) -> Dict[str, Any]:
     """Get console log for a build"""
     try:
-        db = get_mongo_connection()
+        store = get_console_log_store()
 
-        console_doc = db.console_logs.find_one({"build_id": build_id})
+        # Return last N lines if specified
+        if lines > 0:
+            log = store.tail(build_id, lines)
+        else:
+            log = store.read_all(build_id)
 
-        if not console_doc:
+        if log is None:
             return {
                 "success": False,
                 "error": f"No console log found for build {build_id}"
             }
 
-        full_log = console_doc.get("full_log", "")
-
-        # Return last N lines if specified
-        if lines > 0:
-            log_lines = full_log.split('\n')
-            full_log = '\n'.join(log_lines[-lines:])
-
         result = {
             "success": True,
             "build_id": build_id,
-            "console_output": full_log,
-            "log_size": len(full_log),
-            "lines_returned": len(full_log.split('\n')) if full_log else 0,
-            "timestamp": console_doc.get("timestamp")
+            "console_output": log["text"],
+            "log_size": len(log["text"]),
+            "lines_returned": log["lines"],
+            "total_lines": log["total_lines"],
+            "timestamp": log.get("timestamp")
         }
 
         logger.info(f"✅ Retrieved console log for {build_id} ({result['log_size']} bytes)")
@@ -259,6 +344,72 @@ def mongodb_get_console_log(build_id: str, lines: int = -1) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
+def mongodb_tail_console_log(build_id: str, lines: int = 200) -> Dict[str, Any]:
+    """Get the last lines of a console log"""
+    try:
+        log = get_console_log_store().tail(build_id, lines)
+
+        if log is None:
+            return {
+                "success": False,
+                "error": f"No console log found for build {build_id}"
+            }
+
+        logger.info(f"✅ Retrieved last {log['lines']} console log lines for {build_id} "
+                    f"({log['chunks_read']} chunks read)")
+        return {"success": True, "build_id": build_id, **log}
+
+    except Exception as e:
+        logger.error(f"❌ Error getting console log tail: {e}")
+        return {"success": False, "error": str(e)}
+
+
+def mongodb_get_console_log_range(build_id: str, start_line: int, end_line: int) -> Dict[str, Any]:
+    """Get console log lines start_line..end_line"""
+    try:
+        if end_line < start_line:
+            return {"success": False, "error": "end_line must not be smaller than start_line"}
+
+        log = get_console_log_store().read_range(build_id, start_line, end_line)
+
+        if log is None:
+            return {
+                "success": False,
+                "error": f"No console log found for build {build_id}"
+            }
+
+        logger.info(f"✅ Retrieved console log lines {start_line}-{end_line} for {build_id} "
+                    f"({log['chunks_read']} chunks read)")
+        return {"success": True, "build_id": build_id, **log}
+
+    except Exception as e:
+        logger.error(f"❌ Error getting console log range: {e}")
+        return {"success": False, "error": str(e)}
+
+
+def mongodb_grep_console_log(build_id: str, pattern: str, ignore_case: bool = False,
+                             max_matches: int = 100) -> Dict[str, Any]:
+    """Find console log lines matching a pattern"""
+    try:
+        result = get_console_log_store().grep(build_id, pattern, ignore_case=ignore_case,
+                                              max_matches=max_matches)
+
+        if result is None:
+            return {
+                "success": False,
+                "error": f"No console log found for build {build_id}"
+            }
+
+        logger.info(f"✅ Found {len(result['matches'])} console log lines matching {pattern!r} for {build_id}")
+        return {"success": True, "build_id": build_id, "pattern": pattern, **result}
+
+    except re.error as e:
+        return {"success": False, "error": f"Invalid pattern: {e}"}
+    except Exception as e:
+        logger.error(f"❌ Error searching console log: {e}")
+        return {"success": False, "error": str(e)}
+
+
 def mongodb_get_test_results(build_id: str) -> Dict[str, Any]:
     """Get test execution results"""
     try:
@@ -528,6 +679,9 @@ def call_tool():
         tool_functions = {
             "mongodb_get_full_error_details": mongodb_get_full_error_details,
             "mongodb_get_console_log": mongodb_get_console_log,
+            "mongodb_tail_console_log": mongodb_tail_console_log,
+            "mongodb_get_console_log_range": mongodb_get_console_log_range,
+            "mongodb_grep_console_log": mongodb_grep_console_log,
             "mongodb_get_test_results": mongodb_get_test_results,
             "mongodb_get_system_info": mongodb_get_system_info,
             "mongodb_get_environment_details": mongodb_get_environment_details,
@@ -567,6 +721,67 @@ def call_tool():
         }), 500
 
 
+def _decode_blocks(stream, block_size=1024 * 1024):
+    """Text of a byte stream read in blocks (multi-byte characters may span blocks)"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for block in iter(lambda: stream.read(block_size), b''):
+        text = decoder.decode(block)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+@app.route('/api/console-logs/<build_id>', methods=['PUT'])
+def store_console_log(build_id):
+    """
+    Store a build's console log (request body: the raw log text)
+
+    The body is read in blocks and written as compressed chunks, so logs
+    larger than the MongoDB document limit are accepted.
+    """
+    try:
+        summary = get_console_log_store().write(build_id, _decode_blocks(request.stream))
+        return jsonify({"success": True, **summary}), 200
+
+    except Exception as e:
+        logger.error(f"❌ Error storing console log: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/console-logs/<build_id>/tail', methods=['GET'])
+def console_log_tail(build_id):
+    """Last lines of a console log (?lines=200)"""
+    result = mongodb_tail_console_log(build_id, request.args.get('lines', 200, type=int))
+    return jsonify(result), 200 if result["success"] else 404
+
+
+@app.route('/api/console-logs/<build_id>/range', methods=['GET'])
+def console_log_range(build_id):
+    """Console log lines (?start=1&end=100, 1-based inclusive)"""
+    start = request.args.get('start', 1, type=int)
+    result = mongodb_get_console_log_range(build_id, start, request.args.get('end', start + 99, type=int))
+    return jsonify(result), 200 if result["success"] else 404
+
+
+@app.route('/api/console-logs/<build_id>/grep', methods=['GET'])
+def console_log_grep(build_id):
+    """Console log lines matching ?pattern= (&ignore_case=true&max_matches=100)"""
+    pattern = request.args.get('pattern')
+    if not pattern:
+        return jsonify({"success": False, "error": "pattern is required"}), 400
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        return jsonify({"success": False, "error": f"Invalid pattern: {e}"}), 400
+
+    result = mongodb_grep_console_log(build_id, pattern,
+                                      ignore_case=request.args.get('ignore_case', 'false').lower() == 'true',
+                                      max_matches=request.args.get('max_matches', 100, type=int))
+    return jsonify(result), 200 if result["success"] else 404
+
+
 @app.route('/sse', methods=['GET', 'POST'])
 def sse_endpoint():
     """